@@ -1,84 +1,14 @@
 from flask import request, jsonify, Response
 from services.AccountService import AccountService
-from services.UserService import UserService
 from utils.LogUtils import LogUtils
-from utils.TokenUtils import TokenUtils
+from utils.AuthUtils import token_required
 from models.AccountModel import AccountInfoModel, AccountResponseModel, AccountsResponseModel
-from functools import wraps
-import time
 
 # 初始化API日志记录器
 api_logger = LogUtils.get_instance('API')
 
 # 创建服务实例
 account_service = AccountService()
-user_service = UserService()
-
-# 鉴权装饰器
-def token_required(f):
-    """
-    验证token的装饰器
-    """
-    @wraps(f)
-    def decorated(*args, **kwargs):
-        # 从header中获取token和user_id
-        token = request.headers.get('token', '').strip()
-        user_id_header = request.headers.get('userid', '').strip()
-        
-        # 确保token是字符串类型
-        token = str(token)
-        
-        api_logger.info(f"开始token验证 - token: {token[:10]}..., user_id_header: {user_id_header}")
-        
-        # 验证token和user_id是否存在
-        if not token:
-            api_logger.warning("token验证失败: token为空")
-            return jsonify({"errorcode": 401, "message": "未提供token", "data": None}), 401
-        
-        if not user_id_header:
-            api_logger.warning("token验证失败: userid为空")
-            return jsonify({"errorcode": 401, "message": "未提供userid", "data": None}), 401
-        
-        try:
-            user_id = int(user_id_header)
-        except ValueError:
-            api_logger.warning("token验证失败: userid不是有效的整数")
-            return jsonify({"errorcode": 401, "message": "无效的userid", "data": None}), 401
-        
-        # 根据user_id查询用户信息
-        user = user_service.get_user_by_id(user_id)
-        if not user:
-            api_logger.warning(f"token验证失败: 用户不存在 - user_id: {user_id}")
-            return jsonify({"errorcode": 401, "message": "用户不存在", "data": None}), 401
-        
-        # 简化调试信息，只打印user元组结构
-        api_logger.info(f"调试信息 - user元组长度: {len(user)}")
-        for i, item in enumerate(user):
-            api_logger.info(f"调试信息 - user[{i}]: {item}, 类型: {type(item)}")
-        
-        # 从user元组中获取token和过期时间 - 根据实际查询结果设置正确的索引
-        stored_token = user[4]  # refresh_token
-        token_expiration_time = user[5]  # token_expiration_time
-        
-        # 确保stored_token是字符串类型
-        if stored_token is not None:
-            stored_token = str(stored_token)
-        
-        # 调试信息：打印token比较
-        api_logger.info(f"调试信息 - 传入的token: {token}, 类型: {type(token)}, 长度: {len(token)}")
-        api_logger.info(f"调试信息 - 存储的token: {stored_token}, 类型: {type(stored_token)}, 长度: {len(str(stored_token)) if stored_token is not None else 0}")
-        api_logger.info(f"调试信息 - token_expiration_time: {token_expiration_time}, 类型: {type(token_expiration_time)}")
-        api_logger.info(f"调试信息 - 当前时间戳: {int(time.time() * 1000)}")
-        
-        # 验证token
-        if TokenUtils.validate_token(token, stored_token, token_expiration_time):
-            api_logger.info("token验证成功")
-            return f(*args, **kwargs)
-        else:
-            api_logger.warning("token验证失败: token无效或已过期")
-            return jsonify({"errorcode": 401, "message": "无效或已过期的token", "data": None}), 401
-    
-    return decorated
 
 def setup_account_routes(app):
     """
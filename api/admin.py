@@ -0,0 +1,58 @@
+from flask import request, jsonify
+from db.Database import Database
+from utils.LogUtils import LogUtils
+from utils.AuthUtils import admin_token_required
+
+# 初始化API日志记录器
+api_logger = LogUtils.get_instance('API')
+
+# 慢查询统计支持的排序字段
+QUERY_STATS_ORDER_BY = ('total', 'p95', 'max', 'count', 'slow')
+
+def setup_admin_routes(app):
+    """
+    设置运维管理相关的路由
+
+    请求需要在X-Admin-Token请求头中携带[admin]节配置的令牌，未配置令牌时接口不启用（返回404）。
+    """
+    api_logger.info("开始配置运维管理API路由")
+
+    @app.route("/admin/slow-queries", methods=["GET"])  # SQL执行统计接口
+    @admin_token_required
+    def get_slow_queries():
+        """
+        按语句指纹汇总的SQL执行统计，用于确定优先优化的查询
+        请求参数：order_by(可选，默认total) - total、p95、max、count或slow
+                 limit(可选，默认20) - 返回的指纹数量，0表示全部返回
+        """
+        order_by = request.args.get("order_by", "total").strip()
+        if order_by not in QUERY_STATS_ORDER_BY:
+            return jsonify({"errorcode": 400, "message": f"order_by只支持: {', '.join(QUERY_STATS_ORDER_BY)}", "data": None}), 400
+        try:
+            limit = int(request.args.get("limit", 20))
+        except ValueError as e:
+            api_logger.error(f"参数类型错误: {e}")
+            return jsonify({"errorcode": 400, "message": f"参数类型错误: {str(e)}", "data": None}), 400
+        if limit < 0:
+            return jsonify({"errorcode": 400, "message": "limit不能小于0", "data": None}), 400
+
+        query_stats = Database.query_stats
+        if query_stats is None:
+            return jsonify({"errorcode": 200, "message": "获取成功", "data": {"slow_threshold_ms": None, "queries": []}}), 200
+        return jsonify({"errorcode": 200, "message": "获取成功", "data": {
+            "slow_threshold_ms": round(query_stats.slow_threshold * 1000, 3),
+            "queries": query_stats.snapshot(order_by, limit)
+        }}), 200
+
+    @app.route("/admin/slow-queries", methods=["DELETE"])  # 清除SQL执行统计接口
+    @admin_token_required
+    def reset_slow_queries():
+        """
+        清除SQL执行统计，用于在优化后重新开始统计
+        """
+        if Database.query_stats is not None:
+            Database.query_stats.reset()
+        api_logger.info("SQL执行统计已清除")
+        return jsonify({"errorcode": 200, "message": "清除成功", "data": None}), 200
+
+    api_logger.info("运维管理API路由配置完成")
@@ -40,7 +40,7 @@ def setup_expend_routes(app):
         enable = request.form.get("enable", "True")
         
         # 记录新增支出请求
-        api_logger.info(f"收到新增支出请求 - user_id: {user_id}, money: {money}, account_id: {account_id}, remark: {remark}, expend_time: {expend_time}, expend_type_id: {expend_type_id}, enable: {enable}")
+        api_logger.info_event("收到新增支出请求", user_id=user_id, money=money, account_id=account_id, remark=remark, expend_time=expend_time, expend_type_id=expend_type_id, enable=enable)
         
         try:
             # 验证必填参数
@@ -131,7 +131,7 @@ def setup_expend_routes(app):
         api_logger.info(f"更新支出记录路由被调用 - id: {id}")
         
         # 记录更新支出请求
-        api_logger.info(f"收到更新支出请求 - user_id: {user_id}, id: {id}, money: {money}, account_id: {account_id}, remark: {remark}, expend_time: {expend_time}, expend_type_id: {expend_type_id}, enable: {enable}")
+        api_logger.info_event("收到更新支出请求", user_id=user_id, id=id, money=money, account_id=account_id, remark=remark, expend_time=expend_time, expend_type_id=expend_type_id, enable=enable)
         
         try:
             # 验证id参数
@@ -244,21 +244,36 @@ def setup_expend_routes(app):
         """
         获取支出记录接口
         请求头：token, userid
-        请求参数：id(可选) - 提供id则获取单个记录，不提供则获取所有记录
+        请求参数：id(可选) - 提供id则获取单个记录，不提供则获取记录列表
+                 limit(可选) - 每页记录数，与cursor都不提供时返回全部记录的列表（不分页）
+                 cursor(可选) - 上一页返回的next_cursor
+                 account_id(可选), expend_type_id(可选) - 按账户、类型过滤
+                 start_time(可选), end_time(可选) - 按时间范围过滤，毫秒级时间戳或时间字符串
+                 min_money(可选), max_money(可选) - 按金额范围过滤
+                 enable(可选) - 按是否可用过滤
         """
         # 从请求头中获取user_id
         user_id = int(request.headers.get('userid'))
         
-        # 从查询字符串中获取id参数
+        # 从查询字符串中获取id、分页和过滤参数
         id = request.args.get("id", None)
+        limit = request.args.get("limit", None)
+        cursor = request.args.get("cursor", None)
+        account_id = request.args.get("account_id", None)
+        expend_type_id = request.args.get("expend_type_id", None)
+        start_time = request.args.get("start_time", None)
+        end_time = request.args.get("end_time", None)
+        min_money = request.args.get("min_money", None)
+        max_money = request.args.get("max_money", None)
+        enable = request.args.get("enable", None)
         
         api_logger.info(f"获取支出记录路由被调用 - id: {id}")
         
         # 记录获取支出请求
-        api_logger.info(f"收到获取支出请求 - user_id: {user_id}, id: {id}")
+        api_logger.info(f"收到获取支出请求 - user_id: {user_id}, id: {id}, limit: {limit}, cursor: {cursor}")
         
         try:
-            # 检查是否提供了id参数，如果提供则获取单个记录，否则获取所有记录
+            # 检查是否提供了id参数，如果提供则获取单个记录，否则分页获取记录列表
             if id:
                 # 转换id类型
                 id = int(id.strip()) if id.strip() else None
@@ -273,11 +288,27 @@ def setup_expend_routes(app):
                     api_logger.warning(f"获取单个支出记录失败 - user_id: {user_id}, id: {id}, message: {message}")
                     return jsonify({"errorcode": 400, "message": message, "data": None}), 400
             else:
-                # 调用ExpendService的get_expends_by_user_id方法获取所有记录
-                success, message, data = expend_service.get_expends_by_user_id(user_id)
+                # 转换分页参数类型
+                limit = int(limit.strip()) if limit is not None and limit.strip() else None
+                cursor = cursor.strip() if cursor is not None and cursor.strip() else None
+                
+                # 转换过滤参数类型
+                account_id = int(account_id.strip()) if account_id is not None and account_id.strip() else None
+                expend_type_id = int(expend_type_id.strip()) if expend_type_id is not None and expend_type_id.strip() else None
+                start_time = TimeUtils.parse_time(start_time) if start_time is not None and start_time.strip() else None
+                end_time = TimeUtils.parse_time(end_time) if end_time is not None and end_time.strip() else None
+                min_money = float(min_money.strip()) if min_money is not None and min_money.strip() else None
+                max_money = float(max_money.strip()) if max_money is not None and max_money.strip() else None
+                enable = enable.strip().lower() in ['true', '1', 'yes'] if enable is not None and enable.strip() else None
+                
+                # 调用ExpendService的get_expends_by_user_id方法获取记录，提供limit或cursor时分页
+                success, message, data = expend_service.get_expends_by_user_id(
+                    user_id, limit, cursor, account_id, expend_type_id, start_time, end_time, min_money, max_money, enable
+                )
                 
                 if success:
-                    api_logger.info(f"获取所有支出记录成功 - user_id: {user_id}")
+                    records = data['list'] if isinstance(data, dict) else data
+                    api_logger.info(f"获取支出记录列表成功 - user_id: {user_id}, 记录数: {len(records)}")
                     return jsonify({"errorcode": 200, "message": message, "data": data}), 200
                 else:
                     api_logger.warning(f"获取所有支出记录失败 - user_id: {user_id}, message: {message}")
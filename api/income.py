@@ -40,7 +40,7 @@ def setup_income_routes(app):
         enable = request.form.get("enable", "True")
         
         # 记录新增收入请求
-        api_logger.info(f"收到新增收入请求 - user_id: {user_id}, money: {money}, account_id: {account_id}, remark: {remark}, income_time: {income_time}, income_type_id: {income_type_id}, enable: {enable}")
+        api_logger.info_event("收到新增收入请求", user_id=user_id, money=money, account_id=account_id, remark=remark, income_time=income_time, income_type_id=income_type_id, enable=enable)
         
         try:
             # 验证必填参数
@@ -131,7 +131,7 @@ def setup_income_routes(app):
         enable = request.form.get("enable", None)
         
         # 记录更新收入请求
-        api_logger.info(f"收到更新收入请求 - user_id: {user_id}, id: {id}, money: {money}, account_id: {account_id}, remark: {remark}, income_time: {income_time}, income_type_id: {income_type_id}, enable: {enable}")
+        api_logger.info_event("收到更新收入请求", user_id=user_id, id=id, money=money, account_id=account_id, remark=remark, income_time=income_time, income_type_id=income_type_id, enable=enable)
         
         # 验证id参数
         if not id:
@@ -249,18 +249,33 @@ def setup_income_routes(app):
         """
         获取收入记录接口
         请求头：token, userid
-        请求参数：id(可选) - 提供id则获取单个记录，不提供则获取所有记录
+        请求参数：id(可选) - 提供id则获取单个记录，不提供则获取记录列表
+                 limit(可选) - 每页记录数，与cursor都不提供时返回全部记录的列表（不分页）
+                 cursor(可选) - 上一页返回的next_cursor
+                 account_id(可选), income_type_id(可选) - 按账户、类型过滤
+                 start_time(可选), end_time(可选) - 按时间范围过滤，毫秒级时间戳或时间字符串
+                 min_money(可选), max_money(可选) - 按金额范围过滤
+                 enable(可选) - 按是否可用过滤
         """
         api_logger.info("获取收入记录路由被调用")
         
         # 从请求头中获取user_id
         user_id = int(request.headers.get('userid'))
         
-        # 从查询字符串中获取id参数
+        # 从查询字符串中获取id、分页和过滤参数
         id = request.args.get("id", None)
+        limit = request.args.get("limit", None)
+        cursor = request.args.get("cursor", None)
+        account_id = request.args.get("account_id", None)
+        income_type_id = request.args.get("income_type_id", None)
+        start_time = request.args.get("start_time", None)
+        end_time = request.args.get("end_time", None)
+        min_money = request.args.get("min_money", None)
+        max_money = request.args.get("max_money", None)
+        enable = request.args.get("enable", None)
         
         # 记录获取收入请求
-        api_logger.info(f"收到获取收入请求 - user_id: {user_id}, id: {id}")
+        api_logger.info(f"收到获取收入请求 - user_id: {user_id}, id: {id}, limit: {limit}, cursor: {cursor}")
         
         try:
             if id:
@@ -268,8 +283,22 @@ def setup_income_routes(app):
                 id = int(id.strip())
                 success, message, data = income_service.get_income_by_id(id, user_id)
             else:
-                # 获取所有收入记录
-                success, message, data = income_service.get_incomes_by_user_id(user_id)
+                # 分页获取收入记录
+                limit = int(limit.strip()) if limit is not None and limit.strip() else None
+                cursor = cursor.strip() if cursor is not None and cursor.strip() else None
+                
+                # 转换过滤参数类型
+                account_id = int(account_id.strip()) if account_id is not None and account_id.strip() else None
+                income_type_id = int(income_type_id.strip()) if income_type_id is not None and income_type_id.strip() else None
+                start_time = TimeUtils.parse_time(start_time) if start_time is not None and start_time.strip() else None
+                end_time = TimeUtils.parse_time(end_time) if end_time is not None and end_time.strip() else None
+                min_money = float(min_money.strip()) if min_money is not None and min_money.strip() else None
+                max_money = float(max_money.strip()) if max_money is not None and max_money.strip() else None
+                enable = enable.strip().lower() in ['true', '1', 'yes'] if enable is not None and enable.strip() else None
+                
+                success, message, data = income_service.get_incomes_by_user_id(
+                    user_id, limit, cursor, account_id, income_type_id, start_time, end_time, min_money, max_money, enable
+                )
             
             if success:
                 api_logger.info(f"获取收入记录成功 - user_id: {user_id}, id: {id}")
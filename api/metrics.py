@@ -0,0 +1,170 @@
+import time
+from flask import request, g, Response
+from flask.json.provider import DefaultJSONProvider
+from db.Database import Database
+from dao.ExpendTypeDAO import ExpendTypeDAO
+from dao.IncomeTypeDAO import IncomeTypeDAO
+from utils.AuthUtils import admin_token_required
+from utils.LogUtils import LogUtils
+from utils.Metrics import MetricsWriter, RequestMetrics, RequestTiming
+from utils.TokenCache import TokenCache
+
+# 初始化API日志记录器
+api_logger = LogUtils.get_instance('API')
+
+
+class TimedJSONProvider(DefaultJSONProvider):
+    """记录jsonify序列化耗时的JSON提供者，耗时累加到当前请求的g.json_time中"""
+
+    def response(self, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return super().response(*args, **kwargs)
+        finally:
+            g.json_time = g.get('json_time', 0.0) + time.perf_counter() - start
+
+
+def _write_pool_metrics(writer):
+    """
+    写入连接池指标
+
+    Args:
+        writer: MetricsWriter实例
+    """
+    pool = Database.get_pool_stats()
+    if pool is None:
+        return
+    writer.gauge('app_db_pool_connections', '连接池中的连接数', [
+        ({'state': 'in_use'}, pool['in_use']),
+        ({'state': 'idle'}, pool['idle'])
+    ])
+    writer.gauge('app_db_pool_max_connections', '允许同时借出的最大连接数，0表示不限制', [(None, pool['max_connections'])])
+    writer.gauge('app_db_pool_waiters', '正在等待连接的线程数', [(None, pool['waiters'])])
+    writer.counter('app_db_pool_acquired_total', '成功获取连接的次数', [(None, pool['acquired'])])
+    writer.counter('app_db_pool_acquire_failures_total', '获取连接失败的次数', [
+        ({'reason': 'timeout'}, pool['timeouts']),
+        ({'reason': 'rejected'}, pool['rejected'])
+    ])
+    writer.counter('app_db_pool_shed_requests_total', '因连接池过载返回503的请求数', [(None, pool['shed_requests'])])
+    writer.counter('app_db_pool_physical_connections_total', '物理连接的创建和回收次数', [
+        ({'event': 'created'}, pool['created']),
+        ({'event': 'recycled'}, pool['recycled'])
+    ])
+    wait = pool['acquire_wait_seconds']
+    writer.histogram('app_db_pool_acquire_wait_seconds', '获取连接的等待耗时',
+                     [(None, list(wait['buckets'].items()), wait['sum'], wait['count'])])
+
+
+def _write_cache_metrics(writer):
+    """
+    写入进程内缓存的命中统计
+
+    Args:
+        writer: MetricsWriter实例
+    """
+    token = TokenCache.stats()
+    samples = [
+        ({'cache': 'token', 'result': 'hit'}, token['hits']),
+        ({'cache': 'token', 'result': 'miss'}, token['misses'])
+    ]
+    for catalog in (ExpendTypeDAO.catalog, IncomeTypeDAO.catalog):
+        stats = catalog.stats()
+        samples.extend([
+            ({'cache': catalog.table, 'result': 'hit'}, stats['hits']),
+            ({'cache': catalog.table, 'result': 'revalidated'}, stats['revalidations']),
+            ({'cache': catalog.table, 'result': 'miss'}, stats['loads'])
+        ])
+    writer.counter('app_cache_lookups_total', '进程内缓存的查找次数，按结果分类', samples)
+    writer.gauge('app_cache_entries', '进程内缓存的条目数', [({'cache': 'token'}, token['size'])])
+
+
+def _write_log_queue_metrics(writer):
+    """
+    写入异步日志队列指标
+
+    Args:
+        writer: MetricsWriter实例
+    """
+    log_queue = LogUtils.get_queue_stats()
+    if log_queue is None:
+        return
+    writer.gauge('app_log_queue_depth', '异步日志队列中等待写入的日志条数', [(None, log_queue['queue_depth'])])
+    writer.gauge('app_log_queue_capacity', '异步日志队列容量', [(None, log_queue['queue_size'])])
+    writer.gauge('app_log_queue_max_depth', '异步日志队列的历史最大深度', [(None, log_queue['max_depth'])])
+    writer.counter('app_log_queue_dropped_total', '队列满时被丢弃的日志条数', [(None, log_queue['dropped'])])
+    writer.counter('app_log_queue_written_total', '已写入处理器的日志条数', [(None, log_queue['written'])])
+
+
+def _check_query_budget(method, route, query_count):
+    """
+    检查请求执行的SQL语句数是否超出路由的预算，超出时记录警告
+
+    Args:
+        method: 请求方法
+        route: 路由规则
+        query_count: 请求内执行的SQL语句数
+    """
+    budget = RequestTiming.budget_for(method, route)
+    if budget and query_count > budget:
+        RequestMetrics.record_over_budget(method, route)
+        api_logger.warning_event("SQL语句数超出预算", method=method, route=route, queries=query_count, budget=budget)
+
+
+def setup_metrics(app):
+    """
+    设置请求指标收集、Server-Timing响应头和/metrics接口
+
+    Server-Timing中的各项耗时（毫秒）：db为SQL语句执行耗时，pool为获取数据库连接的等待时间，
+    json为响应序列化耗时，app为其余的业务处理耗时，total为请求总耗时。
+
+    需要在其他after_request钩子之前注册：after_request按注册的相反顺序执行，
+    先注册的钩子最后执行，记录的是最终返回给客户端的状态码（例如过载降级后的503）。
+    """
+    api_logger.info("开始配置请求指标")
+
+    app.json_provider_class = TimedJSONProvider
+    app.json = TimedJSONProvider(app)
+
+    @app.before_request
+    def start_request_timer():
+        g.request_start_time = time.perf_counter()
+
+    @app.after_request
+    def record_request_metrics(response):
+        start_time = g.pop('request_start_time', None)
+        if start_time is None:
+            return response
+
+        total_time = time.perf_counter() - start_time
+        route = request.url_rule.rule if request.url_rule is not None else '<unmatched>'
+        query_count, db_time = Database.get_request_db_stats()
+        RequestMetrics.observe(request.method, route, response.status_code, total_time, db_time, query_count)
+        _check_query_budget(request.method, route, query_count)
+
+        if RequestTiming.server_timing_enabled():
+            pool_wait = Database.get_request_pool_wait()
+            json_time = g.get('json_time', 0.0)
+            response.headers['Server-Timing'] = RequestTiming.format_header([
+                ('db', db_time, f"{query_count} queries"),
+                ('pool', pool_wait, None),
+                ('json', json_time, None),
+                ('app', max(total_time - db_time - pool_wait - json_time, 0.0), None),
+                ('total', total_time, None)
+            ])
+        return response
+
+    @app.route("/metrics", methods=["GET"])  # 指标接口
+    @admin_token_required
+    def metrics():
+        """
+        Prometheus文本格式的运行指标：按路由的请求数、错误数、耗时和数据库耗时直方图，
+        连接池统计，缓存命中次数以及异步日志队列深度。指标暴露路由和内部状态，与运维接口使用同一个访问令牌
+        """
+        writer = MetricsWriter()
+        RequestMetrics.write(writer)
+        _write_pool_metrics(writer)
+        _write_cache_metrics(writer)
+        _write_log_queue_metrics(writer)
+        return Response(writer.render(), content_type=MetricsWriter.CONTENT_TYPE)
+
+    api_logger.info("请求指标配置完成")
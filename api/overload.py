@@ -0,0 +1,40 @@
+from flask import jsonify
+from db.Database import Database
+from utils.LogUtils import LogUtils
+
+# 初始化API日志记录器
+api_logger = LogUtils.get_instance('API')
+
+
+def setup_overload_handlers(app):
+    """
+    设置连接池过载保护
+    
+    请求处理过程中如果因连接池等待队列已满或获取连接超时而无法获取数据库连接，
+    则丢弃原响应，快速返回503并携带Retry-After响应头，避免过载在各接口间级联扩散。
+    请求中已经提交过事务时保留原响应：写入已经生效，返回503会让客户端重试并重复写入。
+    """
+    api_logger.info("开始配置连接池过载保护")
+    
+    @app.before_request
+    def reset_request_state():
+        Database.reset_request_state()
+    
+    @app.after_request
+    def shed_overloaded_request(response):
+        if not Database.is_request_shed():
+            return response
+        if Database.is_request_committed():
+            api_logger.warning(f"连接池繁忙，但请求已提交写入，保留原响应: status={response.status_code}")
+            return response
+        
+        if Database.monitor is not None:
+            Database.monitor.record_shed_request()
+        api_logger.warning(f"连接池繁忙，请求被降级处理: status={response.status_code}")
+        
+        shed_response = jsonify({"errorcode": 503, "message": "服务繁忙，请稍后重试", "data": None})
+        shed_response.status_code = 503
+        shed_response.headers['Retry-After'] = str(Database.retry_after)
+        return shed_response
+    
+    api_logger.info("连接池过载保护配置完成")
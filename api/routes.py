@@ -5,6 +5,10 @@ from .expendtype import setup_expendtype_routes
 from .incometype import setup_incometype_routes
 from .expend import setup_expend_routes
 from .income import setup_income_routes
+from .stats import setup_stats_routes
+from .overload import setup_overload_handlers
+from .metrics import setup_metrics
+from .admin import setup_admin_routes
 from utils.LogUtils import LogUtils
 
 # 初始化API日志记录器
@@ -19,6 +23,12 @@ def setup_all_routes(app: Flask):
     """
     api_logger.info("开始配置所有API路由")
     
+    # 设置请求指标，需要先于过载保护注册以记录最终的响应状态码
+    setup_metrics(app)
+    
+    # 设置连接池过载保护
+    setup_overload_handlers(app)
+    
     # 设置用户相关路由
     setup_user_routes(app)
     
@@ -37,4 +47,10 @@ def setup_all_routes(app: Flask):
     # 设置收入相关路由
     setup_income_routes(app)
     
+    # 设置统计相关路由
+    setup_stats_routes(app)
+    
+    # 设置运维管理相关路由
+    setup_admin_routes(app)
+    
     api_logger.info("所有API路由配置完成")
@@ -0,0 +1,99 @@
+from flask import request, jsonify
+from services.StatsService import StatsService
+from utils.LogUtils import LogUtils
+from utils.AuthUtils import token_required
+from utils.TimeUtils import TimeUtils
+
+# 初始化API日志记录器
+api_logger = LogUtils.get_instance('API')
+
+# 创建StatsService实例
+stats_service = StatsService()
+
+def _parse_time_range():
+    """
+    从查询字符串中解析时间范围参数
+
+    Returns:
+        tuple: (开始时间, 结束时间)，未提供的参数为None
+    """
+    start_time = request.args.get("start_time", None)
+    end_time = request.args.get("end_time", None)
+    start_time = TimeUtils.parse_time(start_time) if start_time is not None and start_time.strip() else None
+    end_time = TimeUtils.parse_time(end_time) if end_time is not None and end_time.strip() else None
+    return start_time, end_time
+
+def setup_stats_routes(app):
+    """
+    设置统计相关的路由
+    """
+    api_logger.info("开始配置统计API路由")
+
+    @app.route("/api/stats/<kind>", methods=["GET"])
+    @token_required
+    def get_grouped_stats(kind):
+        """
+        支出/收入分组统计接口
+        请求头：token, userid
+        路径参数：kind - expend或income
+        请求参数：group_by(可选，默认month) - day、week、month、type或account
+                 start_time(可选), end_time(可选) - 时间范围，毫秒级时间戳或时间字符串
+        """
+        # 从请求头中获取user_id
+        user_id = int(request.headers.get('userid'))
+        group_by = request.args.get("group_by", "month").strip()
+
+        api_logger.info(f"收到分组统计请求 - user_id: {user_id}, kind: {kind}, group_by: {group_by}")
+
+        try:
+            start_time, end_time = _parse_time_range()
+            success, message, data = stats_service.get_grouped_stats(kind, user_id, group_by, start_time, end_time)
+
+            if success:
+                api_logger.info(f"分组统计成功 - user_id: {user_id}, kind: {kind}, 分组数: {len(data['items'])}")
+                return jsonify({"errorcode": 200, "message": message, "data": data}), 200
+            else:
+                api_logger.warning(f"分组统计失败 - user_id: {user_id}, kind: {kind}, message: {message}")
+                return jsonify({"errorcode": 400, "message": message, "data": None}), 400
+        except ValueError as e:
+            api_logger.error(f"参数类型错误: {e}")
+            return jsonify({"errorcode": 400, "message": f"参数类型错误: {str(e)}", "data": None}), 400
+        except Exception as e:
+            api_logger.error(f"分组统计过程中发生错误: {e}")
+            import traceback
+            traceback.print_exc()
+            return jsonify({"errorcode": 500, "message": f"统计失败: {str(e)}", "data": None}), 500
+
+    @app.route("/api/stats/summary", methods=["GET"])
+    @token_required
+    def get_stats_summary():
+        """
+        支出/收入汇总统计接口
+        请求头：token, userid
+        请求参数：start_time(可选), end_time(可选) - 时间范围，毫秒级时间戳或时间字符串
+        """
+        # 从请求头中获取user_id
+        user_id = int(request.headers.get('userid'))
+
+        api_logger.info(f"收到汇总统计请求 - user_id: {user_id}")
+
+        try:
+            start_time, end_time = _parse_time_range()
+            success, message, data = stats_service.get_summary(user_id, start_time, end_time)
+
+            if success:
+                api_logger.info(f"汇总统计成功 - user_id: {user_id}")
+                return jsonify({"errorcode": 200, "message": message, "data": data}), 200
+            else:
+                api_logger.warning(f"汇总统计失败 - user_id: {user_id}, message: {message}")
+                return jsonify({"errorcode": 400, "message": message, "data": None}), 400
+        except ValueError as e:
+            api_logger.error(f"参数类型错误: {e}")
+            return jsonify({"errorcode": 400, "message": f"参数类型错误: {str(e)}", "data": None}), 400
+        except Exception as e:
+            api_logger.error(f"汇总统计过程中发生错误: {e}")
+            import traceback
+            traceback.print_exc()
+            return jsonify({"errorcode": 500, "message": f"统计失败: {str(e)}", "data": None}), 500
+
+    api_logger.info("统计API路由配置完成")
@@ -28,22 +28,22 @@ def setup_user_routes(app):
         username = request.form.get("username", "").strip()
         password = request.form.get("password", "").strip()
         phone = request.form.get("phone", "").strip()
+        # 设备信息，未提供时使用User-Agent
+        device = request.form.get("device", "").strip() or request.headers.get("User-Agent", "")
 
         # 记录登录请求
         api_logger.info(f"收到登录请求 - 用户名: {username}，手机号: {phone}")
-        api_logger.info(f"password: {password}")
 
         try:
             # 调用UserService的login方法
             api_logger.info("调用user_service.login方法")
-            success, message, user = user_service.login(username, password, phone)
+            success, message, user = user_service.login(username, password, phone, device)
             
-            api_logger.info(f"login返回结果: success={success}, message={message}, user={user}")
+            api_logger.info_event("login返回结果", success=success, message=message)
             
             if success:
                 api_logger.info("登录成功，准备返回JSON响应")
-                api_logger.info(f"user的长度: {len(user)}")
-                api_logger.info(f"user的内容: {user}")
+                api_logger.debug_event("登录用户信息", length=lambda: len(user), user=user)
                 
                 # 使用UserInfoModel处理用户信息
                 user_info = UserInfoModel(user)
@@ -52,7 +52,13 @@ def setup_user_routes(app):
                 # 转换为字典格式
                 response_data = login_response.to_dict()
                 
-                api_logger.info(f"response_data: {response_data}")
+                # 启用签名token模式时额外返回访问token，token字段仍用于续签
+                access_token, access_token_expiration_time = user_service.issue_access_token(user_info.id, user_info.token)
+                if access_token:
+                    response_data['data']['access_token'] = access_token
+                    response_data['data']['access_token_expiration_time'] = access_token_expiration_time
+                
+                api_logger.debug_event("登录响应", response_data=response_data)
                 return jsonify(response_data), 200
             elif "用户名/手机号或密码错误" in message:
                 api_logger.info("登录失败: 用户名/手机号或密码错误")
@@ -114,14 +120,46 @@ def setup_user_routes(app):
             from db.Database import Database
             db = Database()
             if db.connect():
-                db.close()
-                return jsonify({"status": "ok", "message": "Service is healthy", "db_status": "connected"}), 200
+                db.disconnect()
+                return jsonify({"status": "ok", "message": "Service is healthy", "db_status": "connected", "pool": Database.get_pool_stats(), "log_queue": LogUtils.get_queue_stats()}), 200
             else:
                 return jsonify({"status": "error", "message": "Database connection failed"}), 500
         except Exception as e:
             api_logger.error(f"健康检查过程中发生错误: {e}")
             return jsonify({"status": "error", "message": f"Service error: {str(e)}"}), 500
     
+    @app.route("/api/token/refresh", methods=["POST"])  # 续签访问token接口
+    def refresh_access_token():
+        """
+        续签访问token接口（签名token模式）
+        请求头：token - 登录时返回的token, userid
+        """
+        token = request.headers.get('token', '').strip()
+        user_id_header = request.headers.get('userid', '').strip()
+        
+        api_logger.info(f"收到续签访问token请求 - user_id: {user_id_header}")
+        
+        try:
+            user_id = int(user_id_header)
+        except ValueError:
+            api_logger.warning("续签访问token失败: userid不是有效的整数")
+            return jsonify({"errorcode": 401, "message": "无效的userid", "data": None}), 401
+        
+        try:
+            success, message, data = user_service.refresh_access_token(user_id, token)
+            
+            if success:
+                api_logger.info(f"续签访问token成功 - user_id: {user_id}")
+                return jsonify({"errorcode": 200, "message": message, "data": data}), 200
+            else:
+                api_logger.warning(f"续签访问token失败 - user_id: {user_id}, message: {message}")
+                return jsonify({"errorcode": 401, "message": message, "data": None}), 401
+        except Exception as e:
+            api_logger.error(f"续签访问token过程中发生错误: {e}")
+            import traceback
+            traceback.print_exc()
+            return jsonify({"errorcode": 500, "message": f"续签失败: {str(e)}", "data": None}), 500
+    
     @app.route("/api/user", methods=["DELETE"])  # 注销账号接口
     @token_required
     def delete_user():
@@ -153,4 +191,65 @@ def setup_user_routes(app):
             traceback.print_exc()
             return jsonify({"errorcode": 500, "message": f"账号注销失败: {str(e)}", "data": None}), 500
     
+    @app.route("/logout", methods=["POST"])  # 退出登录接口
+    @token_required
+    def logout():
+        """
+        退出登录接口，删除当前设备的会话
+        请求头：token, userid
+        表单参数：token - 登录时返回的token（可选，签名token模式下请求头中是访问token时必须提供）
+        """
+        api_logger.info("退出登录路由被调用")
+        
+        user_id = int(request.headers.get('userid'))
+        token = request.form.get("token", "").strip() or request.headers.get('token', '').strip()
+        
+        api_logger.info(f"收到退出登录请求 - user_id: {user_id}")
+        
+        try:
+            success, message = user_service.logout(user_id, token)
+            
+            if success:
+                api_logger.info(f"退出登录成功 - user_id: {user_id}")
+                return jsonify({"errorcode": 200, "message": message, "data": None}), 200
+            else:
+                api_logger.warning(f"退出登录失败 - user_id: {user_id}, message: {message}")
+                return jsonify({"errorcode": 400, "message": message, "data": None}), 400
+        except Exception as e:
+            api_logger.error(f"退出登录过程中发生错误: {e}")
+            import traceback
+            traceback.print_exc()
+            return jsonify({"errorcode": 500, "message": f"退出登录失败: {str(e)}", "data": None}), 500
+    
+    @app.route("/api/user/password", methods=["PUT"])  # 修改密码接口
+    @token_required
+    def change_password():
+        """
+        修改密码接口，修改成功后所有设备都需要重新登录
+        请求头：token, userid
+        表单参数：old_password, new_password
+        """
+        api_logger.info("修改密码路由被调用")
+        
+        user_id = int(request.headers.get('userid'))
+        old_password = request.form.get("old_password", "").strip()
+        new_password = request.form.get("new_password", "").strip()
+        
+        api_logger.info(f"收到修改密码请求 - user_id: {user_id}")
+        
+        try:
+            success, message = user_service.change_password(user_id, old_password, new_password)
+            
+            if success:
+                api_logger.info(f"修改密码成功 - user_id: {user_id}")
+                return jsonify({"errorcode": 200, "message": message, "data": None}), 200
+            else:
+                api_logger.warning(f"修改密码失败 - user_id: {user_id}, message: {message}")
+                return jsonify({"errorcode": 400, "message": message, "data": None}), 400
+        except Exception as e:
+            api_logger.error(f"修改密码过程中发生错误: {e}")
+            import traceback
+            traceback.print_exc()
+            return jsonify({"errorcode": 500, "message": f"密码修改失败: {str(e)}", "data": None}), 500
+    
     api_logger.info("用户API路由配置完成")
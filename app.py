@@ -4,6 +4,8 @@ import sys
 import logging
 from db.Database import Database
 from api.routes import setup_all_routes
+from services.SessionSweeper import SessionSweeper
+from utils.LogUtils import LogUtils
 
 # 创建Flask应用实例
 app = Flask(__name__)
@@ -15,6 +17,9 @@ setup_all_routes(app)
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger('App')
 
+# 过期会话清理线程，服务启动时创建
+session_sweeper = None
+
 
 def cleanup_resources():
     """
@@ -22,6 +27,10 @@ def cleanup_resources():
     """
     logger.info("开始清理资源...")
     
+    # 停止过期会话清理线程
+    if session_sweeper is not None:
+        session_sweeper.stop()
+    
     # 关闭数据库连接池
     try:
         if Database.pool is not None:
@@ -30,6 +39,9 @@ def cleanup_resources():
             logger.info("数据库连接池已关闭")
     except Exception as e:
         logger.error(f"关闭数据库连接池时出错: {e}")
+    
+    # 写完异步日志队列中剩余的日志
+    LogUtils.shutdown()
 
 
 def shutdown_handler(signum, frame):
@@ -48,6 +60,8 @@ if __name__ == "__main__":
     signal.signal(signal.SIGTERM, shutdown_handler)  # kill命令
     
     logger.info("服务启动中...")
+    session_sweeper = SessionSweeper.from_config()
+    session_sweeper.start()
     logger.info("监听地址: 0.0.0.0:8080")
     
     try:
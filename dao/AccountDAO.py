@@ -1,3 +1,4 @@
+import decimal
 from db.Database import Database
 from utils.LogUtils import LogUtils
 
@@ -8,6 +9,10 @@ class AccountDAO:
     
     logger = LogUtils.get_instance('AccountDAO')
     
+    # adjust_balance的失败原因
+    ACCOUNT_NOT_FOUND = "account_not_found"
+    INSUFFICIENT_BALANCE = "insufficient_balance"
+    
     def __init__(self):
         """
         初始化AccountDAO，创建数据库连接
@@ -178,3 +183,40 @@ class AccountDAO:
             return []
         finally:
             self.db.disconnect()
+    
+    @staticmethod
+    def adjust_balance(cur, account_id, user_id, delta, check_balance=False):
+        """
+        在调用方的事务中以单条语句原子地调整账户余额
+        
+        余额在SQL中直接增减，不再先查询余额再回写，避免并发写入时丢失更新。
+        只有在没有行被更新时才额外查询一次，用于区分账户不存在和余额不足。
+        
+        Args:
+            cur: 调用方事务所使用的游标
+            account_id: 账户ID
+            user_id: 用户ID（用于验证权限）
+            delta: 余额变化量，负数表示扣减
+            check_balance: 扣减时是否要求余额充足
+            
+        Returns:
+            str: 成功返回None，否则返回ACCOUNT_NOT_FOUND或INSUFFICIENT_BALANCE
+        """
+        delta = decimal.Decimal(str(delta))
+        update_query = "UPDATE account SET balance = balance + %s WHERE id = %s AND user_id = %s"
+        update_params = [delta, account_id, user_id]
+        if check_balance and delta < 0:
+            update_query += " AND balance >= %s"
+            update_params.append(-delta)
+        cur.execute(update_query, tuple(update_params))
+        if cur.rowcount > 0:
+            return None
+        
+        # 没有行被更新：账户不存在、余额不足，或者变化量为0导致余额未改变
+        cur.execute("SELECT balance FROM account WHERE id = %s AND user_id = %s", (account_id, user_id))
+        account = cur.fetchone()
+        if not account:
+            return AccountDAO.ACCOUNT_NOT_FOUND
+        if check_balance and account[0] + delta < 0:
+            return AccountDAO.INSUFFICIENT_BALANCE
+        return None
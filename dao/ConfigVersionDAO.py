@@ -0,0 +1,61 @@
+from db.Database import Database
+from utils.LogUtils import LogUtils
+
+class ConfigVersionDAO:
+    """
+    配置版本数据访问对象，读取和递增config_version表中的版本号
+
+    版本号保存在id=1的一行中，类型表等低频修改的配置数据每次修改后递增对应版本号，
+    进程内缓存只需按主键读取一个整数即可判断缓存是否过期。
+    """
+
+    logger = LogUtils.get_instance('ConfigVersionDAO')
+
+    # 版本号所在行的ID
+    ROW_ID = 1
+
+    # 可用的版本号字段
+    VERSION_COLUMNS = ('expend_type_version', 'income_type_version', 'account_version')
+
+    def __init__(self):
+        """
+        初始化ConfigVersionDAO，创建数据库连接
+        """
+        ConfigVersionDAO.logger.info("初始化ConfigVersionDAO")
+        self.db = Database()
+
+    @staticmethod
+    def get_version(cur, column):
+        """
+        使用调用方的游标读取版本号
+
+        Args:
+            cur: 调用方所使用的游标
+            column: 版本号字段
+
+        Returns:
+            int: 版本号，版本行不存在返回None
+        """
+        if column not in ConfigVersionDAO.VERSION_COLUMNS:
+            raise ValueError(f"不支持的版本号字段: {column}")
+        cur.execute(f"SELECT {column} FROM config_version WHERE id = %s", (ConfigVersionDAO.ROW_ID,))
+        row = cur.fetchone()
+        return row[0] if row else None
+
+    @staticmethod
+    def bump(cur, column):
+        """
+        在调用方的事务中递增版本号，版本行不存在时先创建
+
+        与类型表的修改在同一事务中提交，修改生效时版本号一定已经递增，
+        不会出现修改已提交而版本号递增失败、其他进程一直使用旧缓存的情况。
+
+        Args:
+            cur: 调用方事务所使用的游标
+            column: 版本号字段
+        """
+        if column not in ConfigVersionDAO.VERSION_COLUMNS:
+            raise ValueError(f"不支持的版本号字段: {column}")
+        upsert_query = (f"INSERT INTO config_version (id, expend_type_version, income_type_version, account_version) "
+                        f"VALUES (%s, 0, 0, 0) ON DUPLICATE KEY UPDATE {column} = {column} + 1")
+        cur.execute(upsert_query, (ConfigVersionDAO.ROW_ID,))
@@ -1,4 +1,7 @@
 import decimal
+from dao.AccountDAO import AccountDAO
+from dao.ExpendTypeDAO import ExpendTypeDAO
+from dao.RollupDAO import RollupDAO
 from db.Database import Database
 from utils.LogUtils import LogUtils
 
@@ -41,43 +44,33 @@ class ExpendDAO:
                 self.db.cur.execute("START TRANSACTION")
                 
                 try:
-                    # 1. 检查账户是否存在且余额足够
-                    select_account_query = "SELECT * FROM account WHERE id = %s AND user_id = %s"
-                    self.db.cur.execute(select_account_query, (account_id, user_id))
-                    account = self.db.cur.fetchone()
-                    if not account:
-                        error_msg = "账户不存在或不属于当前用户"
-                        ExpendDAO.logger.error(f"创建支出记录失败: {error_msg}")
-                        self.db.rollback()
-                        return False, 0, error_msg
-                    
-                    current_balance = account[2]  # 账户余额在索引2的位置
-                    money_decimal = decimal.Decimal(str(money))
-                    if current_balance < money_decimal:
-                        error_msg = "账户余额不足"
+                    # 1. 检查支出类型是否存在（在锁定账户之前完成，缩短行锁持有时间）
+                    # 优先使用进程内的类型缓存，需要重新校验时复用本事务的连接
+                    snapshot = ExpendTypeDAO.catalog.current()
+                    if snapshot is None:
+                        snapshot = ExpendTypeDAO.catalog.refresh(self.db.cur)
+                    if expend_type_id not in snapshot[1]:
+                        error_msg = "支出类型不存在"
                         ExpendDAO.logger.error(f"创建支出记录失败: {error_msg}")
                         self.db.rollback()
                         return False, 0, error_msg
                     
-                    # 3. 检查支出类型是否存在
-                    select_expend_type_query = "SELECT * FROM expend_type WHERE id = %s"
-                    self.db.cur.execute(select_expend_type_query, (expend_type_id,))
-                    expend_type = self.db.cur.fetchone()
-                    if not expend_type:
-                        error_msg = "支出类型不存在"
+                    # 2. 余额充足时原子扣减账户余额
+                    error = AccountDAO.adjust_balance(self.db.cur, account_id, user_id, -decimal.Decimal(str(money)), check_balance=True)
+                    if error:
+                        error_msg = "账户余额不足" if error == AccountDAO.INSUFFICIENT_BALANCE else "账户不存在或不属于当前用户"
                         ExpendDAO.logger.error(f"创建支出记录失败: {error_msg}")
                         self.db.rollback()
                         return False, 0, error_msg
                     
-                    # 4. 插入支出记录
+                    # 3. 插入支出记录
                     insert_query = "INSERT INTO expend (money, account_id, user_id, remark, expend_time, enable, expend_type_id) VALUES (%s, %s, %s, %s, %s, %s, %s)"
                     self.db.cur.execute(insert_query, (money, account_id, user_id, remark, expend_time, enable, expend_type_id))
                     expend_id = self.db.cur.lastrowid
                     
-                    # 3. 更新账户余额
-                    new_balance = current_balance - money_decimal
-                    update_balance_query = "UPDATE account SET balance = %s WHERE id = %s"
-                    self.db.cur.execute(update_balance_query, (new_balance, account_id))
+                    # 4. 更新日汇总
+                    if enable:
+                        RollupDAO.apply(self.db.cur, 'expend', user_id, expend_time, account_id, expend_type_id, 1, money)
                     
                     # 提交事务
                     self.db.commit()
@@ -118,29 +111,32 @@ class ExpendDAO:
         ExpendDAO.logger.info(f"修改支出记录信息: ID={expend_id}, 用户ID={user_id}")
         try:
             if self.db.connect():
-                # 获取原支出记录信息
-                select_query = "SELECT * FROM expend WHERE id = %s AND user_id = %s"
-                self.db.cur.execute(select_query, (expend_id, user_id))
-                original_expend = self.db.cur.fetchone()
-                if not original_expend:
-                    self.db.rollback()
-                    error_msg = "支出记录不存在或不属于当前用户"
-                    ExpendDAO.logger.error(f"修改支出记录失败: {error_msg}")
-                    return False, error_msg
-                
                 # 开始事务
                 self.db.cur.execute("START TRANSACTION")
                 
                 try:
+                    # 获取并锁定原支出记录，防止并发修改基于过期的金额和账户调整余额
+                    select_query = "SELECT money, account_id, expend_time, expend_type_id, enable FROM expend WHERE id = %s AND user_id = %s FOR UPDATE"
+                    self.db.cur.execute(select_query, (expend_id, user_id))
+                    original_expend = self.db.cur.fetchone()
+                    if not original_expend:
+                        self.db.rollback()
+                        error_msg = "支出记录不存在或不属于当前用户"
+                        ExpendDAO.logger.error(f"修改支出记录失败: {error_msg}")
+                        return False, error_msg
+                    
                     # 构建动态更新语句
                     update_fields = []
                     update_values = []
                     
                     # 记录原金额和原账户ID，用于后续更新账户余额
-                    original_money = original_expend[1]
-                    original_account_id = original_expend[2]
+                    original_money = original_expend[0]
+                    original_account_id = original_expend[1]
                     new_money = original_money
                     new_account_id = original_account_id
+                    new_expend_time = original_expend[2]
+                    new_expend_type_id = original_expend[3]
+                    new_enable = original_expend[4]
                     
                     if money is not None:
                         update_fields.append("money = %s")
@@ -159,14 +155,17 @@ class ExpendDAO:
                     if expend_time is not None:
                         update_fields.append("expend_time = %s")
                         update_values.append(expend_time)
+                        new_expend_time = expend_time
                     
                     if enable is not None:
                         update_fields.append("enable = %s")
                         update_values.append(enable)
+                        new_enable = enable
                     
                     if expend_type_id is not None:
                         update_fields.append("expend_type_id = %s")
                         update_values.append(expend_type_id)
+                        new_expend_type_id = expend_type_id
                     
                     # 如果没有提供更新字段，直接提交事务并返回成功
                     if not update_fields:
@@ -174,77 +173,49 @@ class ExpendDAO:
                         ExpendDAO.logger.info("没有需要更新的字段，操作成功")
                         return True, ""
                     
+                    # 更新账户余额
+                    if original_account_id != new_account_id:
+                        # 如果账户ID发生变化，恢复原账户余额并扣除新账户余额
+                        # 按账户ID顺序加锁，避免两个方向相反的修改互相死锁
+                        adjustments = sorted([
+                            (original_account_id, decimal.Decimal(str(original_money)), False),
+                            (new_account_id, -decimal.Decimal(str(new_money)), True)
+                        ], key=lambda adjustment: adjustment[0])
+                        for adjust_account_id, delta, is_new_account in adjustments:
+                            error = AccountDAO.adjust_balance(self.db.cur, adjust_account_id, user_id, delta, check_balance=is_new_account)
+                            if error:
+                                self.db.rollback()
+                                if not is_new_account:
+                                    error_msg = "原账户不存在"
+                                elif error == AccountDAO.INSUFFICIENT_BALANCE:
+                                    error_msg = "新账户余额不足"
+                                else:
+                                    error_msg = "新账户不存在或不属于当前用户"
+                                ExpendDAO.logger.error(f"修改支出记录失败: {error_msg}")
+                                return False, error_msg
+                    elif original_money != new_money:
+                        # 如果金额发生变化，只需要调整同一个账户的余额：先恢复原金额，再扣除新金额
+                        delta = decimal.Decimal(str(original_money)) - decimal.Decimal(str(new_money))
+                        error = AccountDAO.adjust_balance(self.db.cur, original_account_id, user_id, delta, check_balance=True)
+                        if error:
+                            self.db.rollback()
+                            error_msg = "账户余额不足" if error == AccountDAO.INSUFFICIENT_BALANCE else "账户不存在或不属于当前用户"
+                            ExpendDAO.logger.error(f"修改支出记录失败: {error_msg}")
+                            return False, error_msg
+                    
                     # 更新支出记录
                     update_query = f"UPDATE expend SET {', '.join(update_fields)} WHERE id = %s AND user_id = %s"
                     update_values.extend([expend_id, user_id])
                     self.db.cur.execute(update_query, tuple(update_values))
                     
+                    # 将日汇总从原记录调整为新记录
+                    RollupDAO.replace(self.db.cur, 'expend', user_id,
+                                      (original_money, original_account_id, original_expend[2], original_expend[3], original_expend[4]),
+                                      (new_money, new_account_id, new_expend_time, new_expend_type_id, new_enable))
+                    
                     # 不需要检查rowcount，因为我们已经确认记录存在
                     # 即使没有实际更新任何行（内容相同），操作也是成功的
                     
-                    # 更新账户余额
-                    if original_account_id != new_account_id:
-                        # 如果账户ID发生变化，需要同时调整两个账户的余额
-                        # 1. 恢复原账户余额
-                        select_original_account_query = "SELECT * FROM account WHERE id = %s AND user_id = %s"
-                        self.db.cur.execute(select_original_account_query, (original_account_id, user_id))
-                        original_account = self.db.cur.fetchone()
-                        if not original_account:
-                            self.db.rollback()
-                            error_msg = "原账户不存在"
-                            ExpendDAO.logger.error(f"修改支出记录失败: {error_msg}")
-                            return False, error_msg
-                        
-                        new_original_balance = original_account[2] + decimal.Decimal(str(original_money))
-                        update_original_balance_query = "UPDATE account SET balance = %s WHERE id = %s"
-                        self.db.cur.execute(update_original_balance_query, (new_original_balance, original_account_id))
-                        
-                        # 2. 检查新账户是否存在且余额足够
-                        select_new_account_query = "SELECT * FROM account WHERE id = %s AND user_id = %s"
-                        self.db.cur.execute(select_new_account_query, (new_account_id, user_id))
-                        new_account = self.db.cur.fetchone()
-                        if not new_account:
-                            self.db.rollback()
-                            error_msg = "新账户不存在或不属于当前用户"
-                            ExpendDAO.logger.error(f"修改支出记录失败: {error_msg}")
-                            return False, error_msg
-                        
-                        current_new_balance = new_account[2]
-                        if current_new_balance < new_money:
-                            self.db.rollback()
-                            error_msg = "新账户余额不足"
-                            ExpendDAO.logger.error(f"修改支出记录失败: {error_msg}")
-                            return False, error_msg
-                        
-                        # 3. 扣除新账户余额
-                        new_new_balance = current_new_balance - decimal.Decimal(str(new_money))
-                        update_new_balance_query = "UPDATE account SET balance = %s WHERE id = %s"
-                        self.db.cur.execute(update_new_balance_query, (new_new_balance, new_account_id))
-                    elif original_money != new_money:
-                        # 如果金额发生变化，只需要调整同一个账户的余额
-                        select_account_query = "SELECT * FROM account WHERE id = %s AND user_id = %s"
-                        self.db.cur.execute(select_account_query, (original_account_id, user_id))
-                        account = self.db.cur.fetchone()
-                        if not account:
-                            self.db.rollback()
-                            error_msg = "账户不存在或不属于当前用户"
-                            ExpendDAO.logger.error(f"修改支出记录失败: {error_msg}")
-                            return False, error_msg
-                        
-                        # 计算新余额
-                        current_balance = account[2]
-                        # 先恢复原金额，再扣除新金额
-                        new_balance = current_balance + decimal.Decimal(str(original_money)) - decimal.Decimal(str(new_money))
-                        
-                        if new_balance < 0:
-                            self.db.rollback()
-                            error_msg = "账户余额不足"
-                            ExpendDAO.logger.error(f"修改支出记录失败: {error_msg}")
-                            return False, error_msg
-                        
-                        update_balance_query = "UPDATE account SET balance = %s WHERE id = %s"
-                        self.db.cur.execute(update_balance_query, (new_balance, original_account_id))
-                    
                     # 提交事务
                     self.db.commit()
                     ExpendDAO.logger.info(f"支出记录ID={expend_id}的信息修改成功")
@@ -282,8 +253,8 @@ class ExpendDAO:
                 self.db.cur.execute("START TRANSACTION")
                 
                 try:
-                    # 1. 查询支出记录
-                    select_query = "SELECT * FROM expend WHERE id = %s AND user_id = %s"
+                    # 1. 查询并锁定支出记录
+                    select_query = "SELECT money, account_id, expend_time, expend_type_id, enable FROM expend WHERE id = %s AND user_id = %s FOR UPDATE"
                     self.db.cur.execute(select_query, (expend_id, user_id))
                     expend = self.db.cur.fetchone()
                     if not expend:
@@ -296,22 +267,19 @@ class ExpendDAO:
                     delete_query = "DELETE FROM expend WHERE id = %s AND user_id = %s"
                     self.db.cur.execute(delete_query, (expend_id, user_id))
                     
-                    # 3. 恢复账户余额
-                    account_id = expend[2]  # 账户ID在索引2的位置
-                    money = expend[1]  # 支出金额在索引1的位置
-                    
-                    select_account_query = "SELECT * FROM account WHERE id = %s AND user_id = %s"
-                    self.db.cur.execute(select_account_query, (account_id, user_id))
-                    account = self.db.cur.fetchone()
-                    if not account:
+                    # 3. 原子恢复账户余额
+                    money = expend[0]
+                    account_id = expend[1]
+                    error = AccountDAO.adjust_balance(self.db.cur, account_id, user_id, decimal.Decimal(str(money)))
+                    if error:
                         self.db.rollback()
                         error_msg = "账户不存在或不属于当前用户"
                         ExpendDAO.logger.error(f"删除支出记录失败: {error_msg}")
                         return False, error_msg
                     
-                    new_balance = account[2] + decimal.Decimal(str(money))  # 账户余额在索引2的位置
-                    update_balance_query = "UPDATE account SET balance = %s WHERE id = %s"
-                    self.db.cur.execute(update_balance_query, (new_balance, account_id))
+                    # 4. 扣除日汇总
+                    if expend[4]:
+                        RollupDAO.apply(self.db.cur, 'expend', user_id, expend[2], account_id, expend[3], -1, -decimal.Decimal(str(money)))
                     
                     # 提交事务
                     self.db.commit()
@@ -360,7 +328,7 @@ class ExpendDAO:
         finally:
             self.db.disconnect()
     
-    def get_expends_by_user_id(self, user_id, account_id=None, expend_type_id=None, start_time=None, end_time=None):
+    def get_expends_by_user_id(self, user_id, account_id=None, expend_type_id=None, start_time=None, end_time=None, min_money=None, max_money=None, enable=None, limit=None, cursor=None):
         """
         根据用户ID查询支出记录列表
         
@@ -370,14 +338,22 @@ class ExpendDAO:
             expend_type_id: 消费类型ID（可选）
             start_time: 开始时间（可选）
             end_time: 结束时间（可选）
+            min_money: 最小金额（可选，包含）
+            max_money: 最大金额（可选，包含）
+            enable: 是否可用（可选）
+            limit: 最多返回的记录数（可选），不提供则返回全部
+            cursor: 分页位置 (expend_time, id)（可选），只返回排在该位置之后的记录，expend_time为空时为(None, id)
             
         Returns:
-            list: 如果查询成功返回支出记录列表，否则返回空列表
+            list: 如果查询成功返回支出记录列表，按(expend_time, id)倒序排列，否则返回空列表
         """
         ExpendDAO.logger.info(f"根据用户ID查询支出记录: {user_id}")
         try:
             if self.db.connect():
                 # 构建查询语句
+                # 用户+账户/类型的等值条件和时间范围条件分别命中(user_id, account_id, expend_time)、
+                # (user_id, expend_type_id, expend_time)或(user_id, expend_time)组合索引，
+                # 金额和可用状态在索引范围内过滤
                 select_query = "SELECT * FROM expend WHERE user_id = %s"
                 query_params = [user_id]
                 
@@ -397,8 +373,35 @@ class ExpendDAO:
                     select_query += " AND expend_time <= %s"
                     query_params.append(end_time)
                 
-                # 按支出时间倒序排序
-                select_query += " ORDER BY expend_time DESC"
+                if min_money is not None:
+                    select_query += " AND money >= %s"
+                    query_params.append(min_money)
+                
+                if max_money is not None:
+                    select_query += " AND money <= %s"
+                    query_params.append(max_money)
+                
+                if enable is not None:
+                    select_query += " AND enable = %s"
+                    query_params.append(enable)
+                
+                # 键集分页：从上一页最后一条记录之后继续读取，避免OFFSET扫描已翻过的记录
+                # 倒序排列时expend_time为空的记录排在最后（MySQL和SQLite一致），游标位于这些记录中时只按ID继续
+                if cursor is not None:
+                    cursor_time, cursor_id = cursor
+                    if cursor_time is None:
+                        select_query += " AND expend_time IS NULL AND id < %s"
+                        query_params.append(cursor_id)
+                    else:
+                        select_query += " AND (expend_time < %s OR (expend_time = %s AND id < %s) OR expend_time IS NULL)"
+                        query_params.extend([cursor_time, cursor_time, cursor_id])
+                
+                # 按支出时间倒序排序，时间相同时按ID倒序，保证分页顺序稳定
+                select_query += " ORDER BY expend_time DESC, id DESC"
+                
+                if limit is not None:
+                    select_query += " LIMIT %s"
+                    query_params.append(limit)
                 
                 if self.db.execute(select_query, tuple(query_params)):
                     expends = self.db.cur.fetchall()
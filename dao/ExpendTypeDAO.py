@@ -1,3 +1,5 @@
+from dao.ConfigVersionDAO import ConfigVersionDAO
+from dao.TypeCatalog import TypeCatalog
 from db.Database import Database
 from utils.LogUtils import LogUtils
 
@@ -8,6 +10,9 @@ class ExpendTypeDAO:
     
     logger = LogUtils.get_instance('ExpendTypeDAO')
     
+    # 进程内共享的消费类型缓存，以config_version.expend_type_version判断是否过期
+    catalog = TypeCatalog('expend_type', 'expend_type_version')
+    
     def __init__(self):
         """
         初始化ExpendTypeDAO，创建数据库连接
@@ -32,9 +37,9 @@ class ExpendTypeDAO:
             if self.db.connect():
                 insert_query = "INSERT INTO expend_type (expend_type_name, enable, create_time) VALUES (%s, %s, NOW())"
                 if self.db.execute(insert_query, (expend_type_name, enable)):
-                    self.db.commit()
-                    # 获取新创建的消费类型ID
+                    # 获取新创建的消费类型ID（递增版本号之前读取）
                     expend_type_id = self.db.cur.lastrowid
+                    self._commit_with_version()
                     ExpendTypeDAO.logger.info(f"消费类型{expend_type_name}创建成功，ID: {expend_type_id}")
                     return True, expend_type_id
                 else:
@@ -85,7 +90,7 @@ class ExpendTypeDAO:
                 if self.db.execute(update_query, tuple(update_values)):
                     # 检查是否有行被修改
                     if self.db.cur.rowcount > 0:
-                        self.db.commit()
+                        self._commit_with_version()
                         ExpendTypeDAO.logger.info(f"消费类型ID={expend_type_id}的信息修改成功")
                         return True
                     else:
@@ -121,7 +126,7 @@ class ExpendTypeDAO:
                 if self.db.execute(delete_query, (expend_type_id,)):
                     # 检查是否有行被删除
                     if self.db.cur.rowcount > 0:
-                        self.db.commit()
+                        self._commit_with_version()
                         ExpendTypeDAO.logger.info(f"消费类型ID={expend_type_id}删除成功")
                         return True
                     else:
@@ -140,9 +145,40 @@ class ExpendTypeDAO:
         finally:
             self.db.disconnect()
     
+    def _load_catalog(self):
+        """
+        获取消费类型缓存，缓存需要重新校验时使用本DAO的连接校验并按需加载
+        
+        Returns:
+            tuple: (按ID排序的消费类型列表, ID到消费类型的字典)，无法连接数据库返回None
+        """
+        snapshot = ExpendTypeDAO.catalog.current()
+        if snapshot is not None:
+            return snapshot
+        try:
+            if self.db.connect():
+                return ExpendTypeDAO.catalog.refresh(self.db.cur)
+            return None
+        finally:
+            self.db.disconnect()
+    
+    def _commit_with_version(self):
+        """
+        在消费类型表修改所在的事务中递增expend_type_version后提交，并清除本进程的缓存，
+        其他进程在下次校验版本号时重新加载。递增失败时抛出异常，由调用方回滚整个修改
+        
+        Raises:
+            RuntimeError: 事务提交失败
+        """
+        ConfigVersionDAO.bump(self.db.cur, 'expend_type_version')
+        if not self.db.commit():
+            raise RuntimeError("提交消费类型修改失败")
+        ExpendTypeDAO.logger.info("消费类型已修改，清除消费类型缓存")
+        ExpendTypeDAO.catalog.clear()
+    
     def get_expend_type_by_id(self, expend_type_id):
         """
-        根据消费类型ID查询消费类型
+        根据消费类型ID查询消费类型，从消费类型缓存中读取
         
         Args:
             expend_type_id: 消费类型ID
@@ -152,44 +188,36 @@ class ExpendTypeDAO:
         """
         ExpendTypeDAO.logger.info(f"根据ID查询消费类型: {expend_type_id}")
         try:
-            if self.db.connect():
-                select_query = "SELECT * FROM expend_type WHERE id = %s"
-                if self.db.execute(select_query, (expend_type_id,)):
-                    expend_type = self.db.cur.fetchone()
-                    if expend_type:
-                        ExpendTypeDAO.logger.info(f"查询到消费类型ID={expend_type_id}的信息")
-                        return expend_type
-                    else:
-                        ExpendTypeDAO.logger.info(f"未查询到消费类型ID={expend_type_id}的信息")
-                        return None
+            snapshot = self._load_catalog()
+            if snapshot is None:
+                return None
+            expend_type = snapshot[1].get(int(expend_type_id))
+            if expend_type:
+                ExpendTypeDAO.logger.info(f"查询到消费类型ID={expend_type_id}的信息")
+                return expend_type
+            else:
+                ExpendTypeDAO.logger.info(f"未查询到消费类型ID={expend_type_id}的信息")
+                return None
         except Exception as e:
             ExpendTypeDAO.logger.error(f"查询消费类型ID={expend_type_id}时发生错误: {e}")
             return None
-        finally:
-            self.db.disconnect()
     
     def get_all_expend_types(self):
         """
-        查询所有消费类型
+        查询所有消费类型，从消费类型缓存中读取
         
         Returns:
             list: 如果查询成功返回消费类型列表，否则返回空列表
         """
         ExpendTypeDAO.logger.info("查询所有消费类型")
         try:
-            if self.db.connect():
-                select_query = "SELECT * FROM expend_type"
-                if self.db.execute(select_query):
-                    expend_types = self.db.cur.fetchall()
-                    if expend_types:
-                        ExpendTypeDAO.logger.info(f"查询到{len(expend_types)}个消费类型")
-                        return expend_types
-                    else:
-                        ExpendTypeDAO.logger.info("未查询到任何消费类型")
-                        return []
+            snapshot = self._load_catalog()
+            if snapshot and snapshot[0]:
+                ExpendTypeDAO.logger.info(f"查询到{len(snapshot[0])}个消费类型")
+                return list(snapshot[0])
+            else:
+                ExpendTypeDAO.logger.info("未查询到任何消费类型")
+                return []
         except Exception as e:
             ExpendTypeDAO.logger.error(f"查询所有消费类型时发生错误: {e}")
             return []
-        finally:
-            self.db.disconnect()
-
@@ -1,4 +1,6 @@
 import decimal
+from dao.AccountDAO import AccountDAO
+from dao.RollupDAO import RollupDAO
 from db.Database import Database
 from utils.LogUtils import LogUtils
 
@@ -40,11 +42,9 @@ class IncomeDAO:
                 self.db.cur.execute("START TRANSACTION")
                 
                 try:
-                    # 1. 检查账户是否存在
-                    select_account_query = "SELECT * FROM account WHERE id = %s AND user_id = %s"
-                    self.db.cur.execute(select_account_query, (account_id, user_id))
-                    account = self.db.cur.fetchone()
-                    if not account:
+                    # 1. 原子增加账户余额，同时校验账户存在且属于当前用户
+                    error = AccountDAO.adjust_balance(self.db.cur, account_id, user_id, decimal.Decimal(str(money)))
+                    if error:
                         IncomeDAO.logger.error(f"创建收入记录失败: 账户不存在或不属于当前用户")
                         self.db.rollback()
                         return False, 0
@@ -54,11 +54,9 @@ class IncomeDAO:
                     self.db.cur.execute(insert_query, (money, account_id, user_id, remark, income_time, enable, income_type_id))
                     income_id = self.db.cur.lastrowid
                     
-                    # 3. 更新账户余额
-                    current_balance = account[2]  # 账户余额在索引2的位置
-                    new_balance = current_balance + decimal.Decimal(str(money))
-                    update_balance_query = "UPDATE account SET balance = %s WHERE id = %s"
-                    self.db.cur.execute(update_balance_query, (new_balance, account_id))
+                    # 3. 更新日汇总
+                    if enable:
+                        RollupDAO.apply(self.db.cur, 'income', user_id, income_time, account_id, income_type_id, 1, money)
                     
                     # 提交事务
                     self.db.commit()
@@ -96,32 +94,31 @@ class IncomeDAO:
         IncomeDAO.logger.info(f"修改收入记录信息: ID={income_id}, 用户ID={user_id}")
         try:
             if self.db.connect():
-                # 获取原收入记录信息
-                select_query = "SELECT * FROM income WHERE id = %s AND user_id = %s"
-                if not self.db.execute(select_query, (income_id, user_id)):
-                    self.db.rollback()
-                    IncomeDAO.logger.error(f"修改收入记录失败: 无法查询收入记录")
-                    return False
-                
-                original_income = self.db.cur.fetchone()
-                if not original_income:
-                    self.db.rollback()
-                    IncomeDAO.logger.error(f"修改收入记录失败: 收入记录不存在或不属于当前用户")
-                    return False
-                
                 # 开始事务
                 self.db.cur.execute("START TRANSACTION")
                 
                 try:
+                    # 获取并锁定原收入记录，防止并发修改基于过期的金额和账户调整余额
+                    select_query = "SELECT money, account_id, income_time, income_type_id, enable FROM income WHERE id = %s AND user_id = %s FOR UPDATE"
+                    self.db.cur.execute(select_query, (income_id, user_id))
+                    original_income = self.db.cur.fetchone()
+                    if not original_income:
+                        self.db.rollback()
+                        IncomeDAO.logger.error(f"修改收入记录失败: 收入记录不存在或不属于当前用户")
+                        return False
+                    
                     # 构建动态更新语句
                     update_fields = []
                     update_values = []
                     
                     # 记录原金额和原账户ID，用于后续更新账户余额
-                    original_money = original_income[1]
-                    original_account_id = original_income[2]
+                    original_money = original_income[0]
+                    original_account_id = original_income[1]
                     new_money = original_money
                     new_account_id = original_account_id
+                    new_income_time = original_income[2]
+                    new_income_type_id = original_income[3]
+                    new_enable = original_income[4]
                     
                     if money is not None:
                         update_fields.append("money = %s")
@@ -140,14 +137,17 @@ class IncomeDAO:
                     if income_time is not None:
                         update_fields.append("income_time = %s")
                         update_values.append(income_time)
+                        new_income_time = income_time
                     
                     if enable is not None:
                         update_fields.append("enable = %s")
                         update_values.append(enable)
+                        new_enable = enable
                     
                     if income_type_id is not None:
                         update_fields.append("income_type_id = %s")
                         update_values.append(income_type_id)
+                        new_income_type_id = income_type_id
                     
                     # 如果没有提供更新字段，直接提交事务并返回成功
                     if not update_fields:
@@ -155,61 +155,40 @@ class IncomeDAO:
                         IncomeDAO.logger.info("没有需要更新的字段，操作成功")
                         return True
                     
+                    # 更新账户余额
+                    if original_account_id != new_account_id:
+                        # 如果账户ID发生变化，减少原账户余额并增加新账户余额
+                        # 按账户ID顺序加锁，避免两个方向相反的修改互相死锁
+                        adjustments = sorted([
+                            (original_account_id, -decimal.Decimal(str(original_money)), "原账户不存在"),
+                            (new_account_id, decimal.Decimal(str(new_money)), "新账户不存在或不属于当前用户")
+                        ], key=lambda adjustment: adjustment[0])
+                        for adjust_account_id, delta, error_msg in adjustments:
+                            if AccountDAO.adjust_balance(self.db.cur, adjust_account_id, user_id, delta):
+                                self.db.rollback()
+                                IncomeDAO.logger.error(f"修改收入记录失败: {error_msg}")
+                                return False
+                    elif original_money != new_money:
+                        # 如果金额发生变化，只需要调整同一个账户的余额：先减去原金额，再加新金额
+                        delta = decimal.Decimal(str(new_money)) - decimal.Decimal(str(original_money))
+                        if AccountDAO.adjust_balance(self.db.cur, original_account_id, user_id, delta):
+                            self.db.rollback()
+                            IncomeDAO.logger.error(f"修改收入记录失败: 账户不存在")
+                            return False
+                    
                     # 更新收入记录
                     update_query = f"UPDATE income SET {', '.join(update_fields)} WHERE id = %s AND user_id = %s"
                     update_values.extend([income_id, user_id])
                     self.db.cur.execute(update_query, tuple(update_values))
                     
+                    # 将日汇总从原记录调整为新记录
+                    RollupDAO.replace(self.db.cur, 'income', user_id,
+                                      (original_money, original_account_id, original_income[2], original_income[3], original_income[4]),
+                                      (new_money, new_account_id, new_income_time, new_income_type_id, new_enable))
+                    
                     # 不需要检查rowcount，因为我们已经确认记录存在
                     # 即使没有实际更新任何行（内容相同），操作也是成功的
                     
-                    # 更新账户余额
-                    if original_account_id != new_account_id:
-                        # 如果账户ID发生变化，需要同时调整两个账户的余额
-                        # 1. 恢复原账户余额
-                        select_original_account_query = "SELECT * FROM account WHERE id = %s AND user_id = %s"
-                        self.db.cur.execute(select_original_account_query, (original_account_id, user_id))
-                        original_account = self.db.cur.fetchone()
-                        if not original_account:
-                            self.db.rollback()
-                            IncomeDAO.logger.error(f"修改收入记录失败: 原账户不存在")
-                            return False
-                        
-                        new_original_balance = original_account[2] - decimal.Decimal(str(original_money))
-                        update_original_balance_query = "UPDATE account SET balance = %s WHERE id = %s"
-                        self.db.cur.execute(update_original_balance_query, (new_original_balance, original_account_id))
-                        
-                        # 2. 检查新账户是否存在
-                        select_new_account_query = "SELECT * FROM account WHERE id = %s AND user_id = %s"
-                        self.db.cur.execute(select_new_account_query, (new_account_id, user_id))
-                        new_account = self.db.cur.fetchone()
-                        if not new_account:
-                            self.db.rollback()
-                            IncomeDAO.logger.error(f"修改收入记录失败: 新账户不存在或不属于当前用户")
-                            return False
-                        
-                        # 3. 增加新账户余额
-                        new_new_balance = new_account[2] + decimal.Decimal(str(new_money))
-                        update_new_balance_query = "UPDATE account SET balance = %s WHERE id = %s"
-                        self.db.cur.execute(update_new_balance_query, (new_new_balance, new_account_id))
-                    elif original_money != new_money:
-                        # 如果金额发生变化，只需要调整同一个账户的余额
-                        select_account_query = "SELECT * FROM account WHERE id = %s AND user_id = %s"
-                        self.db.cur.execute(select_account_query, (original_account_id, user_id))
-                        account = self.db.cur.fetchone()
-                        if not account:
-                            self.db.rollback()
-                            IncomeDAO.logger.error(f"修改收入记录失败: 账户不存在")
-                            return False
-                        
-                        # 计算新余额
-                        current_balance = account[2]
-                        # 先减去原金额，再加新金额
-                        new_balance = current_balance - decimal.Decimal(str(original_money)) + decimal.Decimal(str(new_money))
-                        
-                        update_balance_query = "UPDATE account SET balance = %s WHERE id = %s"
-                        self.db.cur.execute(update_balance_query, (new_balance, original_account_id))
-                    
                     # 提交事务
                     self.db.commit()
                     IncomeDAO.logger.info(f"收入记录ID={income_id}的信息修改成功")
@@ -244,8 +223,8 @@ class IncomeDAO:
                 self.db.cur.execute("START TRANSACTION")
                 
                 try:
-                    # 1. 查询收入记录
-                    select_query = "SELECT * FROM income WHERE id = %s AND user_id = %s"
+                    # 1. 查询并锁定收入记录
+                    select_query = "SELECT money, account_id, income_time, income_type_id, enable FROM income WHERE id = %s AND user_id = %s FOR UPDATE"
                     self.db.cur.execute(select_query, (income_id, user_id))
                     income = self.db.cur.fetchone()
                     if not income:
@@ -257,21 +236,17 @@ class IncomeDAO:
                     delete_query = "DELETE FROM income WHERE id = %s AND user_id = %s"
                     self.db.cur.execute(delete_query, (income_id, user_id))
                     
-                    # 3. 减少账户余额
-                    account_id = income[2]  # 账户ID在索引2的位置
-                    money = income[1]  # 收入金额在索引1的位置
-                    
-                    select_account_query = "SELECT * FROM account WHERE id = %s AND user_id = %s"
-                    self.db.cur.execute(select_account_query, (account_id, user_id))
-                    account = self.db.cur.fetchone()
-                    if not account:
+                    # 3. 原子减少账户余额
+                    money = income[0]
+                    account_id = income[1]
+                    if AccountDAO.adjust_balance(self.db.cur, account_id, user_id, -decimal.Decimal(str(money))):
                         self.db.rollback()
                         IncomeDAO.logger.error(f"删除收入记录失败: 账户不存在")
                         return False
                     
-                    new_balance = account[2] - decimal.Decimal(str(money))  # 账户余额在索引2的位置
-                    update_balance_query = "UPDATE account SET balance = %s WHERE id = %s"
-                    self.db.cur.execute(update_balance_query, (new_balance, account_id))
+                    # 4. 扣除日汇总
+                    if income[4]:
+                        RollupDAO.apply(self.db.cur, 'income', user_id, income[2], account_id, income[3], -1, -decimal.Decimal(str(money)))
                     
                     # 提交事务
                     self.db.commit()
@@ -318,7 +293,7 @@ class IncomeDAO:
         finally:
             self.db.disconnect()
     
-    def get_incomes_by_user_id(self, user_id, account_id=None, income_type_id=None, start_time=None, end_time=None):
+    def get_incomes_by_user_id(self, user_id, account_id=None, income_type_id=None, start_time=None, end_time=None, min_money=None, max_money=None, enable=None, limit=None, cursor=None):
         """
         根据用户ID查询收入记录列表
         
@@ -328,14 +303,22 @@ class IncomeDAO:
             income_type_id: 收入类型ID（可选）
             start_time: 开始时间（可选）
             end_time: 结束时间（可选）
+            min_money: 最小金额（可选，包含）
+            max_money: 最大金额（可选，包含）
+            enable: 是否可用（可选）
+            limit: 最多返回的记录数（可选），不提供则返回全部
+            cursor: 分页位置 (income_time, id)（可选），只返回排在该位置之后的记录，income_time为空时为(None, id)
             
         Returns:
-            list: 如果查询成功返回收入记录列表，否则返回空列表
+            list: 如果查询成功返回收入记录列表，按(income_time, id)倒序排列，否则返回空列表
         """
         IncomeDAO.logger.info(f"根据用户ID查询收入记录: {user_id}")
         try:
             if self.db.connect():
                 # 构建查询语句
+                # 用户+账户/类型的等值条件和时间范围条件分别命中(user_id, account_id, income_time)、
+                # (user_id, income_type_id, income_time)或(user_id, income_time)组合索引，
+                # 金额和可用状态在索引范围内过滤
                 select_query = "SELECT * FROM income WHERE user_id = %s"
                 query_params = [user_id]
                 
@@ -355,8 +338,35 @@ class IncomeDAO:
                     select_query += " AND income_time <= %s"
                     query_params.append(end_time)
                 
-                # 按收入时间倒序排序
-                select_query += " ORDER BY income_time DESC"
+                if min_money is not None:
+                    select_query += " AND money >= %s"
+                    query_params.append(min_money)
+                
+                if max_money is not None:
+                    select_query += " AND money <= %s"
+                    query_params.append(max_money)
+                
+                if enable is not None:
+                    select_query += " AND enable = %s"
+                    query_params.append(enable)
+                
+                # 键集分页：从上一页最后一条记录之后继续读取，避免OFFSET扫描已翻过的记录
+                # 倒序排列时income_time为空的记录排在最后（MySQL和SQLite一致），游标位于这些记录中时只按ID继续
+                if cursor is not None:
+                    cursor_time, cursor_id = cursor
+                    if cursor_time is None:
+                        select_query += " AND income_time IS NULL AND id < %s"
+                        query_params.append(cursor_id)
+                    else:
+                        select_query += " AND (income_time < %s OR (income_time = %s AND id < %s) OR income_time IS NULL)"
+                        query_params.extend([cursor_time, cursor_time, cursor_id])
+                
+                # 按收入时间倒序排序，时间相同时按ID倒序，保证分页顺序稳定
+                select_query += " ORDER BY income_time DESC, id DESC"
+                
+                if limit is not None:
+                    select_query += " LIMIT %s"
+                    query_params.append(limit)
                 
                 if self.db.execute(select_query, tuple(query_params)):
                     incomes = self.db.cur.fetchall()
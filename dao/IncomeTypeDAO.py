@@ -1,3 +1,5 @@
+from dao.ConfigVersionDAO import ConfigVersionDAO
+from dao.TypeCatalog import TypeCatalog
 from db.Database import Database
 from utils.LogUtils import LogUtils
 
@@ -8,6 +10,9 @@ class IncomeTypeDAO:
     
     logger = LogUtils.get_instance('IncomeTypeDAO')
     
+    # 进程内共享的收入类型缓存，以config_version.income_type_version判断是否过期
+    catalog = TypeCatalog('income_type', 'income_type_version')
+    
     def __init__(self):
         """
         初始化IncomeTypeDAO，创建数据库连接
@@ -32,9 +37,9 @@ class IncomeTypeDAO:
             if self.db.connect():
                 insert_query = "INSERT INTO income_type (income_type_name, enable, create_time) VALUES (%s, %s, NOW())"
                 if self.db.execute(insert_query, (income_type_name, enable)):
-                    self.db.commit()
-                    # 获取新创建的收入类型ID
+                    # 获取新创建的收入类型ID（递增版本号之前读取）
                     income_type_id = self.db.cur.lastrowid
+                    self._commit_with_version()
                     IncomeTypeDAO.logger.info(f"收入类型{income_type_name}创建成功，ID: {income_type_id}")
                     return True, income_type_id
                 else:
@@ -85,7 +90,7 @@ class IncomeTypeDAO:
                 if self.db.execute(update_query, tuple(update_values)):
                     # 检查是否有行被修改
                     if self.db.cur.rowcount > 0:
-                        self.db.commit()
+                        self._commit_with_version()
                         IncomeTypeDAO.logger.info(f"收入类型ID={income_type_id}的信息修改成功")
                         return True
                     else:
@@ -121,7 +126,7 @@ class IncomeTypeDAO:
                 if self.db.execute(delete_query, (income_type_id,)):
                     # 检查是否有行被删除
                     if self.db.cur.rowcount > 0:
-                        self.db.commit()
+                        self._commit_with_version()
                         IncomeTypeDAO.logger.info(f"收入类型ID={income_type_id}删除成功")
                         return True
                     else:
@@ -140,9 +145,40 @@ class IncomeTypeDAO:
         finally:
             self.db.disconnect()
     
+    def _load_catalog(self):
+        """
+        获取收入类型缓存，缓存需要重新校验时使用本DAO的连接校验并按需加载
+        
+        Returns:
+            tuple: (按ID排序的收入类型列表, ID到收入类型的字典)，无法连接数据库返回None
+        """
+        snapshot = IncomeTypeDAO.catalog.current()
+        if snapshot is not None:
+            return snapshot
+        try:
+            if self.db.connect():
+                return IncomeTypeDAO.catalog.refresh(self.db.cur)
+            return None
+        finally:
+            self.db.disconnect()
+    
+    def _commit_with_version(self):
+        """
+        在收入类型表修改所在的事务中递增income_type_version后提交，并清除本进程的缓存，
+        其他进程在下次校验版本号时重新加载。递增失败时抛出异常，由调用方回滚整个修改
+        
+        Raises:
+            RuntimeError: 事务提交失败
+        """
+        ConfigVersionDAO.bump(self.db.cur, 'income_type_version')
+        if not self.db.commit():
+            raise RuntimeError("提交收入类型修改失败")
+        IncomeTypeDAO.logger.info("收入类型已修改，清除收入类型缓存")
+        IncomeTypeDAO.catalog.clear()
+    
     def get_income_type_by_id(self, income_type_id):
         """
-        根据收入类型ID查询收入类型
+        根据收入类型ID查询收入类型，从收入类型缓存中读取
         
         Args:
             income_type_id: 收入类型ID
@@ -152,43 +188,36 @@ class IncomeTypeDAO:
         """
         IncomeTypeDAO.logger.info(f"根据ID查询收入类型: {income_type_id}")
         try:
-            if self.db.connect():
-                select_query = "SELECT * FROM income_type WHERE id = %s"
-                if self.db.execute(select_query, (income_type_id,)):
-                    income_type = self.db.cur.fetchone()
-                    if income_type:
-                        IncomeTypeDAO.logger.info(f"查询到收入类型ID={income_type_id}的信息")
-                        return income_type
-                    else:
-                        IncomeTypeDAO.logger.info(f"未查询到收入类型ID={income_type_id}的信息")
-                        return None
+            snapshot = self._load_catalog()
+            if snapshot is None:
+                return None
+            income_type = snapshot[1].get(int(income_type_id))
+            if income_type:
+                IncomeTypeDAO.logger.info(f"查询到收入类型ID={income_type_id}的信息")
+                return income_type
+            else:
+                IncomeTypeDAO.logger.info(f"未查询到收入类型ID={income_type_id}的信息")
+                return None
         except Exception as e:
             IncomeTypeDAO.logger.error(f"查询收入类型ID={income_type_id}时发生错误: {e}")
             return None
-        finally:
-            self.db.disconnect()
     
     def get_all_income_types(self):
         """
-        查询所有收入类型
+        查询所有收入类型，从收入类型缓存中读取
         
         Returns:
             list: 如果查询成功返回收入类型列表，否则返回空列表
         """
         IncomeTypeDAO.logger.info("查询所有收入类型")
         try:
-            if self.db.connect():
-                select_query = "SELECT * FROM income_type"
-                if self.db.execute(select_query):
-                    income_types = self.db.cur.fetchall()
-                    if income_types:
-                        IncomeTypeDAO.logger.info(f"查询到{len(income_types)}个收入类型")
-                        return income_types
-                    else:
-                        IncomeTypeDAO.logger.info("未查询到任何收入类型")
-                        return []
+            snapshot = self._load_catalog()
+            if snapshot and snapshot[0]:
+                IncomeTypeDAO.logger.info(f"查询到{len(snapshot[0])}个收入类型")
+                return list(snapshot[0])
+            else:
+                IncomeTypeDAO.logger.info("未查询到任何收入类型")
+                return []
         except Exception as e:
             IncomeTypeDAO.logger.error(f"查询所有收入类型时发生错误: {e}")
             return []
-        finally:
-            self.db.disconnect()
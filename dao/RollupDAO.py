@@ -0,0 +1,154 @@
+import decimal
+from datetime import date, datetime
+from db.Database import Database
+from utils.LogUtils import LogUtils
+
+class RollupDAO:
+    """
+    日汇总数据访问对象，维护expend_daily/income_daily预聚合表
+
+    汇总表按(用户, 日期, 账户, 类型)记录可用记录的笔数和金额合计，
+    由支出/收入的写操作在同一事务中通过apply增量维护，也可以通过rebuild从原始记录重建。
+    """
+
+    logger = LogUtils.get_instance('RollupDAO')
+
+    # 原始记录表 -> (汇总表, 时间字段, 类型字段)
+    TABLES = {
+        'expend': ('expend_daily', 'expend_time', 'expend_type_id'),
+        'income': ('income_daily', 'income_time', 'income_type_id')
+    }
+
+    def __init__(self):
+        """
+        初始化RollupDAO，创建数据库连接
+        """
+        RollupDAO.logger.info("初始化RollupDAO")
+        self.db = Database()
+
+    @staticmethod
+    def day_of(record_time):
+        """
+        获取记录时间所在的日期
+
+        Args:
+            record_time: 记录时间（datetime、date或时间字符串）
+
+        Returns:
+            date: 日期，记录时间为空返回None
+        """
+        if record_time is None:
+            return None
+        if isinstance(record_time, datetime):
+            return record_time.date()
+        if isinstance(record_time, date):
+            return record_time
+        return datetime.fromisoformat(str(record_time)[:10]).date()
+
+    @staticmethod
+    def apply(cur, table, user_id, record_time, account_id, type_id, count_delta, money_delta):
+        """
+        在调用方的事务中增量调整一条日汇总
+
+        Args:
+            cur: 调用方事务所使用的游标
+            table: 原始记录表名，expend或income
+            user_id: 用户ID
+            record_time: 记录时间
+            account_id: 账户ID
+            type_id: 类型ID，为空时归入类型0
+            count_delta: 笔数变化量
+            money_delta: 金额变化量
+        """
+        day = RollupDAO.day_of(record_time)
+        if day is None or (not count_delta and not money_delta):
+            return
+        rollup_table, _, type_column = RollupDAO.TABLES[table]
+        upsert_query = (f"INSERT INTO {rollup_table} (user_id, day, account_id, {type_column}, record_count, total_money) "
+                        f"VALUES (%s, %s, %s, %s, %s, %s) "
+                        f"ON DUPLICATE KEY UPDATE record_count = record_count + VALUES(record_count), "
+                        f"total_money = total_money + VALUES(total_money)")
+        key = (user_id, day, account_id, type_id or 0)
+        cur.execute(upsert_query, key + (count_delta, decimal.Decimal(str(money_delta))))
+        if count_delta < 0:
+            # 最后一条记录被删除或禁用后删除该汇总行，避免统计结果中出现原始记录表中不存在的空分组
+            delete_query = (f"DELETE FROM {rollup_table} WHERE user_id = %s AND day = %s AND account_id = %s "
+                            f"AND {type_column} = %s AND record_count <= 0")
+            cur.execute(delete_query, key)
+
+    @staticmethod
+    def replace(cur, table, user_id, original, updated):
+        """
+        在调用方的事务中把一条记录的汇总从原值调整为新值
+
+        Args:
+            cur: 调用方事务所使用的游标
+            table: 原始记录表名，expend或income
+            user_id: 用户ID
+            original: 修改前的(金额, 账户ID, 记录时间, 类型ID, 是否可用)
+            updated: 修改后的(金额, 账户ID, 记录时间, 类型ID, 是否可用)
+        """
+        original_money, original_account_id, original_time, original_type_id, original_enable = original
+        new_money, new_account_id, new_time, new_type_id, new_enable = updated
+        original_key = (RollupDAO.day_of(original_time), original_account_id, original_type_id or 0)
+        new_key = (RollupDAO.day_of(new_time), new_account_id, new_type_id or 0)
+
+        if original_key == new_key and bool(original_enable) == bool(new_enable):
+            # 汇总键和可用状态不变，只需要调整金额差
+            if new_enable and original_money != new_money:
+                delta = decimal.Decimal(str(new_money)) - decimal.Decimal(str(original_money))
+                RollupDAO.apply(cur, table, user_id, original_time, original_account_id, original_type_id, 0, delta)
+            return
+
+        if original_enable:
+            RollupDAO.apply(cur, table, user_id, original_time, original_account_id, original_type_id, -1, -decimal.Decimal(str(original_money)))
+        if new_enable:
+            RollupDAO.apply(cur, table, user_id, new_time, new_account_id, new_type_id, 1, new_money)
+
+    def rebuild(self, user_id=None):
+        """
+        从原始记录重新计算日汇总
+
+        Args:
+            user_id: 只重建该用户的日汇总（可选），不提供则重建全部
+
+        Returns:
+            bool: 如果重建成功返回True，否则返回False
+        """
+        RollupDAO.logger.info(f"开始重建日汇总: 用户ID={user_id if user_id is not None else '全部'}")
+        try:
+            if self.db.connect():
+                # 开始事务
+                self.db.cur.execute("START TRANSACTION")
+
+                try:
+                    for table, (rollup_table, time_column, type_column) in RollupDAO.TABLES.items():
+                        user_filter = " AND user_id = %s" if user_id is not None else ""
+                        params = (user_id,) if user_id is not None else None
+
+                        delete_query = f"DELETE FROM {rollup_table} WHERE 1 = 1{user_filter}"
+                        self.db.cur.execute(delete_query, params)
+
+                        insert_query = (f"INSERT INTO {rollup_table} (user_id, day, account_id, {type_column}, record_count, total_money) "
+                                        f"SELECT user_id, DATE({time_column}), account_id, COALESCE({type_column}, 0), COUNT(*), SUM(money) "
+                                        f"FROM {table} WHERE enable = TRUE AND {time_column} IS NOT NULL{user_filter} "
+                                        f"GROUP BY user_id, DATE({time_column}), account_id, COALESCE({type_column}, 0)")
+                        self.db.cur.execute(insert_query, params)
+                        RollupDAO.logger.info(f"{rollup_table}重建完成，写入{self.db.cur.rowcount}行")
+
+                    # 提交事务
+                    self.db.commit()
+                    RollupDAO.logger.info("日汇总重建成功")
+                    return True
+                except Exception as e:
+                    RollupDAO.logger.error(f"重建日汇总时事务处理失败: {e}")
+                    self.db.rollback()
+                    return False
+            return False
+        except Exception as e:
+            RollupDAO.logger.error(f"重建日汇总时发生错误: {e}")
+            if self.db.cur:
+                self.db.rollback()
+            return False
+        finally:
+            self.db.disconnect()
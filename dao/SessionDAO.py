@@ -0,0 +1,229 @@
+import hashlib
+import time
+from db.Database import Database
+from dao.TokenRevocationDAO import TokenRevocationDAO
+from utils.AccessToken import AccessToken
+from utils.LogUtils import LogUtils
+from utils.TokenCache import TokenCache
+
+class SessionDAO:
+    """
+    会话数据访问对象，封装user_session表的操作
+
+    每次登录创建一条会话，按token的SHA-256摘要查找，同一用户可以在多个设备上同时登录。
+    删除会话后清除该用户的鉴权缓存，被删除的token不能再通过缓存校验，该会话签发的访问token一并撤销。
+    """
+    
+    logger = LogUtils.get_instance('SessionDAO')
+    
+    # 最后使用时间的更新间隔（秒），间隔内的请求不再写会话表
+    TOUCH_INTERVAL = 300
+    
+    # 会话标识的长度，取token摘要的前缀
+    SESSION_ID_LENGTH = 16
+    
+    def __init__(self):
+        """
+        初始化SessionDAO，创建数据库连接
+        """
+        SessionDAO.logger.info("初始化SessionDAO")
+        self.db = Database()
+    
+    @staticmethod
+    def hash_token(token):
+        """
+        计算token摘要，会话表中只保存摘要
+        
+        Args:
+            token: token字符串
+            
+        Returns:
+            str: SHA-256摘要（64位十六进制）
+        """
+        return hashlib.sha256(str(token).encode('utf-8')).hexdigest()
+    
+    @staticmethod
+    def session_id(token):
+        """
+        计算会话标识，写入该会话签发的访问token，退出登录时按会话标识撤销访问token
+        
+        Args:
+            token: 登录时返回的token
+            
+        Returns:
+            str: token摘要的前SESSION_ID_LENGTH位
+        """
+        return SessionDAO.hash_token(token)[:SessionDAO.SESSION_ID_LENGTH]
+    
+    def create_session(self, user_id, token, expiration_time, device=None):
+        """
+        创建会话
+        
+        Args:
+            user_id: 用户ID
+            token: 登录时生成的token
+            expiration_time: token过期时间戳
+            device: 设备信息（可选）
+            
+        Returns:
+            bool: 如果创建成功返回True，否则返回False
+        """
+        SessionDAO.logger.info(f"创建会话: user_id={user_id}, 设备={device}")
+        try:
+            if self.db.connect():
+                insert_query = ("INSERT INTO user_session (user_id, token_hash, device, expiration_time, last_seen_time) "
+                                "VALUES (%s, %s, %s, %s, NOW())")
+                if self.db.execute(insert_query, (user_id, SessionDAO.hash_token(token), device[:255] if device else None, expiration_time)):
+                    self.db.commit()
+                    SessionDAO.logger.info(f"会话创建成功: user_id={user_id}")
+                    return True
+                else:
+                    self.db.rollback()
+                    SessionDAO.logger.error(f"会话创建失败: user_id={user_id}")
+                    return False
+            return False
+        except Exception as e:
+            SessionDAO.logger.error(f"创建会话时发生错误: {e}")
+            if self.db.cur:
+                self.db.rollback()
+            return False
+        finally:
+            self.db.disconnect()
+    
+    def get_session(self, user_id, token):
+        """
+        按token摘要查询会话，距离上次使用超过TOUCH_INTERVAL秒时更新最后使用时间
+        
+        Args:
+            user_id: 用户ID
+            token: 请求中的token
+            
+        Returns:
+            tuple: (会话ID, 用户ID, 过期时间戳, 设备信息)，会话不存在或不属于该用户返回None
+        """
+        try:
+            if self.db.connect():
+                select_query = ("SELECT id, user_id, expiration_time, device, "
+                                "last_seen_time IS NULL OR last_seen_time < NOW() - INTERVAL %s SECOND "
+                                "FROM user_session WHERE token_hash = %s")
+                if self.db.execute(select_query, (SessionDAO.TOUCH_INTERVAL, SessionDAO.hash_token(token))):
+                    session = self.db.cur.fetchone()
+                    if not session or session[1] != user_id:
+                        return None
+                    if session[4]:
+                        self.db.execute("UPDATE user_session SET last_seen_time = NOW() WHERE id = %s", (session[0],))
+                        self.db.commit()
+                    return tuple(session[:4])
+            return None
+        except Exception as e:
+            SessionDAO.logger.error(f"查询会话时发生错误: {e}")
+            return None
+        finally:
+            self.db.disconnect()
+    
+    def delete_session(self, user_id, token):
+        """
+        按token摘要删除用户的会话（退出登录），撤销该会话签发的访问token
+        
+        Args:
+            user_id: 用户ID
+            token: 登录时返回的token
+            
+        Returns:
+            bool: 删除了会话返回True，会话不存在或发生错误返回False
+        """
+        SessionDAO.logger.info(f"删除会话: user_id={user_id}")
+        try:
+            if self.db.connect():
+                delete_query = "DELETE FROM user_session WHERE token_hash = %s AND user_id = %s"
+                if self.db.execute(delete_query, (SessionDAO.hash_token(token), user_id)):
+                    deleted = self.db.cur.rowcount
+                    session_id = SessionDAO.session_id(token)
+                    revoked_at = TokenRevocationDAO.revoke_session(self.db.cur, session_id) if deleted > 0 else None
+                    self.db.commit()
+                    if deleted > 0:
+                        TokenCache.invalidate(user_id)
+                        AccessToken.revoke_session(session_id, revoked_at)
+                        SessionDAO.logger.info(f"会话删除成功: user_id={user_id}")
+                        return True
+                    SessionDAO.logger.warning(f"会话不存在: user_id={user_id}")
+                    return False
+                self.db.rollback()
+            return False
+        except Exception as e:
+            SessionDAO.logger.error(f"删除会话时发生错误: {e}")
+            if self.db.cur:
+                self.db.rollback()
+            return False
+        finally:
+            self.db.disconnect()
+    
+    def delete_device_sessions(self, user_id, device):
+        """
+        删除用户在指定设备上的会话，重新登录时替换该设备上之前的会话，并撤销这些会话签发的访问token，
+        其他设备上的会话和访问token不受影响
+        
+        Args:
+            user_id: 用户ID
+            device: 设备信息，为空时不删除
+            
+        Returns:
+            int: 删除的会话数，发生错误返回0
+        """
+        if not device:
+            return 0
+        try:
+            if self.db.connect():
+                select_query = "SELECT token_hash FROM user_session WHERE user_id = %s AND device = %s"
+                if not self.db.execute(select_query, (user_id, device[:255])):
+                    return 0
+                session_ids = [row[0][:SessionDAO.SESSION_ID_LENGTH] for row in self.db.cur.fetchall() or ()]
+                if not session_ids:
+                    return 0
+                delete_query = "DELETE FROM user_session WHERE user_id = %s AND device = %s"
+                if self.db.execute(delete_query, (user_id, device[:255])):
+                    deleted = self.db.cur.rowcount
+                    revocations = [(session_id, TokenRevocationDAO.revoke_session(self.db.cur, session_id)) for session_id in session_ids]
+                    self.db.commit()
+                    for session_id, revoked_at in revocations:
+                        AccessToken.revoke_session(session_id, revoked_at)
+                    if deleted > 0:
+                        TokenCache.invalidate(user_id)
+                        SessionDAO.logger.info(f"删除设备上之前的会话: user_id={user_id}, 设备={device}, 数量={deleted}")
+                    return deleted
+                self.db.rollback()
+            return 0
+        except Exception as e:
+            SessionDAO.logger.error(f"删除设备会话时发生错误: {e}")
+            if self.db.cur:
+                self.db.rollback()
+            return 0
+        finally:
+            self.db.disconnect()
+    
+    def delete_expired_sessions(self, batch_size=500):
+        """
+        删除一批已过期的会话
+        
+        Args:
+            batch_size: 单次最多删除的会话数
+            
+        Returns:
+            int: 删除的会话数，发生错误返回0
+        """
+        try:
+            if self.db.connect():
+                delete_query = "DELETE FROM user_session WHERE expiration_time < %s ORDER BY expiration_time LIMIT %s"
+                if self.db.execute(delete_query, (int(time.time() * 1000), batch_size)):
+                    deleted = self.db.cur.rowcount
+                    self.db.commit()
+                    return deleted
+                self.db.rollback()
+            return 0
+        except Exception as e:
+            SessionDAO.logger.error(f"删除过期会话时发生错误: {e}")
+            if self.db.cur:
+                self.db.rollback()
+            return 0
+        finally:
+            self.db.disconnect()
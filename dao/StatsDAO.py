@@ -0,0 +1,156 @@
+from datetime import datetime, time
+from db.Database import Database
+from utils.LogUtils import LogUtils
+
+class StatsDAO:
+    """
+    统计数据访问对象，在数据库中对支出/收入记录做分组汇总
+
+    时间范围按整天划分（或不限时间）时读取expend_daily/income_daily日汇总表，
+    只需要扫描预聚合的行；否则直接在原始记录表上分组汇总。
+    """
+
+    logger = LogUtils.get_instance('StatsDAO')
+
+    # 可统计的记录表：表名 -> (时间字段, 类型字段, 日汇总表)
+    TABLES = {
+        'expend': ('expend_time', 'expend_type_id', 'expend_daily'),
+        'income': ('income_time', 'income_type_id', 'income_daily')
+    }
+
+    # 分组维度 -> 分组表达式模板，{time}和{type}分别替换为时间字段和类型字段
+    # 带参数执行时pymysql会做%格式化，DATE_FORMAT中的%需要写成%%
+    # 类型为空的记录归入类型0，与日汇总表一致
+    GROUP_EXPRESSIONS = {
+        'day': "DATE_FORMAT({time}, '%%Y-%%m-%%d')",
+        'week': "DATE_FORMAT({time}, '%%x-W%%v')",
+        'month': "DATE_FORMAT({time}, '%%Y-%%m')",
+        'type': "COALESCE({type}, 0)",
+        'account': "account_id"
+    }
+
+    def __init__(self):
+        """
+        初始化StatsDAO，创建数据库连接
+        """
+        StatsDAO.logger.info("初始化StatsDAO")
+        self.db = Database()
+
+    @staticmethod
+    def use_rollup(start_time=None, end_time=None):
+        """
+        判断时间范围能否直接使用日汇总表
+
+        Args:
+            start_time: 开始时间（可选）
+            end_time: 结束时间（可选）
+
+        Returns:
+            bool: 开始时间为零点、结束时间为当天最后一秒（或未提供）时返回True
+        """
+        if start_time is not None and (not isinstance(start_time, datetime) or start_time.time() != time.min):
+            return False
+        if end_time is not None and (not isinstance(end_time, datetime) or end_time.time() < time(23, 59, 59)):
+            return False
+        return True
+
+    def _build_source(self, table, user_id, start_time=None, end_time=None):
+        """
+        构建统计查询的数据源和过滤条件，只统计可用的记录
+
+        Args:
+            table: 记录表名
+            user_id: 用户ID
+            start_time: 开始时间（可选）
+            end_time: 结束时间（可选）
+
+        Returns:
+            str: FROM和WHERE子句
+            str: 时间字段
+            str: 记录数表达式
+            str: 金额合计表达式
+            list: 查询参数
+        """
+        time_column, _, rollup_table = StatsDAO.TABLES[table]
+        params = [user_id]
+
+        if StatsDAO.use_rollup(start_time, end_time):
+            # 日汇总表以(user_id, day)开头的主键覆盖用户+日期范围条件
+            source = f"FROM {rollup_table} WHERE user_id = %s"
+            if start_time is not None:
+                source += " AND day >= %s"
+                params.append(start_time.date())
+            if end_time is not None:
+                source += " AND day <= %s"
+                params.append(end_time.date())
+            return source, "day", "COALESCE(SUM(record_count), 0)", "COALESCE(SUM(total_money), 0)", params
+
+        # 用户+时间范围条件命中(user_id, 时间)组合索引
+        source = f"FROM {table} WHERE user_id = %s AND enable = TRUE"
+        if start_time is not None:
+            source += f" AND {time_column} >= %s"
+            params.append(start_time)
+        if end_time is not None:
+            source += f" AND {time_column} <= %s"
+            params.append(end_time)
+        return source, time_column, "COUNT(*)", "COALESCE(SUM(money), 0)", params
+
+    def get_grouped_totals(self, table, user_id, group_by, start_time=None, end_time=None):
+        """
+        按分组维度汇总记录数和金额
+
+        Args:
+            table: 记录表名，expend或income
+            user_id: 用户ID
+            group_by: 分组维度，day、week、month、type或account
+            start_time: 开始时间（可选）
+            end_time: 结束时间（可选）
+
+        Returns:
+            list: 按分组键升序排列的(分组键, 记录数, 金额合计)列表，查询失败返回None
+        """
+        StatsDAO.logger.info(f"分组统计{table}记录: 用户ID={user_id}, 分组={group_by}, 时间范围={start_time}~{end_time}")
+        try:
+            if self.db.connect():
+                source, time_column, count_expression, total_expression, params = self._build_source(table, user_id, start_time, end_time)
+                group_expression = StatsDAO.GROUP_EXPRESSIONS[group_by].format(time=time_column, type=StatsDAO.TABLES[table][1])
+                # 日汇总表中可能残留记录数为0的行（例如升级前删除的记录），与原始记录表一样不返回空分组
+                select_query = (f"SELECT {group_expression} AS group_key, {count_expression}, {total_expression} "
+                                f"{source} GROUP BY group_key HAVING {count_expression} > 0 ORDER BY group_key")
+                if self.db.execute(select_query, tuple(params)):
+                    rows = self.db.cur.fetchall()
+                    StatsDAO.logger.info(f"用户ID={user_id}的{table}记录统计得到{len(rows)}个分组")
+                    return list(rows)
+            return None
+        except Exception as e:
+            StatsDAO.logger.error(f"分组统计用户ID={user_id}的{table}记录时发生错误: {e}")
+            return None
+        finally:
+            self.db.disconnect()
+
+    def get_totals(self, table, user_id, start_time=None, end_time=None):
+        """
+        汇总时间范围内的记录数和金额
+
+        Args:
+            table: 记录表名，expend或income
+            user_id: 用户ID
+            start_time: 开始时间（可选）
+            end_time: 结束时间（可选）
+
+        Returns:
+            tuple: (记录数, 金额合计)，查询失败返回None
+        """
+        StatsDAO.logger.info(f"汇总{table}记录: 用户ID={user_id}, 时间范围={start_time}~{end_time}")
+        try:
+            if self.db.connect():
+                source, _, count_expression, total_expression, params = self._build_source(table, user_id, start_time, end_time)
+                select_query = f"SELECT {count_expression}, {total_expression} {source}"
+                if self.db.execute(select_query, tuple(params)):
+                    return self.db.cur.fetchone()
+            return None
+        except Exception as e:
+            StatsDAO.logger.error(f"汇总用户ID={user_id}的{table}记录时发生错误: {e}")
+            return None
+        finally:
+            self.db.disconnect()
@@ -0,0 +1,100 @@
+import threading
+import time
+from db.Database import Database
+from utils.AccessToken import AccessToken
+from utils.LogUtils import LogUtils
+
+class TokenRevocationDAO:
+    """
+    访问token撤销记录的数据访问对象，封装token_revocation（按用户）和session_revocation（按会话）表的操作
+
+    撤销访问token的DAO在自己的事务中调用revoke或revoke_session写入撤销时间，提交后再更新本进程的撤销表；
+    鉴权时调用sync，距离上次同步超过SYNC_INTERVAL秒才读取一次有效期内的撤销记录，
+    其他工作进程和服务节点上的撤销最迟在一个同步间隔后生效。
+    """
+
+    logger = LogUtils.get_instance('TokenRevocationDAO')
+
+    # 撤销记录的同步间隔（秒）
+    SYNC_INTERVAL = 1.0
+
+    # 上次同步的时间（time.monotonic()），进程内共享
+    _synced_at = None
+    _sync_lock = threading.Lock()
+
+    def __init__(self):
+        """
+        初始化TokenRevocationDAO，创建数据库连接
+        """
+        TokenRevocationDAO.logger.info("初始化TokenRevocationDAO")
+        self.db = Database()
+
+    @staticmethod
+    def revoke(cur, user_id):
+        """
+        在调用方的事务中记录撤销时间，未启用签名token模式时不记录
+
+        Args:
+            cur: 调用方事务所使用的游标
+            user_id: 用户ID
+
+        Returns:
+            int: 撤销时间（毫秒），提交后传给AccessToken.revoke_user；未记录时返回None
+        """
+        if not AccessToken.enabled():
+            return None
+        revoked_at = int(time.time() * 1000)
+        cur.execute("INSERT INTO token_revocation (user_id, revoked_at) VALUES (%s, %s) "
+                    "ON DUPLICATE KEY UPDATE revoked_at = VALUES(revoked_at)", (user_id, revoked_at))
+        return revoked_at
+
+    @staticmethod
+    def revoke_session(cur, session_id):
+        """
+        在调用方的事务中记录会话的撤销时间，未启用签名token模式时不记录
+
+        Args:
+            cur: 调用方事务所使用的游标
+            session_id: 会话标识
+
+        Returns:
+            int: 撤销时间（毫秒），提交后传给AccessToken.revoke_session；未记录时返回None
+        """
+        if not AccessToken.enabled():
+            return None
+        revoked_at = int(time.time() * 1000)
+        cur.execute("INSERT INTO session_revocation (session_id, revoked_at) VALUES (%s, %s) "
+                    "ON DUPLICATE KEY UPDATE revoked_at = VALUES(revoked_at)", (session_id, revoked_at))
+        return revoked_at
+
+    def sync(self):
+        """
+        距离上次同步超过SYNC_INTERVAL秒时，读取访问token有效期内的撤销记录并合并到本进程的撤销表
+
+        同步失败时同样等到下一个间隔再重试，数据库不可用时不会让每个请求都去连接数据库。
+
+        Returns:
+            bool: 本次执行了同步返回True，未到同步时间或同步失败返回False
+        """
+        now = time.monotonic()
+        with TokenRevocationDAO._sync_lock:
+            if TokenRevocationDAO._synced_at is not None and now - TokenRevocationDAO._synced_at < TokenRevocationDAO.SYNC_INTERVAL:
+                return False
+            TokenRevocationDAO._synced_at = now
+        try:
+            if self.db.connect():
+                oldest_valid_issue_time = AccessToken.oldest_valid_issue_time()
+                select_query = "SELECT user_id, revoked_at FROM token_revocation WHERE revoked_at >= %s"
+                if self.db.execute(select_query, (oldest_valid_issue_time,)):
+                    revocations = self.db.cur.fetchall() or ()
+                    select_query = "SELECT session_id, revoked_at FROM session_revocation WHERE revoked_at >= %s"
+                    if self.db.execute(select_query, (oldest_valid_issue_time,)):
+                        AccessToken.merge_revocations(revocations, self.db.cur.fetchall() or ())
+                        return True
+            TokenRevocationDAO.logger.error("同步访问token撤销记录失败")
+            return False
+        except Exception as e:
+            TokenRevocationDAO.logger.error(f"同步访问token撤销记录时发生错误: {e}")
+            return False
+        finally:
+            self.db.disconnect()
@@ -0,0 +1,109 @@
+import threading
+import time
+from dao.ConfigVersionDAO import ConfigVersionDAO
+from utils.LogUtils import LogUtils
+
+class TypeCatalog:
+    """
+    类型目录的进程内缓存，缓存整张类型表并以config_version中的版本号判断是否过期
+
+    距离上次校验不超过REVALIDATE_INTERVAL秒时直接使用缓存，不访问数据库；
+    超过后按主键读取一次版本号，版本号未变化只刷新校验时间，变化时才重新加载整张类型表。
+    本进程修改类型表后调用clear立即丢弃缓存，其他进程最迟在一个校验间隔后读到新数据。
+    """
+
+    logger = LogUtils.get_instance('TypeCatalog')
+
+    # 缓存校验间隔（秒）
+    REVALIDATE_INTERVAL = 1.0
+
+    def __init__(self, table, version_column):
+        """
+        初始化类型目录缓存
+
+        Args:
+            table: 类型表名
+            version_column: config_version中对应的版本号字段
+        """
+        self.table = table
+        self.version_column = version_column
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._version = None
+        self._checked_at = 0.0
+        # 每次clear递增，加载期间被清除的结果不再写入缓存
+        self._generation = 0
+        # 直接命中、校验版本号后继续使用、重新加载的次数，供/metrics接口统计命中率
+        self.hits = 0
+        self.revalidations = 0
+        self.loads = 0
+
+    def current(self):
+        """
+        获取仍在校验间隔内的缓存
+
+        Returns:
+            tuple: (按ID排序的类型列表, ID到类型的字典)，缓存为空或需要重新校验时返回None
+        """
+        with self._lock:
+            if self._snapshot is not None and time.monotonic() - self._checked_at < TypeCatalog.REVALIDATE_INTERVAL:
+                self.hits += 1
+                return self._snapshot
+            return None
+
+    def refresh(self, cur):
+        """
+        使用调用方的游标校验版本号，版本号变化时重新加载类型表
+
+        先读版本号再读类型表：两次读取之间有修改时，缓存的是新数据和旧版本号，
+        下次校验会再加载一次，而不会把旧数据当作新版本缓存下来。
+
+        Args:
+            cur: 调用方所使用的游标
+
+        Returns:
+            tuple: (按ID排序的类型列表, ID到类型的字典)
+        """
+        checked_at = time.monotonic()
+        with self._lock:
+            generation = self._generation
+        version = ConfigVersionDAO.get_version(cur, self.version_column)
+        with self._lock:
+            if self._snapshot is not None and version == self._version and generation == self._generation:
+                self._checked_at = checked_at
+                self.revalidations += 1
+                return self._snapshot
+
+        cur.execute(f"SELECT * FROM {self.table} ORDER BY id")
+        rows = tuple(cur.fetchall() or ())
+        snapshot = (rows, {row[0]: row for row in rows})
+        with self._lock:
+            self.loads += 1
+            if generation != self._generation:
+                return snapshot
+            self._snapshot = snapshot
+            self._version = version
+            self._checked_at = checked_at
+        TypeCatalog.logger.info(f"{self.table}缓存已加载: 版本号={version}, 类型数={len(rows)}")
+        return snapshot
+
+    def stats(self):
+        """
+        获取缓存统计信息
+
+        Returns:
+            dict: 直接命中、校验后继续使用和重新加载的次数
+        """
+        with self._lock:
+            return {"hits": self.hits, "revalidations": self.revalidations, "loads": self.loads}
+
+    def clear(self):
+        """
+        丢弃缓存，下次读取时重新加载
+        """
+        with self._lock:
+            self._snapshot = None
+            self._version = None
+            self._checked_at = 0.0
+            self._generation += 1
+        TypeCatalog.logger.info(f"{self.table}缓存已清除")
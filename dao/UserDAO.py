@@ -1,5 +1,9 @@
 from db.Database import Database
+from dao.SessionDAO import SessionDAO
+from dao.TokenRevocationDAO import TokenRevocationDAO
+from utils.AccessToken import AccessToken
 from utils.LogUtils import LogUtils
+from utils.TokenCache import TokenCache
 
 class UserDAO:
     """
@@ -154,18 +158,20 @@ class UserDAO:
         
         Args:
             user_id: 用户ID
-            token: 新的token
+            token: 新的token，为None时清除用户表中的token
             expiration_time: token过期时间戳
             
         Returns:
             bool: 更新是否成功
         """
-        UserDAO.logger.info(f"更新用户token: user_id={user_id}, token={token[:10]}..., expiration_time={expiration_time}")
+        UserDAO.logger.info(f"更新用户token: user_id={user_id}, expiration_time={expiration_time}")
         try:
             if self.db.connect():
                 update_query = "UPDATE user SET refresh_token = %s, token_expiration_time = %s WHERE id = %s"
                 if self.db.execute(update_query, (token, expiration_time, user_id)):
                     self.db.commit()
+                    # 旧token立即失效，不能再通过鉴权缓存校验
+                    TokenCache.invalidate(user_id)
                     UserDAO.logger.info(f"用户token更新成功: user_id={user_id}")
                     return True
                 else:
@@ -180,6 +186,77 @@ class UserDAO:
         finally:
             self.db.disconnect()
     
+    def clear_legacy_token(self, user_id, token):
+        """
+        清除旧版本登录保存在用户表中的token，并撤销用该token续签的访问token，其他会话的访问token不受影响
+        
+        Args:
+            user_id: 用户ID
+            token: 用户表中保存的token
+            
+        Returns:
+            bool: 清除了token返回True，token已变化或发生错误返回False
+        """
+        UserDAO.logger.info(f"清除用户表中的token: user_id={user_id}")
+        try:
+            if self.db.connect():
+                update_query = "UPDATE user SET refresh_token = NULL, token_expiration_time = NULL WHERE id = %s AND refresh_token = %s"
+                if self.db.execute(update_query, (user_id, token)) and self.db.cur.rowcount > 0:
+                    session_id = SessionDAO.session_id(token)
+                    revoked_at = TokenRevocationDAO.revoke_session(self.db.cur, session_id)
+                    self.db.commit()
+                    TokenCache.invalidate(user_id)
+                    AccessToken.revoke_session(session_id, revoked_at)
+                    UserDAO.logger.info(f"用户表中的token清除成功: user_id={user_id}")
+                    return True
+                else:
+                    self.db.rollback()
+                    UserDAO.logger.warning(f"用户表中的token清除失败: user_id={user_id}")
+                    return False
+        except Exception as e:
+            UserDAO.logger.error(f"清除用户表中的token时发生错误: {e}")
+            if self.db.cur:
+                self.db.rollback()
+            return False
+        finally:
+            self.db.disconnect()
+    
+    def update_password(self, user_id, encrypted_password):
+        """
+        修改用户密码，同时删除该用户在所有设备上的会话并清除用户表中的token
+        
+        Args:
+            user_id: 用户ID
+            encrypted_password: 加密后的新密码
+            
+        Returns:
+            bool: 修改成功返回True，否则返回False
+        """
+        UserDAO.logger.info(f"修改用户密码: user_id={user_id}")
+        try:
+            if self.db.connect():
+                update_query = "UPDATE user SET password = %s, refresh_token = NULL, token_expiration_time = NULL WHERE id = %s"
+                if self.db.execute(update_query, (encrypted_password, user_id)) and self.db.cur.rowcount > 0:
+                    # 所有设备上的会话与密码修改在同一事务中提交，需要使用新密码重新登录
+                    self.db.execute("DELETE FROM user_session WHERE user_id = %s", (user_id,))
+                    revoked_at = TokenRevocationDAO.revoke(self.db.cur, user_id)
+                    self.db.commit()
+                    TokenCache.invalidate(user_id)
+                    AccessToken.revoke_user(user_id, revoked_at)
+                    UserDAO.logger.info(f"用户密码修改成功: user_id={user_id}")
+                    return True
+                else:
+                    self.db.rollback()
+                    UserDAO.logger.error(f"用户密码修改失败: user_id={user_id}")
+                    return False
+        except Exception as e:
+            UserDAO.logger.error(f"修改用户密码时发生错误: {e}")
+            if self.db.cur:
+                self.db.rollback()
+            return False
+        finally:
+            self.db.disconnect()
+    
     def get_user_by_id(self, user_id):
         """
         根据用户ID查询用户信息
@@ -249,9 +326,14 @@ class UserDAO:
         UserDAO.logger.info(f"根据用户ID删除用户: {user_id}")
         try:
             if self.db.connect():
+                # 先删除该用户在所有设备上的会话，与删除用户在同一事务中提交
+                self.db.execute("DELETE FROM user_session WHERE user_id = %s", (user_id,))
                 delete_query = "DELETE FROM user WHERE id = %s"
                 if self.db.execute(delete_query, (user_id,)):
+                    revoked_at = TokenRevocationDAO.revoke(self.db.cur, user_id)
                     self.db.commit()
+                    TokenCache.invalidate(user_id)
+                    AccessToken.revoke_user(user_id, revoked_at)
                     UserDAO.logger.info(f"用户ID={user_id}删除成功")
                     return True
                 else:
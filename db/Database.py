@@ -1,19 +1,56 @@
+import os
+import threading
+import time
 import pymysql
 from dbutils.pooled_db import PooledDB
+from db.PoolMonitor import PoolMonitor
+from db.QueryStats import QueryStats
+from db.SQLiteBackend import SQLiteConnection, SQLiteCursor, SQLiteSchema
 from utils.ConfigManager import ConfigManager
 from utils.LogUtils import LogUtils
 
 class Database:
+    """
+    数据库访问类
+
+    DAO实例由模块级的Service单例持有，会被多个请求线程同时使用，
+    因此连接和游标保存在线程本地存储中：每个线程从连接池获取自己的连接，
+    互不覆盖，并发能力随连接池大小线性扩展。
+    
+    环境配置中的driver选择数据库驱动：mysql（默认，pymysql）或sqlite（db/SQLiteBackend.py，
+    执行前把MySQL方言改写为SQLite语句，用于不依赖MySQL服务的集成测试和性能基准测试）。
+    """
+
     # 类变量，保存连接池实例和配置管理器实例
     pool = None
     config_manager = None
+    # 支持的数据库驱动及当前使用的驱动
+    DRIVERS = ('mysql', 'sqlite')
+    driver = 'mysql'
     logger = None
+    # 连接池监控器及获取连接的超时时间（秒，0表示一直等待）
+    monitor = None
+    acquire_timeout = 0
+    # 按语句指纹汇总的SQL执行统计及慢查询日志
+    query_stats = None
+    # 连接池过载时建议客户端重试的等待时间（秒）
+    retry_after = 1
+    # 为True时创建实例不创建连接池，第一次获取连接时才创建。多进程服务在主进程中预加载应用时设置，
+    # 使连接池只在fork出的工作进程中创建（见server.py）
+    lazy_pool = False
+    # 子进程从父进程继承、但不能使用的连接池（见_after_fork_in_child）
+    _inherited_pools = []
+    # 创建连接池的锁，保证多个线程同时第一次获取连接时只创建一个连接池
+    _pool_lock = threading.Lock()
+    # 请求级状态（线程本地），记录当前请求是否因连接池过载而获取连接失败、是否已提交过事务，
+    # 以及当前请求执行的SQL语句数、累计耗时和获取连接的累计等待时间
+    _request_state = threading.local()
     
     def __init__(self, config_file='config/DateBaseConfig.ini', default_env='dev'):
         self.config_file = config_file
         self.default_env = default_env
-        self.conn = None
-        self.cur = None
+        # 线程本地存储，保存当前线程的连接和游标
+        self._local = threading.local()
         
         # 初始化日志器（如果尚未初始化）
         if Database.logger is None:
@@ -39,7 +76,7 @@ class Database:
                 return
         
         # 如果连接池不存在，则创建连接池
-        if Database.pool is None:
+        if Database.pool is None and not Database.lazy_pool:
             try:
                 self._load_config()
                 self._create_pool()
@@ -54,6 +91,24 @@ class Database:
                 import traceback
                 traceback.print_exc()
     
+    @property
+    def conn(self):
+        """当前线程持有的数据库连接"""
+        return getattr(self._local, 'conn', None)
+    
+    @conn.setter
+    def conn(self, value):
+        self._local.conn = value
+    
+    @property
+    def cur(self):
+        """当前线程持有的数据库游标"""
+        return getattr(self._local, 'cur', None)
+    
+    @cur.setter
+    def cur(self, value):
+        self._local.cur = value
+    
     def _load_config(self):
         # 使用类共享的ConfigManager实例获取配置
         config = Database.config_manager
@@ -63,22 +118,54 @@ class Database:
         current_env = config.get('app', 'env', default=self.default_env)
         Database.logger.info(f"当前环境: {current_env}")
         
+        Database.driver = str(config.get(current_env, 'driver', default='mysql')).lower()
+        if Database.driver not in Database.DRIVERS:
+            raise ValueError(f"不支持的数据库驱动: {Database.driver}")
+        
         # 验证必要的配置项是否存在
-        required_keys = ['host', 'port', 'user', 'password', 'database', 'charset']
+        required_keys = ['database'] if Database.driver == 'sqlite' else ['host', 'port', 'user', 'password', 'database', 'charset']
         try:
             config.validate(required_sections=[current_env], required_keys={current_env: required_keys})
-            Database.logger.info(f"配置验证成功，环境: {current_env}")
+            Database.logger.info(f"配置验证成功，环境: {current_env}，驱动: {Database.driver}")
         except ValueError as e:
             Database.logger.error(f"配置验证失败: {e}")
             raise
         
-        self.db_config = {
-            'host': config.get(current_env, 'host'),
-            'port': config.getint(current_env, 'port'),
-            'user': config.get(current_env, 'user'),
-            'password': config.get(current_env, 'password'),
-            'database': config.get(current_env, 'database'),
-            'charset': config.get(current_env, 'charset')
+        if Database.driver == 'sqlite':
+            self.db_config = {
+                'database': SQLiteConnection.resolve_database(config.get(current_env, 'database')),
+                'timeout': config.getfloat(current_env, 'busy_timeout', 5.0)
+            }
+            self.schema_file = config.get(current_env, 'schema', default='sql/create_tables_sqlite.sql')
+        else:
+            self.db_config = {
+                'host': config.get(current_env, 'host'),
+                'port': config.getint(current_env, 'port'),
+                'user': config.get(current_env, 'user'),
+                'password': config.get(current_env, 'password'),
+                'database': config.get(current_env, 'database'),
+                'charset': config.get(current_env, 'charset')
+            }
+        
+        # 连接池配置（可选，未配置时使用默认值）
+        self.pool_config = {
+            'maxconnections': config.getint(current_env, 'max_connections', 20),
+            'mincached': config.getint(current_env, 'min_cached', 5),
+            'maxcached': config.getint(current_env, 'max_cached', 10),
+            'maxshared': config.getint(current_env, 'max_shared', 10),
+            'blocking': config.getboolean(current_env, 'blocking', True),
+            'maxusage': config.getint(current_env, 'max_usage', 0) or None,
+            'ping': config.getint(current_env, 'ping', 0)
+        }
+        self.max_waiters = config.getint(current_env, 'max_waiters', 0)
+        Database.acquire_timeout = config.getfloat(current_env, 'acquire_timeout', 0)
+        Database.retry_after = config.getint(current_env, 'retry_after', 1)
+        
+        # SQL执行统计配置（可选）
+        self.query_stats_config = {
+            'slow_threshold': config.getfloat('instrumentation', 'slow_query_threshold', 0.2),
+            'max_fingerprints': config.getint('instrumentation', 'query_stats_max_fingerprints', 500),
+            'sample_size': config.getint('instrumentation', 'query_stats_sample_size', 256)
         }
         
         # 记录数据库配置信息（隐藏密码）
@@ -86,21 +173,28 @@ class Database:
         if 'password' in log_config:
             log_config['password'] = '******'
         Database.logger.info(f"数据库配置加载完成: {log_config}")
+        Database.logger.info(f"连接池配置: {self.pool_config}, 最大等待线程数: {self.max_waiters}, 获取连接超时: {Database.acquire_timeout}秒")
     
     def _create_pool(self):
         """创建数据库连接池"""
         Database.logger.info("开始创建数据库连接池")
         
+        if Database.driver == 'sqlite':
+            # 先建表，连接池初始化时创建的连接即可直接使用
+            SQLiteSchema.load(self.db_config['database'], self.schema_file)
+            Database.logger.info(f"SQLite表结构加载完成: {self.schema_file}")
+        
         pool_params = {
-            'creator': pymysql,  # 使用pymysql作为数据库连接的创建者
-            'maxconnections': 20,  # 连接池允许的最大连接数，0表示不限制
-            'mincached': 5,  # 初始化时连接池中的空闲连接数
-            'maxcached': 10,  # 连接池中最多允许的空闲连接数，0表示不限制
-            'maxshared': 10,  # 连接池中最多允许的共享连接数，0表示不共享
-            'blocking': True,  # 当连接池没有可用连接时，是否阻塞等待，True表示等待
-            'maxusage': None,  # 一个连接最多被重复使用的次数，None表示不限制
+            'creator': _CONNECTION_CREATORS[Database.driver],  # 创建连接，并记录创建/回收次数
+            # maxconnections: 连接池允许的最大连接数，0表示不限制
+            # mincached: 初始化时连接池中的空闲连接数
+            # maxcached: 连接池中最多允许的空闲连接数，0表示不限制
+            # maxshared: 连接池中最多允许的共享连接数，0表示不共享
+            # blocking: 当连接池没有可用连接时，是否阻塞等待，True表示等待
+            # maxusage: 一个连接最多被重复使用的次数，None表示不限制
+            # ping: 检查连接是否可用的方式，0表示从不检查
+            **self.pool_config,
             'setsession': [],  # 开始会话前执行的命令列表
-            'ping': 0,  # 检查连接是否可用的方式，0表示从不检查
             **self.db_config
         }
         
@@ -110,6 +204,11 @@ class Database:
             log_params['password'] = '******'
         Database.logger.info(f"连接池参数: {log_params}")
         
+        # 先创建监控器，以便记录连接池初始化时建立的连接
+        Database.monitor = PoolMonitor(self.pool_config['maxconnections'], self.max_waiters)
+        Database.query_stats = QueryStats(**self.query_stats_config)
+        Database.logger.info(f"SQL执行统计配置: {self.query_stats_config}")
+        
         try:
             Database.pool = PooledDB(**pool_params)
             Database.logger.info("数据库连接池创建成功")
@@ -117,16 +216,71 @@ class Database:
             Database.logger.error(f"创建数据库连接池失败: {e}")
             raise
     
+    def _ensure_pool(self):
+        """
+        创建尚不存在的连接池，多个线程同时调用时只创建一次
+
+        Returns:
+            bool: 连接池可用返回True，创建失败返回False
+        """
+        with Database._pool_lock:
+            if Database.pool is not None:
+                return True
+            if Database.config_manager is None:
+                Database.logger.error("配置管理器未初始化，无法创建数据库连接池")
+                return False
+            try:
+                self._load_config()
+                self._create_pool()
+                return True
+            except Exception as e:
+                Database.logger.error(f"初始化数据库连接池失败: {e}")
+                return False
+    
+    @classmethod
+    def _after_fork_in_child(cls):
+        """
+        fork后在子进程中调用：丢弃从父进程继承的连接池，子进程第一次获取连接时创建自己的连接池。
+        继承的连接与父进程共用同一个socket，子进程既不能使用也不能关闭（关闭会向数据库发送QUIT，
+        断开父进程的连接），因此只保留引用，避免被垃圾回收时关闭
+        """
+        if cls.pool is not None:
+            cls._inherited_pools.append(cls.pool)
+        cls.pool = None
+        cls.monitor = None
+        # fork时其他线程可能正持有锁，子进程中该线程已不存在
+        cls._pool_lock = threading.Lock()
+    
     def connect(self):
         try:
             Database.logger.info("尝试从连接池获取数据库连接")
+            # 当前线程仍持有旧连接时先归还，避免占用连接池
+            if self.conn is not None or getattr(self._local, 'monitor', None) is not None:
+                self.disconnect()
+            # 连接池延迟创建或在fork后被丢弃时，在第一次获取连接时创建
+            if Database.pool is None and not self._ensure_pool():
+                return False
+            # 先占用连接名额，等待队列已满或超过获取超时时间则放弃
+            acquire_start = time.perf_counter()
+            monitor = Database.monitor
+            if monitor is not None:
+                acquired = monitor.acquire(Database.acquire_timeout)
+                Database.record_pool_wait(time.perf_counter() - acquire_start)
+                if not acquired:
+                    Database._request_state.shed = True
+                    Database.logger.error(f"连接池繁忙，获取数据库连接失败: 等待队列已满或等待超过{Database.acquire_timeout}秒")
+                    return False
+                self._local.monitor = monitor
+                acquire_start = time.perf_counter()
             # 从连接池获取连接
             self.conn = Database.pool.connection()
             self.cur = self.conn.cursor()
+            Database.record_pool_wait(time.perf_counter() - acquire_start)
             Database.logger.info("成功获取数据库连接")
             return True
         except Exception as e:
             Database.logger.error(f"数据库连接错误: {e}")
+            self.disconnect()
             return False
     
     def disconnect(self):
@@ -137,6 +291,7 @@ class Database:
                 Database.logger.info("游标关闭成功")
             except Exception as e:
                 Database.logger.error(f"游标关闭错误: {e}")
+            self.cur = None
         if self.conn:
             try:
                 # 将连接放回连接池
@@ -144,6 +299,12 @@ class Database:
                 Database.logger.info("数据库连接已放回连接池")
             except Exception as e:
                 Database.logger.error(f"数据库连接放回连接池错误: {e}")
+            self.conn = None
+        # 归还连接名额
+        monitor = getattr(self._local, 'monitor', None)
+        if monitor is not None:
+            self._local.monitor = None
+            monitor.release()
         Database.logger.info("数据库连接资源释放完成")
     
     def execute(self, query, params=None):
@@ -153,16 +314,16 @@ class Database:
                     return False
             
             # 记录 SQL 执行信息（隐藏可能的敏感信息）
-            Database.logger.debug(f"准备执行 SQL: {query}")
+            Database.logger.debug_event("准备执行 SQL", sql=query)
             if params:
                 # 不记录完整参数，避免敏感信息泄露
-                Database.logger.debug(f"SQL 参数类型: {type(params).__name__}")
+                Database.logger.debug_event("SQL 参数类型", type=lambda: type(params).__name__)
                 self.cur.execute(query, params)
             else:
                 self.cur.execute(query)
             
             affected_rows = self.cur.rowcount
-            Database.logger.info(f"SQL 执行成功，影响行数: {affected_rows}")
+            Database.logger.info_event("SQL 执行成功", affected_rows=affected_rows)
             return True
         except pymysql.ProgrammingError as e:
             Database.logger.error(f"SQL 语句执行错误: {e}")
@@ -183,6 +344,8 @@ class Database:
             if self.conn:
                 Database.logger.info("准备提交事务")
                 self.conn.commit()
+                # 记录当前请求已有写入生效，过载保护不能再让客户端重试该请求
+                Database._request_state.committed = True
                 Database.logger.info("事务提交成功")
                 return True
             Database.logger.warning("尝试提交事务时连接已关闭")
@@ -204,6 +367,90 @@ class Database:
             Database.logger.error(f"回滚事务错误: {e}")
             return False
     
+    @classmethod
+    def reset_request_state(cls):
+        """清除当前线程的请求级状态，在每个请求开始时调用"""
+        cls._request_state.shed = False
+        cls._request_state.committed = False
+        cls._request_state.query_count = 0
+        cls._request_state.db_time = 0.0
+        cls._request_state.pool_wait = 0.0
+    
+    @classmethod
+    def record_query(cls, seconds):
+        """
+        记录当前线程执行了一条SQL语句，由游标在每次execute后调用
+        
+        Args:
+            seconds: 语句执行耗时（秒）
+        """
+        state = cls._request_state
+        state.query_count = getattr(state, 'query_count', 0) + 1
+        state.db_time = getattr(state, 'db_time', 0.0) + seconds
+    
+    @classmethod
+    def record_pool_wait(cls, seconds):
+        """
+        记录当前线程获取连接的等待时间（包括等待连接名额和从连接池取出连接）
+        
+        Args:
+            seconds: 等待时间（秒）
+        """
+        state = cls._request_state
+        state.pool_wait = getattr(state, 'pool_wait', 0.0) + seconds
+    
+    @classmethod
+    def get_request_pool_wait(cls):
+        """
+        获取当前请求获取连接的累计等待时间
+        
+        Returns:
+            float: 等待时间（秒）
+        """
+        return getattr(cls._request_state, 'pool_wait', 0.0)
+    
+    @classmethod
+    def get_request_db_stats(cls):
+        """
+        获取当前请求执行的SQL语句数和累计耗时
+        
+        Returns:
+            tuple: (语句数, 累计耗时秒数)
+        """
+        return getattr(cls._request_state, 'query_count', 0), getattr(cls._request_state, 'db_time', 0.0)
+    
+    @classmethod
+    def is_request_shed(cls):
+        """
+        当前请求是否因连接池过载而获取连接失败
+        
+        Returns:
+            bool: 获取连接失败返回True，否则返回False
+        """
+        return getattr(cls._request_state, 'shed', False)
+    
+    @classmethod
+    def is_request_committed(cls):
+        """
+        当前请求是否已经提交过事务
+        
+        Returns:
+            bool: 提交过返回True，否则返回False
+        """
+        return getattr(cls._request_state, 'committed', False)
+    
+    @classmethod
+    def get_pool_stats(cls):
+        """
+        获取连接池统计信息
+        
+        Returns:
+            dict: 连接池统计快照，连接池尚未创建时返回None
+        """
+        if cls.monitor is None:
+            return None
+        return cls.monitor.snapshot()
+    
     def __enter__(self):
         Database.logger.info("进入数据库上下文管理器")
         self.connect()
@@ -217,3 +464,79 @@ class Database:
         else:
             self.commit()
         self.disconnect()
+
+
+class _TrackedConnectionMixin:
+    """记录物理连接关闭次数"""
+    
+    def close(self):
+        was_open = self.open
+        try:
+            super().close()
+        finally:
+            if was_open and Database.monitor is not None:
+                Database.monitor.record_recycled()
+
+
+class _TrackedConnection(_TrackedConnectionMixin, pymysql.connections.Connection):
+    """记录物理连接关闭次数的pymysql连接"""
+
+
+class _TrackedSQLiteConnection(_TrackedConnectionMixin, SQLiteConnection):
+    """记录物理连接关闭次数的SQLite连接"""
+
+
+class _TimedCursorMixin:
+    """记录每条语句执行耗时，executemany最终也会调用execute"""
+    
+    def execute(self, query, args=None):
+        start = time.perf_counter()
+        rows = None
+        try:
+            rows = super().execute(query, args)
+            return rows
+        finally:
+            seconds = time.perf_counter() - start
+            Database.record_query(seconds)
+            query_stats = Database.query_stats
+            if query_stats is not None:
+                query_stats.record(query, seconds, rows)
+
+
+class _TimedCursor(_TimedCursorMixin, pymysql.cursors.Cursor):
+    """记录每条语句执行耗时的pymysql游标"""
+
+
+class _TimedSQLiteCursor(_TimedCursorMixin, SQLiteCursor):
+    """记录每条语句执行耗时的SQLite游标"""
+
+
+def _create_connection(*args, **kwargs):
+    """连接池使用的连接创建函数，记录物理连接的创建次数，游标统一记录语句耗时"""
+    kwargs.setdefault('cursorclass', _TimedCursor)
+    conn = _TrackedConnection(*args, **kwargs)
+    if Database.monitor is not None:
+        Database.monitor.record_created()
+    return conn
+
+
+def _create_sqlite_connection(*args, **kwargs):
+    """连接池使用的SQLite连接创建函数"""
+    kwargs.setdefault('cursorclass', _TimedSQLiteCursor)
+    conn = _TrackedSQLiteConnection(*args, **kwargs)
+    if Database.monitor is not None:
+        Database.monitor.record_created()
+    return conn
+
+
+# 供DBUtils识别底层DB-API模块（异常类型、线程安全级别）
+_create_connection.dbapi = pymysql
+
+# 数据库驱动 -> 连接池使用的连接创建函数
+_CONNECTION_CREATORS = {
+    'mysql': _create_connection,
+    'sqlite': _create_sqlite_connection
+}
+
+# fork出的子进程丢弃继承的连接池，在子进程中重新创建
+os.register_at_fork(after_in_child=Database._after_fork_in_child)
@@ -0,0 +1,277 @@
+import random
+import time
+from datetime import date, datetime, timedelta
+from dao.ConfigVersionDAO import ConfigVersionDAO
+from dao.RollupDAO import RollupDAO
+from db.Database import Database
+from utils.LogUtils import LogUtils
+from utils.MD5Utils import MD5Utils
+
+
+class DatasetGenerator:
+    """
+    压测数据生成器
+
+    按给定规模生成用户、账户、支出和收入记录，通过多行INSERT分批写入，每批一个事务。
+    同一个随机种子和参数生成完全相同的数据；用户的活跃度服从对数正态分布，
+    少数用户拥有大量记录，与真实数据的长尾分布一致。新用户的编号接在已有用户之后，
+    可以多次追加生成。MySQL和SQLite后端都可以使用（见db/SQLiteBackend.py）。
+    """
+
+    logger = LogUtils.get_instance('DatasetGenerator')
+
+    # 类型表为空时创建的类型及各类型记录的相对频率
+    EXPEND_TYPES = (('餐饮', 35), ('交通', 15), ('购物', 20), ('住房', 5), ('娱乐', 10), ('医疗', 5), ('教育', 5), ('其他', 5))
+    INCOME_TYPES = (('工资', 50), ('奖金', 10), ('理财', 20), ('兼职', 15), ('其他', 5))
+    ACCOUNT_NAMES = ('现金', '银行卡', '信用卡', '支付宝', '微信')
+    EXPEND_REMARKS = ('早餐', '午餐', '晚餐', '打车', '地铁', '超市', '网购', '房租', '电影', None)
+    INCOME_REMARKS = ('月薪', '年终奖', '基金收益', '利息', '稿费', None)
+
+    # 生成的用户统一使用该密码登录
+    DEFAULT_PASSWORD = 'password123'
+    # 金额的对数正态分布参数(mu, sigma)，支出中位数约33，收入中位数约1800
+    EXPEND_MONEY = (3.5, 1.0)
+    INCOME_MONEY = (7.5, 0.8)
+    # 被逻辑删除（enable = false）的记录比例
+    DISABLED_RATE = 0.02
+
+    def __init__(self, seed=42, batch_size=1000, skew=1.0, start_date=date(2024, 1, 1), days=365):
+        """
+        初始化数据生成器
+
+        Args:
+            seed: 随机种子
+            batch_size: 每条INSERT语句写入的行数
+            skew: 用户活跃度的对数正态分布sigma，0表示每个用户的记录数相同
+            start_date: 记录时间的起始日期
+            days: 记录时间跨越的天数
+        """
+        self.seed = seed
+        self.batch_size = batch_size
+        self.skew = skew
+        self.start_time = datetime.combine(start_date, datetime.min.time())
+        self.days = days
+        self.rng = random.Random(seed)
+        self.db = Database()
+
+    def generate(self, users, accounts_per_user=5, expends=0, incomes=0, rebuild_rollups=True):
+        """
+        生成数据
+
+        Args:
+            users: 用户数
+            accounts_per_user: 每个用户的账户数
+            expends: 支出记录数
+            incomes: 收入记录数
+            rebuild_rollups: 写入完成后是否重建日汇总表
+
+        Returns:
+            dict: 各表写入的行数
+        """
+        DatasetGenerator.logger.info(f"开始生成数据: 用户{users}个, 每个用户{accounts_per_user}个账户, 支出{expends}条, 收入{incomes}条, "
+                                     f"随机种子{self.seed}, 每批{self.batch_size}行")
+        expend_type_ids = self._ensure_types('expend_type', 'expend_type_name', DatasetGenerator.EXPEND_TYPES, 'expend_type_version')
+        income_type_ids = self._ensure_types('income_type', 'income_type_name', DatasetGenerator.INCOME_TYPES, 'income_type_version')
+        user_ids = self._insert_users(users)
+        accounts = self._insert_accounts(user_ids, accounts_per_user)
+
+        counts = {'user': len(user_ids), 'account': sum(len(ids) for ids in accounts.values())}
+        if expends or incomes:
+            cum_weights = self.user_cum_weights(len(user_ids))
+            counts['expend'] = self._insert_rows('expend', ('money', 'account_id', 'user_id', 'remark', 'expend_time', 'enable', 'expend_type_id'),
+                                                 self.record_rows(expends, user_ids, cum_weights, accounts, expend_type_ids,
+                                                                  DatasetGenerator.EXPEND_MONEY, DatasetGenerator.EXPEND_REMARKS))
+            counts['income'] = self._insert_rows('income', ('money', 'account_id', 'user_id', 'remark', 'income_time', 'enable', 'income_type_id'),
+                                                 self.record_rows(incomes, user_ids, cum_weights, accounts, income_type_ids,
+                                                                  DatasetGenerator.INCOME_MONEY, DatasetGenerator.INCOME_REMARKS))
+            if rebuild_rollups and not RollupDAO().rebuild():
+                raise RuntimeError("重建日汇总失败")
+
+        DatasetGenerator.logger.info(f"数据生成完成: {counts}")
+        return counts
+
+    def user_cum_weights(self, count):
+        """
+        生成用户活跃度的累计权重
+
+        Args:
+            count: 用户数
+
+        Returns:
+            list: 与用户列表一一对应的累计权重
+        """
+        cum_weights = []
+        total = 0.0
+        for _ in range(count):
+            total += self.rng.lognormvariate(0.0, self.skew) if self.skew else 1.0
+            cum_weights.append(total)
+        return cum_weights
+
+    def record_rows(self, count, user_ids, cum_weights, accounts, type_ids, money, remarks):
+        """
+        逐行生成支出或收入记录
+
+        Args:
+            count: 记录数
+            user_ids: 用户ID列表
+            cum_weights: 用户活跃度的累计权重
+            accounts: 用户ID到账户ID列表的字典
+            type_ids: (类型ID, 相对频率)列表
+            money: 金额的对数正态分布参数(mu, sigma)
+            remarks: 备注候选列表
+
+        Yields:
+            tuple: (金额, 账户ID, 用户ID, 备注, 记录时间, 是否可用, 类型ID)
+        """
+        rng = self.rng
+        type_values = [type_id for type_id, _ in type_ids]
+        type_weights = [weight for _, weight in type_ids]
+        seconds = self.days * 86400
+        mu, sigma = money
+        remaining = count
+        while remaining > 0:
+            size = min(remaining, self.batch_size)
+            remaining -= size
+            # 按批抽样，减少逐行调用的开销
+            batch_users = rng.choices(user_ids, cum_weights=cum_weights, k=size)
+            batch_types = rng.choices(type_values, weights=type_weights, k=size)
+            for user_id, type_id in zip(batch_users, batch_types):
+                record_time = self.start_time + timedelta(seconds=rng.randrange(seconds) // 60 * 60)
+                yield (max(int(rng.lognormvariate(mu, sigma)), 1), rng.choice(accounts[user_id]), user_id,
+                       rng.choice(remarks), record_time, rng.random() >= DatasetGenerator.DISABLED_RATE, type_id)
+
+    def _ensure_types(self, table, name_column, types, version_column):
+        """
+        获取可用的类型，类型表为空时先创建默认类型
+
+        Returns:
+            list: (类型ID, 相对频率)列表
+        """
+        rows = self._fetch_all(f"SELECT id FROM {table} WHERE enable = TRUE ORDER BY id")
+        if rows:
+            return [(row[0], 1) for row in rows]
+
+        create_time = self.start_time - timedelta(days=1)
+        if not self.db.connect():
+            raise RuntimeError("无法连接数据库")
+        try:
+            insert_query = (f"INSERT INTO {table} ({name_column}, enable, create_time) VALUES "
+                            + ', '.join(['(%s, %s, %s)'] * len(types)))
+            self.db.cur.execute(insert_query, [value for name, _ in types for value in (name, True, create_time)])
+            # 类型表被直接写入，在同一事务中递增版本号，各进程的类型缓存不会在类型已写入时仍认为缓存有效
+            ConfigVersionDAO.bump(self.db.cur, version_column)
+            if not self.db.commit():
+                raise RuntimeError(f"{table}写入失败")
+        except Exception:
+            self.db.rollback()
+            raise
+        finally:
+            self.db.disconnect()
+
+        # 按名称对应相对频率，不依赖写入顺序
+        weights = dict(types)
+        rows = self._fetch_all(f"SELECT id, {name_column} FROM {table} WHERE enable = TRUE AND {name_column} IN "
+                               f"({', '.join(['%s'] * len(types))}) ORDER BY id", [name for name, _ in types])
+        return [(type_id, weights[name]) for type_id, name in rows]
+
+    def _insert_users(self, count):
+        """
+        写入用户，用户名和手机号按编号生成，编号接在已有用户之后
+
+        Returns:
+            list: 新用户的ID列表
+        """
+        first_id = self._max_id('user')
+        password = MD5Utils.encrypt(DatasetGenerator.DEFAULT_PASSWORD)
+        start_ms = int(self.start_time.timestamp() * 1000)
+
+        def rows():
+            for number in range(first_id + 1, first_id + count + 1):
+                registration = start_ms - self.rng.randrange(365 * 86400) * 1000
+                yield (f"user{number:08d}", password, f"139{number:08d}", True, registration)
+
+        self._insert_rows('user', ('username', 'password', 'phone', 'enable', 'registration'), rows())
+        return [row[0] for row in self._fetch_all("SELECT id FROM user WHERE id > %s ORDER BY id", (first_id,))]
+
+    def _insert_accounts(self, user_ids, per_user):
+        """
+        为每个用户写入账户
+
+        Returns:
+            dict: 用户ID到账户ID列表的字典
+        """
+        if not user_ids:
+            return {}
+        first_id = self._max_id('account')
+        names = DatasetGenerator.ACCOUNT_NAMES
+
+        def rows():
+            for user_id in user_ids:
+                for index in range(per_user):
+                    yield (names[index % len(names)], self.rng.randrange(0, 5000000) / 100, user_id)
+
+        self._insert_rows('account', ('name', 'balance', 'user_id'), rows())
+        accounts = {user_id: [] for user_id in user_ids}
+        for account_id, user_id in self._fetch_all("SELECT id, user_id FROM account WHERE id > %s ORDER BY id", (first_id,)):
+            accounts[user_id].append(account_id)
+        return accounts
+
+    def _insert_rows(self, table, columns, rows):
+        """
+        按batch_size行一批，用多行INSERT写入数据，每批提交一次
+
+        Args:
+            table: 表名
+            columns: 字段名列表
+            rows: 行数据的可迭代对象
+
+        Returns:
+            int: 写入的行数
+        """
+        row_placeholder = '(' + ', '.join(['%s'] * len(columns)) + ')'
+        prefix = f"INSERT INTO {table} ({', '.join(columns)}) VALUES "
+        full_query = prefix + ', '.join([row_placeholder] * self.batch_size)
+
+        total = 0
+        start = time.perf_counter()
+        next_report = 100 * self.batch_size
+        batch = []
+        if not self.db.connect():
+            raise RuntimeError("无法连接数据库")
+        try:
+            for row in rows:
+                batch.extend(row)
+                if len(batch) == self.batch_size * len(columns):
+                    self.db.cur.execute(full_query, batch)
+                    self.db.commit()
+                    total += self.batch_size
+                    batch = []
+                    if total >= next_report:
+                        next_report += 100 * self.batch_size
+                        DatasetGenerator.logger.info(f"{table}已写入{total}行, {total / (time.perf_counter() - start):.0f}行/秒")
+            if batch:
+                size = len(batch) // len(columns)
+                self.db.cur.execute(prefix + ', '.join([row_placeholder] * size), batch)
+                self.db.commit()
+                total += size
+        except Exception:
+            self.db.rollback()
+            raise
+        finally:
+            self.db.disconnect()
+        DatasetGenerator.logger.info(f"{table}写入完成: {total}行, 耗时{time.perf_counter() - start:.1f}秒")
+        return total
+
+    def _fetch_all(self, query, params=None):
+        """执行查询并返回全部结果"""
+        if not self.db.connect():
+            raise RuntimeError("无法连接数据库")
+        try:
+            self.db.cur.execute(query, params)
+            return self.db.cur.fetchall()
+        finally:
+            self.db.disconnect()
+
+    def _max_id(self, table):
+        """获取表中当前最大的ID，空表返回0"""
+        return self._fetch_all(f"SELECT COALESCE(MAX(id), 0) FROM {table}")[0][0]
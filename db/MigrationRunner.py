@@ -0,0 +1,188 @@
+import hashlib
+import os
+import re
+from db.Database import Database
+from utils.LogUtils import LogUtils
+
+
+class MigrationRunner:
+    """
+    数据库迁移执行器
+
+    迁移脚本放在sql/migrations目录下，文件名格式为 V<版本号>__<说明>.sql，
+    按版本号从小到大依次执行，已执行的版本及文件校验和记录在schema_migrations表中，
+    重复执行时只会执行尚未执行过的版本。
+    """
+
+    logger = LogUtils.get_instance('MigrationRunner')
+
+    # 迁移文件名格式，例如 V002__add_query_indexes.sql
+    FILE_PATTERN = re.compile(r'^V(\d+)__(\w+)\.sql$')
+
+    # 默认迁移脚本目录
+    DEFAULT_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'sql', 'migrations')
+
+    # 迁移历史表
+    HISTORY_TABLE_QUERY = """CREATE TABLE IF NOT EXISTS `schema_migrations` (
+	`version` INT NOT NULL COMMENT '迁移版本号',
+	`name` VARCHAR(255) NOT NULL COMMENT '迁移说明',
+	`checksum` CHAR(32) NOT NULL COMMENT '迁移文件MD5校验和',
+	`applied_at` TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP COMMENT '执行时间',
+	PRIMARY KEY(`version`)
+) COMMENT='数据库迁移历史表'"""
+
+    def __init__(self, migrations_dir=None):
+        """
+        初始化迁移执行器
+
+        Args:
+            migrations_dir: 迁移脚本目录，默认为sql/migrations
+        """
+        self.migrations_dir = migrations_dir or MigrationRunner.DEFAULT_DIR
+        self.db = Database()
+
+    @staticmethod
+    def split_statements(sql_content):
+        """
+        将SQL脚本拆分为单条语句，忽略只包含注释的片段
+
+        Args:
+            sql_content: SQL脚本内容
+
+        Returns:
+            list: SQL语句列表
+        """
+        # 以分号分割，处理可能存在的字符串内分号
+        statements = re.split(r';(?=(?:[^"\']*["\'][^"\']*["\'])*[^"\']*$)', sql_content)
+        result = []
+        for statement in statements:
+            code_lines = [line for line in statement.splitlines() if line.strip() and not line.strip().startswith('--')]
+            if code_lines:
+                result.append(statement.strip())
+        return result
+
+    def discover(self):
+        """
+        扫描迁移脚本目录
+
+        Returns:
+            list: 按版本号排序的迁移信息列表，每项包含version、name、path、checksum
+        """
+        migrations = []
+        for filename in os.listdir(self.migrations_dir):
+            match = MigrationRunner.FILE_PATTERN.match(filename)
+            if not match:
+                continue
+            path = os.path.join(self.migrations_dir, filename)
+            with open(path, 'rb') as f:
+                checksum = hashlib.md5(f.read()).hexdigest()
+            migrations.append({
+                'version': int(match.group(1)),
+                'name': match.group(2),
+                'path': path,
+                'checksum': checksum
+            })
+        migrations.sort(key=lambda migration: migration['version'])
+
+        versions = [migration['version'] for migration in migrations]
+        if len(versions) != len(set(versions)):
+            raise ValueError(f"迁移脚本目录中存在重复的版本号: {self.migrations_dir}")
+        return migrations
+
+    def get_applied_versions(self):
+        """
+        查询已执行的迁移版本，迁移历史表不存在时自动创建
+
+        Returns:
+            dict: 版本号到校验和的映射
+        """
+        try:
+            if not self.db.connect():
+                raise RuntimeError("无法连接数据库")
+            self.db.cur.execute(MigrationRunner.HISTORY_TABLE_QUERY)
+            self.db.cur.execute("SELECT version, checksum FROM schema_migrations")
+            return {row[0]: row[1] for row in self.db.cur.fetchall()}
+        finally:
+            self.db.disconnect()
+
+    def status(self):
+        """
+        查询所有迁移的执行状态
+
+        Returns:
+            list: 迁移信息列表，每项额外包含applied（是否已执行）和modified（执行后文件是否被修改）
+        """
+        applied = self.get_applied_versions()
+        result = []
+        for migration in self.discover():
+            version = migration['version']
+            result.append({
+                **migration,
+                'applied': version in applied,
+                'modified': version in applied and applied[version] != migration['checksum']
+            })
+        return result
+
+    def migrate(self, target_version=None):
+        """
+        依次执行尚未执行的迁移
+
+        Args:
+            target_version: 最多执行到该版本（包含），None表示执行全部
+
+        Returns:
+            bool: 全部执行成功返回True，否则返回False
+            list: 本次执行成功的版本号列表
+        """
+        applied = self.get_applied_versions()
+        executed = []
+        for migration in self.discover():
+            version = migration['version']
+            if target_version is not None and version > target_version:
+                break
+            if version in applied:
+                if applied[version] != migration['checksum']:
+                    MigrationRunner.logger.warning(f"迁移V{version:03d}在执行后被修改，不会重新执行: {migration['path']}")
+                continue
+            if not self._apply(migration):
+                return False, executed
+            executed.append(version)
+
+        MigrationRunner.logger.info(f"数据库迁移完成，本次执行{len(executed)}个版本: {executed}")
+        return True, executed
+
+    def _apply(self, migration):
+        """
+        执行单个迁移并记录到迁移历史表
+
+        Args:
+            migration: 迁移信息
+
+        Returns:
+            bool: 执行成功返回True，否则返回False
+        """
+        version = migration['version']
+        MigrationRunner.logger.info(f"开始执行迁移V{version:03d}: {migration['name']}")
+        with open(migration['path'], 'r', encoding='utf-8') as f:
+            statements = MigrationRunner.split_statements(f.read())
+
+        try:
+            if not self.db.connect():
+                MigrationRunner.logger.error(f"迁移V{version:03d}执行失败: 无法连接数据库")
+                return False
+            for statement in statements:
+                MigrationRunner.logger.info(f"执行SQL语句: {statement[:50]}...")
+                self.db.cur.execute(statement)
+            insert_query = "INSERT INTO schema_migrations (version, name, checksum) VALUES (%s, %s, %s)"
+            self.db.cur.execute(insert_query, (version, migration['name'], migration['checksum']))
+            self.db.commit()
+            MigrationRunner.logger.info(f"迁移V{version:03d}执行成功")
+            return True
+        except Exception as e:
+            # MySQL的DDL语句会隐式提交，失败前已执行的语句无法回滚，需要人工检查
+            MigrationRunner.logger.error(f"迁移V{version:03d}执行失败: {e}")
+            if self.db.cur:
+                self.db.rollback()
+            return False
+        finally:
+            self.db.disconnect()
@@ -0,0 +1,140 @@
+import threading
+import time
+
+
+class PoolMonitor:
+    """
+    连接池监控器
+
+    限制同时借出的连接数（支持获取超时和等待队列长度上限），并记录连接池运行统计：
+    使用中/空闲连接数、等待线程数、获取等待耗时直方图、物理连接的创建与回收次数、
+    被拒绝/超时的获取次数以及被降级处理的请求数。
+    所有方法都是线程安全的。
+    """
+
+    # 获取连接等待耗时直方图的桶上限（单位：秒）
+    WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+    def __init__(self, max_connections=0, max_waiters=0):
+        """
+        初始化连接池监控器
+
+        Args:
+            max_connections: 允许同时借出的最大连接数，0表示不限制
+            max_waiters: 允许同时等待连接的最大线程数，0表示不限制
+        """
+        self.max_connections = max_connections
+        self.max_waiters = max_waiters
+        self._cond = threading.Condition()
+        self.in_use = 0
+        self.waiters = 0
+        self.acquired = 0
+        self.timeouts = 0
+        self.rejected = 0
+        self.shed_requests = 0
+        self.created = 0
+        self.recycled = 0
+        self._wait_counts = [0] * (len(self.WAIT_BUCKETS) + 1)
+        self._wait_sum = 0.0
+
+    def acquire(self, timeout=None):
+        """
+        占用一个连接名额，名额不足时等待
+
+        Args:
+            timeout: 最长等待时间（秒），None或0表示一直等待
+
+        Returns:
+            bool: 成功占用返回True，等待队列已满或等待超时返回False
+        """
+        start = time.perf_counter()
+        deadline = start + timeout if timeout else None
+        with self._cond:
+            if self.max_connections and self.in_use >= self.max_connections:
+                # 等待队列已满，直接拒绝，避免请求线程无限堆积
+                if self.max_waiters and self.waiters >= self.max_waiters:
+                    self.rejected += 1
+                    return False
+                self.waiters += 1
+                try:
+                    while self.in_use >= self.max_connections:
+                        remaining = None if deadline is None else deadline - time.perf_counter()
+                        if remaining is not None and remaining <= 0:
+                            self.timeouts += 1
+                            self._record_wait(time.perf_counter() - start)
+                            return False
+                        self._cond.wait(remaining)
+                finally:
+                    self.waiters -= 1
+            self.in_use += 1
+            self.acquired += 1
+            self._record_wait(time.perf_counter() - start)
+            return True
+
+    def release(self):
+        """归还一个连接名额并唤醒一个等待线程"""
+        with self._cond:
+            if self.in_use > 0:
+                self.in_use -= 1
+            self._cond.notify()
+
+    def record_created(self):
+        """记录新建了一个物理连接"""
+        with self._cond:
+            self.created += 1
+
+    def record_recycled(self):
+        """记录关闭了一个物理连接（达到maxusage重置、ping失败或空闲缓存已满）"""
+        with self._cond:
+            self.recycled += 1
+
+    def record_shed_request(self):
+        """记录一个因连接池过载而被降级（返回503）的请求"""
+        with self._cond:
+            self.shed_requests += 1
+
+    def _record_wait(self, seconds):
+        """记录一次获取连接的等待耗时（调用方需持有锁）"""
+        for index, bound in enumerate(self.WAIT_BUCKETS):
+            if seconds <= bound:
+                self._wait_counts[index] += 1
+                break
+        else:
+            self._wait_counts[-1] += 1
+        self._wait_sum += seconds
+
+    def snapshot(self):
+        """
+        获取连接池统计快照
+
+        Returns:
+            dict: 连接池统计信息，等待耗时直方图的桶为累计计数
+        """
+        with self._cond:
+            buckets = {}
+            cumulative = 0
+            for bound, count in zip(self.WAIT_BUCKETS, self._wait_counts):
+                cumulative += count
+                buckets[str(bound)] = cumulative
+            cumulative += self._wait_counts[-1]
+            buckets['+Inf'] = cumulative
+            # 存活的物理连接要么被借出，要么在空闲缓存中
+            idle = max(self.created - self.recycled - self.in_use, 0)
+            return {
+                'max_connections': self.max_connections,
+                'max_waiters': self.max_waiters,
+                'in_use': self.in_use,
+                'idle': idle,
+                'waiters': self.waiters,
+                'acquired': self.acquired,
+                'timeouts': self.timeouts,
+                'rejected': self.rejected,
+                'shed_requests': self.shed_requests,
+                'created': self.created,
+                'recycled': self.recycled,
+                'acquire_wait_seconds': {
+                    'buckets': buckets,
+                    'count': cumulative,
+                    'sum': round(self._wait_sum, 6)
+                }
+            }
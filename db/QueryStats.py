@@ -0,0 +1,151 @@
+import re
+import threading
+from collections import deque
+from functools import lru_cache
+from utils.LogUtils import LogUtils
+
+# 语句指纹的归一化规则，按顺序替换
+_COMMENT_PATTERN = re.compile(r'/\*.*?\*/|--[^\n]*|#[^\n]*', re.S)
+_STRING_PATTERN = re.compile(r"'(?:[^'\\]|\\.|'')*'|\"(?:[^\"\\]|\\.|\"\")*\"", re.S)
+_PLACEHOLDER_PATTERN = re.compile(r'%\(\w+\)s|%s')
+_NUMBER_PATTERN = re.compile(r'(?<![\w.])(?:0x[0-9a-f]+|[+-]?\d+(?:\.\d+)?(?:e[+-]?\d+)?)(?![\w.])', re.I)
+_VALUE_LIST_PATTERN = re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)')
+_REPEATED_LIST_PATTERN = re.compile(r'\(\?\+\)(?:\s*,\s*\(\?\+\))+')
+_WHITESPACE_PATTERN = re.compile(r'\s+')
+
+
+@lru_cache(maxsize=2048)
+def fingerprint(query):
+    """
+    把SQL语句归一化为指纹：字符串、数字和参数占位符替换为?，去掉注释，
+    IN列表和多行VALUES折叠为(?+)，合并空白并转为小写。
+    只有取值不同的语句得到相同的指纹。
+
+    Args:
+        query: SQL语句
+
+    Returns:
+        str: 语句指纹
+    """
+    if isinstance(query, bytes):
+        query = query.decode('utf-8', 'replace')
+    # 先替换字符串，避免字符串中的#或--被当作注释
+    text = _STRING_PATTERN.sub('?', query)
+    text = _COMMENT_PATTERN.sub(' ', text)
+    text = _PLACEHOLDER_PATTERN.sub('?', text)
+    text = _NUMBER_PATTERN.sub('?', text)
+    text = _VALUE_LIST_PATTERN.sub('(?+)', text)
+    text = _REPEATED_LIST_PATTERN.sub('(?+)', text)
+    return _WHITESPACE_PATTERN.sub(' ', text).strip().lower()
+
+
+class QueryStats:
+    """
+    按语句指纹汇总的SQL执行统计
+
+    游标每执行一条语句调用一次record：按指纹累计执行次数、总耗时、最大耗时和慢查询次数，
+    并保留最近sample_size次耗时用于计算p95。超过慢查询阈值的语句写入独立的慢查询日志。
+    指纹数量达到上限后，新出现的指纹统一计入OTHER，避免拼接了字面量的语句导致内存无限增长。
+    所有方法都是线程安全的。
+    """
+
+    # 指纹数量达到上限后新指纹的汇总键
+    OTHER = '<other>'
+
+    def __init__(self, slow_threshold=0.2, max_fingerprints=500, sample_size=256,
+                 slow_log_config='config/SlowQueryLogConfig.ini'):
+        """
+        初始化SQL执行统计
+
+        Args:
+            slow_threshold: 慢查询阈值（秒），0表示不记录慢查询日志
+            max_fingerprints: 最多统计的指纹数量
+            sample_size: 每个指纹保留用于计算p95的最近耗时个数
+            slow_log_config: 慢查询日志的配置文件路径
+        """
+        self.slow_threshold = slow_threshold
+        self.max_fingerprints = max_fingerprints
+        self.sample_size = sample_size
+        self.slow_log_config = slow_log_config
+        self._lock = threading.Lock()
+        # 指纹 -> [执行次数, 总耗时, 最大耗时, 慢查询次数, 最近耗时]
+        self._stats = {}
+        self._slow_logger = None
+
+    def record(self, query, seconds, rows=None):
+        """
+        记录一条语句的执行耗时
+
+        Args:
+            query: SQL语句（参数替换前的模板）
+            seconds: 执行耗时（秒）
+            rows: 影响或返回的行数，执行失败时为None
+        """
+        key = fingerprint(query)
+        slow = bool(self.slow_threshold) and seconds >= self.slow_threshold
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                if len(self._stats) >= self.max_fingerprints:
+                    key = self.OTHER
+                    stats = self._stats.get(key)
+                if stats is None:
+                    stats = [0, 0.0, 0.0, 0, deque(maxlen=self.sample_size)]
+                    self._stats[key] = stats
+            stats[0] += 1
+            stats[1] += seconds
+            if seconds > stats[2]:
+                stats[2] = seconds
+            if slow:
+                stats[3] += 1
+            stats[4].append(seconds)
+
+        if slow:
+            self._get_slow_logger().warning_event("慢查询", elapsed_ms=round(seconds * 1000, 3), rows=rows, fingerprint=key)
+
+    def _get_slow_logger(self):
+        """获取慢查询日志器，第一次出现慢查询时才创建"""
+        if self._slow_logger is None:
+            self._slow_logger = LogUtils.get_instance('SlowQuery', self.slow_log_config)
+        return self._slow_logger
+
+    @staticmethod
+    def _percentile(samples, percent):
+        """按最近邻法计算百分位数"""
+        ordered = sorted(samples)
+        index = max(int(len(ordered) * percent / 100.0 + 0.5) - 1, 0)
+        return ordered[min(index, len(ordered) - 1)]
+
+    def snapshot(self, order_by='total', limit=20):
+        """
+        获取按指纹汇总的统计快照
+
+        Args:
+            order_by: 排序字段，total、p95、max、count或slow，均为降序
+            limit: 返回的指纹数量，0表示全部返回
+
+        Returns:
+            list: 每个指纹的统计信息，耗时单位为毫秒
+        """
+        with self._lock:
+            items = [(key, stats[0], stats[1], stats[2], stats[3], list(stats[4])) for key, stats in self._stats.items()]
+
+        result = []
+        for key, count, total, maximum, slow, samples in items:
+            result.append({
+                'fingerprint': key,
+                'count': count,
+                'total_ms': round(total * 1000, 3),
+                'avg_ms': round(total * 1000 / count, 3),
+                'p95_ms': round(self._percentile(samples, 95) * 1000, 3),
+                'max_ms': round(maximum * 1000, 3),
+                'slow_count': slow
+            })
+        sort_key = {'total': 'total_ms', 'p95': 'p95_ms', 'max': 'max_ms', 'count': 'count', 'slow': 'slow_count'}[order_by]
+        result.sort(key=lambda item: item[sort_key], reverse=True)
+        return result[:limit] if limit else result
+
+    def reset(self):
+        """清除全部统计"""
+        with self._lock:
+            self._stats.clear()
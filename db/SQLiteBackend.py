@@ -0,0 +1,380 @@
+import decimal
+import itertools
+import os
+import re
+import sqlite3
+import threading
+from datetime import date, datetime
+from functools import lru_cache
+import pymysql
+
+# SQLite 3.35起支持省略冲突目标的ON CONFLICT DO UPDATE，用于替换ON DUPLICATE KEY UPDATE
+MIN_SQLITE_VERSION = (3, 35, 0)
+
+# MySQL方言到SQLite的改写规则
+_START_TRANSACTION_PATTERN = re.compile(r'^\s*(START\s+TRANSACTION|BEGIN)\s*;?\s*$', re.I)
+_INSERT_IGNORE_PATTERN = re.compile(r'\bINSERT\s+IGNORE\b', re.I)
+_ON_DUPLICATE_PATTERN = re.compile(r'\bON\s+DUPLICATE\s+KEY\s+UPDATE\b(.*)$', re.I | re.S)
+_VALUES_FUNCTION_PATTERN = re.compile(r'\bVALUES\s*\(\s*`?(\w+)`?\s*\)', re.I)
+_FOR_UPDATE_PATTERN = re.compile(r'\s+FOR\s+UPDATE\b', re.I)
+_INTERVAL_PATTERN = re.compile(r'(\w+\(\)|`?\w+`?)\s*([-+])\s*INTERVAL\s+(%s|\d+)\s+(SECOND|MINUTE|HOUR|DAY)\b', re.I)
+_CURRENT_TIMESTAMP_PATTERN = re.compile(r'\bCURRENT_TIMESTAMP\b(?!\s*\()', re.I)
+_DELETE_LIMIT_PATTERN = re.compile(r'^\s*DELETE\s+FROM\s+(`?\w+`?)\s+WHERE\s+(.*?)\s+((?:ORDER\s+BY\s+.*?\s+)?LIMIT\s+\S+)\s*$', re.I | re.S)
+_PLACEHOLDER_PATTERN = re.compile(r'%%|%s|%\((\w+)\)s')
+_STATEMENT_PATTERN = re.compile(r'^\s*(\w+)')
+
+# DATE_FORMAT格式符到strftime格式符的映射
+_DATE_FORMAT_CODES = {
+    'Y': '%Y', 'y': '%y', 'm': '%m', 'd': '%d', 'H': '%H', 'h': '%I', 'i': '%M',
+    's': '%S', 'S': '%S', 'p': '%p', 'W': '%A', 'a': '%a', 'M': '%B', 'b': '%b', 'j': '%j',
+    'x': '%G', 'v': '%V', 'u': '%W', 'U': '%U', 'T': '%H:%M:%S', '%': '%%'
+}
+
+# sqlite3异常到pymysql异常的映射，上层按pymysql的异常类型处理数据库错误
+_ERROR_TYPES = (
+    (sqlite3.IntegrityError, pymysql.err.IntegrityError),
+    (sqlite3.ProgrammingError, pymysql.err.ProgrammingError),
+    (sqlite3.OperationalError, pymysql.err.OperationalError),
+    (sqlite3.NotSupportedError, pymysql.err.NotSupportedError),
+    (sqlite3.DataError, pymysql.err.DataError),
+    (sqlite3.InternalError, pymysql.err.InternalError),
+    (sqlite3.InterfaceError, pymysql.err.InterfaceError),
+    (sqlite3.Error, pymysql.err.DatabaseError)
+)
+
+
+def _to_datetime(value):
+    text = value.decode() if isinstance(value, bytes) else str(value)
+    return datetime.fromisoformat(text)
+
+
+# 按列声明的类型把读取的值转换为与pymysql一致的Python类型
+sqlite3.register_converter('TIMESTAMP', _to_datetime)
+sqlite3.register_converter('DATETIME', _to_datetime)
+sqlite3.register_converter('DATE', lambda value: date.fromisoformat(value.decode()[:10]))
+sqlite3.register_converter('DECIMAL', lambda value: decimal.Decimal(value.decode()))
+
+
+class SQLiteDialect:
+    """
+    MySQL方言到SQLite的转换
+
+    DAO中的SQL按MySQL编写，这里在执行前改写为SQLite可以执行的等价语句：
+    %s/%(name)s占位符改为?/:name（只在带参数执行时，与pymysql的%格式化一致，%%还原为%），
+    ON DUPLICATE KEY UPDATE改为ON CONFLICT DO UPDATE，INSERT IGNORE改为INSERT OR IGNORE，
+    NOW() - INTERVAL n SECOND改为DATETIME计算，去掉FOR UPDATE（由BEGIN IMMEDIATE加写锁代替），
+    带ORDER BY/LIMIT的DELETE改为按rowid子查询删除。NOW()和DATE_FORMAT()注册为自定义函数。
+    """
+
+    @staticmethod
+    @lru_cache(maxsize=1024)
+    def translate(query, has_args):
+        """
+        把MySQL语句改写为SQLite语句，同一条语句模板只改写一次
+
+        Args:
+            query: MySQL语句
+            has_args: 是否带参数执行
+
+        Returns:
+            str: SQLite语句
+        """
+        sql = _INSERT_IGNORE_PATTERN.sub('INSERT OR IGNORE', query)
+        sql = _ON_DUPLICATE_PATTERN.sub(
+            lambda match: 'ON CONFLICT DO UPDATE SET' + _VALUES_FUNCTION_PATTERN.sub(r'excluded.\1', match.group(1)), sql)
+        sql = _FOR_UPDATE_PATTERN.sub('', sql)
+        sql = _INTERVAL_PATTERN.sub(lambda match: f"DATETIME({match.group(1)}, '{match.group(2)}' || {match.group(3)} || "
+                                                  f"' {match.group(4).lower()}s')", sql)
+        sql = _CURRENT_TIMESTAMP_PATTERN.sub('NOW()', sql)
+        sql = _DELETE_LIMIT_PATTERN.sub(r'DELETE FROM \1 WHERE rowid IN (SELECT rowid FROM \1 WHERE \2 \3)', sql)
+        if has_args:
+            sql = _PLACEHOLDER_PATTERN.sub(lambda match: '%' if match.group(0) == '%%' else
+                                           (f':{match.group(1)}' if match.group(1) else '?'), sql)
+        return sql
+
+    @staticmethod
+    def convert_value(value):
+        """把参数转换为sqlite3支持的类型，时间按MySQL的文本格式保存以便比较和排序"""
+        if isinstance(value, datetime):
+            return value.isoformat(' ', timespec='microseconds' if value.microsecond else 'seconds')
+        if isinstance(value, date):
+            return value.isoformat()
+        if isinstance(value, decimal.Decimal):
+            return int(value) if value == value.to_integral_value() else float(value)
+        return value
+
+    @staticmethod
+    def convert_args(args):
+        """
+        转换语句参数
+
+        Args:
+            args: 元组、列表、字典或单个值，None表示不带参数
+
+        Returns:
+            元组或字典形式的参数
+        """
+        if args is None:
+            return ()
+        if isinstance(args, dict):
+            return {key: SQLiteDialect.convert_value(value) for key, value in args.items()}
+        if isinstance(args, (tuple, list)):
+            return tuple(SQLiteDialect.convert_value(value) for value in args)
+        return (SQLiteDialect.convert_value(args),)
+
+    @staticmethod
+    def convert_error(error):
+        """
+        把sqlite3异常转换为对应的pymysql异常
+
+        Args:
+            error: sqlite3异常
+
+        Returns:
+            pymysql异常
+        """
+        for sqlite_type, mysql_type in _ERROR_TYPES:
+            if isinstance(error, sqlite_type):
+                return mysql_type(0, str(error))
+        return pymysql.err.DatabaseError(0, str(error))
+
+    @staticmethod
+    def date_format(value, fmt):
+        """MySQL DATE_FORMAT函数"""
+        if value is None or fmt is None:
+            return None
+        moment = _to_datetime(value)
+        return moment.strftime(re.sub(r'%(.)', lambda match: _DATE_FORMAT_CODES.get(match.group(1), match.group(1)), fmt))
+
+    @staticmethod
+    def now():
+        """MySQL NOW函数，返回本地时间"""
+        return datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+
+class SQLiteCursor:
+    """
+    pymysql风格的SQLite游标：execute返回影响的行数，异常转换为pymysql异常，
+    连接不在事务中时先开启事务，与pymysql关闭autocommit时的行为一致
+    """
+
+    def __init__(self, connection):
+        self.connection = connection
+        self._cursor = connection._conn.cursor()
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+    @property
+    def lastrowid(self):
+        return self._cursor.lastrowid
+
+    @property
+    def description(self):
+        return self._cursor.description
+
+    def execute(self, query, args=None):
+        """
+        执行语句
+
+        Args:
+            query: MySQL语句
+            args: 语句参数（可选）
+
+        Returns:
+            int: 影响的行数，查询语句返回0
+        """
+        if isinstance(query, bytes):
+            query = query.decode('utf-8')
+        try:
+            if _START_TRANSACTION_PATTERN.match(query):
+                self.connection.begin()
+                return 0
+            sql = SQLiteDialect.translate(query, args is not None)
+            self.connection._ensure_transaction(sql)
+            self._cursor.execute(sql, SQLiteDialect.convert_args(args))
+        except sqlite3.Error as e:
+            raise SQLiteDialect.convert_error(e) from e
+        return max(self._cursor.rowcount, 0)
+
+    def executemany(self, query, args):
+        """逐条执行语句，返回影响的总行数"""
+        return sum(self.execute(query, item) for item in args)
+
+    def fetchone(self):
+        try:
+            return self._cursor.fetchone()
+        except sqlite3.Error as e:
+            raise SQLiteDialect.convert_error(e) from e
+
+    def fetchmany(self, size=None):
+        try:
+            return tuple(self._cursor.fetchmany(size or self._cursor.arraysize))
+        except sqlite3.Error as e:
+            raise SQLiteDialect.convert_error(e) from e
+
+    def fetchall(self):
+        try:
+            return tuple(self._cursor.fetchall())
+        except sqlite3.Error as e:
+            raise SQLiteDialect.convert_error(e) from e
+
+    def close(self):
+        self._cursor.close()
+
+    def __iter__(self):
+        return iter(self.fetchone, None)
+
+
+class SQLiteConnection:
+    """
+    pymysql风格的SQLite连接，供连接池创建和管理
+
+    database为文件路径，或:memory:表示进程内的内存数据库（多个连接共享同一个库）。
+    """
+
+    # DB-API的连接异常属性（与pymysql一致），DBUtils据此判断哪些异常需要重建连接
+    Warning = pymysql.err.Warning
+    Error = pymysql.err.Error
+    InterfaceError = pymysql.err.InterfaceError
+    DatabaseError = pymysql.err.DatabaseError
+    DataError = pymysql.err.DataError
+    OperationalError = pymysql.err.OperationalError
+    IntegrityError = pymysql.err.IntegrityError
+    InternalError = pymysql.err.InternalError
+    ProgrammingError = pymysql.err.ProgrammingError
+    NotSupportedError = pymysql.err.NotSupportedError
+
+    _memory_ids = itertools.count(1)
+
+    def __init__(self, database, timeout=5.0, cursorclass=SQLiteCursor, **kwargs):
+        """
+        打开SQLite连接
+
+        Args:
+            database: 数据库文件路径或SQLite URI
+            timeout: 等待其他连接释放写锁的最长时间（秒）
+            cursorclass: 游标类
+            kwargs: 其余的连接参数（如schema），忽略
+        """
+        if sqlite3.sqlite_version_info < MIN_SQLITE_VERSION:
+            raise pymysql.err.NotSupportedError(0, f"SQLite版本过低: {sqlite3.sqlite_version}，"
+                                                   f"需要{'.'.join(map(str, MIN_SQLITE_VERSION))}及以上")
+        self.database = database
+        self.cursorclass = cursorclass
+        # isolation_level=None关闭sqlite3模块的隐式事务，由_ensure_transaction按pymysql的语义开启
+        self._conn = sqlite3.connect(database, timeout=timeout, detect_types=sqlite3.PARSE_DECLTYPES,
+                                     isolation_level=None, check_same_thread=False, uri=database.startswith('file:'))
+        self._conn.create_function('NOW', 0, SQLiteDialect.now)
+        self._conn.create_function('DATE_FORMAT', 2, SQLiteDialect.date_format, deterministic=True)
+
+    @property
+    def open(self):
+        return self._conn is not None
+
+    def _ensure_transaction(self, sql):
+        """不在事务中时开启事务：写语句直接获取写锁，避免读后写升级锁时与其他连接冲突"""
+        if self._conn.in_transaction:
+            return
+        match = _STATEMENT_PATTERN.match(sql)
+        statement = match.group(1).upper() if match else ''
+        if statement in ('SELECT', 'WITH', 'PRAGMA', 'EXPLAIN'):
+            self._conn.execute('BEGIN')
+        else:
+            self._conn.execute('BEGIN IMMEDIATE')
+
+    def begin(self):
+        """开启事务，已有的事务先提交（与MySQL的START TRANSACTION一致）"""
+        if self._conn.in_transaction:
+            self._conn.commit()
+        self._conn.execute('BEGIN IMMEDIATE')
+
+    def cursor(self, cursorclass=None):
+        return (cursorclass or self.cursorclass)(self)
+
+    def commit(self):
+        try:
+            self._conn.commit()
+        except sqlite3.Error as e:
+            raise SQLiteDialect.convert_error(e) from e
+
+    def rollback(self):
+        try:
+            self._conn.rollback()
+        except sqlite3.Error as e:
+            raise SQLiteDialect.convert_error(e) from e
+
+    def ping(self, reconnect=True):
+        if self._conn is None:
+            raise pymysql.err.InterfaceError(0, "连接已关闭")
+        return True
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    @classmethod
+    def resolve_database(cls, database):
+        """
+        解析数据库路径，:memory:转换为同一进程内可被多个连接共享的内存数据库URI
+
+        Args:
+            database: 配置中的数据库路径
+
+        Returns:
+            str: 数据库文件路径或URI
+        """
+        if database == ':memory:':
+            return f"file:bill_db_memory_{next(cls._memory_ids)}?mode=memory&cache=shared"
+        return database
+
+
+class SQLiteSchema:
+    """
+    SQLite表结构的加载
+
+    内存数据库在最后一个连接关闭时销毁，因此加载表结构的连接会一直保留到close_all，
+    连接池中的连接进出时内存数据库保持存在。
+    """
+
+    _lock = threading.Lock()
+    # 数据库路径 -> 加载表结构的连接
+    _holders = {}
+
+    @classmethod
+    def load(cls, database, schema_file):
+        """
+        执行建表脚本，已存在的表保持不变
+
+        Args:
+            database: 数据库文件路径或URI
+            schema_file: 建表脚本路径
+        """
+        with open(schema_file, 'r', encoding='utf-8') as f:
+            script = f.read()
+        with cls._lock:
+            conn = cls._holders.get(database)
+            if conn is None:
+                directory = os.path.dirname(database)
+                if directory and not database.startswith('file:'):
+                    os.makedirs(directory, exist_ok=True)
+                conn = sqlite3.connect(database, isolation_level=None, check_same_thread=False,
+                                       uri=database.startswith('file:'))
+                if not database.startswith('file:'):
+                    # 文件数据库使用WAL模式，读写互不阻塞
+                    conn.execute('PRAGMA journal_mode=WAL')
+            conn.executescript(script)
+            if 'mode=memory' in database:
+                cls._holders[database] = conn
+            else:
+                conn.close()
+
+    @classmethod
+    def close_all(cls):
+        """关闭保留的连接，释放内存数据库"""
+        with cls._lock:
+            for conn in cls._holders.values():
+                conn.close()
+            cls._holders.clear()
@@ -0,0 +1,452 @@
+#!/usr/bin/env python3
+"""
+生产环境多进程服务入口
+
+主进程创建监听socket并预加载应用（不创建数据库连接池），然后fork出多个工作进程共同accept同一个socket。
+每个工作进程用固定大小的线程池处理请求，在fork后创建自己的数据库连接池，预热完成后调用gc.freeze()，
+把预加载和预热产生的对象移出垃圾回收的扫描范围。这样每个CPU核都有一个不受其他进程GIL限制的Python进程，
+主进程只负责管理工作进程：异常退出的工作进程会被重新创建。
+
+app.py中的Flask开发服务器只用于本地开发；生产环境使用本脚本（仍建议在前面部署nginx等反向代理）。
+
+进程内缓存在工作进程之间不共享：token校验缓存（utils/TokenCache.py）最多在TTL（30秒）后读到其他进程的
+退出登录、修改密码；签名访问token的撤销写入token_revocation和session_revocation表，其他工作进程最多在
+TokenRevocationDAO.SYNC_INTERVAL（1秒）后同步到。
+
+用法:
+    python server.py                            # 使用配置文件[server]节的配置
+    python server.py --workers 4 --threads 8    # 命令行参数覆盖配置
+
+信号:
+    SIGTERM/SIGINT  优雅关闭：工作进程停止接受新连接，等待处理中的请求完成后退出
+    SIGHUP          滚动重启：逐个创建新的工作进程，预热完成后再优雅关闭对应的旧工作进程
+"""
+
+import argparse
+import gc
+import os
+import random
+import select
+import signal
+import socket
+import sys
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from werkzeug.serving import BaseWSGIServer, WSGIRequestHandler
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from db.Database import Database
+from utils.ConfigManager import ConfigManager
+from utils.LogUtils import LogUtils
+
+logger = LogUtils.get_instance('Server')
+
+
+class PooledWSGIServer(BaseWSGIServer):
+    """
+    使用固定大小线程池的WSGI服务器
+
+    所有线程都在处理请求时，accept循环停止接受新连接，连接留在内核的监听队列中由其他工作进程accept，
+    而不是在本进程中无限排队。
+    """
+
+    multithread = True
+
+    def __init__(self, host, port, app, threads, keepalive, fd):
+        """
+        Args:
+            host: 监听地址
+            port: 监听端口
+            app: WSGI应用
+            threads: 处理请求的线程数
+            keepalive: keep-alive连接的空闲超时（秒），0表示每个请求后关闭连接
+            fd: 主进程创建的监听socket的文件描述符
+        """
+        self.threads = threads
+        self.handled = 0
+        self._executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix='Request')
+        self._slots = threading.BoundedSemaphore(threads)
+        self._active = 0
+        self._idle = threading.Condition()
+        super().__init__(host, port, app, handler=_make_handler(keepalive), fd=fd)
+
+    def process_request(self, request, client_address):
+        self._slots.acquire()
+        with self._idle:
+            self._active += 1
+        self._executor.submit(self._process, request, client_address)
+
+    def _process(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+            with self._idle:
+                self._active -= 1
+                self.handled += 1
+                self._idle.notify_all()
+            self._slots.release()
+
+    def wait_idle(self, timeout):
+        """
+        等待处理中的连接全部完成
+
+        Returns:
+            bool: 全部完成返回True，超时返回False
+        """
+        with self._idle:
+            return self._idle.wait_for(lambda: self._active == 0, timeout)
+
+
+def _make_handler(keepalive):
+    """创建按keep-alive配置设置协议版本和空闲超时的请求处理器"""
+
+    class RequestHandler(WSGIRequestHandler):
+        # HTTP/1.1默认保持连接，HTTP/1.0在每个请求后关闭连接
+        protocol_version = 'HTTP/1.1' if keepalive > 0 else 'HTTP/1.0'
+        # 等待下一个请求的空闲超时，避免空闲的keep-alive连接长期占用线程
+        timeout = keepalive if keepalive > 0 else None
+
+        def log_request(self, code='-', size='-'):
+            # 访问统计由api/metrics.py记录，不再逐条输出werkzeug的访问日志
+            pass
+
+    return RequestHandler
+
+
+def load_options(config_file='config/DateBaseConfig.ini', argv=None):
+    """
+    读取配置文件[server]节的配置，命令行参数优先
+
+    Returns:
+        argparse.Namespace: 服务配置
+    """
+    config = ConfigManager(config_file, env_override=True)
+    parser = argparse.ArgumentParser(description="生产环境多进程服务")
+    parser.add_argument('--host', default=config.get('server', 'host', '0.0.0.0'), help="监听地址")
+    parser.add_argument('--port', type=int, default=config.getint('server', 'port', 8080), help="监听端口")
+    parser.add_argument('--workers', type=int, default=config.getint('server', 'workers', 0), help="工作进程数，0表示与CPU核数相同")
+    parser.add_argument('--threads', type=int, default=config.getint('server', 'threads', 8), help="每个工作进程处理请求的线程数")
+    parser.add_argument('--backlog', type=int, default=config.getint('server', 'backlog', 2048), help="监听队列长度")
+    parser.add_argument('--keepalive', type=float, default=config.getfloat('server', 'keepalive', 2.0),
+                        help="keep-alive连接的空闲超时（秒），0表示每个请求后关闭连接")
+    parser.add_argument('--graceful-timeout', type=float, default=config.getfloat('server', 'graceful_timeout', 30.0),
+                        help="关闭或重启时等待处理中请求完成的最长时间（秒）")
+    parser.add_argument('--max-requests', type=int, default=config.getint('server', 'max_requests', 0),
+                        help="工作进程处理该数量的请求后优雅重启，0表示不限制")
+    parser.add_argument('--max-requests-jitter', type=int, default=config.getint('server', 'max_requests_jitter', 0),
+                        help="在max_requests上增加的随机数上限，避免工作进程同时重启")
+    parser.add_argument('--warmup-timeout', type=float, default=config.getfloat('server', 'warmup_timeout', 30.0),
+                        help="等待新工作进程预热完成的最长时间（秒）")
+    options = parser.parse_args(argv)
+    if options.workers <= 0:
+        options.workers = os.cpu_count() or 1
+    if options.threads <= 0:
+        parser.error("--threads必须大于0")
+    return options
+
+
+def create_listener(host, port, backlog):
+    """
+    创建所有工作进程共用的监听socket
+
+    设置为非阻塞：多个工作进程同时被唤醒时，没有accept到连接的进程立即返回，而不是阻塞在accept中
+    """
+    family = socket.AF_INET6 if ':' in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.setblocking(False)
+    sock.set_inheritable(True)
+    return sock
+
+
+class Worker:
+    """
+    工作进程（fork之后在子进程中运行）
+
+    创建连接池并预热，调用gc.freeze()，通知主进程已就绪，然后处理请求直到收到SIGTERM
+    或处理的请求数达到max_requests，最后等待处理中的请求完成后退出。
+    """
+
+    def __init__(self, app, listener, options, ready_fd, run_sweeper):
+        self.app = app
+        self.listener = listener
+        self.options = options
+        self.ready_fd = ready_fd
+        self.run_sweeper = run_sweeper
+        self.server = None
+        self._stopping = threading.Event()
+
+    def _warm_up(self):
+        """创建连接池并完整执行一次请求，加载类型缓存"""
+        from dao.ExpendTypeDAO import ExpendTypeDAO
+        from dao.IncomeTypeDAO import IncomeTypeDAO
+
+        with self.app.test_client() as client:
+            response = client.get('/health')
+            if response.status_code != 200:
+                logger.warning(f"工作进程{os.getpid()}预热时健康检查失败: {response.get_json()}")
+        ExpendTypeDAO().get_all_expend_types()
+        IncomeTypeDAO().get_all_income_types()
+
+    def _request_stop(self, *_):
+        """开始优雅退出：在独立线程中停止accept循环（shutdown会等待循环退出，不能在循环所在线程调用）"""
+        if self._stopping.is_set():
+            return
+        self._stopping.set()
+        threading.Thread(target=self.server.shutdown, name='WorkerShutdown', daemon=True).start()
+
+    def _watch_max_requests(self, limit):
+        """处理的请求数达到上限时优雅退出，由主进程创建新的工作进程"""
+        while not self._stopping.wait(1.0):
+            if self.server.handled >= limit:
+                logger.info(f"工作进程{os.getpid()}已处理{self.server.handled}个请求，准备重启")
+                self._request_stop()
+                return
+
+    def run(self):
+        """
+        Returns:
+            int: 进程退出码
+        """
+        # 主进程的信号处理不适用于工作进程；Ctrl+C会发给整个进程组，由主进程统一关闭
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        signal.signal(signal.SIGHUP, signal.SIG_IGN)
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        gc.enable()
+
+        self._warm_up()
+        # 预加载和预热产生的对象大多长期存在，移出垃圾回收的扫描范围，减少每次回收的停顿
+        gc.freeze()
+
+        options = self.options
+        self.server = PooledWSGIServer(options.host, options.port, self.app, options.threads, options.keepalive,
+                                       self.listener.fileno())
+        signal.signal(signal.SIGTERM, self._request_stop)
+
+        sweeper = None
+        if self.run_sweeper:
+            from services.SessionSweeper import SessionSweeper
+            sweeper = SessionSweeper.from_config()
+            sweeper.start()
+        if options.max_requests > 0:
+            limit = options.max_requests + random.randint(0, max(options.max_requests_jitter, 0))
+            threading.Thread(target=self._watch_max_requests, args=(limit,), name='MaxRequests', daemon=True).start()
+
+        os.write(self.ready_fd, b'1')
+        os.close(self.ready_fd)
+        logger.info(f"工作进程{os.getpid()}已就绪: {options.threads}个线程")
+
+        self.server.serve_forever(poll_interval=0.5)
+
+        # 关闭本进程的监听socket副本，内核中的监听队列由主进程和其他工作进程继续持有
+        self.server.server_close()
+        if not self.server.wait_idle(options.graceful_timeout):
+            logger.warning(f"工作进程{os.getpid()}等待处理中的请求超时，强制退出")
+        if sweeper is not None:
+            sweeper.stop()
+        if Database.pool is not None:
+            Database.pool.close()
+        logger.info(f"工作进程{os.getpid()}已退出，共处理{self.server.handled}个请求")
+        LogUtils.shutdown()
+        return 0
+
+
+class Arbiter:
+    """
+    主进程：创建和回收工作进程
+
+    每个工作进程占一个编号，退出后用相同的编号创建新的工作进程；编号0的工作进程负责清理过期会话。
+    主进程不处理请求，也不创建数据库连接池。
+    """
+
+    # 工作进程在启动后该时间内异常退出时，等待一段时间再重新创建，避免配置错误时反复fork
+    CRASH_WINDOW = 5.0
+    CRASH_BACKOFF = 1.0
+
+    def __init__(self, app, listener, options):
+        self.app = app
+        self.listener = listener
+        self.options = options
+        # pid -> (编号, 启动时间)
+        self.workers = {}
+        self._stopping = False
+        self._reload = False
+
+    def spawn(self, slot):
+        """
+        fork一个工作进程，等待其预热完成
+
+        Returns:
+            int: 工作进程的pid，预热超时返回None（该进程会被终止并由run循环重新创建）
+        """
+        ready_read, ready_write = os.pipe()
+        # fork前冻结主进程的对象：子进程的垃圾回收不会扫描它们，写时复制的内存页保持共享
+        gc.freeze()
+        pid = os.fork()
+        if pid == 0:
+            os.close(ready_read)
+            code = 1
+            try:
+                code = Worker(self.app, self.listener, self.options, ready_write, run_sweeper=(slot == 0)).run()
+            except Exception:
+                traceback.print_exc()
+            finally:
+                os._exit(code)
+
+        os.close(ready_write)
+        self.workers[pid] = (slot, time.monotonic())
+        try:
+            readable, _, _ = select.select([ready_read], [], [], self.options.warmup_timeout)
+            ready = bool(readable) and os.read(ready_read, 1) == b'1'
+        finally:
+            os.close(ready_read)
+        if not ready:
+            logger.error(f"工作进程{pid}（编号{slot}）未能在{self.options.warmup_timeout}秒内完成预热")
+            self._kill(pid, signal.SIGKILL)
+            return None
+        logger.info(f"工作进程{pid}（编号{slot}）已启动")
+        return pid
+
+    def _kill(self, pid, sig):
+        try:
+            os.kill(pid, sig)
+        except ProcessLookupError:
+            pass
+
+    def reap(self):
+        """
+        回收已退出的工作进程
+
+        Returns:
+            list: 已退出工作进程的(编号, 是否在启动后很快异常退出)
+        """
+        exited = []
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                break
+            if pid == 0:
+                break
+            slot, started = self.workers.pop(pid, (None, None))
+            if slot is None:
+                continue
+            code = os.waitstatus_to_exitcode(status)
+            crashed = code != 0 and time.monotonic() - started < self.CRASH_WINDOW
+            if code != 0 and not self._stopping:
+                logger.error(f"工作进程{pid}（编号{slot}）异常退出，退出码{code}")
+            exited.append((slot, crashed))
+        return exited
+
+    def _wait_exit(self, pid, timeout):
+        """等待指定的工作进程退出，超时后强制终止"""
+        deadline = time.monotonic() + timeout
+        while pid in self.workers and time.monotonic() < deadline:
+            # 同时退出的其他工作进程由run循环补齐
+            self.reap()
+            time.sleep(0.1)
+        if pid in self.workers:
+            logger.warning(f"工作进程{pid}在{timeout}秒内未退出，强制终止")
+            self._kill(pid, signal.SIGKILL)
+            os.waitpid(pid, 0)
+            self.workers.pop(pid, None)
+
+    def reload(self):
+        """滚动重启：逐个创建新的工作进程，就绪后再优雅关闭同编号的旧工作进程，重启期间服务容量不下降"""
+        logger.info("开始滚动重启工作进程")
+        for pid, (slot, _) in list(self.workers.items()):
+            if self._stopping:
+                return
+            if self.spawn(slot) is None:
+                logger.error(f"编号{slot}的新工作进程启动失败，保留旧工作进程{pid}")
+                continue
+            self._kill(pid, signal.SIGTERM)
+            self._wait_exit(pid, self.options.graceful_timeout + 5)
+        logger.info("滚动重启完成")
+
+    def stop(self):
+        """优雅关闭全部工作进程"""
+        self._stopping = True
+        logger.info("开始关闭工作进程")
+        for pid in list(self.workers):
+            self._kill(pid, signal.SIGTERM)
+        deadline = time.monotonic() + self.options.graceful_timeout + 5
+        while self.workers and time.monotonic() < deadline:
+            self.reap()
+            time.sleep(0.1)
+        for pid in list(self.workers):
+            logger.warning(f"工作进程{pid}未在规定时间内退出，强制终止")
+            self._kill(pid, signal.SIGKILL)
+            os.waitpid(pid, 0)
+        self.workers.clear()
+        self.listener.close()
+        logger.info("服务已关闭")
+
+    def _handle_stop(self, signum, frame):
+        self._stopping = True
+
+    def _handle_reload(self, signum, frame):
+        self._reload = True
+
+    def run(self):
+        signal.signal(signal.SIGTERM, self._handle_stop)
+        signal.signal(signal.SIGINT, self._handle_stop)
+        signal.signal(signal.SIGHUP, self._handle_reload)
+
+        options = self.options
+        logger.info(f"服务启动: {options.host}:{options.port}, {options.workers}个工作进程, 每个{options.threads}个线程")
+        for slot in range(options.workers):
+            if self._stopping:
+                break
+            self.spawn(slot)
+
+        while not self._stopping:
+            if any(crashed for _, crashed in self.reap()):
+                time.sleep(self.CRASH_BACKOFF)
+            # 补齐退出的工作进程（包括达到max_requests后主动退出的）
+            running = {slot for slot, _ in self.workers.values()}
+            for slot in range(options.workers):
+                if slot not in running and not self._stopping:
+                    self.spawn(slot)
+            if self._reload:
+                self._reload = False
+                self.reload()
+            time.sleep(0.5)
+
+        self.stop()
+        return 0
+
+
+def main(argv=None):
+    options = load_options(argv=argv)
+    listener = create_listener(options.host, options.port, options.backlog)
+
+    # 预加载应用：路由、服务和DAO只在主进程中创建一次，工作进程通过写时复制共享；
+    # 连接池延迟到工作进程第一次获取连接时创建。预加载期间暂停垃圾回收，避免创建大量长期对象时反复回收，
+    # 预加载结束（包括失败）后恢复，主进程在运行期间仍需要回收循环引用
+    gc.disable()
+    try:
+        Database.lazy_pool = True
+        from app import app
+    finally:
+        gc.enable()
+    gc.collect()
+    gc.freeze()
+
+    try:
+        return Arbiter(app, listener, options).run()
+    finally:
+        LogUtils.shutdown()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
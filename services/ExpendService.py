@@ -1,7 +1,12 @@
 from models.Expend import ExpendInfoModel
 from dao.ExpendDAO import ExpendDAO
+from utils.CursorUtils import CursorUtils
 
 class ExpendService:
+    # 列表查询默认每页记录数和每页最大记录数
+    DEFAULT_PAGE_SIZE = 20
+    MAX_PAGE_SIZE = 100
+
     def __init__(self, expend_dao=None):
         self.expend_dao = expend_dao or ExpendDAO()
 
@@ -64,13 +69,51 @@ class ExpendService:
         except Exception as e:
             return False, f"查询支出记录时发生错误: {str(e)}", None
 
-    def get_expends_by_user_id(self, user_id):
+    def get_expends_by_user_id(self, user_id, limit=None, cursor=None, account_id=None, expend_type_id=None,
+                               start_time=None, end_time=None, min_money=None, max_money=None, enable=None):
         if not user_id:
             return False, "参数不能为空", None
         
+        if start_time is not None and end_time is not None and start_time > end_time:
+            return False, "开始时间不能晚于结束时间", None
+        
+        if min_money is not None and max_money is not None and min_money > max_money:
+            return False, "最小金额不能大于最大金额", None
+        
+        # 既没有limit也没有cursor时按原接口返回全部记录的列表，兼容不分页的旧客户端
+        if limit is None and cursor is None:
+            try:
+                expends_data = self.expend_dao.get_expends_by_user_id(
+                    user_id, account_id=account_id, expend_type_id=expend_type_id, start_time=start_time, end_time=end_time,
+                    min_money=min_money, max_money=max_money, enable=enable
+                )
+                return True, "查询支出记录列表成功", [ExpendInfoModel(expend_data).to_dict() for expend_data in expends_data]
+            except Exception as e:
+                return False, f"查询支出记录列表时发生错误: {str(e)}", None
+        
+        if limit is None:
+            limit = ExpendService.DEFAULT_PAGE_SIZE
+        if limit <= 0:
+            return False, "limit必须大于0", None
+        limit = min(limit, ExpendService.MAX_PAGE_SIZE)
+        
+        try:
+            position = CursorUtils.decode(cursor) if cursor else None
+        except ValueError as e:
+            return False, str(e), None
+        
         try:
-            expends_data = self.expend_dao.get_expends_by_user_id(user_id)
-            expends_list = [ExpendInfoModel(expend_data).to_dict() for expend_data in expends_data]
-            return True, "查询支出记录列表成功", expends_list
+            # 多取一条用于判断是否还有下一页
+            expends_data = self.expend_dao.get_expends_by_user_id(
+                user_id, account_id=account_id, expend_type_id=expend_type_id, start_time=start_time, end_time=end_time,
+                min_money=min_money, max_money=max_money, enable=enable, limit=limit + 1, cursor=position
+            )
+            page = expends_data[:limit]
+            next_cursor = None
+            if len(expends_data) > limit:
+                last = ExpendInfoModel(page[-1])
+                next_cursor = CursorUtils.encode(last.expend_time, last.id)
+            expends_list = [ExpendInfoModel(expend_data).to_dict() for expend_data in page]
+            return True, "查询支出记录列表成功", {"list": expends_list, "next_cursor": next_cursor}
         except Exception as e:
             return False, f"查询支出记录列表时发生错误: {str(e)}", None
@@ -1,7 +1,12 @@
 from models.Income import IncomeInfoModel
 from dao.IncomeDAO import IncomeDAO
+from utils.CursorUtils import CursorUtils
 
 class IncomeService:
+    # 列表查询默认每页记录数和每页最大记录数
+    DEFAULT_PAGE_SIZE = 20
+    MAX_PAGE_SIZE = 100
+
     def __init__(self, income_dao=None):
         self.income_dao = income_dao or IncomeDAO()
 
@@ -64,13 +69,51 @@ class IncomeService:
         except Exception as e:
             return False, f"查询收入记录时发生错误: {str(e)}", None
 
-    def get_incomes_by_user_id(self, user_id):
+    def get_incomes_by_user_id(self, user_id, limit=None, cursor=None, account_id=None, income_type_id=None,
+                               start_time=None, end_time=None, min_money=None, max_money=None, enable=None):
         if not user_id:
             return False, "参数不能为空", None
         
+        if start_time is not None and end_time is not None and start_time > end_time:
+            return False, "开始时间不能晚于结束时间", None
+        
+        if min_money is not None and max_money is not None and min_money > max_money:
+            return False, "最小金额不能大于最大金额", None
+        
+        # 既没有limit也没有cursor时按原接口返回全部记录的列表，兼容不分页的旧客户端
+        if limit is None and cursor is None:
+            try:
+                incomes_data = self.income_dao.get_incomes_by_user_id(
+                    user_id, account_id=account_id, income_type_id=income_type_id, start_time=start_time, end_time=end_time,
+                    min_money=min_money, max_money=max_money, enable=enable
+                )
+                return True, "查询收入记录列表成功", [IncomeInfoModel(income_data).to_dict() for income_data in incomes_data]
+            except Exception as e:
+                return False, f"查询收入记录列表时发生错误: {str(e)}", None
+        
+        if limit is None:
+            limit = IncomeService.DEFAULT_PAGE_SIZE
+        if limit <= 0:
+            return False, "limit必须大于0", None
+        limit = min(limit, IncomeService.MAX_PAGE_SIZE)
+        
+        try:
+            position = CursorUtils.decode(cursor) if cursor else None
+        except ValueError as e:
+            return False, str(e), None
+        
         try:
-            incomes_data = self.income_dao.get_incomes_by_user_id(user_id)
-            incomes_list = [IncomeInfoModel(income_data).to_dict() for income_data in incomes_data]
-            return True, "查询收入记录列表成功", incomes_list
+            # 多取一条用于判断是否还有下一页
+            incomes_data = self.income_dao.get_incomes_by_user_id(
+                user_id, account_id=account_id, income_type_id=income_type_id, start_time=start_time, end_time=end_time,
+                min_money=min_money, max_money=max_money, enable=enable, limit=limit + 1, cursor=position
+            )
+            page = incomes_data[:limit]
+            next_cursor = None
+            if len(incomes_data) > limit:
+                last = IncomeInfoModel(page[-1])
+                next_cursor = CursorUtils.encode(last.income_time, last.id)
+            incomes_list = [IncomeInfoModel(income_data).to_dict() for income_data in page]
+            return True, "查询收入记录列表成功", {"list": incomes_list, "next_cursor": next_cursor}
         except Exception as e:
             return False, f"查询收入记录列表时发生错误: {str(e)}", None
@@ -0,0 +1,91 @@
+import threading
+import time
+from dao.SessionDAO import SessionDAO
+from utils.ConfigManager import ConfigManager
+from utils.LogUtils import LogUtils
+
+
+class SessionSweeper:
+    """
+    过期会话清理线程，定期分批删除user_session中已过期的会话
+
+    每批最多删除batch_size条并单独提交，避免一次大删除长时间持有锁；
+    一批删满时短暂休眠后继续，直到没有过期会话再等待下一个清理周期。
+    """
+
+    logger = LogUtils.get_instance('SessionSweeper')
+
+    # 两批删除之间的休眠时间（秒），给在线请求让出连接
+    BATCH_PAUSE = 0.1
+
+    def __init__(self, interval=300, batch_size=500):
+        """
+        初始化清理线程
+
+        Args:
+            interval: 清理周期（秒）
+            batch_size: 单批最多删除的会话数
+        """
+        self.interval = interval
+        self.batch_size = batch_size
+        self.session_dao = SessionDAO()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    @classmethod
+    def from_config(cls, config_file='config/DateBaseConfig.ini'):
+        """
+        根据配置文件[auth]节中的session_sweep_interval和session_sweep_batch创建清理线程
+
+        Returns:
+            SessionSweeper: 清理线程实例
+        """
+        config = ConfigManager(config_file, env_override=True)
+        return cls(config.getint('auth', 'session_sweep_interval', 300),
+                   config.getint('auth', 'session_sweep_batch', 500))
+
+    def sweep(self):
+        """
+        删除全部过期会话
+
+        Returns:
+            int: 删除的会话总数
+        """
+        total = 0
+        while not self._stop_event.is_set():
+            deleted = self.session_dao.delete_expired_sessions(self.batch_size)
+            total += deleted
+            if deleted < self.batch_size:
+                break
+            time.sleep(SessionSweeper.BATCH_PAUSE)
+        if total:
+            SessionSweeper.logger.info(f"清理过期会话{total}条")
+        return total
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            try:
+                self.sweep()
+            except Exception as e:
+                SessionSweeper.logger.error(f"清理过期会话时发生错误: {e}")
+
+    def start(self):
+        """
+        启动后台清理线程
+        """
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name='SessionSweeper', daemon=True)
+        self._thread.start()
+        SessionSweeper.logger.info(f"过期会话清理线程已启动: 周期={self.interval}秒, 每批={self.batch_size}条")
+
+    def stop(self):
+        """
+        停止后台清理线程
+        """
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        SessionSweeper.logger.info("过期会话清理线程已停止")
@@ -0,0 +1,112 @@
+import decimal
+from dao.StatsDAO import StatsDAO
+from utils.LogUtils import LogUtils
+
+
+class StatsService:
+    """
+    统计业务逻辑层，提供支出/收入的分组汇总
+    """
+
+    logger = LogUtils.get_instance('StatsService')
+
+    # 支持的分组维度
+    GROUP_BY_OPTIONS = ('day', 'week', 'month', 'type', 'account')
+
+    def __init__(self, stats_dao=None):
+        """
+        初始化StatsService，创建StatsDAO实例
+        """
+        StatsService.logger.info("初始化StatsService")
+        self.stats_dao = stats_dao or StatsDAO()
+
+    @staticmethod
+    def _to_number(value):
+        """将数据库返回的金额合计（Decimal）转换为可序列化的数字"""
+        if isinstance(value, decimal.Decimal):
+            return int(value) if value == value.to_integral_value() else float(value)
+        return value
+
+    @staticmethod
+    def _validate_time_range(start_time, end_time):
+        """校验时间范围，返回错误消息，校验通过返回None"""
+        if start_time is not None and end_time is not None and start_time > end_time:
+            return "开始时间不能晚于结束时间"
+        return None
+
+    def get_grouped_stats(self, kind, user_id, group_by, start_time=None, end_time=None):
+        """
+        按分组维度统计支出或收入
+
+        Args:
+            kind: 统计对象，expend或income
+            user_id: 用户ID
+            group_by: 分组维度，day、week、month、type或account
+            start_time: 开始时间（可选）
+            end_time: 结束时间（可选）
+
+        Returns:
+            tuple: (是否成功, 消息, 统计结果)
+        """
+        StatsService.logger.info(f"分组统计请求 - 对象: {kind}, 用户ID: {user_id}, 分组: {group_by}")
+
+        if not user_id:
+            return False, "用户ID不能为空", None
+
+        if kind not in StatsDAO.TABLES:
+            return False, f"不支持的统计对象: {kind}", None
+
+        if group_by not in StatsService.GROUP_BY_OPTIONS:
+            return False, f"group_by必须是{'、'.join(StatsService.GROUP_BY_OPTIONS)}之一", None
+
+        error_msg = StatsService._validate_time_range(start_time, end_time)
+        if error_msg:
+            return False, error_msg, None
+
+        rows = self.stats_dao.get_grouped_totals(kind, user_id, group_by, start_time, end_time)
+        if rows is None:
+            # 查询失败不能当作没有记录返回，否则数据库故障会显示为"没有支出"
+            StatsService.logger.error(f"分组统计失败 - 对象: {kind}, 用户ID: {user_id}, 分组: {group_by}")
+            return False, "统计失败", None
+        items = [
+            {"key": group_key, "count": int(count), "total": StatsService._to_number(total)}
+            for group_key, count, total in rows
+        ]
+        data = {
+            "group_by": group_by,
+            "items": items,
+            "count": sum(item["count"] for item in items),
+            "total": sum(item["total"] for item in items)
+        }
+        return True, "统计成功", data
+
+    def get_summary(self, user_id, start_time=None, end_time=None):
+        """
+        统计时间范围内的支出、收入合计及结余
+
+        Args:
+            user_id: 用户ID
+            start_time: 开始时间（可选）
+            end_time: 结束时间（可选）
+
+        Returns:
+            tuple: (是否成功, 消息, 统计结果)
+        """
+        StatsService.logger.info(f"汇总统计请求 - 用户ID: {user_id}, 时间范围: {start_time}~{end_time}")
+
+        if not user_id:
+            return False, "用户ID不能为空", None
+
+        error_msg = StatsService._validate_time_range(start_time, end_time)
+        if error_msg:
+            return False, error_msg, None
+
+        data = {}
+        for kind in StatsDAO.TABLES:
+            totals = self.stats_dao.get_totals(kind, user_id, start_time, end_time)
+            if totals is None:
+                StatsService.logger.error(f"汇总统计失败 - 对象: {kind}, 用户ID: {user_id}")
+                return False, "统计失败", None
+            data[kind] = {"count": int(totals[0]), "total": StatsService._to_number(totals[1])}
+        data["net"] = data["income"]["total"] - data["expend"]["total"]
+        return True, "统计成功", data
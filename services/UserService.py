@@ -1,7 +1,9 @@
 from dao.UserDAO import UserDAO
+from dao.SessionDAO import SessionDAO
 from utils.MD5Utils import MD5Utils
 from utils.LogUtils import LogUtils
 from utils.TokenUtils import TokenUtils
+from utils.AccessToken import AccessToken
 import re
 import time
 
@@ -18,6 +20,7 @@ class UserService:
         """
         UserService.logger.info("初始化UserService")
         self.user_dao = UserDAO()
+        self.session_dao = SessionDAO()
     
     def validate_phone(self, phone):
         """
@@ -97,14 +100,15 @@ class UserService:
             UserService.logger.error(f"用户注册失败: {username} ({phone})")
             return False, "注册失败: 无法插入用户信息", None
     
-    def login(self, username=None, password=None, phone=None):
+    def login(self, username=None, password=None, phone=None, device=None):
         """
-        用户登录业务逻辑
+        用户登录业务逻辑，每次登录为当前设备创建一个会话并替换该设备上之前的会话，不影响其他设备上的登录状态
         
         Args:
             username: 用户名（可选）
             password: 密码
             phone: 手机号（可选）
+            device: 设备信息（可选）
             
         Returns:
             tuple: (是否成功, 消息, 用户信息)
@@ -144,13 +148,17 @@ class UserService:
             UserService.logger.debug(f"token生成结果: token={token}, expiration={token_expiration_time}")
             
             if token:
-                # 更新token到数据库
-                UserService.logger.debug(f"更新token到数据库，user_id: {user_id}, token: {token}, expiration: {token_expiration_time}")
-                update_result = self.user_dao.update_token(user_id, token, token_expiration_time)
-                UserService.logger.debug(f"token更新结果: {update_result}")
-                if update_result:
-                    UserService.logger.debug(f"用户token更新成功 - user_id: {user_id}")
-                    UserService.logger.info(f"用户token更新成功 - user_id: {user_id}")
+                # 同一设备重新登录时之前的会话失效；旧版本登录保存在用户表中的token一并清除
+                self.session_dao.delete_device_sessions(user_id, device)
+                if user[4] is not None:
+                    self.user_dao.clear_legacy_token(user_id, str(user[4]))
+                # 为当前设备创建会话
+                UserService.logger.debug(f"创建会话，user_id: {user_id}, device: {device}, expiration: {token_expiration_time}")
+                create_result = self.session_dao.create_session(user_id, token, token_expiration_time, device)
+                UserService.logger.debug(f"会话创建结果: {create_result}")
+                if create_result:
+                    UserService.logger.debug(f"用户会话创建成功 - user_id: {user_id}")
+                    UserService.logger.info(f"用户会话创建成功 - user_id: {user_id}")
                     # 返回用户信息时包含token
                     user_with_token = list(user) + [token, token_expiration_time]
                     UserService.logger.debug(f"返回的用户信息 - user_with_token长度: {len(user_with_token)}")
@@ -160,9 +168,9 @@ class UserService:
                         UserService.logger.debug(f"user_with_token[{i}]: {item}, 类型: {type(item)}")
                     return True, "login success", user_with_token
                 else:
-                    UserService.logger.debug(f"用户token更新失败 - user_id: {user_id}")
-                    UserService.logger.error(f"用户token更新失败 - user_id: {user_id}")
-                    return False, "登录失败: token更新失败", None
+                    UserService.logger.debug(f"用户会话创建失败 - user_id: {user_id}")
+                    UserService.logger.error(f"用户会话创建失败 - user_id: {user_id}")
+                    return False, "登录失败: 会话创建失败", None
             else:
                 UserService.logger.debug(f"用户token生成失败 - user_id: {user_id}")
                 UserService.logger.error(f"用户token生成失败 - user_id: {user_id}")
@@ -172,6 +180,82 @@ class UserService:
             UserService.logger.warning(f"登录失败: 用户名/手机号或密码错误 - 用户名: {username}，手机号: {phone}")
             return False, "用户名/手机号或密码错误", None
     
+    def logout(self, user_id, token):
+        """
+        退出登录业务逻辑，删除token对应的会话，其他设备上的登录状态不受影响
+        
+        Args:
+            user_id: 用户ID
+            token: 登录时返回的token
+            
+        Returns:
+            tuple: (是否成功, 消息)
+        """
+        UserService.logger.info(f"退出登录请求 - 用户ID: {user_id}")
+        
+        if not token:
+            UserService.logger.warning("退出登录失败: token不能为空")
+            return False, "token不能为空"
+        
+        # 访问token不对应会话，需要提供登录时返回的token才能删除会话
+        if AccessToken.is_access_token(token):
+            UserService.logger.warning(f"退出登录失败: 未提供登录时返回的token - 用户ID: {user_id}")
+            return False, "签名token模式下退出登录需要提供登录时返回的token"
+        
+        if self.session_dao.delete_session(user_id, token):
+            UserService.logger.info(f"退出登录成功 - 用户ID: {user_id}")
+            return True, "退出登录成功"
+        
+        # 旧版本登录的token保存在用户表中
+        user = self.user_dao.get_user_by_id(user_id)
+        if user and user[4] is not None and str(user[4]) == token:
+            if self.user_dao.clear_legacy_token(user_id, token):
+                UserService.logger.info(f"退出登录成功 - 用户ID: {user_id}")
+                return True, "退出登录成功"
+            UserService.logger.error(f"退出登录失败: 无法清除token - 用户ID: {user_id}")
+            return False, "退出登录失败"
+        
+        UserService.logger.warning(f"退出登录失败: 会话不存在 - 用户ID: {user_id}")
+        return False, "会话不存在或已退出登录"
+    
+    def change_password(self, user_id, old_password, new_password):
+        """
+        修改密码业务逻辑，修改成功后所有设备上的会话和访问token都失效，需要重新登录
+        
+        Args:
+            user_id: 用户ID
+            old_password: 原密码
+            new_password: 新密码
+            
+        Returns:
+            tuple: (是否成功, 消息)
+        """
+        UserService.logger.info(f"修改密码请求 - 用户ID: {user_id}")
+        
+        # 参数验证
+        if not old_password:
+            UserService.logger.warning("修改密码失败: 原密码不能为空")
+            return False, "原密码不能为空"
+        
+        if not new_password:
+            UserService.logger.warning("修改密码失败: 新密码不能为空")
+            return False, "新密码不能为空"
+        
+        user = self.user_dao.get_user_by_id(user_id)
+        if not user:
+            UserService.logger.warning(f"修改密码失败: 用户不存在 - 用户ID: {user_id}")
+            return False, "用户不存在"
+        
+        if MD5Utils.encrypt(old_password) != user[2]:
+            UserService.logger.warning(f"修改密码失败: 原密码错误 - 用户ID: {user_id}")
+            return False, "原密码错误"
+        
+        if self.user_dao.update_password(user_id, MD5Utils.encrypt(new_password)):
+            UserService.logger.info(f"修改密码成功 - 用户ID: {user_id}")
+            return True, "密码修改成功，请重新登录"
+        UserService.logger.error(f"修改密码失败: 无法更新密码 - 用户ID: {user_id}")
+        return False, "密码修改失败"
+    
     def get_user_by_id(self, user_id):
         """
         根据用户ID查询用户信息
@@ -196,6 +280,73 @@ class UserService:
             UserService.logger.error(f"查询用户时发生错误: {e}")
             return None
     
+    def get_session(self, user_id, token):
+        """
+        根据token查询用户在当前设备上的会话
+        
+        Args:
+            user_id: 用户ID
+            token: 请求中的token
+            
+        Returns:
+            tuple: (会话ID, 用户ID, 过期时间戳, 设备信息)，会话不存在返回None
+        """
+        return self.session_dao.get_session(user_id, token)
+    
+    def issue_access_token(self, user_id, token):
+        """
+        签发签名访问token（仅在启用签名token模式时）
+        
+        Args:
+            user_id: 用户ID
+            token: 登录时返回的token，访问token记录其会话标识
+            
+        Returns:
+            tuple: (访问token, 过期时间戳)，未启用签名token模式时返回(None, None)
+        """
+        return AccessToken.issue(user_id, SessionDAO.session_id(token))
+    
+    def refresh_access_token(self, user_id, refresh_token):
+        """
+        使用数据库中保存的token续签访问token
+        
+        Args:
+            user_id: 用户ID
+            refresh_token: 登录时返回的token
+            
+        Returns:
+            tuple: (是否成功, 消息, 访问token信息)
+        """
+        UserService.logger.info(f"续签访问token请求 - 用户ID: {user_id}")
+        
+        if not AccessToken.enabled():
+            UserService.logger.warning("续签访问token失败: 未启用签名token模式")
+            return False, "未启用签名token模式", None
+        
+        if not refresh_token:
+            UserService.logger.warning("续签访问token失败: token不能为空")
+            return False, "token不能为空", None
+        
+        # 续签时校验数据库中的会话，注销账号后无法续签；旧版本登录的token回退到用户表中校验
+        session = self.session_dao.get_session(user_id, refresh_token)
+        if session:
+            stored_token, token_expiration_time = refresh_token, session[2]
+        else:
+            user = self.user_dao.get_user_by_id(user_id)
+            if not user:
+                UserService.logger.warning(f"续签访问token失败: 用户不存在 - 用户ID: {user_id}")
+                return False, "用户不存在", None
+            stored_token = str(user[4]) if user[4] is not None else None
+            token_expiration_time = user[5]
+        
+        if not TokenUtils.validate_token(refresh_token, stored_token, token_expiration_time):
+            UserService.logger.warning(f"续签访问token失败: token无效或已过期 - 用户ID: {user_id}")
+            return False, "无效或已过期的token", None
+        
+        access_token, expiration_time = AccessToken.issue(user_id, SessionDAO.session_id(refresh_token))
+        UserService.logger.info(f"续签访问token成功 - 用户ID: {user_id}")
+        return True, "续签成功", {"access_token": access_token, "access_token_expiration_time": expiration_time}
+    
     def delete_account(self, user_id):
         """
         注销账号业务逻辑
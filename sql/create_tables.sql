@@ -44,7 +44,7 @@ CREATE TABLE IF NOT EXISTS `expend` (
 	`expend_time` TIMESTAMP COMMENT '支出时间',
 	`create_time` TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP COMMENT '创建时间',
 	`enable` BOOLEAN NOT NULL DEFAULT true COMMENT '是否可用',
-	`consumption_id` BIGINT COMMENT '消费类型id',
+	`expend_type_id` BIGINT COMMENT '消费类型id',
 	PRIMARY KEY(`id`)
 ) COMMENT='支出表';
 
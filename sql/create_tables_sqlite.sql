@@ -0,0 +1,122 @@
+-- SQLite表结构，与create_tables.sql执行完sql/migrations中全部迁移后的MySQL表结构一致，
+-- 供driver = sqlite的环境在创建连接池时自动加载（已存在的表保持不变）。
+-- 时间字段声明为TIMESTAMP/DATE、金额字段声明为DECIMAL，读取时转换为与pymysql一致的Python类型；
+-- 默认时间使用本地时间，与MySQL的CURRENT_TIMESTAMP一致
+CREATE TABLE IF NOT EXISTS `user` (
+	`id` INTEGER PRIMARY KEY AUTOINCREMENT,
+	`username` VARCHAR(255),
+	`password` VARCHAR(255),
+	`phone` VARCHAR(255) UNIQUE,
+	`refresh_token` VARCHAR(255),
+	`token_expiration_time` BIGINT,
+	`registration` BIGINT NOT NULL DEFAULT 0,
+	`enable` BOOLEAN NOT NULL DEFAULT 0,
+	`last_login_time` TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS `idx_user_username` ON `user` (`username`);
+
+CREATE TABLE IF NOT EXISTS `account` (
+	`id` INTEGER PRIMARY KEY AUTOINCREMENT,
+	`name` VARCHAR(255),
+	`balance` DECIMAL(19,2),
+	`user_id` BIGINT
+);
+CREATE INDEX IF NOT EXISTS `idx_account_user` ON `account` (`user_id`);
+
+CREATE TABLE IF NOT EXISTS `income` (
+	`id` INTEGER PRIMARY KEY AUTOINCREMENT,
+	`money` BIGINT NOT NULL DEFAULT 0,
+	`account_id` BIGINT NOT NULL DEFAULT 0,
+	`user_id` BIGINT NOT NULL DEFAULT 0,
+	`remark` VARCHAR(255),
+	`income_time` TIMESTAMP,
+	`create_time` TIMESTAMP NOT NULL DEFAULT (DATETIME('now', 'localtime')),
+	`enable` BOOLEAN NOT NULL DEFAULT 1,
+	`income_type_id` BIGINT
+);
+CREATE INDEX IF NOT EXISTS `idx_income_user_time` ON `income` (`user_id`, `income_time`);
+CREATE INDEX IF NOT EXISTS `idx_income_user_account_time` ON `income` (`user_id`, `account_id`, `income_time`);
+CREATE INDEX IF NOT EXISTS `idx_income_user_type_time` ON `income` (`user_id`, `income_type_id`, `income_time`);
+
+CREATE TABLE IF NOT EXISTS `expend` (
+	`id` INTEGER PRIMARY KEY AUTOINCREMENT,
+	`money` BIGINT NOT NULL DEFAULT 0,
+	`account_id` BIGINT NOT NULL DEFAULT 0,
+	`user_id` BIGINT NOT NULL DEFAULT 0,
+	`remark` VARCHAR(255),
+	`expend_time` TIMESTAMP,
+	`create_time` TIMESTAMP NOT NULL DEFAULT (DATETIME('now', 'localtime')),
+	`enable` BOOLEAN NOT NULL DEFAULT 1,
+	`expend_type_id` BIGINT
+);
+CREATE INDEX IF NOT EXISTS `idx_expend_user_time` ON `expend` (`user_id`, `expend_time`);
+CREATE INDEX IF NOT EXISTS `idx_expend_user_account_time` ON `expend` (`user_id`, `account_id`, `expend_time`);
+CREATE INDEX IF NOT EXISTS `idx_expend_user_type_time` ON `expend` (`user_id`, `expend_type_id`, `expend_time`);
+
+CREATE TABLE IF NOT EXISTS `expend_type` (
+	`id` INTEGER PRIMARY KEY AUTOINCREMENT,
+	`expend_type_name` VARCHAR(255),
+	`enable` BOOLEAN NOT NULL,
+	`create_time` TIMESTAMP NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS `income_type` (
+	`id` INTEGER PRIMARY KEY AUTOINCREMENT,
+	`income_type_name` VARCHAR(255),
+	`create_time` TIMESTAMP NOT NULL,
+	`enable` BOOLEAN NOT NULL DEFAULT 1
+);
+
+CREATE TABLE IF NOT EXISTS `config_version` (
+	`id` INTEGER PRIMARY KEY AUTOINCREMENT,
+	`expend_type_version` BIGINT NOT NULL,
+	`income_type_version` BIGINT NOT NULL,
+	`account_version` BIGINT NOT NULL
+);
+INSERT OR IGNORE INTO config_version (id, expend_type_version, income_type_version, account_version)
+VALUES (1, 0, 0, 0);
+
+CREATE TABLE IF NOT EXISTS `expend_daily` (
+	`user_id` BIGINT NOT NULL,
+	`day` DATE NOT NULL,
+	`account_id` BIGINT NOT NULL,
+	`expend_type_id` BIGINT NOT NULL DEFAULT 0,
+	`record_count` INT NOT NULL DEFAULT 0,
+	`total_money` BIGINT NOT NULL DEFAULT 0,
+	PRIMARY KEY(`user_id`, `day`, `account_id`, `expend_type_id`)
+);
+
+CREATE TABLE IF NOT EXISTS `income_daily` (
+	`user_id` BIGINT NOT NULL,
+	`day` DATE NOT NULL,
+	`account_id` BIGINT NOT NULL,
+	`income_type_id` BIGINT NOT NULL DEFAULT 0,
+	`record_count` INT NOT NULL DEFAULT 0,
+	`total_money` BIGINT NOT NULL DEFAULT 0,
+	PRIMARY KEY(`user_id`, `day`, `account_id`, `income_type_id`)
+);
+
+CREATE TABLE IF NOT EXISTS `user_session` (
+	`id` INTEGER PRIMARY KEY AUTOINCREMENT,
+	`user_id` BIGINT NOT NULL,
+	`token_hash` CHAR(64) NOT NULL,
+	`device` VARCHAR(255),
+	`expiration_time` BIGINT NOT NULL,
+	`create_time` TIMESTAMP NOT NULL DEFAULT (DATETIME('now', 'localtime')),
+	`last_seen_time` TIMESTAMP NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS `uk_session_token_hash` ON `user_session` (`token_hash`);
+CREATE INDEX IF NOT EXISTS `idx_session_user` ON `user_session` (`user_id`);
+CREATE INDEX IF NOT EXISTS `idx_session_expiration` ON `user_session` (`expiration_time`);
+
+CREATE TABLE IF NOT EXISTS `token_revocation` (
+	`user_id` BIGINT NOT NULL PRIMARY KEY,
+	`revoked_at` BIGINT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS `idx_revocation_time` ON `token_revocation` (`revoked_at`);
+
+CREATE TABLE IF NOT EXISTS `session_revocation` (
+	`session_id` CHAR(16) NOT NULL PRIMARY KEY,
+	`revoked_at` BIGINT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS `idx_session_revocation_time` ON `session_revocation` (`revoked_at`);
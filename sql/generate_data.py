@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+压测数据生成脚本
+按给定规模生成用户、账户、支出和收入记录，用于在接近生产规模的表上评估索引、分页和汇总查询的改动。
+相同的随机种子和参数生成相同的数据；生成的用户密码均为password123。
+使用配置文件中当前环境的数据库，APP_ENV=sqlite时写入本地SQLite文件（路径可用SQLITE_DATABASE覆盖）
+
+用法:
+    python sql/generate_data.py --users 1000 --expends 100000 --incomes 20000
+    python sql/generate_data.py --users 100000 --accounts-per-user 5 --expends 10000000 --incomes 10000000
+    APP_ENV=sqlite SQLITE_DATABASE=data/bench.sqlite3 python sql/generate_data.py --users 10000 --expends 1000000
+"""
+
+import argparse
+import os
+import sys
+from datetime import date
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db.DatasetGenerator import DatasetGenerator
+from utils.LogUtils import LogUtils
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="生成压测数据")
+    parser.add_argument('--users', type=int, default=1000, help="用户数")
+    parser.add_argument('--accounts-per-user', type=int, default=5, help="每个用户的账户数")
+    parser.add_argument('--expends', type=int, default=100000, help="支出记录数")
+    parser.add_argument('--incomes', type=int, default=20000, help="收入记录数")
+    parser.add_argument('--seed', type=int, default=42, help="随机种子")
+    parser.add_argument('--batch-size', type=int, default=1000, help="每条INSERT语句写入的行数")
+    parser.add_argument('--skew', type=float, default=1.0, help="用户活跃度的偏斜程度（对数正态分布sigma），0表示均匀分布")
+    parser.add_argument('--start-date', type=date.fromisoformat, default=date(2024, 1, 1), help="记录时间的起始日期，如2024-01-01")
+    parser.add_argument('--days', type=int, default=365, help="记录时间跨越的天数")
+    parser.add_argument('--skip-rollups', action='store_true', help="写入完成后不重建日汇总表")
+    args = parser.parse_args(argv)
+
+    if args.users <= 0 or args.accounts_per_user <= 0 or args.batch_size <= 0 or args.days <= 0:
+        parser.error("--users、--accounts-per-user、--batch-size和--days必须大于0")
+    if args.expends < 0 or args.incomes < 0 or args.skew < 0:
+        parser.error("--expends、--incomes和--skew不能小于0")
+
+    logger = LogUtils.get_instance('DataGenerate')
+
+    try:
+        generator = DatasetGenerator(seed=args.seed, batch_size=args.batch_size, skew=args.skew,
+                                     start_date=args.start_date, days=args.days)
+        counts = generator.generate(args.users, args.accounts_per_user, args.expends, args.incomes,
+                                    rebuild_rollups=not args.skip_rollups)
+        logger.info(f"压测数据生成成功: {counts}")
+        return 0
+    except Exception as e:
+        logger.error(f"压测数据生成脚本执行异常: {e}")
+        import traceback
+        traceback.print_exc()
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,7 +1,7 @@
 #!/usr/bin/env python3
 """
 数据库初始化脚本
-用于执行SQL建表语句，初始化数据库表结构
+用于执行SQL建表语句，初始化数据库表结构，建表完成后执行sql/migrations中的迁移脚本
 """
 
 import os
@@ -11,6 +11,7 @@ import sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from db.Database import Database
+from db.MigrationRunner import MigrationRunner
 from utils.LogUtils import LogUtils
 
 def main():
@@ -21,6 +22,9 @@ def main():
     try:
         # 创建数据库连接
         db = Database()
+        if Database.driver == 'sqlite':
+            logger.info("SQLite后端在创建连接池时已加载sql/create_tables_sqlite.sql中的表结构，无需执行建表和迁移脚本")
+            return 0
         
         # 读取SQL文件
         sql_file_path = os.path.join(os.path.dirname(__file__), 'create_tables.sql')
@@ -75,9 +79,15 @@ def main():
         if failed_count > 0:
             logger.error("数据库初始化过程中存在失败的SQL语句")
             return 1
-        else:
-            logger.info("数据库初始化全部成功")
-            return 0
+        
+        # 执行数据库迁移，使表结构升级到最新版本
+        success, executed = MigrationRunner().migrate()
+        if not success:
+            logger.error("数据库初始化过程中执行迁移失败")
+            return 1
+        
+        logger.info(f"数据库初始化全部成功，执行迁移 {len(executed)} 个")
+        return 0
             
     except Exception as e:
         logger.error(f"数据库初始化脚本执行异常: {e}")
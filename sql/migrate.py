@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+数据库迁移脚本
+按版本号顺序执行sql/migrations目录下尚未执行的迁移脚本
+
+用法:
+    python sql/migrate.py              # 执行所有未执行的迁移
+    python sql/migrate.py --target 2   # 执行到指定版本（包含）
+    python sql/migrate.py --status     # 查看迁移执行状态
+"""
+
+import argparse
+import os
+import sys
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db.Database import Database
+from db.MigrationRunner import MigrationRunner
+from utils.LogUtils import LogUtils
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="执行数据库迁移")
+    parser.add_argument('--target', type=int, default=None, help="执行到指定版本（包含）")
+    parser.add_argument('--status', action='store_true', help="只查看迁移执行状态")
+    args = parser.parse_args(argv)
+
+    logger = LogUtils.get_instance('DatabaseMigrate')
+
+    try:
+        runner = MigrationRunner()
+        if Database.driver == 'sqlite':
+            logger.info("SQLite后端在创建连接池时加载sql/create_tables_sqlite.sql中的最新表结构，无需执行迁移")
+            return 0
+
+        if args.status:
+            for migration in runner.status():
+                state = "已执行" if migration['applied'] else "未执行"
+                if migration['modified']:
+                    state += "（执行后文件已修改）"
+                logger.info(f"V{migration['version']:03d} {migration['name']}: {state}")
+            return 0
+
+        success, executed = runner.migrate(args.target)
+        if success:
+            logger.info(f"数据库迁移成功，本次执行 {len(executed)} 个版本")
+            return 0
+        logger.error("数据库迁移失败")
+        return 1
+    except Exception as e:
+        logger.error(f"数据库迁移脚本执行异常: {e}")
+        import traceback
+        traceback.print_exc()
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,13 @@
+-- 修改expend表中的consumption_id字段名为expend_type_id
+-- 已执行过旧版update_database.py的数据库以及按当前create_tables.sql新建的数据库中已经是expend_type_id，
+-- 只在consumption_id字段仍存在时执行重命名，否则执行空语句
+SET @rename_expend_type_id = (
+	SELECT IF(COUNT(*) > 0,
+		'ALTER TABLE expend CHANGE consumption_id expend_type_id BIGINT COMMENT ''消费类型id''',
+		'DO 0')
+	FROM information_schema.COLUMNS
+	WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'expend' AND COLUMN_NAME = 'consumption_id'
+);
+PREPARE rename_expend_type_id FROM @rename_expend_type_id;
+EXECUTE rename_expend_type_id;
+DEALLOCATE PREPARE rename_expend_type_id;
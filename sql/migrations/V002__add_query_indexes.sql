@@ -0,0 +1,20 @@
+-- 支出列表：按用户过滤、按支出时间倒序排序；按账户/消费类型过滤时使用对应的组合索引
+-- InnoDB二级索引隐含主键，(user_id, expend_time)同时支持按(expend_time, id)排序
+ALTER TABLE expend
+	ADD INDEX `idx_expend_user_time` (`user_id`, `expend_time`),
+	ADD INDEX `idx_expend_user_account_time` (`user_id`, `account_id`, `expend_time`),
+	ADD INDEX `idx_expend_user_type_time` (`user_id`, `expend_type_id`, `expend_time`);
+
+-- 收入列表：与支出表相同的查询模式
+ALTER TABLE income
+	ADD INDEX `idx_income_user_time` (`user_id`, `income_time`),
+	ADD INDEX `idx_income_user_account_time` (`user_id`, `account_id`, `income_time`),
+	ADD INDEX `idx_income_user_type_time` (`user_id`, `income_type_id`, `income_time`);
+
+-- 账户列表：按用户查询
+ALTER TABLE account
+	ADD INDEX `idx_account_user` (`user_id`);
+
+-- 用户名登录及注册时的用户名查重（手机号已有唯一索引）
+ALTER TABLE user
+	ADD INDEX `idx_user_username` (`username`);
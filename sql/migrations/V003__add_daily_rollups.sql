@@ -0,0 +1,33 @@
+-- 支出/收入按(用户, 日期, 账户, 类型)预聚合的日汇总表，在记录写入的同一事务中增量维护，
+-- 可通过 python sql/rebuild_rollups.py 从原始记录重建。只汇总可用（enable=true）的记录，
+-- 类型为空的记录归入类型0
+CREATE TABLE IF NOT EXISTS `expend_daily` (
+	`user_id` BIGINT NOT NULL COMMENT '人员id',
+	`day` DATE NOT NULL COMMENT '支出日期',
+	`account_id` BIGINT NOT NULL COMMENT '账户id',
+	`expend_type_id` BIGINT NOT NULL DEFAULT 0 COMMENT '消费类型id',
+	`record_count` INT NOT NULL DEFAULT 0 COMMENT '支出笔数',
+	`total_money` BIGINT NOT NULL DEFAULT 0 COMMENT '支出金额合计',
+	PRIMARY KEY(`user_id`, `day`, `account_id`, `expend_type_id`)
+) COMMENT='支出日汇总表';
+
+CREATE TABLE IF NOT EXISTS `income_daily` (
+	`user_id` BIGINT NOT NULL COMMENT '人员id',
+	`day` DATE NOT NULL COMMENT '收入日期',
+	`account_id` BIGINT NOT NULL COMMENT '账户id',
+	`income_type_id` BIGINT NOT NULL DEFAULT 0 COMMENT '收入类型id',
+	`record_count` INT NOT NULL DEFAULT 0 COMMENT '收入笔数',
+	`total_money` BIGINT NOT NULL DEFAULT 0 COMMENT '收入金额合计',
+	PRIMARY KEY(`user_id`, `day`, `account_id`, `income_type_id`)
+) COMMENT='收入日汇总表';
+
+-- 初始化已有记录的日汇总
+INSERT INTO expend_daily (user_id, day, account_id, expend_type_id, record_count, total_money)
+	SELECT user_id, DATE(expend_time), account_id, COALESCE(expend_type_id, 0), COUNT(*), SUM(money)
+	FROM expend WHERE enable = TRUE AND expend_time IS NOT NULL
+	GROUP BY user_id, DATE(expend_time), account_id, COALESCE(expend_type_id, 0);
+
+INSERT INTO income_daily (user_id, day, account_id, income_type_id, record_count, total_money)
+	SELECT user_id, DATE(income_time), account_id, COALESCE(income_type_id, 0), COUNT(*), SUM(money)
+	FROM income WHERE enable = TRUE AND income_time IS NOT NULL
+	GROUP BY user_id, DATE(income_time), account_id, COALESCE(income_type_id, 0);
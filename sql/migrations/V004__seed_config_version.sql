@@ -0,0 +1,4 @@
+-- 配置版本号固定保存在id=1的一行中，类型表修改时递增对应版本号，
+-- 各进程的类型缓存据此判断是否需要重新加载
+INSERT IGNORE INTO config_version (id, expend_type_version, income_type_version, account_version)
+VALUES (1, 0, 0, 0);
@@ -0,0 +1,15 @@
+-- 每个设备登录时创建一条会话，按token的SHA-256摘要唯一索引查找，不再保存token原文；
+-- 过期会话由后台清理线程按expiration_time索引分批删除
+CREATE TABLE IF NOT EXISTS `user_session` (
+	`id` BIGINT NOT NULL AUTO_INCREMENT,
+	`user_id` BIGINT NOT NULL COMMENT '用户id',
+	`token_hash` CHAR(64) NOT NULL COMMENT 'token的SHA-256摘要',
+	`device` VARCHAR(255) COMMENT '设备信息',
+	`expiration_time` BIGINT NOT NULL COMMENT 'token过期时间',
+	`create_time` TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP COMMENT '登录时间',
+	`last_seen_time` TIMESTAMP NULL COMMENT '最后使用时间',
+	PRIMARY KEY(`id`),
+	UNIQUE KEY `uk_session_token_hash` (`token_hash`),
+	KEY `idx_session_user` (`user_id`),
+	KEY `idx_session_expiration` (`expiration_time`)
+) COMMENT='用户会话表';
@@ -0,0 +1,8 @@
+-- 签名访问token的撤销记录，每个用户一行，保存最近一次撤销的时间；
+-- 各进程定期按revoked_at索引读取访问token有效期内的撤销记录，撤销对所有工作进程和服务节点生效
+CREATE TABLE IF NOT EXISTS `token_revocation` (
+	`user_id` BIGINT NOT NULL COMMENT '用户id',
+	`revoked_at` BIGINT NOT NULL COMMENT '撤销时间，签发时间早于该时间的访问token无效',
+	PRIMARY KEY(`user_id`),
+	KEY `idx_revocation_time` (`revoked_at`)
+) COMMENT='访问token撤销表';
@@ -0,0 +1,8 @@
+-- 按会话撤销的签名访问token，每个会话一行：退出登录或同一设备重新登录时只撤销该会话签发的访问token，
+-- 用户在其他设备上的访问token不受影响；各进程与token_revocation一起定期读取有效期内的记录
+CREATE TABLE IF NOT EXISTS `session_revocation` (
+	`session_id` CHAR(16) NOT NULL COMMENT '会话标识，登录token的SHA-256摘要的前16位',
+	`revoked_at` BIGINT NOT NULL COMMENT '撤销时间',
+	PRIMARY KEY(`session_id`),
+	KEY `idx_session_revocation_time` (`revoked_at`)
+) COMMENT='会话访问token撤销表';
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+日汇总重建脚本
+从expend/income原始记录重新计算expend_daily/income_daily日汇总表，
+用于修复汇总数据或在批量导入记录后同步汇总
+
+用法:
+    python sql/rebuild_rollups.py                # 重建所有用户的日汇总
+    python sql/rebuild_rollups.py --user-id 1    # 只重建指定用户的日汇总
+"""
+
+import argparse
+import os
+import sys
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dao.RollupDAO import RollupDAO
+from utils.LogUtils import LogUtils
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="从原始记录重建日汇总表")
+    parser.add_argument('--user-id', type=int, default=None, help="只重建指定用户的日汇总")
+    args = parser.parse_args(argv)
+
+    logger = LogUtils.get_instance('RollupRebuild')
+
+    try:
+        if RollupDAO().rebuild(args.user_id):
+            logger.info("日汇总重建成功")
+            return 0
+        logger.error("日汇总重建失败")
+        return 1
+    except Exception as e:
+        logger.error(f"日汇总重建脚本执行异常: {e}")
+        import traceback
+        traceback.print_exc()
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,101 @@
+import pytest
+import json
+from app import app
+from unittest.mock import patch
+import sys
+import os
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from db.Database import Database
+from db.QueryStats import QueryStats
+from utils.AdminToken import AdminToken
+
+
+@pytest.fixture
+def client():
+    app.config['TESTING'] = True
+    with app.test_client() as client:
+        yield client
+
+
+@pytest.fixture
+def admin_headers():
+    """启用运维接口，测试结束后恢复为未加载配置的状态"""
+    AdminToken.configure('test_admin_token')
+    yield {'X-Admin-Token': 'test_admin_token'}
+    AdminToken._token = None
+
+
+@pytest.fixture
+def query_stats():
+    """替换为只包含测试数据的SQL执行统计"""
+    stats = QueryStats(slow_threshold=0.1)
+    with patch.object(Database, 'query_stats', stats):
+        yield stats
+
+
+def test_get_slow_queries(client, query_stats, admin_headers):
+    """
+    测试按指定字段排序返回SQL执行统计
+    """
+    query_stats.record("SELECT * FROM expend WHERE user_id = %s", 0.01)
+    query_stats.record("SELECT * FROM expend WHERE user_id = %s", 0.02)
+    query_stats.record("SELECT * FROM user WHERE phone = %s", 0.03)
+
+    response = client.get('/admin/slow-queries?order_by=count&limit=1', headers=admin_headers)
+
+    assert response.status_code == 200
+    data = json.loads(response.data)['data']
+    assert data['slow_threshold_ms'] == 100
+    assert len(data['queries']) == 1
+    assert data['queries'][0]['fingerprint'] == "select * from expend where user_id = ?"
+    assert data['queries'][0]['count'] == 2
+
+
+def test_get_slow_queries_invalid_params(client, query_stats, admin_headers):
+    """
+    测试排序字段或数量参数无效
+    """
+    assert client.get('/admin/slow-queries?order_by=name', headers=admin_headers).status_code == 400
+    assert client.get('/admin/slow-queries?limit=abc', headers=admin_headers).status_code == 400
+    assert client.get('/admin/slow-queries?limit=-1', headers=admin_headers).status_code == 400
+
+
+def test_reset_slow_queries(client, query_stats, admin_headers):
+    """
+    测试清除SQL执行统计
+    """
+    query_stats.record("SELECT 1", 0.01)
+
+    response = client.delete('/admin/slow-queries', headers=admin_headers)
+
+    assert response.status_code == 200
+    assert query_stats.snapshot() == []
+
+
+def test_slow_queries_disabled_without_admin_token(client, query_stats):
+    """
+    测试未配置运维令牌时查看和清除接口都不启用
+    """
+    query_stats.record("SELECT 1", 0.01)
+    AdminToken.configure('')
+    try:
+        assert client.get('/admin/slow-queries').status_code == 404
+        assert client.delete('/admin/slow-queries', headers={'X-Admin-Token': ''}).status_code == 404
+    finally:
+        AdminToken._token = None
+    assert len(query_stats.snapshot()) == 1
+
+
+def test_slow_queries_require_admin_token(client, query_stats, admin_headers):
+    """
+    测试请求未携带或携带错误的运维令牌时返回401，统计不被清除
+    """
+    query_stats.record("SELECT 1", 0.01)
+
+    assert client.get('/admin/slow-queries').status_code == 401
+    assert client.get('/admin/slow-queries', headers={'X-Admin-Token': 'wrong'}).status_code == 401
+    assert client.delete('/admin/slow-queries', headers={'X-Admin-Token': 'wrong'}).status_code == 401
+    assert len(query_stats.snapshot()) == 1
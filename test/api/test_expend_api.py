@@ -1,5 +1,6 @@
 import pytest
 import json
+from datetime import datetime
 from app import app
 from unittest.mock import patch
 import sys
@@ -222,3 +223,74 @@ def test_delete_expend_account_not_found(mock_delete_expend, mock_validate_token
     assert data['errorcode'] == 400
     assert data['message'] == f"删除支出记录失败: {specific_error_msg}"
     assert data['data'] is None
+
+
+@patch('services.UserService.UserService.get_user_by_id')
+@patch('utils.TokenUtils.TokenUtils.validate_token')
+@patch('services.ExpendService.ExpendService.get_expends_by_user_id')
+def test_get_expends_with_filters_and_cursor(mock_get_expends, mock_validate_token, mock_get_user, client, mock_token_header, test_expend_data):
+    """
+    测试按账户、类型、时间范围、金额范围和可用状态过滤并按游标分页获取支出列表
+    """
+    # 设置mock返回值
+    mock_validate_token.return_value = True
+    mock_get_user.return_value = (1, "testuser", "password", "13800138000", "enable", 1620000000000, "token", "token_expire")
+    mock_get_expends.return_value = (True, "查询支出记录列表成功", {"list": [test_expend_data], "next_cursor": "next-page"})
+    
+    # 发送获取支出列表请求
+    response = client.get('/api/expend?limit=1&cursor=prev-page&account_id=3&expend_type_id=4&start_time=2023-01-01'
+                          '&end_time=2023-01-31 23:59:59&min_money=50&max_money=500&enable=false', headers=mock_token_header)
+    
+    # 验证响应
+    assert response.status_code == 200
+    data = json.loads(response.data)
+    assert data['errorcode'] == 200
+    assert data['message'] == '查询支出记录列表成功'
+    assert [expend['id'] for expend in data['data']['list']] == [test_expend_data['id']]
+    assert data['data']['next_cursor'] == "next-page"
+    mock_get_expends.assert_called_once_with(
+        1, 1, "prev-page", 3, 4, datetime(2023, 1, 1), datetime(2023, 1, 31, 23, 59, 59), 50.0, 500.0, False
+    )
+
+
+@patch('services.UserService.UserService.get_user_by_id')
+@patch('utils.TokenUtils.TokenUtils.validate_token')
+@patch('services.ExpendService.ExpendService.get_expends_by_user_id')
+def test_get_expends_without_pagination(mock_get_expends, mock_validate_token, mock_get_user, client, mock_token_header, test_expend_data):
+    """
+    测试不提供limit和cursor时不分页，data为记录列表
+    """
+    # 设置mock返回值
+    mock_validate_token.return_value = True
+    mock_get_user.return_value = (1, "testuser", "password", "13800138000", "enable", 1620000000000, "token", "token_expire")
+    mock_get_expends.return_value = (True, "查询支出记录列表成功", [test_expend_data])
+    
+    # 发送获取支出列表请求
+    response = client.get('/api/expend', headers=mock_token_header)
+    
+    # 验证响应
+    assert response.status_code == 200
+    data = json.loads(response.data)
+    assert [expend['id'] for expend in data['data']] == [test_expend_data['id']]
+    mock_get_expends.assert_called_once_with(1, None, None, None, None, None, None, None, None, None)
+
+
+@patch('services.UserService.UserService.get_user_by_id')
+@patch('utils.TokenUtils.TokenUtils.validate_token')
+@patch('services.ExpendService.ExpendService.get_expends_by_user_id')
+def test_get_expends_invalid_filter(mock_get_expends, mock_validate_token, mock_get_user, client, mock_token_header):
+    """
+    测试支出列表过滤参数格式错误
+    """
+    # 设置mock返回值
+    mock_validate_token.return_value = True
+    mock_get_user.return_value = (1, "testuser", "password", "13800138000", "enable", 1620000000000, "token", "token_expire")
+    
+    # 发送账户ID格式错误的请求
+    response = client.get('/api/expend?account_id=abc', headers=mock_token_header)
+    
+    # 验证响应
+    assert response.status_code == 400
+    data = json.loads(response.data)
+    assert data['errorcode'] == 400
+    mock_get_expends.assert_not_called()
@@ -24,7 +24,9 @@ def mock_user_service():
     """
     创建模拟的UserService
     """
-    with patch('api.expendtype.user_service') as mock_service:
+    with patch('utils.AuthUtils.user_service') as mock_service:
+        # 没有会话记录，回退到用户表中的token校验
+        mock_service.get_session.return_value = None
         yield mock_service
 
 
@@ -33,7 +35,7 @@ def mock_token_validation():
     """
     创建模拟的token验证
     """
-    with patch('api.expendtype.TokenUtils.validate_token') as mock_validate:
+    with patch('utils.AuthUtils.TokenUtils.validate_token') as mock_validate:
         mock_validate.return_value = True
         yield mock_validate
 
@@ -174,7 +176,7 @@ def test_addexpendtype_invalid_token(
     assert response.status_code == 401
     data = json.loads(response.data)
     assert data['errorcode'] == 401
-    assert "验证失败" in data['message']
+    assert data['message'] == "无效或已过期的token"
     
     # 验证Service未被调用
     mock_expend_type_service.create_expend_type.assert_not_called()
@@ -1,5 +1,6 @@
 import pytest
 import json
+from datetime import datetime
 from app import app
 from unittest.mock import patch
 
@@ -130,7 +131,7 @@ def test_get_all_incomes(mock_get_incomes, mock_validate_token, mock_get_user, c
     # 设置mock返回值
     mock_validate_token.return_value = True
     mock_get_user.return_value = (1, "testuser", "password", "13800138000", "enable", 1620000000000, "token", "token_expire")
-    mock_get_incomes.return_value = (True, "查询收入记录列表成功", [
+    mock_get_incomes.return_value = (True, "查询收入记录列表成功", {"list": [
         {
             "id": 1,
             "money": 100,
@@ -153,16 +154,40 @@ def test_get_all_incomes(mock_get_incomes, mock_validate_token, mock_get_user, c
             "enable": True,
             "income_type_id": 2
         }
-    ])
+    ], "next_cursor": "next-page"})
     
-    # 发送获取所有收入请求
-    response = client.get('/api/income', headers=mock_token_header)
+    # 发送获取收入列表请求
+    response = client.get('/api/income?limit=2&cursor=prev-page&account_id=3&start_time=2023-01-01&min_money=50&enable=true', headers=mock_token_header)
     
     # 验证响应
     assert response.status_code == 200
     data = json.loads(response.data)
     assert data['errorcode'] == 200
     assert data['message'] == '查询收入记录列表成功'
-    assert len(data['data']) == 2
-    assert data['data'][0]['id'] == 1
-    assert data['data'][1]['id'] == 2
+    assert len(data['data']['list']) == 2
+    assert data['data']['list'][0]['id'] == 1
+    assert data['data']['list'][1]['id'] == 2
+    assert data['data']['next_cursor'] == "next-page"
+    mock_get_incomes.assert_called_once_with(
+        1, 2, "prev-page", 3, None, datetime(2023, 1, 1), None, 50.0, None, True
+    )
+
+
+@patch('services.UserService.UserService.get_user_by_id')
+@patch('utils.TokenUtils.TokenUtils.validate_token')
+@patch('services.IncomeService.IncomeService.get_incomes_by_user_id')
+def test_get_incomes_invalid_filter(mock_get_incomes, mock_validate_token, mock_get_user, client, mock_token_header):
+    """测试收入列表过滤参数格式错误"""
+    # 设置mock返回值
+    mock_validate_token.return_value = True
+    mock_get_user.return_value = (1, "testuser", "password", "13800138000", "enable", 1620000000000, "token", "token_expire")
+    
+    # 发送时间格式错误的请求
+    response = client.get('/api/income?start_time=yesterday', headers=mock_token_header)
+    
+    # 验证响应
+    assert response.status_code == 400
+    data = json.loads(response.data)
+    assert data['errorcode'] == 400
+    assert "时间格式错误" in data['message']
+    mock_get_incomes.assert_not_called()
@@ -0,0 +1,166 @@
+import pytest
+from app import app
+from unittest.mock import patch
+from utils.Metrics import RequestMetrics, RequestTiming
+import sys
+import os
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from db.Database import Database
+from utils.AdminToken import AdminToken
+
+
+@pytest.fixture
+def client():
+    app.config['TESTING'] = True
+    RequestMetrics.reset()
+    with app.test_client() as client:
+        yield client
+    RequestMetrics.reset()
+
+
+@pytest.fixture
+def admin_headers():
+    """启用运维接口，测试结束后恢复为未加载配置的状态"""
+    AdminToken.configure('test_admin_token')
+    yield {'X-Admin-Token': 'test_admin_token'}
+    AdminToken._token = None
+
+
+def parse_metrics(text):
+    """解析指标文本，返回 指标名及标签 -> 取值 的字典"""
+    samples = {}
+    for line in text.splitlines():
+        if line and not line.startswith('#'):
+            name, value = line.rsplit(' ', 1)
+            samples[name] = float(value)
+    return samples
+
+
+@patch('services.UserService.UserService.register')
+def test_metrics_per_route(mock_register, client, admin_headers):
+    """
+    测试按路由统计请求数、错误数、耗时直方图和请求内数据库耗时
+    """
+    def register(*args, **kwargs):
+        # 模拟请求内执行了两条SQL语句
+        Database.record_query(0.002)
+        Database.record_query(0.003)
+        return False, "用户名不能为空", None
+
+    mock_register.side_effect = register
+
+    client.post('/register', data={'username': '', 'password': '123456', 'phone': '13800138000'})
+    client.post('/register', data={'username': '', 'password': '123456', 'phone': '13800138000'})
+    client.get('/not-found')
+
+    response = client.get('/metrics', headers=admin_headers)
+
+    assert response.status_code == 200
+    assert response.headers['Content-Type'].startswith('text/plain; version=0.0.4')
+    samples = parse_metrics(response.get_data(as_text=True))
+    assert samples['app_http_requests_total{method="POST",route="/register",status="400"}'] == 2
+    assert samples['app_http_requests_total{method="GET",route="<unmatched>",status="404"}'] == 1
+    assert samples['app_http_request_errors_total{method="POST",route="/register"}'] == 0
+    assert samples['app_http_request_duration_seconds_count{method="POST",route="/register"}'] == 2
+    assert samples['app_http_request_duration_seconds_bucket{method="POST",route="/register",le="+Inf"}'] == 2
+    assert samples['app_http_request_db_seconds_bucket{method="POST",route="/register",le="0.005"}'] == 2
+    assert samples['app_http_request_db_seconds_sum{method="POST",route="/register"}'] == pytest.approx(0.01)
+    assert samples['app_http_request_queries_total{method="POST",route="/register"}'] == 4
+    assert 'app_cache_lookups_total{cache="token",result="hit"}' in samples
+    assert 'app_cache_lookups_total{cache="expend_type",result="miss"}' in samples
+
+
+def test_metrics_require_admin_token(client):
+    """
+    测试指标接口与运维接口使用同一个访问令牌：未配置令牌时不启用，令牌错误或缺失时拒绝访问
+    """
+    AdminToken.configure('')
+    try:
+        assert client.get('/metrics').status_code == 404
+        AdminToken.configure('test_admin_token')
+        assert client.get('/metrics').status_code == 401
+        assert client.get('/metrics', headers={'X-Admin-Token': 'wrong'}).status_code == 401
+    finally:
+        AdminToken._token = None
+
+
+def test_metrics_records_final_status(client, admin_headers):
+    """
+    测试过载降级等after_request钩子修改后的状态码计入指标
+    """
+    with patch.object(Database, 'is_request_shed', return_value=True):
+        client.get('/health')
+
+    samples = parse_metrics(client.get('/metrics', headers=admin_headers).get_data(as_text=True))
+    assert samples['app_http_requests_total{method="GET",route="/health",status="503"}'] == 1
+    assert samples['app_http_request_errors_total{method="GET",route="/health"}'] == 1
+
+
+@pytest.fixture
+def request_timing():
+    """设置Server-Timing和查询预算，测试结束后恢复从配置文件加载"""
+    RequestTiming.configure(True, 5, {('post', '/register'): 1})
+    yield RequestTiming
+    RequestTiming._server_timing = None
+
+
+@patch('services.UserService.UserService.register')
+def test_server_timing_and_query_budget(mock_register, client, request_timing, admin_headers):
+    """
+    测试响应返回Server-Timing耗时分解，SQL语句数超出路由预算时记录警告和指标
+    """
+    def register(*args, **kwargs):
+        Database.record_pool_wait(0.001)
+        Database.record_query(0.002)
+        Database.record_query(0.003)
+        return False, "用户名不能为空", None
+
+    mock_register.side_effect = register
+
+    with patch('api.metrics.api_logger') as mock_logger:
+        response = client.post('/register', data={'username': '', 'password': '123456', 'phone': '13800138000'})
+
+    timing = dict(entry.split(';', 1) for entry in response.headers['Server-Timing'].split(', '))
+    assert list(timing) == ['db', 'pool', 'json', 'app', 'total']
+    assert timing['db'] == 'dur=5.00;desc="2 queries"'
+    assert timing['pool'] == 'dur=1.00'
+    mock_logger.warning_event.assert_called_once_with("SQL语句数超出预算", method='POST', route='/register', queries=2, budget=1)
+
+    # 未单独设置预算的路由使用默认预算
+    with patch('api.metrics.api_logger') as mock_logger:
+        client.get('/health')
+    mock_logger.warning_event.assert_not_called()
+
+    samples = parse_metrics(client.get('/metrics', headers=admin_headers).get_data(as_text=True))
+    assert samples['app_http_query_budget_exceeded_total{method="POST",route="/register"}'] == 1
+
+
+def test_server_timing_disabled(client):
+    """
+    测试关闭Server-Timing后响应不包含该响应头
+    """
+    RequestTiming.configure(False)
+    try:
+        response = client.get('/health')
+    finally:
+        RequestTiming._server_timing = None
+    assert 'Server-Timing' not in response.headers
+
+
+@pytest.mark.parametrize("env, expected", [('dev', True), ('test', True), ('prod', False)])
+def test_server_timing_default_by_env(tmp_path, env, expected):
+    """
+    测试Server-Timing默认关闭，只在配置了server_timing的环境中开启
+    """
+    config_file = tmp_path / 'config.ini'
+    config_file.write_text(f"[app]\nenv = {env}\n\n[instrumentation]\nserver_timing = false\n\n"
+                           "[dev]\nserver_timing = true\n\n[test]\nserver_timing = true\n\n[prod]\nhost = localhost\n",
+                           encoding='utf-8')
+    try:
+        RequestTiming._load_config(str(config_file))
+        assert RequestTiming.server_timing_enabled() is expected
+    finally:
+        RequestTiming._server_timing = None
@@ -0,0 +1,85 @@
+import pytest
+import json
+from app import app
+from unittest.mock import Mock, patch
+import sys
+import os
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from db.Database import Database
+from db.PoolMonitor import PoolMonitor
+
+
+@pytest.fixture
+def client():
+    app.config['TESTING'] = True
+    with app.test_client() as client:
+        yield client
+
+
+@pytest.fixture
+def exhausted_pool():
+    """
+    模拟连接名额已全部被占用且不允许排队的连接池
+    """
+    monitor = PoolMonitor(max_connections=1, max_waiters=0)
+    monitor.acquire()
+    with (patch.object(Database, 'pool', Mock()),
+          patch.object(Database, 'monitor', monitor),
+          patch.object(Database, 'acquire_timeout', 0.01),
+          patch.object(Database, 'retry_after', 3)):
+        yield monitor
+
+
+def test_request_shed_when_pool_exhausted(client, exhausted_pool):
+    """
+    测试连接池过载时返回503和Retry-After响应头
+    """
+    response = client.get('/api/expend', headers={'token': 'valid_token', 'userid': '1'})
+    
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '3'
+    data = json.loads(response.data)
+    assert data['errorcode'] == 503
+    assert data['data'] is None
+    
+    stats = exhausted_pool.snapshot()
+    assert stats['shed_requests'] == 1
+    assert stats['timeouts'] >= 1
+
+
+@patch('services.UserService.UserService.register')
+def test_request_not_shed_without_db_failure(mock_register, client, exhausted_pool):
+    """
+    测试未获取数据库连接的请求不受连接池过载影响
+    """
+    mock_register.return_value = (False, "用户名不能为空", None)
+    
+    response = client.post('/register', data={'username': '', 'password': '123456', 'phone': '13800138000'})
+    
+    assert response.status_code == 400
+    assert 'Retry-After' not in response.headers
+    assert exhausted_pool.snapshot()['shed_requests'] == 0
+
+
+@patch('services.UserService.UserService.register')
+def test_committed_request_not_shed(mock_register, client, exhausted_pool):
+    """
+    测试请求中已提交事务后再获取连接失败时保留原响应，不让客户端重试已生效的写入
+    """
+    def register(*args, **kwargs):
+        db = Database()
+        db.conn = Mock()
+        assert db.commit() is True
+        db.conn = None
+        assert db.connect() is False
+        return False, "注册后查询用户失败", None
+    mock_register.side_effect = register
+    
+    response = client.post('/register', data={'username': 'test', 'password': '123456', 'phone': '13800138000'})
+    
+    assert response.status_code == 400
+    assert 'Retry-After' not in response.headers
+    assert exhausted_pool.snapshot()['shed_requests'] == 0
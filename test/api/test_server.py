@@ -0,0 +1,110 @@
+import pytest
+import gc
+import json
+import signal
+import socket
+import subprocess
+import sys
+import os
+import time
+import urllib.request
+from unittest.mock import patch
+
+# 添加项目根目录到Python路径
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.append(ROOT)
+
+import server
+from server import load_options
+from db.Database import Database
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def get_json(url):
+    with urllib.request.urlopen(url, timeout=5) as response:
+        return response.status, json.loads(response.read())
+
+
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason="当前平台不支持fork")
+def test_prefork_server_serves_and_stops_gracefully(tmp_path):
+    """
+    测试多进程服务：工作进程在fork后各自创建连接池并处理请求，SIGHUP滚动重启后继续服务，SIGTERM后正常退出
+    """
+    port = free_port()
+    env = dict(os.environ, APP_ENV='sqlite', SQLITE_DATABASE=str(tmp_path / 'bill_db.sqlite3'))
+    process = subprocess.Popen(
+        [sys.executable, 'server.py', '--host', '127.0.0.1', '--port', str(port), '--workers', '2', '--threads', '2',
+         '--graceful-timeout', '5'],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    url = f"http://127.0.0.1:{port}/health"
+    try:
+        deadline = time.monotonic() + 20
+        while True:
+            try:
+                status, body = get_json(url)
+                break
+            except OSError:
+                assert process.poll() is None, "服务进程提前退出"
+                assert time.monotonic() < deadline, "服务未能在20秒内启动"
+                time.sleep(0.2)
+        assert status == 200
+        # 主进程不创建连接池，连接池在工作进程第一次获取连接时创建
+        assert body['db_status'] == 'connected'
+        assert body['pool']['created'] >= 1
+
+        process.send_signal(signal.SIGHUP)
+        time.sleep(1)
+        for _ in range(5):
+            assert get_json(url)[0] == 200
+
+        process.send_signal(signal.SIGTERM)
+        assert process.wait(timeout=20) == 0
+    finally:
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+
+
+def test_load_options_defaults():
+    """
+    测试命令行参数覆盖配置文件，工作进程数为0时使用CPU核数
+    """
+    options = load_options(argv=['--port', '9000', '--threads', '4'])
+    assert options.port == 9000
+    assert options.threads == 4
+    assert options.workers == (os.cpu_count() or 1)
+    assert options.keepalive == 2
+    assert options.max_requests == 0
+
+    with pytest.raises(SystemExit):
+        load_options(argv=['--threads', '0'])
+
+
+def test_main_reenables_gc_after_preload():
+    """
+    测试预加载应用后主进程重新启用垃圾回收，运行期间不会一直关闭
+    """
+    gc_states = []
+
+    class FakeArbiter:
+        def __init__(self, app, listener, options):
+            pass
+
+        def run(self):
+            gc_states.append(gc.isenabled())
+            return 0
+
+    lazy_pool = Database.lazy_pool
+    try:
+        with patch('server.create_listener'), patch('server.Arbiter', FakeArbiter), patch('server.LogUtils.shutdown'):
+            assert server.main([]) == 0
+    finally:
+        Database.lazy_pool = lazy_pool
+        gc.unfreeze()
+        gc.enable()
+    assert gc_states == [True]
@@ -0,0 +1,148 @@
+import pytest
+import json
+import time
+from datetime import datetime
+from app import app
+from unittest.mock import patch
+from utils.TokenCache import TokenCache
+import sys
+import os
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+
+@pytest.fixture
+def client():
+    app.config['TESTING'] = True
+    with app.test_client() as client:
+        yield client
+
+
+@pytest.fixture
+def mock_token_header():
+    """模拟有效的token和userid请求头"""
+    return {
+        'token': 'valid_token',
+        'userid': '1'
+    }
+
+
+@patch('services.UserService.UserService.get_user_by_id')
+@patch('utils.TokenUtils.TokenUtils.validate_token')
+@patch('services.StatsService.StatsService.get_grouped_stats')
+def test_get_grouped_stats(mock_get_grouped_stats, mock_validate_token, mock_get_user, client, mock_token_header):
+    """
+    测试分组统计接口
+    """
+    # 设置mock返回值
+    mock_validate_token.return_value = True
+    mock_get_user.return_value = (1, "testuser", "password", "13800138000", "enable", 1620000000000, "token", "token_expire")
+    mock_get_grouped_stats.return_value = (True, "统计成功", {
+        "group_by": "day",
+        "items": [{"key": "2023-01-01", "count": 2, "total": 150}],
+        "count": 2,
+        "total": 150
+    })
+
+    # 发送分组统计请求
+    response = client.get('/api/stats/expend?group_by=day&start_time=2023-01-01&end_time=2023-01-31', headers=mock_token_header)
+
+    # 验证响应
+    assert response.status_code == 200
+    data = json.loads(response.data)
+    assert data['errorcode'] == 200
+    assert data['data']['items'][0]['total'] == 150
+    mock_get_grouped_stats.assert_called_once_with('expend', 1, 'day', datetime(2023, 1, 1), datetime(2023, 1, 31))
+
+
+@patch('services.UserService.UserService.get_user_by_id')
+@patch('utils.TokenUtils.TokenUtils.validate_token')
+@patch('dao.StatsDAO.StatsDAO.get_grouped_totals')
+def test_get_grouped_stats_dao_failure(mock_get_grouped_totals, mock_validate_token, mock_get_user, client, mock_token_header):
+    """
+    测试数据库查询失败时返回统计失败，不返回空的统计结果
+    """
+    mock_validate_token.return_value = True
+    mock_get_user.return_value = (1, "testuser", "password", "13800138000", "enable", 1620000000000, "token", "token_expire")
+    mock_get_grouped_totals.return_value = None
+
+    response = client.get('/api/stats/expend?group_by=month', headers=mock_token_header)
+
+    assert response.status_code == 400
+    data = json.loads(response.data)
+    assert data['message'] == "统计失败"
+    assert data['data'] is None
+    mock_get_grouped_totals.assert_called_once_with('expend', 1, 'month', None, None)
+
+
+@patch('services.UserService.UserService.get_user_by_id')
+@patch('utils.TokenUtils.TokenUtils.validate_token')
+@patch('services.StatsService.StatsService.get_summary')
+def test_get_stats_summary(mock_get_summary, mock_validate_token, mock_get_user, client, mock_token_header):
+    """
+    测试汇总统计接口不会被分组统计路由匹配
+    """
+    # 设置mock返回值
+    mock_validate_token.return_value = True
+    mock_get_user.return_value = (1, "testuser", "password", "13800138000", "enable", 1620000000000, "token", "token_expire")
+    mock_get_summary.return_value = (True, "统计成功", {
+        "expend": {"count": 1, "total": 100},
+        "income": {"count": 1, "total": 300},
+        "net": 200
+    })
+
+    # 发送汇总统计请求
+    response = client.get('/api/stats/summary', headers=mock_token_header)
+
+    # 验证响应
+    assert response.status_code == 200
+    data = json.loads(response.data)
+    assert data['data']['net'] == 200
+    mock_get_summary.assert_called_once_with(1, None, None)
+
+
+@patch('services.UserService.UserService.get_user_by_id')
+@patch('services.StatsService.StatsService.get_summary')
+def test_token_verification_uses_cache(mock_get_summary, mock_get_user, client, mock_token_header):
+    """
+    测试token校验缓存：命中时不再查询用户，token更新后重新查询
+    """
+    future_expiration = int(time.time() * 1000) + 60 * 60 * 1000
+    mock_get_user.return_value = (1, "testuser", "password", "13800138000", "valid_token", future_expiration, 1620000000000, True, None)
+    mock_get_summary.return_value = (True, "统计成功", {"expend": {}, "income": {}, "net": 0})
+
+    # 第一次请求查询用户并写入缓存，第二次请求命中缓存
+    assert client.get('/api/stats/summary', headers=mock_token_header).status_code == 200
+    assert client.get('/api/stats/summary', headers=mock_token_header).status_code == 200
+    assert mock_get_user.call_count == 1
+
+    # 不一致的token不会通过缓存校验
+    response = client.get('/api/stats/summary', headers={'token': 'other_token', 'userid': '1'})
+    assert response.status_code == 401
+    assert mock_get_user.call_count == 2
+
+    # token更新后旧token需要重新查询用户
+    TokenCache.invalidate(1)
+    mock_get_user.return_value = (1, "testuser", "password", "13800138000", "new_token", future_expiration, 1620000000000, True, None)
+    response = client.get('/api/stats/summary', headers=mock_token_header)
+    assert response.status_code == 401
+    assert mock_get_user.call_count == 3
+
+
+@patch('services.UserService.UserService.get_user_by_id')
+@patch('services.UserService.UserService.get_session')
+@patch('services.StatsService.StatsService.get_summary')
+def test_token_verification_uses_session(mock_get_summary, mock_get_session, mock_get_user, client, mock_token_header):
+    """
+    测试按会话校验token时不查询用户表
+    """
+    future_expiration = int(time.time() * 1000) + 60 * 60 * 1000
+    mock_get_session.return_value = (10, 1, future_expiration, 'iPhone')
+    mock_get_summary.return_value = (True, "统计成功", {"expend": {}, "income": {}, "net": 0})
+
+    response = client.get('/api/stats/summary', headers=mock_token_header)
+
+    assert response.status_code == 200
+    mock_get_session.assert_called_once_with(1, 'valid_token')
+    mock_get_user.assert_not_called()
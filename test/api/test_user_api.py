@@ -3,6 +3,10 @@ import json
 import time
 from app import app
 from unittest.mock import patch
+from utils.AccessToken import AccessToken
+from utils.TokenCache import TokenCache
+from dao.TokenRevocationDAO import TokenRevocationDAO
+from db.Database import Database
 from datetime import datetime
 
 @pytest.fixture
@@ -11,6 +15,16 @@ def client():
     with app.test_client() as client:
         yield client
 
+
+@pytest.fixture
+def signed_token_mode():
+    """启用签名token模式，测试结束后恢复为未加载配置的状态"""
+    AccessToken.configure(True, 'test_secret', 900)
+    yield
+    AccessToken._enabled = None
+    AccessToken._revoked.clear()
+    AccessToken._revoked_sessions.clear()
+
 @patch('services.UserService.UserService.register')
 def test_register_success(mock_register, client):
     """测试注册成功的情况"""
@@ -231,3 +245,205 @@ def test_delete_account_failure(mock_get_user, mock_delete_account, client):
     # 验证mock被调用
     mock_get_user.assert_called_once_with(1)
     mock_delete_account.assert_called_once_with(1)
+
+
+@patch('services.UserService.UserService.delete_account')
+@patch('services.UserService.UserService.get_user_by_id')
+def test_signed_access_token_skips_user_lookup(mock_get_user, mock_delete_account, client, signed_token_mode):
+    """测试签名访问token在内存中校验，用户token更新后被撤销"""
+    mock_delete_account.return_value = (False, "用户不存在")
+    access_token, expiration_time = AccessToken.issue(1)
+    assert access_token.startswith('v1.')
+
+    # 签名token校验通过，不查询用户
+    response = client.delete('/api/user', headers={'token': access_token, 'userid': '1'})
+    assert response.status_code == 400
+    mock_get_user.assert_not_called()
+
+    # 签名token不能用于其他用户，篡改后的签名无效
+    assert client.delete('/api/user', headers={'token': access_token, 'userid': '2'}).status_code == 401
+    assert client.delete('/api/user', headers={'token': access_token[:-2] + 'xx', 'userid': '1'}).status_code == 401
+
+    # 撤销后此前签发的token失效
+    AccessToken._revoked[1] = int(time.time() * 1000) + 1
+    assert client.delete('/api/user', headers={'token': access_token, 'userid': '1'}).status_code == 401
+    mock_get_user.assert_not_called()
+
+
+def test_revocation_in_same_millisecond_as_issue(signed_token_mode):
+    """测试与撤销在同一毫秒内签发的访问token同样被撤销"""
+    with patch('utils.AccessToken.time.time', return_value=1766750674.874):
+        access_token, _ = AccessToken.issue(1)
+        assert AccessToken.verify(access_token, 1)
+        AccessToken.revoke_user(1)
+        assert not AccessToken.verify(access_token, 1)
+
+
+def test_refresh_access_token(client, signed_token_mode):
+    """测试使用数据库中的token续签访问token"""
+    future_expiration = int(time.time() * 1000) + (365 * 24 * 60 * 60 * 1000)
+    user = (1, "testuser", "password_hash", "13800138000", "test_token_123", future_expiration, 1620000000000, True, None)
+
+    with patch('dao.UserDAO.UserDAO.get_user_by_id', return_value=user):
+        response = client.post('/api/token/refresh', headers={'token': 'test_token_123', 'userid': '1'})
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        assert AccessToken.verify(data['data']['access_token'], 1)
+
+        # token不一致时不能续签
+        response = client.post('/api/token/refresh', headers={'token': 'old_token', 'userid': '1'})
+        assert response.status_code == 401
+
+
+@pytest.fixture
+def registered_user(sqlite_database):
+    """在SQLite数据库中注册测试用户，鉴权装饰器和服务执行真实的SQL"""
+    TokenCache.clear()
+    TokenRevocationDAO._synced_at = None
+    with app.test_client() as client:
+        response = client.post('/register', data={'username': 'alice', 'password': 'secret', 'phone': '13800138000'})
+        assert response.status_code == 200
+    yield
+    TokenCache.clear()
+    TokenRevocationDAO._synced_at = None
+    AccessToken._revoked.clear()
+    AccessToken._revoked_sessions.clear()
+
+
+def login_headers(client, device, password='secret'):
+    """登录并返回鉴权请求头"""
+    response = client.post('/login', data={'phone': '13800138000', 'password': password, 'device': device})
+    assert response.status_code == 200
+    data = json.loads(response.data)['data']
+    return {'token': data['token'], 'userid': str(data['id'])}
+
+
+def test_logout_revokes_current_session(client, registered_user):
+    """测试退出登录后当前设备的token失效，其他设备不受影响"""
+    phone_headers = login_headers(client, 'iPhone')
+    pad_headers = login_headers(client, 'iPad')
+    # 先通过一次校验，token进入鉴权缓存
+    assert client.get('/api/account', headers=phone_headers).status_code == 200
+
+    response = client.post('/logout', headers=phone_headers)
+    assert response.status_code == 200
+    assert json.loads(response.data)['message'] == '退出登录成功'
+
+    assert client.get('/api/account', headers=phone_headers).status_code == 401
+    assert client.get('/api/account', headers=pad_headers).status_code == 200
+
+
+def test_logout_revokes_access_tokens(client, registered_user, signed_token_mode):
+    """测试签名token模式下退出登录需要提供登录时返回的token，退出后访问token被撤销"""
+    response = client.post('/login', data={'phone': '13800138000', 'password': 'secret', 'device': 'iPhone'})
+    data = json.loads(response.data)['data']
+    headers = {'token': data['access_token'], 'userid': str(data['id'])}
+
+    assert client.post('/logout', headers=headers).status_code == 400
+    assert client.post('/logout', headers=headers, data={'token': data['token']}).status_code == 200
+
+    assert client.get('/api/account', headers=headers).status_code == 401
+    response = client.post('/api/token/refresh', headers={'token': data['token'], 'userid': str(data['id'])})
+    assert response.status_code == 401
+
+
+def signed_login(client, device):
+    """签名token模式下登录，返回登录token和访问token的鉴权请求头"""
+    response = client.post('/login', data={'phone': '13800138000', 'password': 'secret', 'device': device})
+    assert response.status_code == 200
+    data = json.loads(response.data)['data']
+    return data['token'], {'token': data['access_token'], 'userid': str(data['id'])}
+
+
+def test_logout_keeps_other_devices_access_tokens(client, registered_user, signed_token_mode):
+    """测试退出登录只撤销当前会话签发的访问token，其他设备的访问token仍然有效"""
+    phone_token, phone_headers = signed_login(client, 'iPhone')
+    _, pad_headers = signed_login(client, 'iPad')
+
+    assert client.post('/logout', headers=phone_headers, data={'token': phone_token}).status_code == 200
+
+    assert client.get('/api/account', headers=phone_headers).status_code == 401
+    assert client.get('/api/account', headers=pad_headers).status_code == 200
+
+
+def test_relogin_revokes_only_replaced_session(client, registered_user, signed_token_mode):
+    """测试同一设备重新登录时撤销之前会话的访问token，其他设备不受影响"""
+    _, old_phone_headers = signed_login(client, 'iPhone')
+    _, pad_headers = signed_login(client, 'iPad')
+
+    _, new_phone_headers = signed_login(client, 'iPhone')
+
+    assert client.get('/api/account', headers=old_phone_headers).status_code == 401
+    assert client.get('/api/account', headers=new_phone_headers).status_code == 200
+    assert client.get('/api/account', headers=pad_headers).status_code == 200
+
+
+def test_login_clears_legacy_token_without_revoking_sessions(client, registered_user, signed_token_mode):
+    """测试登录时清除用户表中旧版本的token只撤销用它续签的访问token"""
+    _, pad_headers = signed_login(client, 'iPad')
+    expiration_time = int(time.time() * 1000) + 3600 * 1000
+    db = Database()
+    assert db.connect()
+    assert db.execute("UPDATE user SET refresh_token = %s, token_expiration_time = %s WHERE phone = %s",
+                      ('legacy_token', expiration_time, '13800138000'))
+    assert db.commit()
+    db.disconnect()
+    response = client.post('/api/token/refresh', headers={'token': 'legacy_token', 'userid': pad_headers['userid']})
+    assert response.status_code == 200
+    legacy_headers = {'token': json.loads(response.data)['data']['access_token'], 'userid': pad_headers['userid']}
+
+    _, phone_headers = signed_login(client, 'iPhone')
+
+    assert client.get('/api/account', headers=legacy_headers).status_code == 401
+    assert client.get('/api/account', headers=pad_headers).status_code == 200
+    assert client.get('/api/account', headers=phone_headers).status_code == 200
+    response = client.post('/api/token/refresh', headers={'token': 'legacy_token', 'userid': pad_headers['userid']})
+    assert response.status_code == 401
+
+
+def test_revocation_reaches_other_processes(client, registered_user, signed_token_mode):
+    """测试撤销记录写入数据库，没有收到本进程撤销的其他进程同步后同样拒绝访问token"""
+    response = client.post('/login', data={'phone': '13800138000', 'password': 'secret', 'device': 'iPhone'})
+    data = json.loads(response.data)['data']
+    headers = {'token': data['access_token'], 'userid': str(data['id'])}
+    assert client.post('/logout', headers=headers, data={'token': data['token']}).status_code == 200
+
+    # 模拟另一个工作进程：本进程的撤销表为空，在同步间隔内仍按本地撤销表校验
+    AccessToken._revoked.clear()
+    AccessToken._revoked_sessions.clear()
+    TokenRevocationDAO._synced_at = time.monotonic()
+    assert client.get('/api/account', headers=headers).status_code == 200
+
+    # 到达同步时间后读取数据库中的撤销记录
+    TokenRevocationDAO._synced_at = None
+    assert client.get('/api/account', headers=headers).status_code == 401
+
+
+def test_relogin_replaces_session_on_same_device(client, registered_user):
+    """测试同一设备重新登录后之前的token失效"""
+    old_headers = login_headers(client, 'iPhone')
+    assert client.get('/api/account', headers=old_headers).status_code == 200
+
+    new_headers = login_headers(client, 'iPhone')
+
+    assert client.get('/api/account', headers=old_headers).status_code == 401
+    assert client.get('/api/account', headers=new_headers).status_code == 200
+
+
+def test_change_password_revokes_all_sessions(client, registered_user):
+    """测试修改密码后所有设备上的token失效，需要使用新密码重新登录"""
+    phone_headers = login_headers(client, 'iPhone')
+    pad_headers = login_headers(client, 'iPad')
+    assert client.get('/api/account', headers=pad_headers).status_code == 200
+
+    response = client.put('/api/user/password', headers=phone_headers, data={'old_password': 'wrong', 'new_password': 'changed'})
+    assert response.status_code == 400
+    assert json.loads(response.data)['message'] == '原密码错误'
+
+    response = client.put('/api/user/password', headers=phone_headers, data={'old_password': 'secret', 'new_password': 'changed'})
+    assert response.status_code == 200
+
+    assert client.get('/api/account', headers=phone_headers).status_code == 401
+    assert client.get('/api/account', headers=pad_headers).status_code == 401
+    assert client.post('/login', data={'phone': '13800138000', 'password': 'secret'}).status_code == 401
+    assert client.get('/api/account', headers=login_headers(client, 'iPhone', 'changed')).status_code == 200
@@ -0,0 +1,93 @@
+"""
+日志过滤器微基准测试
+
+对比逐个关键词扫描与编译后的KeywordMatcher在关键词数量增长时的单条日志过滤耗时。
+运行方式（在项目根目录下）：
+    python -m test.benchmarks.bench_log_filters
+"""
+
+import logging
+import random
+import string
+import timeit
+from utils.LogUtils import ContentFilter, ModuleFilter
+
+# 每组测试过滤的日志条数
+RECORD_COUNT = 2000
+KEYWORD_COUNTS = (1, 10, 100, 1000)
+
+
+def naive_content_filter(message, include_keywords, exclude_keywords):
+    """编译前的内容过滤实现：每个关键词都转换一次小写并扫描整条消息"""
+    for keyword in exclude_keywords:
+        if keyword.lower() in message.lower():
+            return False
+    if not include_keywords:
+        return True
+    for keyword in include_keywords:
+        if keyword.lower() in message.lower():
+            return True
+    return False
+
+
+def naive_module_filter(module_name, include_modules, exclude_modules):
+    """编译前的模块过滤实现：逐个模块做子串扫描"""
+    for module in exclude_modules:
+        if module in module_name:
+            return False
+    if not include_modules:
+        return True
+    for module in include_modules:
+        if module in module_name:
+            return True
+    return False
+
+
+def random_word(rng, length):
+    return ''.join(rng.choices(string.ascii_lowercase, k=length))
+
+
+def make_records(rng):
+    """生成与应用日志相似的日志记录，模块名取自项目中的日志器"""
+    modules = ['Database', 'AuthUtils', 'ExpendDAO', 'IncomeDAO', 'TokenUtils', 'StatsDAO', 'user', 'expend']
+    records = []
+    for i in range(RECORD_COUNT):
+        message = f"SQL 执行成功 - affected_rows: {i % 7}, request: {random_word(rng, 24)} user_id={i}"
+        record = logging.LogRecord('Database', logging.INFO, f"{rng.choice(modules)}.py", i, message, None, None)
+        records.append(record)
+    return records
+
+
+def bench(count, rng, records):
+    keywords = [random_word(rng, 8) for _ in range(count)]
+    modules = [random_word(rng, 6) for _ in range(count)]
+    content_filter = ContentFilter(exclude_keywords=keywords)
+    module_filter = ModuleFilter(exclude_modules=modules)
+
+    # 两种实现的过滤结果必须一致
+    for record in records:
+        message = record.getMessage()
+        assert content_filter.filter(record) == naive_content_filter(message, [], keywords)
+        assert module_filter.filter(record) == naive_module_filter(record.module, [], modules)
+
+    results = {
+        'content_naive': timeit.timeit(lambda: [naive_content_filter(r.getMessage(), [], keywords) for r in records], number=1),
+        'content_compiled': timeit.timeit(lambda: [content_filter.filter(r) for r in records], number=1),
+        'module_naive': timeit.timeit(lambda: [naive_module_filter(r.module, [], modules) for r in records], number=1),
+        'module_compiled': timeit.timeit(lambda: [module_filter.filter(r) for r in records], number=1)
+    }
+    return {name: seconds / RECORD_COUNT * 1e6 for name, seconds in results.items()}
+
+
+def main():
+    rng = random.Random(42)
+    records = make_records(rng)
+    print(f"{'关键词数':>8} | {'内容-逐个(us)':>14} | {'内容-编译(us)':>14} | {'模块-逐个(us)':>14} | {'模块-编译(us)':>14}")
+    for count in KEYWORD_COUNTS:
+        result = bench(count, rng, records)
+        print(f"{count:>8} | {result['content_naive']:>14.2f} | {result['content_compiled']:>14.2f} | "
+              f"{result['module_naive']:>14.2f} | {result['module_compiled']:>14.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,306 @@
+"""
+请求级性能回归基准测试
+
+在用sql/generate_data.py的生成器填充的本地SQLite数据库上，通过app.test_client()驱动完整的请求
+（路由、鉴权、服务、DAO、JSON序列化和日志），并直接调用DAO，统计每个用例的p50/p95/p99耗时、
+每次执行的SQL语句数和内存分配。结果可以保存为JSON基线，之后的运行与基线比较，
+任一指标回退超过阈值时以退出码1结束，性能改动的效果由数据验证而不是推测。
+
+运行方式（在项目根目录下）：
+    python -m test.benchmarks.bench_requests --save-baseline   # 运行并保存基线
+    python -m test.benchmarks.bench_requests                   # 运行并与基线比较，回退时退出码为1
+    python -m test.benchmarks.bench_requests --users 1000 --expends 200000 --iterations 500
+    python -m test.benchmarks.bench_requests > /dev/null       # 丢弃控制台日志，只看结果
+
+结果输出到stderr，与输出到stdout的控制台日志分开（日志开销计入耗时，与生产配置一致）。
+耗时和内存分配只在同一台机器、相同参数的运行之间可比；SQL语句数与机器无关。
+"""
+
+import argparse
+import itertools
+import os
+import shutil
+import sys
+import tempfile
+from datetime import datetime
+
+from flask import jsonify
+from db.Database import Database
+from db.DatasetGenerator import DatasetGenerator
+from db.SQLiteBackend import SQLiteSchema
+from test.benchmarks.harness import BenchmarkCase, measure, compare, load_baseline, save_baseline, format_table
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baselines', 'bench_requests.json')
+
+
+class RequestBenchmark:
+    """
+    请求级基准测试用例集
+
+    在已经配置好的数据库上运行：以记录最多的用户登录，用该用户的账户、类型和记录构造用例，
+    与真实数据中最重的分页和统计查询一致。
+    """
+
+    def __init__(self):
+        # 应用和DAO在切换数据库之后才导入，避免导入时按默认配置连接MySQL
+        from app import app
+        self.app = app
+        self.client = app.test_client()
+        self.user_id = None
+        self.headers = None
+        self.phone = None
+        self.account_id = None
+        self.expend_type_id = None
+        self.income_type_id = None
+        self.expend_id = None
+        self.income_id = None
+
+    def prepare(self):
+        """选择记录最多的用户并登录，取得用例需要的ID"""
+        db = Database()
+        if not db.connect():
+            raise RuntimeError("无法连接数据库")
+        try:
+            db.cur.execute("SELECT user_id, COUNT(*) AS total FROM expend GROUP BY user_id ORDER BY total DESC, user_id LIMIT 1")
+            row = db.cur.fetchone()
+            if row is None:
+                raise RuntimeError("数据库中没有支出记录，请先生成数据")
+            self.user_id = row[0]
+            db.cur.execute("SELECT phone FROM user WHERE id = %s", (self.user_id,))
+            self.phone = db.cur.fetchone()[0]
+            db.cur.execute("SELECT id FROM account WHERE user_id = %s ORDER BY id LIMIT 1", (self.user_id,))
+            self.account_id = db.cur.fetchone()[0]
+            db.cur.execute("SELECT id, expend_type_id FROM expend WHERE user_id = %s AND enable = TRUE ORDER BY id LIMIT 1", (self.user_id,))
+            self.expend_id, self.expend_type_id = db.cur.fetchone()
+            db.cur.execute("SELECT id, income_type_id FROM income WHERE user_id = %s AND enable = TRUE ORDER BY id LIMIT 1", (self.user_id,))
+            row = db.cur.fetchone()
+            if row is None:
+                raise RuntimeError("该用户没有收入记录，请增加生成的收入记录数")
+            self.income_id, self.income_type_id = row
+        finally:
+            db.disconnect()
+
+        response = self._login()
+        data = response.get_json()['data']
+        # 启用签名token时使用访问token，与客户端的行为一致
+        self.headers = {'token': data.get('access_token') or data['token'], 'userid': str(self.user_id)}
+
+    def _login(self, device='bench'):
+        response = self.client.post('/login', data={'phone': self.phone, 'password': DatasetGenerator.DEFAULT_PASSWORD, 'device': device})
+        if response.status_code != 200:
+            raise RuntimeError(f"登录失败: {response.get_json()}")
+        return response
+
+    def _request(self, method, path, **kwargs):
+        response = self.client.open(path, method=method, headers=self.headers, **kwargs)
+        if response.status_code != 200:
+            raise RuntimeError(f"{method} {path} 返回{response.status_code}: {response.get_json()}")
+        return response
+
+    def _token_required_case(self, name, clear_cache):
+        """只执行鉴权装饰器，被装饰的视图不做任何工作"""
+        from utils.AuthUtils import token_required
+        from utils.TokenCache import TokenCache
+
+        @token_required
+        def view():
+            return jsonify({"errorcode": 200, "message": "ok", "data": None})
+
+        def op():
+            if clear_cache:
+                TokenCache.clear()
+            with self.app.test_request_context('/api/bench', headers=self.headers):
+                view()
+
+        return BenchmarkCase(name, op)
+
+    def _record_cases(self, kind, dao, create_method, type_id, record_id):
+        """新增、更新、删除和分页查询一类记录的用例"""
+        path = f'/api/{kind}'
+        type_field = f'{kind}_type_id'
+        money = itertools.cycle(['12.5', '88'])
+
+        def create_record():
+            # ExpendDAO额外返回错误信息，IncomeDAO只返回(是否成功, ID)
+            result = getattr(dao, create_method)(10, self.account_id, self.user_id, 'bench', datetime.now(), type_id)
+            if not result[0]:
+                raise RuntimeError(f"创建{kind}记录失败")
+            return result[1]
+
+        return [
+            BenchmarkCase(f'api_{kind}_create', lambda: self._request('POST', path, data={
+                'money': '23.5', 'account_id': str(self.account_id), 'remark': 'bench',
+                f'{kind}_time': '2024-06-01 12:00:00', type_field: str(type_id)})),
+            BenchmarkCase(f'api_{kind}_update', lambda: self._request('PUT', path, data={'id': str(record_id), 'money': next(money)})),
+            BenchmarkCase(f'api_{kind}_delete', lambda new_id: self._request('DELETE', path, data={'id': str(new_id)}), setup=create_record),
+            BenchmarkCase(f'api_{kind}_get', lambda: self._request('GET', path, query_string={'id': record_id})),
+            BenchmarkCase(f'api_{kind}_list', lambda: self._request('GET', path, query_string={'limit': 20})),
+            BenchmarkCase(f'api_{kind}_list_filtered', lambda: self._request('GET', path, query_string={
+                'limit': 20, 'account_id': self.account_id, 'start_time': '2024-03-01', 'end_time': '2024-09-01'}))
+        ]
+
+    def cases(self):
+        """
+        构造全部用例
+
+        Returns:
+            list: BenchmarkCase列表
+        """
+        from dao.ExpendDAO import ExpendDAO
+        from dao.ExpendTypeDAO import ExpendTypeDAO
+        from dao.IncomeDAO import IncomeDAO
+        from dao.IncomeTypeDAO import IncomeTypeDAO
+        from dao.StatsDAO import StatsDAO
+
+        expend_dao = ExpendDAO()
+        income_dao = IncomeDAO()
+        stats_dao = StatsDAO()
+        cases = [
+            # 同一设备重新登录会替换之前的会话，登录用例使用单独的设备，不影响后续用例的token
+            BenchmarkCase('api_login', lambda: self._login('bench-login')),
+            self._token_required_case('token_required_cached', clear_cache=False),
+            self._token_required_case('token_required_uncached', clear_cache=True),
+            BenchmarkCase('api_expendtype_list', lambda: self._request('GET', '/api/expendtype')),
+            BenchmarkCase('api_incometype_list', lambda: self._request('GET', '/api/incometype'))
+        ]
+        cases += self._record_cases('expend', expend_dao, 'create_expend', self.expend_type_id, self.expend_id)
+        cases += self._record_cases('income', income_dao, 'create_income', self.income_type_id, self.income_id)
+        cases += [
+            BenchmarkCase('dao_expend_page', lambda: expend_dao.get_expends_by_user_id(self.user_id, limit=20)),
+            BenchmarkCase('dao_income_page', lambda: income_dao.get_incomes_by_user_id(self.user_id, limit=20)),
+            BenchmarkCase('dao_expend_types', lambda: ExpendTypeDAO().get_all_expend_types()),
+            BenchmarkCase('dao_income_types', lambda: IncomeTypeDAO().get_all_income_types()),
+            BenchmarkCase('dao_stats_totals', lambda: stats_dao.get_totals('expend', self.user_id)),
+            BenchmarkCase('dao_stats_by_month', lambda: stats_dao.get_grouped_totals('expend', self.user_id, 'month'))
+        ]
+        return cases
+
+    def run(self, iterations=200, warmup=20, alloc_iterations=20, only=None):
+        """
+        运行用例
+
+        Args:
+            iterations: 每个用例计时的执行次数
+            warmup: 每个用例的预热次数
+            alloc_iterations: 每个用例统计内存分配的执行次数
+            only: 只运行名称包含该字符串的用例
+
+        Returns:
+            dict: 用例名 -> 指标
+        """
+        self.prepare()
+        results = {}
+        for case in self.cases():
+            if only and only not in case.name:
+                continue
+            results[case.name] = measure(case, iterations, warmup, alloc_iterations)
+        return results
+
+
+def configure_database(database):
+    """
+    把Database切换到指定的SQLite数据库文件
+
+    Args:
+        database: SQLite数据库文件路径
+    """
+    config_dir = tempfile.mkdtemp(prefix='bill_bench_')
+    config_file = os.path.join(config_dir, 'DateBaseConfig.ini')
+    with open(config_file, 'w', encoding='utf-8') as f:
+        f.write("[app]\n"
+                "env = sqlite\n"
+                "\n"
+                "[sqlite]\n"
+                "driver = sqlite\n"
+                f"database = {database}\n"
+                "max_connections = 5\n")
+    Database.pool = None
+    Database.config_manager = None
+    try:
+        Database(config_file)
+    finally:
+        shutil.rmtree(config_dir, ignore_errors=True)
+
+
+def report(message):
+    """输出结果，写到stderr以与控制台日志分开"""
+    print(message, file=sys.stderr)
+
+
+def seed_database(args):
+    """数据库中没有用户时按参数生成数据，已有数据时直接复用"""
+    db = Database()
+    if not db.connect():
+        raise RuntimeError("无法连接数据库")
+    try:
+        db.cur.execute("SELECT COUNT(*) FROM user")
+        existing = db.cur.fetchone()[0]
+    finally:
+        db.disconnect()
+    if existing:
+        report(f"复用已有数据: {existing}个用户")
+        return
+    DatasetGenerator(seed=args.seed).generate(args.users, args.accounts_per_user, args.expends, args.incomes)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="请求级性能回归基准测试")
+    parser.add_argument('--database', default=None, help="SQLite数据库文件，已有数据时直接复用；默认在临时目录中生成")
+    parser.add_argument('--users', type=int, default=200, help="生成的用户数")
+    parser.add_argument('--accounts-per-user', type=int, default=5, help="每个用户的账户数")
+    parser.add_argument('--expends', type=int, default=50000, help="生成的支出记录数")
+    parser.add_argument('--incomes', type=int, default=10000, help="生成的收入记录数")
+    parser.add_argument('--seed', type=int, default=42, help="随机种子")
+    parser.add_argument('--iterations', type=int, default=200, help="每个用例计时的执行次数")
+    parser.add_argument('--warmup', type=int, default=20, help="每个用例的预热次数")
+    parser.add_argument('--alloc-iterations', type=int, default=20, help="每个用例统计内存分配的执行次数")
+    parser.add_argument('--only', default=None, help="只运行名称包含该字符串的用例")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help="基线文件路径")
+    parser.add_argument('--save-baseline', action='store_true', help="把本次结果保存为基线")
+    parser.add_argument('--threshold', type=float, default=0.25, help="耗时和内存分配允许超出基线的比例")
+    args = parser.parse_args(argv)
+
+    work_dir = None
+    database = args.database
+    if database is None:
+        work_dir = tempfile.mkdtemp(prefix='bill_bench_')
+        database = os.path.join(work_dir, 'bench.sqlite3')
+
+    try:
+        configure_database(database)
+        seed_database(args)
+        results = RequestBenchmark().run(args.iterations, args.warmup, args.alloc_iterations, args.only)
+    finally:
+        if Database.pool is not None:
+            Database.pool.close()
+            Database.pool = None
+        SQLiteSchema.close_all()
+        if work_dir:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    params = {'users': args.users, 'accounts_per_user': args.accounts_per_user, 'expends': args.expends,
+              'incomes': args.incomes, 'seed': args.seed, 'iterations': args.iterations}
+    if args.save_baseline:
+        report(format_table(results))
+        save_baseline(args.baseline, results, params)
+        report(f"基线已保存: {args.baseline}")
+        return 0
+
+    baseline = load_baseline(args.baseline)
+    report(format_table(results, baseline))
+    if baseline is None:
+        report(f"基线文件不存在: {args.baseline}，使用--save-baseline生成")
+        return 0
+
+    regressions = compare(results, baseline, args.threshold)
+    if regressions:
+        report(f"发现{len(regressions)}项性能回退（阈值{args.threshold:.0%}）：")
+        for name, metric, old, new in regressions:
+            report(f"  {name}.{metric}: {old} -> {new}")
+        return 1
+    report("未发现性能回退")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
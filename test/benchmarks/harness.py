@@ -0,0 +1,192 @@
+"""
+性能回归基准测试的计时、统计和基线比较
+
+每个用例先预热，再重复执行并记录每次的耗时和执行的SQL语句数（Database的请求级计数），
+最后在tracemalloc下单独执行若干次统计内存分配（tracemalloc会拖慢执行，不与计时混在一起）。
+结果可以保存为JSON基线，之后的运行与基线比较，超出阈值的指标视为性能回退。
+"""
+
+import json
+import os
+import platform
+import time
+import tracemalloc
+from datetime import datetime
+from db.Database import Database
+
+# 与基线比较的指标及各自的判定方式：
+# 耗时和内存分配受机器负载影响，超过基线的(1 + 阈值)倍才算回退；SQL语句数是确定的，增加即为回退。
+# p99只由最慢的几次执行决定，受偶发的调度和GC影响太大，只输出不参与判定
+COMPARED_METRICS = {
+    'p50_ms': 'relative',
+    'p95_ms': 'relative',
+    'alloc_kb': 'relative',
+    'queries': 'absolute'
+}
+# 低于该值的耗时差异视为计时噪声，不判定为回退（毫秒）
+NOISE_FLOOR_MS = 0.05
+
+
+class BenchmarkCase:
+    """
+    基准测试用例
+
+    op是被测操作；setup在每次执行前调用且不计入耗时，返回值作为参数传给op，
+    用于准备被删除、更新的记录等每次都要重新创建的数据。
+    """
+
+    def __init__(self, name, op, setup=None):
+        self.name = name
+        self.op = op
+        self.setup = setup
+
+    def run_once(self):
+        """执行一次用例，返回(耗时秒数, SQL语句数)"""
+        arg = self.setup() if self.setup else None
+        Database.reset_request_state()
+        start = time.perf_counter()
+        if self.setup:
+            self.op(arg)
+        else:
+            self.op()
+        elapsed = time.perf_counter() - start
+        # 经过test_client的请求在before_request中重置计数，读取到的就是本次请求的语句数
+        return elapsed, Database.get_request_db_stats()[0]
+
+
+def percentile(samples, percent):
+    """按最近邻法计算百分位数，与db/QueryStats.py的算法一致"""
+    ordered = sorted(samples)
+    index = max(int(len(ordered) * percent / 100.0 + 0.5) - 1, 0)
+    return ordered[min(index, len(ordered) - 1)]
+
+
+def measure(case, iterations=200, warmup=20, alloc_iterations=20):
+    """
+    测量一个用例
+
+    Args:
+        case: BenchmarkCase实例
+        iterations: 计时的执行次数
+        warmup: 预热次数（填充缓存、建立连接，不计入结果）
+        alloc_iterations: 统计内存分配的执行次数
+
+    Returns:
+        dict: p50/p95/p99/平均耗时（毫秒）、每次执行的SQL语句数、每次执行的内存分配峰值（KB）
+    """
+    for _ in range(warmup):
+        case.run_once()
+
+    timings = []
+    queries = []
+    for _ in range(iterations):
+        elapsed, query_count = case.run_once()
+        timings.append(elapsed * 1000)
+        queries.append(query_count)
+
+    # 内存分配峰值：每次执行前重置峰值，取相对于执行前已分配内存的增量
+    allocations = []
+    tracemalloc.start()
+    try:
+        for _ in range(alloc_iterations):
+            arg = case.setup() if case.setup else None
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            if case.setup:
+                case.op(arg)
+            else:
+                case.op()
+            allocations.append((tracemalloc.get_traced_memory()[1] - before) / 1024)
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'iterations': iterations,
+        'p50_ms': round(percentile(timings, 50), 4),
+        'p95_ms': round(percentile(timings, 95), 4),
+        'p99_ms': round(percentile(timings, 99), 4),
+        'mean_ms': round(sum(timings) / len(timings), 4),
+        'queries': round(sum(queries) / len(queries), 2),
+        'alloc_kb': round(percentile(allocations, 50), 2) if allocations else 0.0
+    }
+
+
+def compare(results, baseline, threshold=0.25):
+    """
+    与基线比较
+
+    Args:
+        results: 本次运行的结果，用例名 -> 指标
+        baseline: 基线结果，格式同results
+        threshold: 耗时和内存分配允许超出基线的比例
+
+    Returns:
+        list: 回退项，每项为(用例名, 指标名, 基线值, 本次值)
+    """
+    regressions = []
+    for name, metrics in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        for metric, mode in COMPARED_METRICS.items():
+            if metric not in base or metric not in metrics:
+                continue
+            old, new = base[metric], metrics[metric]
+            if mode == 'absolute':
+                regressed = new > old
+            else:
+                regressed = new > old * (1 + threshold)
+                if metric.endswith('_ms') and new - old < NOISE_FLOOR_MS:
+                    regressed = False
+            if regressed:
+                regressions.append((name, metric, old, new))
+    return regressions
+
+
+def load_baseline(path):
+    """读取基线文件，文件不存在时返回None"""
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)['results']
+
+
+def save_baseline(path, results, params):
+    """
+    保存基线文件
+
+    Args:
+        path: 基线文件路径
+        results: 用例名 -> 指标
+        params: 生成基线时的运行参数（数据规模、迭代次数等），比较时应使用相同的参数
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    document = {
+        'created_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'params': params,
+        'results': results
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(document, f, ensure_ascii=False, indent=2, sort_keys=True)
+        f.write('\n')
+
+
+def format_table(results, baseline=None):
+    """把结果格式化为文本表格，有基线时附上p95相对基线的变化"""
+    header = f"{'用例':<28} | {'p50(ms)':>9} | {'p95(ms)':>9} | {'p99(ms)':>9} | {'SQL数':>6} | {'分配(KB)':>9}"
+    if baseline:
+        header += f" | {'p95变化':>8}"
+    lines = [header, '-' * len(header)]
+    for name, metrics in results.items():
+        line = (f"{name:<28} | {metrics['p50_ms']:>9.3f} | {metrics['p95_ms']:>9.3f} | {metrics['p99_ms']:>9.3f} | "
+                f"{metrics['queries']:>6.1f} | {metrics['alloc_kb']:>9.1f}")
+        if baseline:
+            base = baseline.get(name)
+            if base and base.get('p95_ms'):
+                line += f" | {(metrics['p95_ms'] / base['p95_ms'] - 1) * 100:>+7.1f}%"
+            else:
+                line += f" | {'新增':>8}"
+        lines.append(line)
+    return '\n'.join(lines)
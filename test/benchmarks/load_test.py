@@ -0,0 +1,603 @@
+"""
+HTTP压测工具
+
+以sql/generate_data.py生成的用户（手机号139<8位编号>，密码password123）登录，
+按可配置的比例向正在运行的服务重放真实的接口请求，按固定的目标RPS发起请求（开环：
+请求按计划时间发出，不等待前一个请求完成），每隔一段时间输出吞吐量、延迟分位数和错误率。
+阶梯模式逐级提高RPS，找出服务的饱和点；结果可以保存为JSON，用于比较不同的部署配置。
+只依赖标准库，可以在没有安装项目依赖的压测机上运行。
+
+运行方式（在项目根目录下，或直接运行本文件）：
+    python -m test.benchmarks.load_test --url http://127.0.0.1:8080 --users 100 --rps 50 --duration 60
+    python -m test.benchmarks.load_test --rps 50 --ramp-to 500 --step 50 --duration 20 --output result.json
+    python -m test.benchmarks.load_test --mix "expend_list=50,expend_create=10,stats_summary=5"
+
+延迟从请求的计划发出时间开始计算，包括在压测端排队的时间，服务变慢时不会因为少发请求而低估延迟。
+"""
+
+import argparse
+import http.client
+import itertools
+import json
+import queue
+import random
+import sys
+import threading
+import time
+from collections import Counter, deque
+from datetime import datetime
+from urllib.parse import urlencode, urlsplit
+
+# 默认的请求比例，与客户端的实际使用情况相近：以查询为主，少量新增、修改和删除
+DEFAULT_MIX = {
+    'login': 1,
+    'account_list': 12,
+    'expendtype_list': 6,
+    'incometype_list': 4,
+    'expend_list': 25,
+    'expend_get': 5,
+    'expend_create': 10,
+    'expend_update': 4,
+    'expend_delete': 2,
+    'income_list': 10,
+    'income_create': 4,
+    'income_update': 2,
+    'income_delete': 1,
+    'stats_summary': 6,
+    'stats_month': 4
+}
+
+# 每个用户会话保留的最近新增记录ID数，用于修改、删除和单条查询
+RECENT_RECORDS = 200
+# 单个请求的默认超时时间（秒）
+DEFAULT_TIMEOUT = 10.0
+
+
+def percentile(samples, percent):
+    """按最近邻法计算百分位数，samples为空时返回0"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = max(int(len(ordered) * percent / 100.0 + 0.5) - 1, 0)
+    return ordered[min(index, len(ordered) - 1)]
+
+
+def parse_mix(text):
+    """
+    解析请求比例
+
+    Args:
+        text: 形如"expend_list=30,expend_create=5"的字符串
+
+    Returns:
+        dict: 操作名 -> 权重
+
+    Raises:
+        ValueError: 操作名不存在或权重无效
+    """
+    mix = {}
+    for item in text.split(','):
+        item = item.strip()
+        if not item:
+            continue
+        name, _, weight = item.partition('=')
+        name = name.strip()
+        if name not in OPERATIONS:
+            raise ValueError(f"不支持的操作: {name}，可选: {', '.join(OPERATIONS)}")
+        try:
+            mix[name] = float(weight) if weight.strip() else 1.0
+        except ValueError:
+            raise ValueError(f"操作{name}的权重无效: {weight}")
+        if mix[name] < 0:
+            raise ValueError(f"操作{name}的权重不能小于0")
+    if not any(mix.values()):
+        raise ValueError("请求比例中至少要有一个权重大于0的操作")
+    return mix
+
+
+class HttpClient:
+    """
+    单个压测线程使用的HTTP客户端，复用一个keep-alive连接
+
+    服务端关闭了空闲连接时重新连接并重发一次；其他网络错误抛出给调用方计为错误。
+    """
+
+    def __init__(self, host, port, timeout=DEFAULT_TIMEOUT):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.conn = None
+
+    def request(self, method, path, params=None, form=None, headers=None):
+        """
+        发送请求
+
+        Returns:
+            tuple: (状态码, 响应体bytes)
+        """
+        if params:
+            path = f"{path}?{urlencode(params)}"
+        body = None
+        request_headers = dict(headers or {})
+        if form is not None:
+            body = urlencode(form)
+            request_headers['Content-Type'] = 'application/x-www-form-urlencoded'
+        for attempt in range(2):
+            if self.conn is None:
+                self.conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+            try:
+                self.conn.request(method, path, body=body, headers=request_headers)
+                response = self.conn.getresponse()
+                return response.status, response.read()
+            except (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError):
+                self.close()
+                if attempt:
+                    raise
+            except Exception:
+                self.close()
+                raise
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+
+class UserSession:
+    """一个已登录的压测用户：鉴权请求头、账户和类型ID、最近新增的记录ID"""
+
+    def __init__(self, phone, password):
+        self.phone = phone
+        self.password = password
+        self.headers = None
+        self.accounts = []
+        self.expend_type_ids = []
+        self.income_type_ids = []
+        self.records = {'expend': deque(maxlen=RECENT_RECORDS), 'income': deque(maxlen=RECENT_RECORDS)}
+
+    def update_login(self, body):
+        """用登录响应更新鉴权请求头，启用签名token时使用访问token"""
+        data = json.loads(body)['data']
+        self.headers = {'token': data.get('access_token') or data['token'], 'userid': str(data['id'])}
+
+    def setup(self, client):
+        """
+        登录并查询账户和类型，返回会话是否可用
+        """
+        status, body = client.request('POST', '/login', form={'phone': self.phone, 'password': self.password, 'device': 'load-test'})
+        if status != 200:
+            return False
+        self.update_login(body)
+        lookups = (('/api/account', 'accounts'), ('/api/expendtype', 'expend_type_ids'), ('/api/incometype', 'income_type_ids'))
+        for path, attribute in lookups:
+            status, body = client.request('GET', path, headers=self.headers)
+            if status != 200:
+                return False
+            setattr(self, attribute, [item['id'] for item in json.loads(body)['data'] or []])
+        return bool(self.accounts and self.expend_type_ids and self.income_type_ids)
+
+
+# 登录操作的设备编号。同一设备重新登录会替换之前的会话，每次登录使用新的设备，
+# 其他线程正在使用的token不会失效
+_login_devices = itertools.count(1)
+
+
+def _login(client, session, rng):
+    device = f"load-test-{next(_login_devices)}"
+    status, body = client.request('POST', '/login', form={'phone': session.phone, 'password': session.password, 'device': device})
+    if status == 200:
+        session.update_login(body)
+    return status
+
+
+def _get(path, params=None):
+    def op(client, session, rng):
+        return client.request('GET', path, params=params, headers=session.headers)[0]
+    return op
+
+
+def _create(kind):
+    def op(client, session, rng):
+        type_ids = session.expend_type_ids if kind == 'expend' else session.income_type_ids
+        form = {
+            'money': str(rng.randint(1, 500) if kind == 'expend' else rng.randint(100, 20000)),
+            'account_id': str(rng.choice(session.accounts)),
+            'remark': 'load-test',
+            f'{kind}_time': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            f'{kind}_type_id': str(rng.choice(type_ids))
+        }
+        status, body = client.request('POST', f'/api/{kind}', form=form, headers=session.headers)
+        if status == 200:
+            session.records[kind].append(json.loads(body)['data']['id'])
+        return status
+    return op
+
+
+def _update(kind):
+    create = _create(kind)
+
+    def op(client, session, rng):
+        records = session.records[kind]
+        if not records:
+            # 还没有本会话新增的记录时改为新增，不修改生成器写入的数据
+            return create(client, session, rng)
+        form = {'id': str(rng.choice(records)), 'money': str(rng.randint(1, 500))}
+        return client.request('PUT', f'/api/{kind}', form=form, headers=session.headers)[0]
+    return op
+
+
+def _delete(kind):
+    create = _create(kind)
+
+    def op(client, session, rng):
+        try:
+            record_id = session.records[kind].popleft()
+        except IndexError:
+            return create(client, session, rng)
+        return client.request('DELETE', f'/api/{kind}', form={'id': str(record_id)}, headers=session.headers)[0]
+    return op
+
+
+def _get_record(kind):
+    list_op = _get(f'/api/{kind}', {'limit': 20})
+
+    def op(client, session, rng):
+        records = session.records[kind]
+        if not records:
+            return list_op(client, session, rng)
+        return client.request('GET', f'/api/{kind}', params={'id': rng.choice(records)}, headers=session.headers)[0]
+    return op
+
+
+# 操作名 -> 操作函数(client, session, rng)，返回HTTP状态码
+OPERATIONS = {
+    'login': _login,
+    'account_list': _get('/api/account'),
+    'expendtype_list': _get('/api/expendtype'),
+    'incometype_list': _get('/api/incometype'),
+    'expend_list': _get('/api/expend', {'limit': 20}),
+    'expend_get': _get_record('expend'),
+    'expend_create': _create('expend'),
+    'expend_update': _update('expend'),
+    'expend_delete': _delete('expend'),
+    'income_list': _get('/api/income', {'limit': 20}),
+    'income_get': _get_record('income'),
+    'income_create': _create('income'),
+    'income_update': _update('income'),
+    'income_delete': _delete('income'),
+    'stats_summary': _get('/api/stats/summary'),
+    'stats_month': _get('/api/stats/expend', {'group_by': 'month'})
+}
+
+
+class Recorder:
+    """
+    线程安全的结果记录器
+
+    每个报告周期的结果放在当前窗口中，报告时取出；同时按阶段和操作累计全部延迟用于最终汇总。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._window = []
+        self._stage = []
+        self._errors = Counter()
+
+    def record(self, operation, latency, status):
+        """记录一个请求，status为HTTP状态码，网络错误时为错误类型名"""
+        item = (operation, latency, status)
+        with self._lock:
+            self._window.append(item)
+            self._stage.append(item)
+            if status != 200:
+                self._errors[f"{operation}:{status}"] += 1
+
+    def take_window(self):
+        with self._lock:
+            window, self._window = self._window, []
+        return window
+
+    def take_stage(self):
+        with self._lock:
+            stage, self._stage = self._stage, []
+            errors, self._errors = self._errors, Counter()
+        return stage, errors
+
+
+def summarize(items, seconds):
+    """
+    汇总一组请求结果
+
+    Args:
+        items: (操作名, 延迟秒数, 状态)列表
+        seconds: 统计的时长
+
+    Returns:
+        dict: 请求数、吞吐量、错误率和延迟分位数（毫秒）
+    """
+    latencies = [latency * 1000 for _, latency, _ in items]
+    errors = sum(1 for _, _, status in items if status != 200)
+    return {
+        'requests': len(items),
+        'rps': round(len(items) / seconds, 2) if seconds > 0 else 0.0,
+        'error_rate': round(errors / len(items), 4) if items else 0.0,
+        'p50_ms': round(percentile(latencies, 50), 2),
+        'p95_ms': round(percentile(latencies, 95), 2),
+        'p99_ms': round(percentile(latencies, 99), 2),
+        'max_ms': round(max(latencies), 2) if latencies else 0.0
+    }
+
+
+class LoadTest:
+    """
+    开环压测
+
+    调度线程按目标RPS把计划发出时间放入队列，工作线程取出后随机选择一个用户会话和一个操作执行。
+    工作线程都在忙时请求在队列中排队，排队时间计入延迟；积压超过max_backlog时丢弃新的请求并计为dropped。
+    """
+
+    def __init__(self, url, sessions, mix, concurrency=32, report_interval=5.0, max_backlog=None,
+                 timeout=DEFAULT_TIMEOUT, seed=42, output=sys.stdout):
+        parts = urlsplit(url)
+        self.host = parts.hostname or '127.0.0.1'
+        self.port = parts.port or 80
+        self.sessions = sessions
+        self.operations = [name for name, weight in mix.items() if weight > 0]
+        self.weights = [mix[name] for name in self.operations]
+        self.concurrency = concurrency
+        self.report_interval = report_interval
+        self.max_backlog = max_backlog if max_backlog is not None else concurrency * 50
+        self.timeout = timeout
+        self.seed = seed
+        self.output = output
+        self.recorder = Recorder()
+        self._queue = queue.Queue()
+        self._dropped = 0
+        self._stop = threading.Event()
+
+    def _worker(self, index):
+        client = HttpClient(self.host, self.port, self.timeout)
+        rng = random.Random(self.seed * 1000 + index)
+        try:
+            while True:
+                scheduled = self._queue.get()
+                if scheduled is None:
+                    return
+                operation = rng.choices(self.operations, weights=self.weights)[0]
+                session = rng.choice(self.sessions)
+                try:
+                    status = OPERATIONS[operation](client, session, rng)
+                except Exception as e:
+                    status = type(e).__name__
+                self.recorder.record(operation, time.perf_counter() - scheduled, status)
+        finally:
+            client.close()
+
+    def _reporter(self, stage_start, target_rps):
+        last = stage_start
+        while not self._stop.wait(self.report_interval):
+            now = time.perf_counter()
+            window = summarize(self.recorder.take_window(), now - last)
+            last = now
+            self._print(f"[{now - stage_start:6.1f}s] 目标 {target_rps:7.1f} rps | 实际 {window['rps']:7.1f} rps | "
+                        f"错误 {window['error_rate']:6.2%} | p50 {window['p50_ms']:8.1f} | p95 {window['p95_ms']:8.1f} | "
+                        f"p99 {window['p99_ms']:8.1f} ms | 积压 {self._queue.qsize()}")
+
+    def _print(self, message):
+        print(message, file=self.output, flush=True)
+
+    def run_stage(self, rps, duration):
+        """
+        以固定RPS运行一个阶段
+
+        Args:
+            rps: 目标每秒请求数
+            duration: 持续时间（秒）
+
+        Returns:
+            dict: 阶段汇总，包括按操作的明细和错误分类
+        """
+        self._dropped = 0
+        self.recorder.take_window()
+        self.recorder.take_stage()
+        self._stop.clear()
+        workers = [threading.Thread(target=self._worker, args=(i,), daemon=True) for i in range(self.concurrency)]
+        for worker in workers:
+            worker.start()
+
+        start = time.perf_counter()
+        reporter = threading.Thread(target=self._reporter, args=(start, rps), daemon=True)
+        reporter.start()
+        total = int(rps * duration)
+        for i in range(total):
+            scheduled = start + i / rps
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            if self._queue.qsize() >= self.max_backlog:
+                self._dropped += 1
+                continue
+            self._queue.put(scheduled)
+        issued_seconds = max(time.perf_counter() - start, duration)
+
+        # 等待已发出的请求完成后再汇总
+        for _ in workers:
+            self._queue.put(None)
+        for worker in workers:
+            worker.join()
+        elapsed = time.perf_counter() - start
+        self._stop.set()
+        reporter.join()
+
+        items, errors = self.recorder.take_stage()
+        result = summarize(items, elapsed)
+        result.update({
+            'target_rps': rps,
+            'duration': round(issued_seconds, 2),
+            'dropped': self._dropped,
+            'errors': dict(errors.most_common()),
+            'operations': {}
+        })
+        by_operation = {}
+        for item in items:
+            by_operation.setdefault(item[0], []).append(item)
+        for name, operation_items in sorted(by_operation.items()):
+            result['operations'][name] = summarize(operation_items, elapsed)
+        return result
+
+    def print_stage(self, result):
+        self._print(f"阶段汇总: 目标 {result['target_rps']} rps, 实际 {result['rps']} rps, 请求 {result['requests']}, "
+                    f"错误率 {result['error_rate']:.2%}, 丢弃 {result['dropped']}, "
+                    f"p50/p95/p99 {result['p50_ms']}/{result['p95_ms']}/{result['p99_ms']} ms")
+        self._print(f"  {'操作':<16} | {'请求数':>7} | {'错误率':>7} | {'p50(ms)':>9} | {'p95(ms)':>9} | {'p99(ms)':>9}")
+        for name, summary in result['operations'].items():
+            self._print(f"  {name:<16} | {summary['requests']:>7} | {summary['error_rate']:>7.2%} | {summary['p50_ms']:>9.1f} | "
+                        f"{summary['p95_ms']:>9.1f} | {summary['p99_ms']:>9.1f}")
+        if result['errors']:
+            self._print(f"  错误分类: {result['errors']}")
+
+
+def is_saturated(result, max_error_rate=0.01, slo_ms=None, min_throughput=0.95):
+    """
+    判断一个阶段是否已经饱和：实际吞吐量达不到目标、错误率超限、请求被丢弃或p99超过SLO
+
+    Returns:
+        str: 饱和原因，未饱和时返回None
+    """
+    if result['dropped']:
+        return f"积压过多，丢弃了{result['dropped']}个请求"
+    if result['rps'] < result['target_rps'] * min_throughput:
+        return f"实际吞吐量{result['rps']}低于目标的{min_throughput:.0%}"
+    if result['error_rate'] > max_error_rate:
+        return f"错误率{result['error_rate']:.2%}超过{max_error_rate:.2%}"
+    if slo_ms is not None and result['p99_ms'] > slo_ms:
+        return f"p99延迟{result['p99_ms']}ms超过{slo_ms}ms"
+    return None
+
+
+def login_sessions(url, users, first_user, phone_prefix, password, concurrency, timeout=DEFAULT_TIMEOUT):
+    """
+    并发登录压测用户
+
+    Returns:
+        list: 登录成功且有账户和类型的UserSession
+    """
+    parts = urlsplit(url)
+    pending = queue.Queue()
+    for number in range(first_user, first_user + users):
+        pending.put(UserSession(f"{phone_prefix}{number:08d}", password))
+    ready = []
+    lock = threading.Lock()
+
+    def worker():
+        client = HttpClient(parts.hostname or '127.0.0.1', parts.port or 80, timeout)
+        try:
+            while True:
+                try:
+                    session = pending.get_nowait()
+                except queue.Empty:
+                    return
+                try:
+                    ok = session.setup(client)
+                except Exception:
+                    ok = False
+                if ok:
+                    with lock:
+                        ready.append(session)
+        finally:
+            client.close()
+
+    threads = [threading.Thread(target=worker, daemon=True) for _ in range(min(concurrency, users))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    # 按手机号排序，使相同的随机种子选择相同的会话
+    ready.sort(key=lambda session: session.phone)
+    return ready
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="按真实请求比例对运行中的服务进行压测")
+    parser.add_argument('--url', default='http://127.0.0.1:8080', help="服务地址")
+    parser.add_argument('--users', type=int, default=50, help="登录的压测用户数")
+    parser.add_argument('--first-user', type=int, default=1, help="第一个压测用户的编号")
+    parser.add_argument('--phone-prefix', default='139', help="压测用户手机号前缀，与生成器一致")
+    parser.add_argument('--password', default='password123', help="压测用户密码，与生成器一致")
+    parser.add_argument('--rps', type=float, default=20.0, help="目标每秒请求数（阶梯模式下为起始值）")
+    parser.add_argument('--duration', type=float, default=30.0, help="每个阶段的持续时间（秒）")
+    parser.add_argument('--ramp-to', type=float, default=None, help="阶梯模式：逐级提高RPS直到该值")
+    parser.add_argument('--step', type=float, default=None, help="阶梯模式：每级提高的RPS，默认为起始RPS")
+    parser.add_argument('--stop-on-saturation', action='store_true', help="阶梯模式：发现饱和后不再继续提高RPS")
+    parser.add_argument('--concurrency', type=int, default=32, help="压测线程数")
+    parser.add_argument('--mix', default=None, help="请求比例，如expend_list=30,expend_create=5；默认使用内置比例")
+    parser.add_argument('--report-interval', type=float, default=5.0, help="输出实时统计的间隔（秒）")
+    parser.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT, help="单个请求的超时时间（秒）")
+    parser.add_argument('--max-error-rate', type=float, default=0.01, help="判定饱和的错误率")
+    parser.add_argument('--slo-ms', type=float, default=None, help="判定饱和的p99延迟（毫秒）")
+    parser.add_argument('--seed', type=int, default=42, help="随机种子")
+    parser.add_argument('--output', default=None, help="把结果保存为JSON文件")
+    args = parser.parse_args(argv)
+
+    try:
+        mix = parse_mix(args.mix) if args.mix else dict(DEFAULT_MIX)
+    except ValueError as e:
+        parser.error(str(e))
+    if args.rps <= 0 or args.duration <= 0 or args.concurrency <= 0 or args.users <= 0:
+        parser.error("--rps、--duration、--concurrency和--users必须大于0")
+
+    print(f"登录{args.users}个压测用户...", flush=True)
+    sessions = login_sessions(args.url, args.users, args.first_user, args.phone_prefix, args.password, args.concurrency, args.timeout)
+    if not sessions:
+        print("没有可用的压测用户，请确认服务地址，并用sql/generate_data.py生成数据", file=sys.stderr)
+        return 1
+    print(f"{len(sessions)}个用户登录成功", flush=True)
+
+    stages = [args.rps]
+    if args.ramp_to is not None:
+        step = args.step or args.rps
+        while stages[-1] + step <= args.ramp_to + 1e-9:
+            stages.append(stages[-1] + step)
+
+    load_test = LoadTest(args.url, sessions, mix, args.concurrency, args.report_interval, timeout=args.timeout, seed=args.seed)
+    results = []
+    saturation = None
+    for rps in stages:
+        print(f"== 阶段: {rps} rps, {args.duration}秒 ==", flush=True)
+        result = load_test.run_stage(rps, args.duration)
+        load_test.print_stage(result)
+        reason = is_saturated(result, args.max_error_rate, args.slo_ms)
+        result['saturated'] = reason
+        results.append(result)
+        if reason and saturation is None:
+            saturation = {'target_rps': rps, 'reason': reason}
+            print(f"在{rps} rps饱和: {reason}", flush=True)
+            if args.stop_on_saturation:
+                break
+
+    if len(stages) > 1:
+        if saturation is None:
+            print(f"直到{stages[-1]} rps仍未饱和", flush=True)
+        else:
+            sustained = [result['rps'] for result in results if not result['saturated']]
+            print(f"饱和点: {saturation['target_rps']} rps（{saturation['reason']}），"
+                  f"未饱和阶段的最高吞吐量: {max(sustained) if sustained else 0} rps", flush=True)
+
+    if args.output:
+        document = {
+            'created_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'params': {key: value for key, value in vars(args).items() if key != 'password'},
+            'mix': mix,
+            'users': len(sessions),
+            'saturation': saturation,
+            'stages': results
+        }
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(document, f, ensure_ascii=False, indent=2)
+            f.write('\n')
+        print(f"结果已保存: {args.output}", flush=True)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
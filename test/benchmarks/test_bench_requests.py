@@ -0,0 +1,70 @@
+import pytest
+import sys
+import os
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from db.DatasetGenerator import DatasetGenerator
+from test.benchmarks.bench_requests import RequestBenchmark
+from test.benchmarks.harness import compare, load_baseline, percentile, save_baseline
+
+
+def test_request_benchmark_smoke(sqlite_database):
+    """
+    测试全部基准用例都能在SQLite后端上执行，每个请求的SQL语句数与预期一致
+    （语句数与机器无关，在常规测试中就能发现多出来的查询）
+    """
+    DatasetGenerator(seed=3).generate(users=5, accounts_per_user=2, expends=300, incomes=100)
+    results = RequestBenchmark().run(iterations=3, warmup=1, alloc_iterations=1)
+
+    assert len(results) == 23
+    for metrics in results.values():
+        assert metrics['p50_ms'] <= metrics['p95_ms'] <= metrics['p99_ms']
+        assert metrics['alloc_kb'] > 0
+
+    queries = {name: metrics['queries'] for name, metrics in results.items()}
+    assert queries['token_required_cached'] == 0
+    assert queries['token_required_uncached'] == 1
+    assert queries['api_expendtype_list'] == 0
+    assert queries['api_expend_list'] == 1
+    assert queries['api_income_get'] == 1
+    assert queries['dao_stats_totals'] == 1
+
+
+def test_compare_thresholds():
+    """
+    测试基线比较：耗时按比例判定并忽略噪声，SQL语句数增加即为回退，新增用例不参与比较
+    """
+    baseline = {
+        'list': {'p50_ms': 2.0, 'p95_ms': 4.0, 'p99_ms': 5.0, 'alloc_kb': 40.0, 'queries': 1},
+        'tiny': {'p50_ms': 0.01, 'p95_ms': 0.02, 'p99_ms': 0.03, 'alloc_kb': 1.0, 'queries': 0}
+    }
+    results = {
+        'list': {'p50_ms': 2.4, 'p95_ms': 5.5, 'p99_ms': 50.0, 'alloc_kb': 41.0, 'queries': 2},
+        'tiny': {'p50_ms': 0.03, 'p95_ms': 0.05, 'p99_ms': 0.09, 'alloc_kb': 1.0, 'queries': 0},
+        'new': {'p50_ms': 9.0, 'p95_ms': 9.0, 'p99_ms': 9.0, 'alloc_kb': 9.0, 'queries': 9}
+    }
+
+    assert compare(results, baseline, threshold=0.25) == [('list', 'p95_ms', 4.0, 5.5), ('list', 'queries', 1, 2)]
+    assert compare(results, baseline, threshold=0.5) == [('list', 'queries', 1, 2)]
+
+
+def test_baseline_round_trip(tmp_path):
+    """
+    测试基线文件的保存和读取，文件不存在时返回None
+    """
+    path = str(tmp_path / 'baselines' / 'bench.json')
+    assert load_baseline(path) is None
+
+    results = {'list': {'p50_ms': 2.0, 'p95_ms': 4.0, 'p99_ms': 5.0, 'alloc_kb': 40.0, 'queries': 1}}
+    save_baseline(path, results, {'users': 5})
+    assert load_baseline(path) == results
+
+
+def test_percentile():
+    samples = list(range(1, 101))
+    assert percentile(samples, 50) == 50
+    assert percentile(samples, 95) == 95
+    assert percentile(samples, 99) == 99
+    assert percentile([7], 99) == 7
@@ -0,0 +1,68 @@
+import pytest
+import io
+import sys
+import os
+import threading
+from werkzeug.serving import make_server
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from db.DatasetGenerator import DatasetGenerator
+from test.benchmarks.load_test import DEFAULT_MIX, LoadTest, OPERATIONS, is_saturated, login_sessions, parse_mix
+
+
+@pytest.fixture
+def live_server(sqlite_file_database, test_app):
+    """在后台线程中运行使用SQLite后端的服务，返回服务地址"""
+    DatasetGenerator(seed=5).generate(users=4, accounts_per_user=2, expends=200, incomes=50)
+    server = make_server('127.0.0.1', 0, test_app, threaded=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_port}"
+    finally:
+        server.shutdown()
+        thread.join()
+
+
+def test_load_test_against_live_server(live_server):
+    """
+    测试登录压测用户并运行一个阶段：全部请求成功，每个操作都被执行
+    """
+    sessions = login_sessions(live_server, users=5, first_user=1, phone_prefix='139', password='password123', concurrency=4)
+    # 第5个用户不存在
+    assert [session.phone for session in sessions] == [f"139{number:08d}" for number in range(1, 5)]
+    assert all(session.accounts and session.expend_type_ids for session in sessions)
+
+    output = io.StringIO()
+    mix = {name: 1 for name in OPERATIONS}
+    load_test = LoadTest(live_server, sessions, mix, concurrency=4, report_interval=0.5, output=output)
+    result = load_test.run_stage(rps=100, duration=1.5)
+
+    assert result['requests'] == 150
+    assert result['error_rate'] == 0, result['errors']
+    assert result['dropped'] == 0
+    assert set(result['operations']) == set(mix)
+    assert result['p50_ms'] <= result['p95_ms'] <= result['p99_ms']
+    assert '目标' in output.getvalue()
+
+
+def test_parse_mix():
+    assert parse_mix("expend_list=3, login, stats_summary=0.5") == {'expend_list': 3.0, 'login': 1.0, 'stats_summary': 0.5}
+    assert set(DEFAULT_MIX) <= set(OPERATIONS)
+    with pytest.raises(ValueError):
+        parse_mix("unknown=1")
+    with pytest.raises(ValueError):
+        parse_mix("expend_list=abc")
+    with pytest.raises(ValueError):
+        parse_mix("expend_list=0")
+
+
+def test_is_saturated():
+    result = {'target_rps': 100, 'rps': 99.0, 'error_rate': 0.0, 'dropped': 0, 'p99_ms': 80.0}
+    assert is_saturated(result) is None
+    assert is_saturated(result, slo_ms=50) is not None
+    assert is_saturated(dict(result, rps=80.0)) is not None
+    assert is_saturated(dict(result, error_rate=0.05)) is not None
+    assert is_saturated(dict(result, dropped=3)) is not None
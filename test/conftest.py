@@ -13,6 +13,17 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 from app import app
 from db.Database import Database
 from utils.ConfigManager import ConfigManager
+from utils.TokenCache import TokenCache
+
+
+@pytest.fixture(autouse=True)
+def clear_token_cache():
+    """
+    每个测试前后清空进程内的token校验缓存，避免前一个测试的鉴权结果影响后续测试
+    """
+    TokenCache.clear()
+    yield
+    TokenCache.clear()
 
 
 @pytest.fixture(scope='session')
@@ -86,6 +97,61 @@ def mock_database():
         yield mock_db
 
 
+def _use_sqlite_database(tmp_path, database):
+    """
+    把Database切换到SQLite后端，DAO执行真实的SQL，结束后恢复原来的连接池
+    """
+    from db.SQLiteBackend import SQLiteSchema
+    from dao.ExpendTypeDAO import ExpendTypeDAO
+    from dao.IncomeTypeDAO import IncomeTypeDAO
+    
+    config_file = tmp_path / 'DateBaseConfig.ini'
+    config_file.write_text(
+        "[app]\n"
+        "env = sqlite\n"
+        "\n"
+        "[sqlite]\n"
+        "driver = sqlite\n"
+        f"database = {database}\n"
+        "max_connections = 5\n"
+        "min_cached = 0\n",
+        encoding='utf-8'
+    )
+    saved = {name: getattr(Database, name) for name in ('pool', 'config_manager', 'driver', 'monitor', 'query_stats', 'acquire_timeout')}
+    Database.pool = None
+    Database.config_manager = None
+    try:
+        Database(str(config_file))
+        ExpendTypeDAO.catalog.clear()
+        IncomeTypeDAO.catalog.clear()
+        yield Database
+    finally:
+        if Database.pool is not None:
+            Database.pool.close()
+        SQLiteSchema.close_all()
+        ExpendTypeDAO.catalog.clear()
+        IncomeTypeDAO.catalog.clear()
+        for name, value in saved.items():
+            setattr(Database, name, value)
+
+
+@pytest.fixture(scope='function')
+def sqlite_database(tmp_path):
+    """
+    把Database切换到内存SQLite后端，DAO执行真实的SQL，测试结束后恢复原来的连接池
+    """
+    yield from _use_sqlite_database(tmp_path, ':memory:')
+
+
+@pytest.fixture(scope='function')
+def sqlite_file_database(tmp_path):
+    """
+    与sqlite_database相同，但使用临时目录中的数据库文件。内存数据库的共享缓存在并发写入时
+    直接报表被锁定，文件数据库（WAL模式）按busy_timeout等待写锁，用于多线程并发请求的测试
+    """
+    yield from _use_sqlite_database(tmp_path, tmp_path / 'bill_db.sqlite3')
+
+
 @pytest.fixture(scope='function')
 def mock_config_manager():
     """
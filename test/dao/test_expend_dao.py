@@ -1,5 +1,6 @@
 import pytest
 import decimal
+from datetime import date
 from dao.ExpendDAO import ExpendDAO
 from unittest.mock import patch, MagicMock
 import sys
@@ -28,38 +29,23 @@ def test_expend_data():
 
 
 @pytest.fixture(scope='function')
-def mock_account_data():
+def mock_expend_type_catalog():
     """
-    提供测试用的账户数据
+    模拟已缓存的消费类型目录，只包含ID为1的消费类型
     """
-    return {
-        'id': 1,
-        'account_name': '测试账户',
-        'balance': decimal.Decimal('1000'),
-        'user_id': 1,
-        'remark': '测试账户备注',
-        'create_time': '2023-01-01 12:00:00',
-        'enable': True
-    }
+    with patch('dao.ExpendDAO.ExpendTypeDAO.catalog') as mock_catalog:
+        mock_catalog.current.return_value = (((1, '餐饮', True),), {1: (1, '餐饮', True)})
+        yield mock_catalog
 
 
-def test_create_expend_success(mock_database, test_expend_data, mock_account_data):
+def test_create_expend_success(mock_database, mock_expend_type_catalog, test_expend_data):
     """
     测试创建支出记录成功
     """
     # 配置模拟
     mock_cursor = mock_database.cur
     mock_cursor.lastrowid = test_expend_data['id']
-    mock_cursor.rowcount = 1
-    
-    # 模拟查询账户成功
-    mock_database.cur.fetchone.side_effect = [
-        (mock_account_data['id'], mock_account_data['account_name'], mock_account_data['balance'], 
-         mock_account_data['user_id'], mock_account_data['remark'], mock_account_data['create_time'], 
-         mock_account_data['enable']),  # 查询账户返回结果
-        (1, "食品", 1),  # 查询支出类型返回结果
-        None  # 其他fetchone调用返回None
-    ]
+    mock_cursor.rowcount = 1  # 条件扣减余额成功
     
     # 创建DAO实例
     expend_dao = ExpendDAO()
@@ -82,17 +68,32 @@ def test_create_expend_success(mock_database, test_expend_data, mock_account_dat
     
     # 验证调用
     assert mock_database.connect.call_count == 1
-    assert mock_database.cur.execute.call_count == 5  # START TRANSACTION, 查询账户, 查询支出类型, 插入支出记录, 更新账户余额
+    assert mock_database.cur.execute.call_count == 4  # START TRANSACTION, 条件扣减余额, 插入支出记录, 更新日汇总
+    mock_expend_type_catalog.refresh.assert_not_called()  # 支出类型从缓存中校验
     assert mock_database.commit.call_count == 1
     assert mock_database.disconnect.call_count == 1
+    
+    # 验证日汇总在同一事务中累加
+    rollup_query, rollup_params = mock_database.cur.execute.call_args_list[3][0]
+    assert rollup_query.startswith("INSERT INTO expend_daily")
+    assert "ON DUPLICATE KEY UPDATE" in rollup_query
+    assert rollup_params == (test_expend_data['user_id'], date(2023, 1, 1), test_expend_data['account_id'],
+                             test_expend_data['expend_type_id'], 1, decimal.Decimal('100'))
+    
+    # 验证余额在SQL中原子扣减，且要求余额充足
+    update_query, update_params = mock_database.cur.execute.call_args_list[1][0]
+    assert "balance = balance + %s" in update_query
+    assert "balance >= %s" in update_query
+    assert update_params == (decimal.Decimal('-100'), test_expend_data['account_id'], test_expend_data['user_id'], decimal.Decimal('100'))
 
 
-def test_create_expend_account_not_found(mock_database, test_expend_data):
+def test_create_expend_account_not_found(mock_database, mock_expend_type_catalog, test_expend_data):
     """
     测试创建支出记录失败 - 账户不存在
     """
-    # 配置模拟 - 账户不存在
-    mock_database.cur.fetchone.return_value = None  # 查询账户返回None
+    # 配置模拟 - 账户不存在，条件扣减没有更新任何行
+    mock_database.cur.rowcount = 0
+    mock_database.cur.fetchone.return_value = None  # 查询账户余额返回None
     
     # 创建DAO实例
     expend_dao = ExpendDAO()
@@ -115,23 +116,17 @@ def test_create_expend_account_not_found(mock_database, test_expend_data):
     
     # 验证调用
     assert mock_database.connect.call_count == 1
-    assert mock_database.cur.execute.call_count == 2  # START TRANSACTION, 查询账户
+    assert mock_database.cur.execute.call_count == 3  # START TRANSACTION, 条件扣减余额, 查询账户余额
     assert mock_database.rollback.call_count == 1
     assert mock_database.disconnect.call_count == 1
 
 
-def test_create_expend_type_not_found(mock_database, test_expend_data, mock_account_data):
+def test_create_expend_type_not_found(mock_database, mock_expend_type_catalog, test_expend_data):
     """
     测试创建支出记录失败 - 支出类型不存在
     """
-    # 配置模拟 - 支出类型不存在
-    mock_database.cur.fetchone.side_effect = [
-        (mock_account_data['id'], mock_account_data['account_name'], mock_account_data['balance'], 
-         mock_account_data['user_id'], mock_account_data['remark'], mock_account_data['create_time'], 
-         mock_account_data['enable']),  # 查询账户返回结果
-        None,  # 查询支出类型返回None
-        None
-    ]
+    # 配置模拟 - 缓存中没有该支出类型
+    mock_expend_type_catalog.current.return_value = ((), {})
     
     # 创建DAO实例
     expend_dao = ExpendDAO()
@@ -154,20 +149,45 @@ def test_create_expend_type_not_found(mock_database, test_expend_data, mock_acco
     
     # 验证调用
     assert mock_database.connect.call_count == 1
-    assert mock_database.cur.execute.call_count == 3  # START TRANSACTION, 查询账户, 查询支出类型
+    assert mock_database.cur.execute.call_count == 1  # START TRANSACTION
     assert mock_database.rollback.call_count == 1
     assert mock_database.disconnect.call_count == 1
 
 
-def test_create_expend_account_balance_not_enough(mock_database, test_expend_data, mock_account_data):
+def test_create_expend_refreshes_stale_type_catalog(mock_database, mock_expend_type_catalog, test_expend_data):
+    """
+    测试类型缓存需要重新校验时复用本事务的游标刷新
+    """
+    # 配置模拟 - 缓存过期，刷新后没有该支出类型
+    mock_expend_type_catalog.current.return_value = None
+    mock_expend_type_catalog.refresh.return_value = ((), {})
+    
+    expend_dao = ExpendDAO()
+    
+    success, expend_id, error_msg = expend_dao.create_expend(
+        test_expend_data['money'],
+        test_expend_data['account_id'],
+        test_expend_data['user_id'],
+        test_expend_data['remark'],
+        test_expend_data['expend_time'],
+        test_expend_data['expend_type_id'],
+        True
+    )
+    
+    assert success is False
+    assert error_msg == "支出类型不存在"
+    mock_expend_type_catalog.refresh.assert_called_once_with(mock_database.cur)
+    assert mock_database.connect.call_count == 1
+
+
+def test_create_expend_account_balance_not_enough(mock_database, mock_expend_type_catalog, test_expend_data):
     """
     测试创建支出记录失败 - 账户余额不足
     """
-    # 配置模拟 - 账户余额不足
+    # 配置模拟 - 账户余额不足，条件扣减没有更新任何行
+    mock_database.cur.rowcount = 0
     mock_database.cur.fetchone.side_effect = [
-        (mock_account_data['id'], mock_account_data['account_name'], decimal.Decimal('50'),  # 余额不足
-         mock_account_data['user_id'], mock_account_data['remark'], mock_account_data['create_time'], 
-         mock_account_data['enable']),  # 查询账户返回结果
+        (decimal.Decimal('50'),),  # 查询账户余额返回结果（余额不足）
         None
     ]
     
@@ -192,7 +212,7 @@ def test_create_expend_account_balance_not_enough(mock_database, test_expend_dat
     
     # 验证调用
     assert mock_database.connect.call_count == 1
-    assert mock_database.cur.execute.call_count == 2  # START TRANSACTION, 查询账户
+    assert mock_database.cur.execute.call_count == 3  # START TRANSACTION, 条件扣减余额, 查询账户余额
     assert mock_database.rollback.call_count == 1
     assert mock_database.disconnect.call_count == 1
 
@@ -202,11 +222,10 @@ def test_update_expend_account_not_found(mock_database, test_expend_data):
     测试更新支出记录失败 - 账户不存在
     """
     # 配置模拟 - 原支出记录存在，但账户不存在
+    mock_database.cur.rowcount = 0
     mock_database.cur.fetchone.side_effect = [
-        (test_expend_data['id'], 50, test_expend_data['account_id'], test_expend_data['user_id'], 
-         test_expend_data['remark'], test_expend_data['expend_time'], test_expend_data['create_time'], 
-         test_expend_data['enable'], test_expend_data['expend_type_id']),  # 原支出记录
-        None,  # 查询账户返回None
+        (50, test_expend_data['account_id'], test_expend_data['expend_time'], 1, True),  # 原支出记录
+        None,  # 查询账户余额返回None
         None
     ]
     
@@ -226,21 +245,60 @@ def test_update_expend_account_not_found(mock_database, test_expend_data):
     
     # 验证调用
     assert mock_database.connect.call_count == 1
-    assert mock_database.cur.execute.call_count == 4  # 查询原支出记录, 开始事务, 更新支出记录, 查询账户
+    assert mock_database.cur.execute.call_count == 4  # 开始事务, 锁定原支出记录, 条件调整余额, 查询账户余额
     assert mock_database.rollback.call_count == 1
     assert mock_database.disconnect.call_count == 1
 
 
+def test_update_expend_change_account_in_id_order(mock_database, test_expend_data):
+    """
+    测试更新支出记录的账户时按账户ID顺序调整两个账户的余额
+    """
+    # 配置模拟 - 原支出记录属于账户5，改为账户2
+    mock_database.cur.rowcount = 1
+    mock_database.cur.fetchone.side_effect = [
+        (50, 5, test_expend_data['expend_time'], 1, True),  # 原支出记录
+        None
+    ]
+    
+    # 创建DAO实例
+    expend_dao = ExpendDAO()
+    
+    # 执行测试
+    success, error_msg = expend_dao.update_expend(
+        test_expend_data['id'],
+        test_expend_data['user_id'],
+        money=80,
+        account_id=2
+    )
+    
+    # 验证结果
+    assert success is True
+    assert error_msg is None
+    
+    # 验证调用：开始事务, 锁定原支出记录, 扣减账户2, 恢复账户5, 更新支出记录, 从账户5的日汇总移出,
+    # 删除账户5记录数为0的日汇总行, 计入账户2的日汇总
+    calls = mock_database.cur.execute.call_args_list
+    assert len(calls) == 8
+    assert "FOR UPDATE" in calls[1][0][0]
+    assert calls[2][0][1] == (decimal.Decimal('-80'), 2, test_expend_data['user_id'], decimal.Decimal('80'))
+    assert calls[3][0][1] == (decimal.Decimal('50'), 5, test_expend_data['user_id'])
+    assert calls[4][0][0].startswith("UPDATE expend SET")
+    assert calls[5][0][1] == (test_expend_data['user_id'], date(2023, 1, 1), 5, 1, -1, decimal.Decimal('-50'))
+    assert calls[6][0][0].startswith("DELETE FROM expend_daily")
+    assert calls[7][0][1] == (test_expend_data['user_id'], date(2023, 1, 1), 2, 1, 1, decimal.Decimal('80'))
+    assert mock_database.commit.call_count == 1
+
+
 def test_delete_expend_account_not_found(mock_database, test_expend_data):
     """
     测试删除支出记录失败 - 账户不存在
     """
     # 配置模拟 - 支出记录存在，但账户不存在
+    mock_database.cur.rowcount = 0
     mock_database.cur.fetchone.side_effect = [
-        (test_expend_data['id'], test_expend_data['money'], test_expend_data['account_id'], 
-         test_expend_data['user_id'], test_expend_data['remark'], test_expend_data['expend_time'], 
-         test_expend_data['create_time'], test_expend_data['enable'], test_expend_data['expend_type_id']),  # 支出记录
-        None,  # 查询账户返回None
+        (test_expend_data['money'], test_expend_data['account_id'], test_expend_data['expend_time'], 1, True),  # 支出记录
+        None,  # 查询账户余额返回None
         None
     ]
     
@@ -259,6 +317,6 @@ def test_delete_expend_account_not_found(mock_database, test_expend_data):
     
     # 验证调用
     assert mock_database.connect.call_count == 1
-    assert mock_database.cur.execute.call_count == 4  # 开始事务, 查询支出记录, 删除支出记录, 查询账户
+    assert mock_database.cur.execute.call_count == 5  # 开始事务, 锁定支出记录, 删除支出记录, 恢复余额, 查询账户余额
     assert mock_database.rollback.call_count == 1
     assert mock_database.disconnect.call_count == 1
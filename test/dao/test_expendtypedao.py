@@ -1,6 +1,6 @@
 import pytest
 from dao.ExpendTypeDAO import ExpendTypeDAO
-from unittest.mock import patch
+from unittest.mock import patch, MagicMock
 import sys
 import os
 
@@ -8,6 +8,16 @@ import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
 
 
+@pytest.fixture(autouse=True)
+def clear_expend_type_catalog():
+    """
+    每个测试前后清空进程内共享的消费类型缓存
+    """
+    ExpendTypeDAO.catalog.clear()
+    yield
+    ExpendTypeDAO.catalog.clear()
+
+
 def test_create_expend_type_success(mock_database, test_expend_type_data):
     """
     测试创建消费类型成功
@@ -193,15 +203,14 @@ def test_delete_expend_type_not_found(mock_database, test_expend_type_data):
 
 def test_get_expend_type_by_id_found(mock_database, test_expend_type_data):
     """
-    测试根据ID查询消费类型成功
+    测试根据ID查询消费类型成功，缓存为空时加载整张类型表
     """
-    # 配置模拟 - 返回测试数据
+    # 配置模拟 - 版本号和类型表
     mock_cursor = mock_database.cur
-    mock_cursor.fetchone.return_value = (
-        test_expend_type_data['id'],
-        test_expend_type_data['expend_type_name'],
-        test_expend_type_data['enable']
-    )
+    mock_cursor.fetchone.return_value = (3,)
+    mock_cursor.fetchall.return_value = [
+        (test_expend_type_data['id'], test_expend_type_data['expend_type_name'], test_expend_type_data['enable'])
+    ]
     
     # 创建DAO实例
     expend_type_dao = ExpendTypeDAO()
@@ -215,9 +224,11 @@ def test_get_expend_type_by_id_found(mock_database, test_expend_type_data):
     assert expend_type[1] == test_expend_type_data['expend_type_name']
     assert expend_type[2] == test_expend_type_data['enable']
     
-    # 验证调用
+    # 验证调用 - 先读版本号再加载类型表
     mock_database.connect.assert_called_once()
-    mock_database.execute.assert_called_once()
+    queries = [call.args[0] for call in mock_cursor.execute.call_args_list]
+    assert queries[0].startswith("SELECT expend_type_version FROM config_version")
+    assert queries[1] == "SELECT * FROM expend_type ORDER BY id"
     mock_database.disconnect.assert_called_once()
 
 
@@ -225,9 +236,10 @@ def test_get_expend_type_by_id_not_found(mock_database, test_expend_type_data):
     """
     测试根据ID查询消费类型未找到
     """
-    # 配置模拟 - 返回None
+    # 配置模拟 - 类型表为空
     mock_cursor = mock_database.cur
-    mock_cursor.fetchone.return_value = None
+    mock_cursor.fetchone.return_value = (3,)
+    mock_cursor.fetchall.return_value = []
     
     # 创建DAO实例
     expend_type_dao = ExpendTypeDAO()
@@ -240,16 +252,16 @@ def test_get_expend_type_by_id_not_found(mock_database, test_expend_type_data):
     
     # 验证调用
     mock_database.connect.assert_called_once()
-    mock_database.execute.assert_called_once()
     mock_database.disconnect.assert_called_once()
 
 
 def test_get_all_expend_types(mock_database, test_expend_type_data):
     """
-    测试查询所有消费类型
+    测试查询所有消费类型，校验间隔内再次查询直接使用缓存
     """
     # 配置模拟 - 返回多条测试数据
     mock_cursor = mock_database.cur
+    mock_cursor.fetchone.return_value = (3,)
     mock_cursor.fetchall.return_value = [
         (test_expend_type_data['id'], test_expend_type_data['expend_type_name'], test_expend_type_data['enable']),
         (2, "交通", True),
@@ -268,10 +280,11 @@ def test_get_all_expend_types(mock_database, test_expend_type_data):
     assert expend_types[1][1] == "交通"
     assert expend_types[2][2] == True
     
-    # 验证调用
+    # 再次查询不访问数据库
+    assert expend_type_dao.get_all_expend_types() == expend_types
+    assert expend_type_dao.get_expend_type_by_id(2) == (2, "交通", True)
     mock_database.connect.assert_called_once()
-    mock_database.execute.assert_called_once()
-    mock_database.disconnect.assert_called_once()
+    assert mock_cursor.execute.call_count == 2
 
 
 def test_get_all_expend_types_empty(mock_database):
@@ -280,6 +293,7 @@ def test_get_all_expend_types_empty(mock_database):
     """
     # 配置模拟 - 返回空列表
     mock_cursor = mock_database.cur
+    mock_cursor.fetchone.return_value = (3,)
     mock_cursor.fetchall.return_value = None
     
     # 创建DAO实例
@@ -293,5 +307,44 @@ def test_get_all_expend_types_empty(mock_database):
     
     # 验证调用
     mock_database.connect.assert_called_once()
-    mock_database.execute.assert_called_once()
     mock_database.disconnect.assert_called_once()
+
+
+def test_update_expend_type_bumps_version_in_transaction(mock_database, test_expend_type_data):
+    """
+    测试修改类型时在同一事务中递增版本号后提交，并清除缓存
+    """
+    mock_cursor = mock_database.cur
+    mock_cursor.fetchone.return_value = (3,)
+    mock_cursor.fetchall.return_value = [(1, "餐饮", True)]
+    mock_cursor.rowcount = 1
+    
+    expend_type_dao = ExpendTypeDAO()
+    expend_type_dao.get_all_expend_types()
+    
+    # 执行测试
+    assert expend_type_dao.update_expend_type(test_expend_type_data['id'], "交通") is True
+    
+    # 验证结果 - 版本号在提交之前于同一游标上递增，下次查询重新加载
+    upsert_sql = mock_cursor.execute.call_args[0][0]
+    assert "INSERT INTO config_version" in upsert_sql
+    assert "expend_type_version = expend_type_version + 1" in upsert_sql
+    mock_database.commit.assert_called_once()
+    assert ExpendTypeDAO.catalog.current() is None
+    mock_cursor.fetchall.return_value = [(1, "餐饮", True), (2, "交通", True)]
+    assert len(expend_type_dao.get_all_expend_types()) == 2
+
+
+def test_create_expend_type_rolls_back_when_version_bump_fails(mock_database, test_expend_type_data):
+    """
+    测试版本号递增失败时回滚类型修改，不提交
+    """
+    mock_database.cur.execute.side_effect = Exception("版本号更新失败")
+    
+    expend_type_dao = ExpendTypeDAO()
+    success, expend_type_id = expend_type_dao.create_expend_type(test_expend_type_data['expend_type_name'])
+    
+    assert success is False
+    assert expend_type_id == 0
+    mock_database.commit.assert_not_called()
+    mock_database.rollback.assert_called_once()
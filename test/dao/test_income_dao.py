@@ -1,5 +1,6 @@
 import pytest
 import decimal
+from datetime import date
 from dao.IncomeDAO import IncomeDAO
 from unittest.mock import patch, MagicMock
 import sys
@@ -27,43 +28,20 @@ def test_income_data():
     }
 
 
-@pytest.fixture(scope='function')
-def mock_account_data():
-    """
-    提供测试用的账户数据
-    """
-    return {
-        'id': 1,
-        'account_name': '测试账户',
-        'balance': decimal.Decimal('1000'),
-        'user_id': 1,
-        'remark': '测试账户备注',
-        'create_time': '2023-01-01 12:00:00',
-        'enable': True
-    }
-
-
-def test_create_income_success(mock_database, test_income_data, mock_account_data):
+def test_create_income_success(mock_database, test_income_data):
     """
     测试创建收入记录成功
     """
     # 配置模拟
     mock_cursor = mock_database.cur
     mock_cursor.lastrowid = test_income_data['id']
-    mock_cursor.rowcount = 1
+    mock_cursor.rowcount = 1  # 增加余额成功
     
-    # 模拟查询账户成功
     mock_cursor.execute.side_effect = [
         True,  # 第一次execute是START TRANSACTION
-        True,  # 第二次execute是查询账户
+        True,  # 第二次execute是增加账户余额
         True,  # 第三次execute是插入收入记录
-        True   # 第四次execute是更新账户余额
-    ]
-    mock_database.cur.fetchone.side_effect = [
-        (mock_account_data['id'], mock_account_data['account_name'], mock_account_data['balance'], 
-         mock_account_data['user_id'], mock_account_data['remark'], mock_account_data['create_time'], 
-         mock_account_data['enable']),  # 查询账户返回结果
-        None  # 其他fetchone调用返回None
+        True   # 第四次execute是更新日汇总
     ]
     
     # 创建DAO实例
@@ -86,19 +64,26 @@ def test_create_income_success(mock_database, test_income_data, mock_account_dat
     
     # 验证调用
     assert mock_database.connect.call_count == 1
-    assert mock_database.cur.execute.call_count == 4  # START TRANSACTION, 查询账户, 插入收入记录, 更新账户余额
+    assert mock_database.cur.execute.call_count == 4  # START TRANSACTION, 增加账户余额, 插入收入记录, 更新日汇总
     assert mock_database.commit.call_count == 1
     assert mock_database.disconnect.call_count == 1
+    
+    # 验证余额在SQL中原子增加
+    update_query, update_params = mock_database.cur.execute.call_args_list[1][0]
+    assert "balance = balance + %s" in update_query
+    assert update_params == (decimal.Decimal('100'), test_income_data['account_id'], test_income_data['user_id'])
 
 
 def test_create_income_account_not_found(mock_database, test_income_data):
     """
     测试创建收入记录失败 - 账户不存在
     """
-    # 配置模拟 - 账户不存在
+    # 配置模拟 - 账户不存在，增加余额没有更新任何行
+    mock_database.cur.rowcount = 0
     mock_database.cur.execute.side_effect = [
         True,  # START TRANSACTION
-        True,  # 查询账户
+        True,  # 增加账户余额
+        True,  # 查询账户余额
     ]
     mock_database.cur.fetchone.return_value = None  # 查询账户返回None
     
@@ -122,12 +107,12 @@ def test_create_income_account_not_found(mock_database, test_income_data):
     
     # 验证调用
     assert mock_database.connect.call_count == 1
-    assert mock_database.cur.execute.call_count == 2  # START TRANSACTION, 查询账户
+    assert mock_database.cur.execute.call_count == 3  # START TRANSACTION, 增加账户余额, 查询账户余额
     assert mock_database.rollback.call_count == 1
     assert mock_database.disconnect.call_count == 1
 
 
-def test_update_income_success(mock_database, test_income_data, mock_account_data):
+def test_update_income_success(mock_database, test_income_data):
     """
     测试更新收入记录成功
     """
@@ -135,21 +120,16 @@ def test_update_income_success(mock_database, test_income_data, mock_account_dat
     mock_cursor = mock_database.cur
     mock_cursor.rowcount = 1
     
-    # 模拟查询原收入记录和账户
+    # 模拟锁定原收入记录
     mock_database.cur.execute.side_effect = [
-        True,  # 查询原收入记录
         True,  # 开始事务
+        True,  # 锁定原收入记录
+        True,  # 调整账户余额
         True,  # 更新收入记录
-        True   # 更新账户余额
+        True   # 调整日汇总金额
     ]
-    mock_database.execute.return_value = True  # 初始查询原收入记录
     mock_database.cur.fetchone.side_effect = [
-        (test_income_data['id'], 50, test_income_data['account_id'], test_income_data['user_id'], 
-         test_income_data['remark'], test_income_data['income_time'], test_income_data['create_time'], 
-         test_income_data['enable'], test_income_data['income_type_id']),  # 原收入记录
-        (mock_account_data['id'], mock_account_data['account_name'], decimal.Decimal('1050'), 
-         mock_account_data['user_id'], mock_account_data['remark'], mock_account_data['create_time'], 
-         mock_account_data['enable']),  # 账户信息
+        (50, test_income_data['account_id'], test_income_data['income_time'], 1, True),  # 原收入记录
         None
     ]
     
@@ -168,13 +148,22 @@ def test_update_income_success(mock_database, test_income_data, mock_account_dat
     
     # 验证调用
     assert mock_database.connect.call_count == 1
-    assert mock_database.execute.call_count == 1  # 初始查询原收入记录
-    assert mock_database.cur.execute.call_count == 4  # 查询原收入记录, 开始事务, 更新收入记录, 更新账户余额
+    assert mock_database.execute.call_count == 0
+    assert mock_database.cur.execute.call_count == 5  # 开始事务, 锁定原收入记录, 调整账户余额, 更新收入记录, 调整日汇总金额
     assert mock_database.commit.call_count == 1
     assert mock_database.disconnect.call_count == 1
+    
+    # 验证按金额差值调整余额
+    update_query, update_params = mock_database.cur.execute.call_args_list[2][0]
+    assert update_params == (decimal.Decimal('50'), test_income_data['account_id'], test_income_data['user_id'])
+    
+    # 验证汇总键不变时只调整日汇总的金额，不改变笔数
+    rollup_query, rollup_params = mock_database.cur.execute.call_args_list[4][0]
+    assert rollup_query.startswith("INSERT INTO income_daily")
+    assert rollup_params == (test_income_data['user_id'], date(2023, 1, 1), test_income_data['account_id'], 1, 0, decimal.Decimal('50'))
 
 
-def test_delete_income_success(mock_database, test_income_data, mock_account_data):
+def test_delete_income_success(mock_database, test_income_data):
     """
     测试删除收入记录成功
     """
@@ -182,21 +171,17 @@ def test_delete_income_success(mock_database, test_income_data, mock_account_dat
     mock_cursor = mock_database.cur
     mock_cursor.rowcount = 1
     
-    # 模拟查询收入记录和账户
+    # 模拟锁定收入记录
     mock_database.cur.execute.side_effect = [
         True,  # 开始事务
-        True,  # 查询收入记录
+        True,  # 锁定收入记录
         True,  # 删除收入记录
-        True,  # 查询账户
-        True   # 更新账户余额
+        True,  # 减少账户余额
+        True,  # 扣除日汇总
+        True   # 删除记录数为0的日汇总行
     ]
     mock_database.cur.fetchone.side_effect = [
-        (test_income_data['id'], test_income_data['money'], test_income_data['account_id'], 
-         test_income_data['user_id'], test_income_data['remark'], test_income_data['income_time'], 
-         test_income_data['create_time'], test_income_data['enable'], test_income_data['income_type_id']),  # 收入记录
-        (mock_account_data['id'], mock_account_data['account_name'], decimal.Decimal('1100'), 
-         mock_account_data['user_id'], mock_account_data['remark'], mock_account_data['create_time'], 
-         mock_account_data['enable']),  # 账户信息
+        (test_income_data['money'], test_income_data['account_id'], test_income_data['income_time'], 1, True),  # 收入记录
         None
     ]
     
@@ -214,7 +199,13 @@ def test_delete_income_success(mock_database, test_income_data, mock_account_dat
     
     # 验证调用
     assert mock_database.connect.call_count == 1
-    assert mock_database.cur.execute.call_count == 5  # 开始事务, 查询收入记录, 删除收入记录, 查询账户, 更新账户余额
+    # 开始事务, 锁定收入记录, 删除收入记录, 减少账户余额, 扣除日汇总, 删除记录数为0的日汇总行
+    assert mock_database.cur.execute.call_count == 6
+    rollup_query, rollup_params = mock_database.cur.execute.call_args_list[4][0]
+    assert rollup_params == (test_income_data['user_id'], date(2023, 1, 1), test_income_data['account_id'], 1, -1, decimal.Decimal('-100'))
+    cleanup_query, cleanup_params = mock_database.cur.execute.call_args_list[5][0]
+    assert cleanup_query.startswith("DELETE FROM income_daily")
+    assert cleanup_params == (test_income_data['user_id'], date(2023, 1, 1), test_income_data['account_id'], 1)
     assert mock_database.commit.call_count == 1
     assert mock_database.disconnect.call_count == 1
 
@@ -282,3 +273,60 @@ def test_get_incomes_by_user_id_success(mock_database, test_income_data):
     assert mock_database.connect.call_count == 1
     assert mock_database.execute.call_count == 1
     assert mock_database.disconnect.call_count == 1
+
+
+def test_get_incomes_by_user_id_keyset_page(mock_database, test_income_data):
+    """
+    测试按游标分页查询收入记录列表生成键集分页条件
+    """
+    # 配置模拟 - 查询成功
+    mock_database.execute.return_value = True
+    mock_database.cur.fetchall.return_value = []
+    
+    # 创建DAO实例
+    income_dao = IncomeDAO()
+    
+    # 执行测试
+    incomes = income_dao.get_incomes_by_user_id(
+        test_income_data['user_id'], limit=21, cursor=('2023-01-02 12:00:00', 5)
+    )
+    
+    # 验证结果
+    assert incomes == []
+    query, params = mock_database.execute.call_args[0]
+    assert "(income_time < %s OR (income_time = %s AND id < %s) OR income_time IS NULL)" in query
+    assert query.endswith("ORDER BY income_time DESC, id DESC LIMIT %s")
+    assert params == (test_income_data['user_id'], '2023-01-02 12:00:00', '2023-01-02 12:00:00', 5, 21)
+    
+    # 游标位于收入时间为空的记录中时，只在这些记录中按ID继续
+    income_dao.get_incomes_by_user_id(test_income_data['user_id'], limit=21, cursor=(None, 5))
+    query, params = mock_database.execute.call_args[0]
+    assert "AND income_time IS NULL AND id < %s ORDER BY" in query
+    assert params == (test_income_data['user_id'], 5, 21)
+
+
+def test_get_incomes_by_user_id_with_filters(mock_database, test_income_data):
+    """
+    测试按账户、时间范围、金额范围和可用状态过滤收入记录列表
+    """
+    # 配置模拟 - 查询成功
+    mock_database.execute.return_value = True
+    mock_database.cur.fetchall.return_value = []
+    
+    # 创建DAO实例
+    income_dao = IncomeDAO()
+    
+    # 执行测试
+    income_dao.get_incomes_by_user_id(
+        test_income_data['user_id'], account_id=2, start_time='2023-01-01 00:00:00', end_time='2023-01-31 23:59:59',
+        min_money=10, max_money=500, enable=True, limit=21
+    )
+    
+    # 验证调用
+    query, params = mock_database.execute.call_args[0]
+    assert "account_id = %s" in query
+    assert "income_type_id" not in query
+    assert "income_time >= %s AND income_time <= %s" in query
+    assert "money >= %s AND money <= %s AND enable = %s" in query
+    assert params == (test_income_data['user_id'], 2, '2023-01-01 00:00:00', '2023-01-31 23:59:59', 10, 500, True, 21)
+
@@ -0,0 +1,89 @@
+import pytest
+import decimal
+from datetime import date, datetime
+from dao.RollupDAO import RollupDAO
+from unittest.mock import patch, MagicMock
+import sys
+import os
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+
+@pytest.fixture(scope='function')
+def mock_rollup_db():
+    """
+    创建模拟的数据库连接
+    """
+    with patch('dao.RollupDAO.Database') as mock_db_class:
+        mock_db = MagicMock()
+        mock_db.connect.return_value = True
+        mock_db_class.return_value = mock_db
+        yield mock_db
+
+
+def test_replace_moves_record_between_days():
+    """
+    测试修改记录时间后从原日期的汇总移到新日期的汇总
+    """
+    cur = MagicMock()
+
+    RollupDAO.replace(cur, 'expend', 1,
+                      (100, 2, datetime(2023, 1, 1, 12, 0, 0), 3, True),
+                      (100, 2, datetime(2023, 1, 2, 9, 0, 0), 3, True))
+
+    params = [call.args[1] for call in cur.execute.call_args_list]
+    assert params == [
+        (1, date(2023, 1, 1), 2, 3, -1, decimal.Decimal('-100')),
+        (1, date(2023, 1, 1), 2, 3),
+        (1, date(2023, 1, 2), 2, 3, 1, decimal.Decimal('100'))
+    ]
+    # 扣除后删除原日期上记录数为0的汇总行
+    assert cur.execute.call_args_list[1].args[0].startswith("DELETE FROM expend_daily")
+    assert cur.execute.call_args_list[1].args[0].endswith("AND record_count <= 0")
+
+
+def test_replace_disable_only_removes_record():
+    """
+    测试把记录改为不可用时只从汇总中扣除，修改备注等不影响汇总的字段时不写汇总
+    """
+    cur = MagicMock()
+
+    RollupDAO.replace(cur, 'income', 1,
+                      (100, 2, '2023-01-01 12:00:00', None, True),
+                      (100, 2, '2023-01-01 12:00:00', None, False))
+    assert cur.execute.call_count == 2
+    query, params = cur.execute.call_args_list[0].args
+    assert query.startswith("INSERT INTO income_daily")
+    assert params == (1, date(2023, 1, 1), 2, 0, -1, decimal.Decimal('-100'))
+    query, params = cur.execute.call_args_list[1].args
+    assert query.startswith("DELETE FROM income_daily")
+    assert params == (1, date(2023, 1, 1), 2, 0)
+
+    cur.reset_mock()
+    RollupDAO.replace(cur, 'income', 1,
+                      (100, 2, '2023-01-01 12:00:00', 1, True),
+                      (100, 2, '2023-01-01 12:00:00', 1, True))
+    cur.execute.assert_not_called()
+
+
+def test_rebuild_for_user(mock_rollup_db):
+    """
+    测试重建指定用户的日汇总：在一个事务中先删除再从原始记录汇总写入
+    """
+    # 创建DAO实例
+    rollup_dao = RollupDAO()
+
+    # 执行测试
+    assert rollup_dao.rebuild(user_id=7) is True
+
+    # 验证调用
+    calls = mock_rollup_db.cur.execute.call_args_list
+    assert calls[0].args[0] == "START TRANSACTION"
+    assert calls[1].args == ("DELETE FROM expend_daily WHERE 1 = 1 AND user_id = %s", (7,))
+    assert calls[2].args[0].startswith("INSERT INTO expend_daily")
+    assert "FROM expend WHERE enable = TRUE AND expend_time IS NOT NULL AND user_id = %s GROUP BY" in calls[2].args[0]
+    assert calls[3].args == ("DELETE FROM income_daily WHERE 1 = 1 AND user_id = %s", (7,))
+    assert calls[4].args[0].startswith("INSERT INTO income_daily")
+    mock_rollup_db.commit.assert_called_once()
+    mock_rollup_db.disconnect.assert_called_once()
@@ -0,0 +1,133 @@
+import pytest
+from dao.SessionDAO import SessionDAO
+from unittest.mock import patch, Mock
+import sys
+import os
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+
+@pytest.fixture(scope='function')
+def mock_session_db():
+    """
+    创建模拟的数据库连接
+    """
+    with patch('dao.SessionDAO.Database') as mock_db_class:
+        mock_db = Mock()
+        mock_db.connect.return_value = True
+        mock_db.execute.return_value = True
+        mock_db_class.return_value = mock_db
+        yield mock_db
+
+
+def test_create_session_stores_token_hash(mock_session_db):
+    """
+    测试创建会话时只保存token摘要
+    """
+    session_dao = SessionDAO()
+
+    assert session_dao.create_session(1, 'token_123', 1766750674874, 'iPhone') is True
+
+    query, params = mock_session_db.execute.call_args[0]
+    assert query.startswith("INSERT INTO user_session")
+    assert params == (1, SessionDAO.hash_token('token_123'), 'iPhone', 1766750674874)
+    assert 'token_123' not in params
+    mock_session_db.commit.assert_called_once()
+    mock_session_db.disconnect.assert_called_once()
+
+
+def test_get_session_touches_stale_last_seen(mock_session_db):
+    """
+    测试按token摘要查询会话，最后使用时间过旧时更新
+    """
+    mock_session_db.cur.fetchone.return_value = (10, 1, 1766750674874, 'iPhone', 1)
+    session_dao = SessionDAO()
+
+    session = session_dao.get_session(1, 'token_123')
+
+    assert session == (10, 1, 1766750674874, 'iPhone')
+    select_query, select_params = mock_session_db.execute.call_args_list[0][0]
+    assert "WHERE token_hash = %s" in select_query
+    assert select_params == (SessionDAO.TOUCH_INTERVAL, SessionDAO.hash_token('token_123'))
+    update_query, update_params = mock_session_db.execute.call_args_list[1][0]
+    assert update_query.startswith("UPDATE user_session SET last_seen_time = NOW()")
+    assert update_params == (10,)
+    mock_session_db.commit.assert_called_once()
+
+
+def test_get_session_of_other_user(mock_session_db):
+    """
+    测试token属于其他用户时不返回会话，也不更新最后使用时间
+    """
+    mock_session_db.cur.fetchone.return_value = (10, 2, 1766750674874, 'iPhone', 0)
+    session_dao = SessionDAO()
+
+    assert session_dao.get_session(1, 'token_123') is None
+    assert mock_session_db.execute.call_count == 1
+
+
+def test_delete_expired_sessions(mock_session_db):
+    """
+    测试分批删除过期会话并返回删除数量
+    """
+    mock_session_db.cur.rowcount = 3
+    session_dao = SessionDAO()
+
+    assert session_dao.delete_expired_sessions(100) == 3
+
+    query, params = mock_session_db.execute.call_args[0]
+    assert query == "DELETE FROM user_session WHERE expiration_time < %s ORDER BY expiration_time LIMIT %s"
+    assert params[1] == 100
+    mock_session_db.commit.assert_called_once()
+
+
+def test_delete_session_invalidates_cache_and_revokes(mock_session_db):
+    """
+    测试退出登录时按token摘要删除会话，清除鉴权缓存并撤销该会话签发的访问token
+    """
+    mock_session_db.cur.rowcount = 1
+    session_dao = SessionDAO()
+
+    with patch('dao.SessionDAO.TokenCache') as mock_cache, patch('dao.SessionDAO.AccessToken') as mock_access_token:
+        assert session_dao.delete_session(1, 'token_123') is True
+
+    query, params = mock_session_db.execute.call_args[0]
+    assert query == "DELETE FROM user_session WHERE token_hash = %s AND user_id = %s"
+    assert params == (SessionDAO.hash_token('token_123'), 1)
+    mock_cache.invalidate.assert_called_once_with(1)
+    mock_access_token.revoke_session.assert_called_once_with(SessionDAO.hash_token('token_123')[:16], None)
+    mock_access_token.revoke_user.assert_not_called()
+
+
+def test_delete_device_sessions_revokes_replaced_sessions(mock_session_db):
+    """
+    测试重新登录时删除同一设备上之前的会话，清除鉴权缓存并只撤销这些会话签发的访问token
+    """
+    mock_session_db.cur.rowcount = 1
+    mock_session_db.cur.fetchall.return_value = [(SessionDAO.hash_token('old_token'),)]
+    session_dao = SessionDAO()
+
+    with patch('dao.SessionDAO.TokenCache') as mock_cache, patch('dao.SessionDAO.AccessToken') as mock_access_token:
+        assert session_dao.delete_device_sessions(1, 'iPhone') == 1
+        assert session_dao.delete_device_sessions(1, None) == 0
+
+    query, params = mock_session_db.execute.call_args[0]
+    assert query == "DELETE FROM user_session WHERE user_id = %s AND device = %s"
+    assert params == (1, 'iPhone')
+    assert mock_session_db.execute.call_count == 2
+    mock_cache.invalidate.assert_called_once_with(1)
+    mock_access_token.revoke_session.assert_called_once_with(SessionDAO.session_id('old_token'), None)
+    mock_access_token.revoke_user.assert_not_called()
+
+
+def test_delete_device_sessions_without_previous_session(mock_session_db):
+    """
+    测试设备上没有之前的会话时不执行删除
+    """
+    mock_session_db.cur.fetchall.return_value = []
+    session_dao = SessionDAO()
+
+    assert session_dao.delete_device_sessions(1, 'iPhone') == 0
+    assert mock_session_db.execute.call_count == 1
+    mock_session_db.commit.assert_not_called()
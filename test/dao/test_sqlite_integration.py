@@ -0,0 +1,171 @@
+import pytest
+import time
+from datetime import datetime
+import sys
+import os
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from dao.AccountDAO import AccountDAO
+from dao.ConfigVersionDAO import ConfigVersionDAO
+from dao.ExpendDAO import ExpendDAO
+from dao.ExpendTypeDAO import ExpendTypeDAO
+from dao.IncomeDAO import IncomeDAO
+from dao.IncomeTypeDAO import IncomeTypeDAO
+from dao.RollupDAO import RollupDAO
+from dao.SessionDAO import SessionDAO
+from dao.StatsDAO import StatsDAO
+from dao.UserDAO import UserDAO
+from services.ExpendService import ExpendService
+from services.IncomeService import IncomeService
+
+
+def test_user_and_account(sqlite_database):
+    """
+    测试在SQLite后端上注册用户、按手机号查询和创建账户
+    """
+    user_dao = UserDAO()
+    assert user_dao.register_user('alice', 'encrypted', '13800138000', 1620000000000) is True
+    assert user_dao.check_phone_exists('13800138000') is True
+
+    user = user_dao.get_user_by_phone('13800138000')
+    assert user[:4] == (1, 'alice', 'encrypted', '13800138000')
+
+    success, account_id = AccountDAO().create_account('现金', 100, user[0])
+    assert success is True
+    assert AccountDAO().get_account_by_id(account_id)[1:] == ('现金', 100, 1)
+
+
+def test_expend_updates_balance_and_rollups(sqlite_database):
+    """
+    测试支出记录的事务：扣减账户余额、维护日汇总，统计结果与原始记录一致
+    """
+    success, account_id = AccountDAO().create_account('现金', 100, 1)
+    success, expend_type_id = ExpendTypeDAO().create_expend_type('餐饮')
+    expend_dao = ExpendDAO()
+    assert expend_dao.create_expend(12, account_id, 1, '午餐', datetime(2023, 1, 1, 12, 0), expend_type_id)[0] is True
+    assert expend_dao.create_expend(30, account_id, 1, '晚餐', datetime(2023, 1, 2, 19, 0), expend_type_id)[0] is True
+    assert expend_dao.update_expend(1, 1, money=20)[0] is True
+
+    assert expend_dao.get_expend_by_id(1, 1)[1] == 20
+    assert AccountDAO().get_account_by_id(account_id)[2] == 50
+
+    stats_dao = StatsDAO()
+    # 整天范围读取日汇总表，非整天范围读取原始记录表
+    assert stats_dao.get_grouped_totals('expend', 1, 'day') == [('2023-01-01', 1, 20), ('2023-01-02', 1, 30)]
+    assert stats_dao.get_grouped_totals('expend', 1, 'week', datetime(2023, 1, 1, 8), datetime(2023, 1, 3)) == [
+        ('2022-W52', 1, 20), ('2023-W01', 1, 30)]
+
+    assert RollupDAO().rebuild(1) is True
+    assert stats_dao.get_totals('expend', 1) == (2, 50)
+    assert stats_dao.get_totals('expend', 1, datetime(2023, 1, 2), datetime(2023, 1, 2, 23, 59, 59)) == (1, 30)
+
+
+def test_session_lifecycle(sqlite_database):
+    """
+    测试会话的创建、查询（更新最后使用时间）和过期清理
+    """
+    session_dao = SessionDAO()
+    future_expiration = int(time.time() * 1000) + 60 * 60 * 1000
+    assert session_dao.create_session(1, 'valid_token', future_expiration, 'iPhone') is True
+    assert session_dao.create_session(1, 'expired_token', 1) is True
+
+    assert session_dao.get_session(1, 'valid_token') == (1, 1, future_expiration, 'iPhone')
+    assert session_dao.get_session(2, 'valid_token') is None
+
+    assert session_dao.delete_expired_sessions(batch_size=10) == 1
+    assert session_dao.get_session(1, 'expired_token') is None
+
+
+def test_type_catalog_version_upsert(sqlite_database):
+    """
+    测试配置版本号的upsert和类型目录缓存
+    """
+    def read_version(column):
+        db = sqlite_database()
+        db.connect()
+        try:
+            return ConfigVersionDAO.get_version(db.cur, column)
+        finally:
+            db.disconnect()
+
+    expend_type_dao = ExpendTypeDAO()
+    success, expend_type_id = expend_type_dao.create_expend_type('餐饮')
+    assert success is True
+    # 创建类型时在同一事务中递增了版本号
+    assert read_version('expend_type_version') == 1
+    db = sqlite_database()
+    db.connect()
+    try:
+        ConfigVersionDAO.bump(db.cur, 'expend_type_version')
+        assert db.commit() is True
+    finally:
+        db.disconnect()
+    assert read_version('expend_type_version') == 2
+    assert expend_type_dao.update_expend_type(expend_type_id, enable=False) is True
+    assert read_version('expend_type_version') == 3
+    assert expend_type_dao.update_expend_type(expend_type_id, enable=True) is True
+
+    types = expend_type_dao.get_all_expend_types()
+    assert [(row[0], row[1]) for row in types] == [(expend_type_id, '餐饮')]
+    assert isinstance(types[0][3], datetime)
+    assert sqlite_database.query_stats.snapshot(limit=0)
+
+
+def test_cursor_pagination_reaches_records_without_time(sqlite_database):
+    """
+    测试时间为空的记录排在最后，逐页翻页时能够翻到，且以它们结尾的游标可以继续使用
+    """
+    success, account_id = AccountDAO().create_account('现金', 100, 1)
+    success, expend_type_id = ExpendTypeDAO().create_expend_type('餐饮')
+    success, income_type_id = IncomeTypeDAO().create_income_type('工资')
+    expend_dao = ExpendDAO()
+    income_dao = IncomeDAO()
+    for record_time in (datetime(2023, 1, 1), None, datetime(2023, 1, 2), None):
+        assert expend_dao.create_expend(10, account_id, 1, None, record_time, expend_type_id)[0] is True
+        assert income_dao.create_income(10, account_id, 1, None, record_time, income_type_id)[0] is True
+
+    for list_page in (ExpendService().get_expends_by_user_id, IncomeService().get_incomes_by_user_id):
+        ids = []
+        cursor = None
+        while True:
+            success, message, data = list_page(1, limit=1, cursor=cursor)
+            assert success is True, message
+            ids.extend(record['id'] for record in data['list'])
+            cursor = data['next_cursor']
+            if cursor is None:
+                break
+        assert ids == [3, 1, 4, 2]
+
+
+def test_rollup_matches_raw_after_delete_and_disable(sqlite_database):
+    """
+    测试删除和禁用某天的全部记录后，读取日汇总表和读取原始记录表的统计结果一致，不返回空分组
+    """
+    success, account_id = AccountDAO().create_account('现金', 100, 1)
+    success, expend_type_id = ExpendTypeDAO().create_expend_type('餐饮')
+    expend_dao = ExpendDAO()
+    for day in (1, 2, 3):
+        assert expend_dao.create_expend(10, account_id, 1, None, datetime(2023, 1, day, 12), expend_type_id)[0] is True
+    assert expend_dao.delete_expend(1, 1)[0] is True
+    assert expend_dao.update_expend(2, 1, enable=False)[0] is True
+
+    # 记录数为0的汇总行已被删除
+    db = sqlite_database()
+    db.connect()
+    db.cur.execute("SELECT COUNT(*) FROM expend_daily WHERE record_count = 0")
+    assert db.cur.fetchone()[0] == 0
+    # 升级前遗留的空汇总行也不会出现在统计结果中
+    db.cur.execute("INSERT INTO expend_daily (user_id, day, account_id, expend_type_id, record_count, total_money) "
+                   "VALUES (1, '2023-01-04', %s, %s, 0, 0)", (account_id, expend_type_id))
+    db.commit()
+    db.disconnect()
+
+    stats_dao = StatsDAO()
+    for group_by in ('day', 'type', 'account'):
+        # 整天范围读取日汇总表，非整天范围读取原始记录表
+        rollup = stats_dao.get_grouped_totals('expend', 1, group_by, datetime(2023, 1, 1), datetime(2023, 1, 4, 23, 59, 59))
+        raw = stats_dao.get_grouped_totals('expend', 1, group_by, datetime(2023, 1, 1, 0, 0, 1), datetime(2023, 1, 4, 23, 59, 59))
+        assert [tuple(row) for row in rollup] == [tuple(row) for row in raw]
+        assert len(rollup) == 1
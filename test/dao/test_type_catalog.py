@@ -0,0 +1,62 @@
+import pytest
+from dao.TypeCatalog import TypeCatalog
+from unittest.mock import patch, MagicMock
+import sys
+import os
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+
+@pytest.fixture(scope='function')
+def mock_cursor():
+    """
+    创建模拟的游标，版本号为1，类型表有两行
+    """
+    cursor = MagicMock()
+    cursor.fetchone.return_value = (1,)
+    cursor.fetchall.return_value = [(1, "工资", True), (2, "奖金", True)]
+    return cursor
+
+
+def test_refresh_skips_reload_when_version_unchanged(mock_cursor):
+    """
+    测试版本号未变化时只读取版本号，不重新加载类型表
+    """
+    catalog = TypeCatalog('income_type', 'income_type_version')
+
+    rows, by_id = catalog.refresh(mock_cursor)
+    assert [row[0] for row in rows] == [1, 2]
+    assert by_id[2] == (2, "奖金", True)
+    assert catalog.current() == (rows, by_id)
+
+    # 超过校验间隔后再次校验，版本号未变化
+    with patch.object(TypeCatalog, 'REVALIDATE_INTERVAL', 0):
+        assert catalog.current() is None
+        assert catalog.refresh(mock_cursor) == (rows, by_id)
+    assert mock_cursor.execute.call_count == 3  # 版本号, 类型表, 版本号
+
+    # 版本号变化后重新加载
+    mock_cursor.fetchone.return_value = (2,)
+    mock_cursor.fetchall.return_value = [(1, "工资", True)]
+    rows, by_id = catalog.refresh(mock_cursor)
+    assert list(by_id) == [1]
+    assert mock_cursor.execute.call_count == 5
+
+
+def test_clear_during_refresh_discards_loaded_rows(mock_cursor):
+    """
+    测试加载过程中缓存被清除时，加载结果只返回给调用方而不写入缓存
+    """
+    catalog = TypeCatalog('income_type', 'income_type_version')
+
+    def fetchall():
+        # 模拟另一个线程在加载期间修改了类型表
+        catalog.clear()
+        return [(1, "工资", True)]
+    mock_cursor.fetchall.side_effect = fetchall
+
+    rows, by_id = catalog.refresh(mock_cursor)
+
+    assert by_id == {1: (1, "工资", True)}
+    assert catalog.current() is None
@@ -0,0 +1,207 @@
+import pytest
+import threading
+import pymysql
+from unittest.mock import Mock, patch
+import sys
+import os
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from db.Database import Database
+from db.PoolMonitor import PoolMonitor
+
+
+@pytest.fixture(scope='function')
+def mock_pool():
+    """
+    创建模拟的连接池，每次获取连接返回新的模拟连接
+    """
+    pool = Mock()
+    pool.connection.side_effect = lambda *args, **kwargs: Mock()
+    with patch.object(Database, 'pool', pool):
+        yield pool
+
+
+def test_connection_is_thread_local(mock_pool):
+    """
+    测试不同线程持有各自独立的连接和游标
+    """
+    db = Database()
+    assert db.connect() is True
+    main_conn = db.conn
+    main_cur = db.cur
+    
+    seen = {}
+    
+    def worker():
+        # 新线程中尚未获取连接
+        seen['before'] = db.conn
+        db.connect()
+        seen['conn'] = db.conn
+        seen['cur'] = db.cur
+        db.disconnect()
+        seen['after'] = db.conn
+    
+    thread = threading.Thread(target=worker)
+    thread.start()
+    thread.join()
+    
+    # 验证子线程不会看到或覆盖主线程的连接
+    assert seen['before'] is None
+    assert seen['conn'] is not main_conn
+    assert seen['cur'] is not main_cur
+    assert seen['after'] is None
+    assert db.conn is main_conn
+    assert db.cur is main_cur
+    assert mock_pool.connection.call_count == 2
+    
+    db.disconnect()
+
+
+def test_disconnect_releases_connection(mock_pool):
+    """
+    测试释放连接后当前线程不再持有连接
+    """
+    db = Database()
+    db.connect()
+    conn = db.conn
+    cur = db.cur
+    
+    db.disconnect()
+    
+    cur.close.assert_called_once()
+    conn.close.assert_called_once()
+    assert db.conn is None
+    assert db.cur is None
+
+
+def test_connect_returns_previous_connection(mock_pool):
+    """
+    测试重复获取连接时先归还当前线程已持有的连接
+    """
+    db = Database()
+    db.connect()
+    first_conn = db.conn
+    
+    db.connect()
+    
+    first_conn.close.assert_called_once()
+    assert db.conn is not first_conn
+    
+    db.disconnect()
+
+
+def test_connect_times_out_when_pool_exhausted(mock_pool):
+    """
+    测试连接名额用尽时在超时后返回False
+    """
+    with (patch.object(Database, 'monitor', PoolMonitor(max_connections=1)),
+          patch.object(Database, 'acquire_timeout', 0.05)):
+        holder = Database()
+        assert holder.connect() is True
+        
+        result = {}
+        
+        def worker():
+            db = Database()
+            result['connected'] = db.connect()
+            result['conn'] = db.conn
+        
+        thread = threading.Thread(target=worker)
+        thread.start()
+        thread.join()
+        
+        assert result['connected'] is False
+        assert result['conn'] is None
+        assert Database.get_pool_stats()['timeouts'] == 1
+        
+        holder.disconnect()
+        assert Database.get_pool_stats()['in_use'] == 0
+
+
+def test_timed_cursor_records_request_db_stats():
+    """
+    测试游标执行语句时累计当前请求的语句数和耗时
+    """
+    from db.Database import _TimedCursor
+    
+    Database.reset_request_state()
+    cursor = _TimedCursor.__new__(_TimedCursor)
+    with patch('pymysql.cursors.Cursor.execute', return_value=1) as mock_execute:
+        assert cursor.execute("SELECT 1") == 1
+        assert cursor.execute("SELECT %s", (2,)) == 1
+    
+    mock_execute.assert_called_with("SELECT %s", (2,))
+    query_count, db_time = Database.get_request_db_stats()
+    assert query_count == 2
+    assert db_time >= 0
+    
+    Database.reset_request_state()
+    assert Database.get_request_db_stats() == (0, 0.0)
+
+
+def test_timed_cursor_records_query_stats():
+    """
+    测试游标执行语句时按指纹汇总SQL执行统计，执行失败的语句也计入
+    """
+    from db.Database import _TimedCursor
+    from db.QueryStats import QueryStats
+    
+    cursor = _TimedCursor.__new__(_TimedCursor)
+    with patch.object(Database, 'query_stats', QueryStats(slow_threshold=0)):
+        with patch('pymysql.cursors.Cursor.execute', return_value=2):
+            cursor.execute("UPDATE expend SET enable = FALSE WHERE id = %s", (1,))
+        with patch('pymysql.cursors.Cursor.execute', side_effect=pymysql.err.OperationalError(2013, "Lost connection")):
+            with pytest.raises(pymysql.err.OperationalError):
+                cursor.execute("UPDATE expend SET enable = FALSE WHERE id = %s", (2,))
+        
+        queries = Database.query_stats.snapshot()
+    
+    assert len(queries) == 1
+    assert queries[0]['fingerprint'] == "update expend set enable = false where id = ?"
+    assert queries[0]['count'] == 2
+
+
+def test_lazy_pool_created_on_first_connect(mock_pool):
+    """
+    测试lazy_pool为True时创建实例不创建连接池，第一次获取连接时才创建
+    """
+    created = []
+    
+    def create_pool(self):
+        created.append(self)
+        Database.pool = mock_pool
+    
+    with patch.object(Database, 'pool', None), patch.object(Database, 'lazy_pool', True), \
+            patch.object(Database, '_load_config'), patch.object(Database, '_create_pool', create_pool):
+        db = Database()
+        assert created == []
+        assert db.connect() is True
+        assert db.connect() is True
+        db.disconnect()
+    
+    assert len(created) == 1
+    assert mock_pool.connection.call_count == 2
+
+
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason="当前平台不支持fork")
+def test_fork_child_discards_inherited_pool(mock_pool):
+    """
+    测试fork出的子进程丢弃从父进程继承的连接池且不关闭它，父进程的连接池不受影响
+    """
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        ok = (Database.pool is None and Database.monitor is None
+              and Database._inherited_pools[-1] is mock_pool and not mock_pool.close.called)
+        os.write(write_fd, b'1' if ok else b'0')
+        os._exit(0)
+    
+    os.close(write_fd)
+    result = os.read(read_fd, 1)
+    os.close(read_fd)
+    os.waitpid(pid, 0)
+    
+    assert result == b'1'
+    assert Database.pool is mock_pool
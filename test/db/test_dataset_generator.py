@@ -0,0 +1,111 @@
+import pytest
+import sys
+import os
+from collections import Counter
+from datetime import date, datetime
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from db.Database import Database
+from db.DatasetGenerator import DatasetGenerator
+from unittest.mock import patch
+
+
+def fetch_all(query, params=None):
+    db = Database()
+    assert db.connect()
+    try:
+        db.cur.execute(query, params)
+        return db.cur.fetchall()
+    finally:
+        db.disconnect()
+
+
+def test_generate_counts_and_rollups(sqlite_database):
+    """
+    测试生成的各表行数、数据范围和日汇总与原始记录一致
+    """
+    generator = DatasetGenerator(seed=7, batch_size=64, start_date=date(2024, 1, 1), days=30)
+    counts = generator.generate(users=20, accounts_per_user=3, expends=500, incomes=100)
+
+    assert counts == {'user': 20, 'account': 60, 'expend': 500, 'income': 100}
+    assert fetch_all("SELECT COUNT(*) FROM expend_type")[0][0] == len(DatasetGenerator.EXPEND_TYPES)
+    assert fetch_all("SELECT COUNT(*) FROM income_type")[0][0] == len(DatasetGenerator.INCOME_TYPES)
+    # 类型表被直接写入后版本号递增
+    assert fetch_all("SELECT expend_type_version, income_type_version FROM config_version")[0] == (1, 1)
+
+    # 每条记录的账户都属于记录所属的用户
+    assert fetch_all("SELECT COUNT(*) FROM expend e JOIN account a ON a.id = e.account_id WHERE a.user_id <> e.user_id")[0][0] == 0
+    times = [row[0] for row in fetch_all("SELECT expend_time FROM expend")]
+    assert min(times) >= datetime(2024, 1, 1) and max(times) < datetime(2024, 1, 31)
+
+    # 日汇总已重建
+    for table in ('expend', 'income'):
+        raw = fetch_all(f"SELECT COUNT(*), SUM(money) FROM {table} WHERE enable = TRUE")[0]
+        rollup = fetch_all(f"SELECT SUM(record_count), SUM(total_money) FROM {table}_daily")[0]
+        assert tuple(raw) == tuple(rollup)
+
+
+def test_generate_appends_users(sqlite_database):
+    """
+    测试重复生成时用户编号接在已有用户之后，不与已有用户冲突
+    """
+    DatasetGenerator(seed=1).generate(users=3, accounts_per_user=1)
+    counts = DatasetGenerator(seed=1).generate(users=2, accounts_per_user=2, expends=10)
+
+    assert counts['user'] == 2 and counts['account'] == 4
+    usernames = [row[0] for row in fetch_all("SELECT username FROM user ORDER BY id")]
+    assert usernames == [f"user{number:08d}" for number in range(1, 6)]
+    # 已有的类型被复用
+    assert fetch_all("SELECT COUNT(*) FROM expend_type")[0][0] == len(DatasetGenerator.EXPEND_TYPES)
+
+
+def test_ensure_types_matches_weights_by_name(sqlite_database):
+    """
+    测试创建默认类型后按名称对应相对频率，版本号与类型在同一事务中写入
+    """
+    generator = DatasetGenerator()
+    type_ids = generator._ensure_types('income_type', 'income_type_name', DatasetGenerator.INCOME_TYPES, 'income_type_version')
+
+    names = dict(fetch_all("SELECT id, income_type_name FROM income_type"))
+    assert {names[type_id]: weight for type_id, weight in type_ids} == dict(DatasetGenerator.INCOME_TYPES)
+    assert fetch_all("SELECT income_type_version FROM config_version")[0][0] == 1
+
+    # 递增版本号失败时类型一并回滚
+    with patch('db.DatasetGenerator.ConfigVersionDAO.bump', side_effect=RuntimeError("写入失败")):
+        with pytest.raises(RuntimeError):
+            generator._ensure_types('expend_type', 'expend_type_name', DatasetGenerator.EXPEND_TYPES, 'expend_type_version')
+    assert fetch_all("SELECT COUNT(*) FROM expend_type")[0][0] == 0
+
+
+def test_record_rows_deterministic_and_skewed():
+    """
+    测试相同随机种子生成相同的记录，用户活跃度偏斜
+    """
+    user_ids = list(range(1, 101))
+    accounts = {user_id: [user_id * 10, user_id * 10 + 1] for user_id in user_ids}
+    type_ids = [(1, 10), (2, 1)]
+
+    def generate(seed, skew):
+        generator = DatasetGenerator(seed=seed, batch_size=100, skew=skew)
+        cum_weights = generator.user_cum_weights(len(user_ids))
+        return list(generator.record_rows(5000, user_ids, cum_weights, accounts, type_ids, (3.5, 1.0), ('午餐', None)))
+
+    rows = generate(3, 1.5)
+    assert len(rows) == 5000
+    assert rows == generate(3, 1.5)
+    assert rows != generate(4, 1.5)
+
+    for money, account_id, user_id, remark, record_time, enable, type_id in rows:
+        assert money >= 1
+        assert account_id in accounts[user_id]
+
+    # 偏斜时最活跃的10%用户拥有远多于10%的记录，不偏斜时接近均匀
+    def top_share(rows):
+        per_user = sorted(Counter(row[2] for row in rows).values(), reverse=True)
+        return sum(per_user[:10]) / len(rows)
+
+    assert top_share(rows) > 0.3
+    assert top_share(generate(3, 0)) < 0.2
+    assert Counter(row[6] for row in rows)[1] > 4000
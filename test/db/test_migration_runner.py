@@ -0,0 +1,142 @@
+import pytest
+from unittest.mock import Mock, patch
+import sys
+import os
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from db.MigrationRunner import MigrationRunner
+
+
+@pytest.fixture(scope='function')
+def migrations_dir(tmp_path):
+    """
+    创建临时迁移脚本目录
+    """
+    (tmp_path / 'V001__rename_column.sql').write_text(
+        "-- 重命名字段\nALTER TABLE expend CHANGE a b BIGINT;\n", encoding='utf-8')
+    (tmp_path / 'V002__add_indexes.sql').write_text(
+        "ALTER TABLE expend ADD INDEX idx_a (a);\n-- 注释\nALTER TABLE income ADD INDEX idx_b (b);\n", encoding='utf-8')
+    (tmp_path / 'README.txt').write_text("not a migration", encoding='utf-8')
+    return str(tmp_path)
+
+
+@pytest.fixture(scope='function')
+def runner(migrations_dir):
+    """
+    创建使用模拟数据库的迁移执行器
+    """
+    runner = MigrationRunner(migrations_dir)
+    runner.db = Mock()
+    runner.db.connect.return_value = True
+    return runner
+
+
+def executed_sql(runner):
+    """获取模拟游标执行过的SQL语句"""
+    return [call.args[0] for call in runner.db.cur.execute.call_args_list]
+
+
+def test_split_statements_skips_comments():
+    """
+    测试拆分SQL脚本时忽略空语句和只包含注释的片段
+    """
+    statements = MigrationRunner.split_statements("-- 注释\nSELECT 1;\n\nSELECT ';';\n-- 结尾注释\n")
+    assert statements == ["-- 注释\nSELECT 1", "SELECT ';'"]
+
+
+def test_discover_sorts_by_version(runner):
+    """
+    测试扫描迁移脚本按版本号排序并忽略不符合命名规则的文件
+    """
+    migrations = runner.discover()
+    assert [m['version'] for m in migrations] == [1, 2]
+    assert [m['name'] for m in migrations] == ['rename_column', 'add_indexes']
+    assert all(len(m['checksum']) == 32 for m in migrations)
+
+
+def test_migrate_applies_pending_only(runner):
+    """
+    测试只执行尚未执行的迁移并记录迁移历史
+    """
+    checksum = runner.discover()[0]['checksum']
+    runner.db.cur.fetchall.return_value = [(1, checksum)]
+
+    success, executed = runner.migrate()
+
+    assert success is True
+    assert executed == [2]
+    sql = executed_sql(runner)
+    assert not any('CHANGE a b' in s for s in sql)
+    assert "ALTER TABLE expend ADD INDEX idx_a (a)" in sql
+    assert any(s.startswith("-- 注释\nALTER TABLE income") for s in sql)
+    insert_call = runner.db.cur.execute.call_args_list[-1]
+    assert insert_call.args[0].startswith("INSERT INTO schema_migrations")
+    assert insert_call.args[1][:2] == (2, 'add_indexes')
+    runner.db.commit.assert_called_once()
+
+
+def test_migrate_respects_target(runner):
+    """
+    测试指定目标版本时不执行更高版本的迁移
+    """
+    runner.db.cur.fetchall.return_value = []
+
+    success, executed = runner.migrate(target_version=1)
+
+    assert success is True
+    assert executed == [1]
+    assert not any('idx_a' in s for s in executed_sql(runner))
+
+
+def test_migrate_stops_on_failure(runner):
+    """
+    测试迁移失败时回滚并停止执行后续版本
+    """
+    runner.db.cur.fetchall.return_value = []
+
+    def execute(sql, params=None):
+        if 'CHANGE a b' in sql:
+            raise Exception("Duplicate column name")
+    runner.db.cur.execute.side_effect = execute
+
+    success, executed = runner.migrate()
+
+    assert success is False
+    assert executed == []
+    runner.db.rollback.assert_called_once()
+    runner.db.commit.assert_not_called()
+
+
+def test_status_reports_modified_migrations(runner):
+    """
+    测试迁移执行后文件被修改时在状态中标记
+    """
+    runner.db.cur.fetchall.return_value = [(1, 'outdated-checksum')]
+
+    status = runner.status()
+
+    assert [(m['version'], m['applied'], m['modified']) for m in status] == [(1, True, True), (2, False, False)]
+
+
+def test_rename_migration_is_guarded():
+    """
+    测试V001只在consumption_id字段仍存在时重命名：已重命名的数据库和新建的数据库上执行空语句，不会中断后续迁移
+    """
+    path = os.path.join(MigrationRunner.DEFAULT_DIR, 'V001__rename_expend_type_id.sql')
+    with open(path, encoding='utf-8') as f:
+        statements = MigrationRunner.split_statements(f.read())
+
+    assert len(statements) == 4
+    assert "information_schema.COLUMNS" in statements[0]
+    assert "COLUMN_NAME = 'consumption_id'" in statements[0]
+    assert "'DO 0'" in statements[0]
+    assert statements[1:] == ["PREPARE rename_expend_type_id FROM @rename_expend_type_id",
+                              "EXECUTE rename_expend_type_id", "DEALLOCATE PREPARE rename_expend_type_id"]
+
+    # 新建数据库的表结构已经使用expend_type_id
+    with open(os.path.join(os.path.dirname(MigrationRunner.DEFAULT_DIR), 'create_tables.sql'), encoding='utf-8') as f:
+        create_tables = f.read()
+    assert 'consumption_id' not in create_tables
+    assert '`expend_type_id`' in create_tables
@@ -0,0 +1,119 @@
+import pytest
+import threading
+import time
+import sys
+import os
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from db.PoolMonitor import PoolMonitor
+
+
+def test_acquire_and_release():
+    """
+    测试占用和归还连接名额
+    """
+    monitor = PoolMonitor(max_connections=2)
+    
+    assert monitor.acquire() is True
+    assert monitor.acquire() is True
+    stats = monitor.snapshot()
+    assert stats['in_use'] == 2
+    assert stats['acquired'] == 2
+    
+    monitor.release()
+    monitor.release()
+    assert monitor.snapshot()['in_use'] == 0
+
+
+def test_acquire_timeout():
+    """
+    测试名额用尽时等待超时返回False
+    """
+    monitor = PoolMonitor(max_connections=1)
+    monitor.acquire()
+    
+    start = time.perf_counter()
+    assert monitor.acquire(timeout=0.05) is False
+    assert time.perf_counter() - start >= 0.05
+    
+    stats = monitor.snapshot()
+    assert stats['timeouts'] == 1
+    assert stats['waiters'] == 0
+    assert stats['in_use'] == 1
+
+
+def test_waiter_is_woken_by_release():
+    """
+    测试归还名额后唤醒等待线程
+    """
+    monitor = PoolMonitor(max_connections=1)
+    monitor.acquire()
+    result = {}
+    
+    def worker():
+        result['acquired'] = monitor.acquire(timeout=5)
+    
+    thread = threading.Thread(target=worker)
+    thread.start()
+    # 等待子线程进入等待状态
+    for _ in range(100):
+        if monitor.snapshot()['waiters'] == 1:
+            break
+        time.sleep(0.01)
+    assert monitor.snapshot()['waiters'] == 1
+    
+    monitor.release()
+    thread.join()
+    
+    assert result['acquired'] is True
+    assert monitor.snapshot()['waiters'] == 0
+
+
+def test_snapshot_counts_connections_and_wait_histogram():
+    """
+    测试统计快照中的连接数和等待耗时直方图
+    """
+    monitor = PoolMonitor(max_connections=0)
+    for _ in range(3):
+        monitor.record_created()
+    monitor.record_recycled()
+    monitor.acquire()
+    
+    stats = monitor.snapshot()
+    
+    assert stats['created'] == 3
+    assert stats['recycled'] == 1
+    assert stats['in_use'] == 1
+    assert stats['idle'] == 1
+    histogram = stats['acquire_wait_seconds']
+    assert histogram['count'] == 1
+    assert histogram['buckets']['+Inf'] == 1
+    # 不限制连接数时无需等待，落在最小的桶内
+    assert histogram['buckets'][str(PoolMonitor.WAIT_BUCKETS[0])] == 1
+
+
+def test_acquire_rejected_when_wait_queue_full():
+    """
+    测试等待队列已满时立即拒绝
+    """
+    monitor = PoolMonitor(max_connections=1, max_waiters=1)
+    monitor.acquire()
+    
+    waiter = threading.Thread(target=monitor.acquire, kwargs={'timeout': 5})
+    waiter.start()
+    for _ in range(100):
+        if monitor.snapshot()['waiters'] == 1:
+            break
+        time.sleep(0.01)
+    
+    # 队列已满，即使不设置超时也会立即返回
+    start = time.perf_counter()
+    assert monitor.acquire() is False
+    assert time.perf_counter() - start < 1
+    assert monitor.snapshot()['rejected'] == 1
+    
+    monitor.release()
+    waiter.join()
+    assert monitor.snapshot()['in_use'] == 1
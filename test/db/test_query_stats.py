@@ -0,0 +1,89 @@
+import pytest
+from unittest.mock import patch, MagicMock
+import sys
+import os
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from db.QueryStats import QueryStats, fingerprint
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("SELECT * FROM expend WHERE user_id = %s AND enable = TRUE",
+     "select * from expend where user_id = ? and enable = true"),
+    ("SELECT  id\n FROM user WHERE phone = '138' AND id = 12 LIMIT 10",
+     "select id from user where phone = ? and id = ? limit ?"),
+    ("SELECT name FROM expend_type WHERE id IN (1, 2, 3)",
+     "select name from expend_type where id in (?+)"),
+    ("INSERT INTO expend_daily (user_id, day) VALUES (%s, %s), (%s, %s)",
+     "insert into expend_daily (user_id, day) values (?+)"),
+    ("SELECT DATE_FORMAT(day, '%%Y-%%m') AS k FROM t1 /* 按月 */ WHERE x = 'a''#b' -- 注释",
+     "select date_format(day, ?) as k from t1 where x = ?"),
+    (b"UPDATE session SET expires = %(expires)s WHERE id = 0x1F", "update session set expires = ? where id = ?")
+])
+def test_fingerprint(query, expected):
+    """
+    测试语句指纹去掉字面量、占位符和注释，折叠取值列表
+    """
+    assert fingerprint(query) == expected
+
+
+def test_record_and_snapshot():
+    """
+    测试按指纹汇总执行次数、总耗时、p95和最大耗时，按指定字段排序
+    """
+    stats = QueryStats(slow_threshold=0)
+    for i in range(1, 101):
+        stats.record("SELECT * FROM expend WHERE id = %s", i / 1000.0, 1)
+    stats.record("SELECT * FROM income WHERE id = 7", 6.0, 1)
+
+    by_total = stats.snapshot()
+    assert [item['fingerprint'] for item in by_total] == ["select * from income where id = ?", "select * from expend where id = ?"]
+    expend = by_total[1]
+    assert expend['count'] == 100
+    assert expend['total_ms'] == pytest.approx(5050)
+    assert expend['avg_ms'] == pytest.approx(50.5)
+    assert expend['p95_ms'] == pytest.approx(95)
+    assert expend['max_ms'] == pytest.approx(100)
+    assert expend['slow_count'] == 0
+
+    assert stats.snapshot(order_by='count', limit=1)[0]['count'] == 100
+
+    stats.reset()
+    assert stats.snapshot() == []
+
+
+def test_max_fingerprints_and_sample_size():
+    """
+    测试指纹数量达到上限后计入<other>，p95只按最近的耗时计算
+    """
+    stats = QueryStats(slow_threshold=0, max_fingerprints=1, sample_size=2)
+    stats.record("SELECT 1 FROM a", 1.0)
+    stats.record("SELECT 1 FROM a", 0.001)
+    stats.record("SELECT 1 FROM a", 0.002)
+    stats.record("SELECT 1 FROM b", 0.1)
+    stats.record("SELECT 1 FROM c", 0.1)
+
+    items = {item['fingerprint']: item for item in stats.snapshot(limit=0)}
+    assert set(items) == {"select ? from a", QueryStats.OTHER}
+    assert items[QueryStats.OTHER]['count'] == 2
+    assert items["select ? from a"]['p95_ms'] == pytest.approx(2)
+    assert items["select ? from a"]['max_ms'] == pytest.approx(1000)
+
+
+def test_slow_query_log():
+    """
+    测试超过阈值的语句写入慢查询日志
+    """
+    stats = QueryStats(slow_threshold=0.1)
+    slow_logger = MagicMock()
+    with patch('db.QueryStats.LogUtils.get_instance', return_value=slow_logger) as mock_get_instance:
+        stats.record("SELECT * FROM expend WHERE user_id = 1", 0.05, 3)
+        mock_get_instance.assert_not_called()
+        stats.record("SELECT * FROM expend WHERE user_id = 2", 0.25, 3)
+
+    mock_get_instance.assert_called_once_with('SlowQuery', 'config/SlowQueryLogConfig.ini')
+    slow_logger.warning_event.assert_called_once_with("慢查询", elapsed_ms=250.0, rows=3,
+                                                      fingerprint="select * from expend where user_id = ?")
+    assert stats.snapshot()[0]['slow_count'] == 1
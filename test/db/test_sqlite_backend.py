@@ -0,0 +1,84 @@
+import pytest
+import decimal
+import sqlite3
+import pymysql
+from datetime import date, datetime
+import sys
+import os
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from db.SQLiteBackend import SQLiteDialect, SQLiteConnection
+
+
+@pytest.mark.parametrize("query, has_args, expected", [
+    ("SELECT * FROM expend WHERE id = %s AND user_id = %s FOR UPDATE", True,
+     "SELECT * FROM expend WHERE id = ? AND user_id = ?"),
+    ("SELECT DATE_FORMAT(day, '%%Y-%%m') FROM expend_daily WHERE user_id = %s", True,
+     "SELECT DATE_FORMAT(day, '%Y-%m') FROM expend_daily WHERE user_id = ?"),
+    ("SELECT '%%' FROM user", False, "SELECT '%%' FROM user"),
+    ("UPDATE user SET refresh_token = %(token)s WHERE id = %(id)s", True,
+     "UPDATE user SET refresh_token = :token WHERE id = :id"),
+    ("INSERT INTO expend_daily (user_id, record_count) VALUES (%s, %s) "
+     "ON DUPLICATE KEY UPDATE record_count = record_count + VALUES(record_count)", True,
+     "INSERT INTO expend_daily (user_id, record_count) VALUES (?, ?) "
+     "ON CONFLICT DO UPDATE SET record_count = record_count + excluded.record_count"),
+    ("INSERT IGNORE INTO config_version (id) VALUES (1)", False, "INSERT OR IGNORE INTO config_version (id) VALUES (1)"),
+    ("SELECT last_seen_time < NOW() - INTERVAL %s SECOND FROM user_session", True,
+     "SELECT last_seen_time < DATETIME(NOW(), '-' || ? || ' seconds') FROM user_session"),
+    ("UPDATE user SET last_login_time = CURRENT_TIMESTAMP WHERE id = %s", True,
+     "UPDATE user SET last_login_time = NOW() WHERE id = ?"),
+    ("DELETE FROM user_session WHERE expiration_time < %s ORDER BY expiration_time LIMIT %s", True,
+     "DELETE FROM user_session WHERE rowid IN (SELECT rowid FROM user_session WHERE expiration_time < ? ORDER BY expiration_time LIMIT ?)"),
+    ("DELETE FROM expend WHERE id = %s AND user_id = %s", True, "DELETE FROM expend WHERE id = ? AND user_id = ?")
+])
+def test_translate(query, has_args, expected):
+    """
+    测试MySQL语句改写为SQLite语句
+    """
+    assert SQLiteDialect.translate(query, has_args) == expected
+
+
+def test_convert_args_and_date_format():
+    """
+    测试参数转换为MySQL的文本时间格式，以及DATE_FORMAT的格式符
+    """
+    assert SQLiteDialect.convert_args((datetime(2023, 1, 2, 3, 4, 5), date(2023, 1, 2), decimal.Decimal('12'),
+                                       decimal.Decimal('1.5'), None)) == ('2023-01-02 03:04:05', '2023-01-02', 12, 1.5, None)
+    assert SQLiteDialect.convert_args(None) == ()
+    assert SQLiteDialect.date_format('2023-01-01 12:00:00', '%x-W%v') == '2022-W52'
+    assert SQLiteDialect.date_format('2023-01-02', '%Y-%m-%d') == '2023-01-02'
+    assert SQLiteDialect.date_format(None, '%Y') is None
+
+
+def test_connection_transactions_and_errors():
+    """
+    测试连接按pymysql的语义开启事务，回滚撤销未提交的修改，异常转换为pymysql异常
+    """
+    conn = SQLiteConnection(':memory:')
+    try:
+        cur = conn.cursor()
+        cur.execute("CREATE TABLE t (id INTEGER PRIMARY KEY, created TIMESTAMP, amount DECIMAL(19,2))")
+        conn.commit()
+
+        assert cur.execute("INSERT INTO t (id, created, amount) VALUES (%s, %s, %s)",
+                           (1, datetime(2023, 1, 1, 8, 0), decimal.Decimal('9.5'))) == 1
+        conn.rollback()
+        cur.execute("SELECT COUNT(*) FROM t")
+        assert cur.fetchone() == (0,)
+
+        cur.execute("START TRANSACTION")
+        cur.execute("INSERT INTO t (id, created, amount) VALUES (%s, %s, %s)", (1, datetime(2023, 1, 1, 8, 0), 3))
+        conn.commit()
+        cur.execute("SELECT created, amount FROM t WHERE id = %s FOR UPDATE", (1,))
+        assert cur.fetchall() == ((datetime(2023, 1, 1, 8, 0), decimal.Decimal('3')),)
+
+        with pytest.raises(pymysql.err.IntegrityError) as error:
+            cur.execute("INSERT INTO t (id) VALUES (%s)", (1,))
+        assert isinstance(error.value.__cause__, sqlite3.IntegrityError)
+        with pytest.raises(pymysql.err.OperationalError):
+            cur.execute("SELECT missing FROM t")
+    finally:
+        conn.close()
+    assert conn.open is False
@@ -1,6 +1,8 @@
 import pytest
 from services.ExpendService import ExpendService
+from utils.CursorUtils import CursorUtils
 from unittest.mock import patch, MagicMock
+from datetime import datetime
 import sys
 import os
 
@@ -329,9 +331,90 @@ def test_get_expends_by_user_id_success(mock_expend_dao, test_expend_data):
         test_expend_data['user_id']
     )
     
-    # 验证结果
+    # 验证结果 - 没有limit和cursor时与旧接口一致，不分页并直接返回记录列表
     assert success is True
     assert message == "查询支出记录列表成功"
     assert len(data) == 2
     assert data[0]['id'] == test_expend_data['id']
     assert data[1]['id'] == 2
+    mock_dao_instance.get_expends_by_user_id.assert_called_once_with(
+        test_expend_data['user_id'], account_id=None, expend_type_id=None, start_time=None, end_time=None,
+        min_money=None, max_money=None, enable=None
+    )
+    
+    # 只提供cursor时按默认每页记录数分页
+    success, message, data = expend_service.get_expends_by_user_id(
+        test_expend_data['user_id'], cursor=CursorUtils.encode('2023-01-03 12:00:00', 3)
+    )
+    assert success is True
+    assert len(data['list']) == 2
+    assert data['next_cursor'] is None
+    _, kwargs = mock_dao_instance.get_expends_by_user_id.call_args
+    assert kwargs['limit'] == ExpendService.DEFAULT_PAGE_SIZE + 1
+
+
+@patch('services.ExpendService.ExpendDAO')
+def test_get_expends_by_user_id_paginates_with_cursor(mock_expend_dao):
+    """
+    测试分页查询支出记录列表：返回下一页游标，并用游标查询下一页
+    """
+    # 配置模拟 - 每页2条，DAO多返回1条表示还有下一页
+    mock_dao_instance = MagicMock()
+    mock_expend_dao.return_value = mock_dao_instance
+    mock_dao_instance.get_expends_by_user_id.return_value = [
+        (3, 300, 1, 1, '测试支出3', '2023-01-03 12:00:00', '2023-01-03 12:00:00', True, 1),
+        (2, 200, 1, 1, '测试支出2', '2023-01-02 12:00:00', '2023-01-02 12:00:00', True, 1),
+        (1, 100, 1, 1, '测试支出1', '2023-01-01 12:00:00', '2023-01-01 12:00:00', True, 1)
+    ]
+    
+    # 创建Service实例
+    expend_service = ExpendService()
+    
+    # 执行测试 - 第一页
+    success, message, data = expend_service.get_expends_by_user_id(1, limit=2)
+    
+    # 验证结果
+    assert success is True
+    assert [expend['id'] for expend in data['list']] == [3, 2]
+    assert data['next_cursor']
+    
+    # 执行测试 - 使用游标查询下一页，游标解析为最后一条记录的时间和ID
+    mock_dao_instance.get_expends_by_user_id.return_value = []
+    success, message, next_page = expend_service.get_expends_by_user_id(1, limit=2, cursor=data['next_cursor'])
+    
+    assert success is True
+    assert next_page == {"list": [], "next_cursor": None}
+    _, kwargs = mock_dao_instance.get_expends_by_user_id.call_args
+    assert kwargs['limit'] == 3
+    assert kwargs['cursor'] == (datetime(2023, 1, 2, 12, 0, 0), 2)
+
+
+@patch('services.ExpendService.ExpendDAO')
+def test_get_expends_by_user_id_invalid_page_params(mock_expend_dao):
+    """
+    测试分页参数无效时返回错误且不查询数据库
+    """
+    mock_dao_instance = MagicMock()
+    mock_expend_dao.return_value = mock_dao_instance
+    
+    expend_service = ExpendService()
+    
+    success, message, data = expend_service.get_expends_by_user_id(1, limit=0)
+    assert success is False
+    assert message == "limit必须大于0"
+    
+    success, message, data = expend_service.get_expends_by_user_id(1, cursor="not-a-cursor")
+    assert success is False
+    assert message == "无效的分页游标"
+    
+    success, message, data = expend_service.get_expends_by_user_id(
+        1, start_time=datetime(2023, 2, 1), end_time=datetime(2023, 1, 1)
+    )
+    assert success is False
+    assert message == "开始时间不能晚于结束时间"
+    
+    success, message, data = expend_service.get_expends_by_user_id(1, min_money=200, max_money=100)
+    assert success is False
+    assert message == "最小金额不能大于最大金额"
+    
+    mock_dao_instance.get_expends_by_user_id.assert_not_called()
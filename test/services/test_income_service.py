@@ -1,6 +1,8 @@
 import pytest
 from services.IncomeService import IncomeService
 from unittest.mock import patch, MagicMock
+from datetime import datetime
+from utils.CursorUtils import CursorUtils
 import sys
 import os
 
@@ -258,7 +260,7 @@ def test_get_incomes_by_user_id_success(mock_income_dao, test_income_data):
         test_income_data['user_id']
     )
     
-    # 验证结果
+    # 验证结果 - 没有limit和cursor时与旧接口一致，不分页并直接返回记录列表
     assert success is True
     assert "成功" in message
     assert data is not None
@@ -268,10 +270,33 @@ def test_get_incomes_by_user_id_success(mock_income_dao, test_income_data):
     
     # 验证DAO调用
     mock_income_dao.get_incomes_by_user_id.assert_called_once_with(
-        test_income_data['user_id']
+        test_income_data['user_id'], account_id=None, income_type_id=None, start_time=None, end_time=None,
+        min_money=None, max_money=None, enable=None
     )
 
 
+def test_get_incomes_by_user_id_next_cursor(mock_income_dao):
+    """
+    测试分页查询收入记录列表时还有下一页则返回游标
+    """
+    # 配置模拟DAO返回值 - 每页1条，多返回1条表示还有下一页
+    mock_income_dao.get_incomes_by_user_id.return_value = [
+        (2, 200, 1, 1, '测试收入2', '2023-01-02 12:00:00', '2023-01-02 12:00:00', True, 1),
+        (1, 100, 1, 1, '测试收入1', '2023-01-01 12:00:00', '2023-01-01 12:00:00', True, 1)
+    ]
+    
+    # 创建Service实例
+    income_service = IncomeService()
+    
+    # 执行测试
+    success, message, data = income_service.get_incomes_by_user_id(1, limit=1)
+    
+    # 验证结果
+    assert success is True
+    assert [income['id'] for income in data['list']] == [2]
+    assert CursorUtils.decode(data['next_cursor']) == (datetime(2023, 1, 2, 12, 0, 0), 2)
+
+
 def test_get_income_by_id_not_found(mock_income_dao, test_income_data):
     """
     测试根据ID查询收入记录不存在
@@ -0,0 +1,45 @@
+import pytest
+from services.SessionSweeper import SessionSweeper
+from unittest.mock import patch
+import sys
+import os
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+
+@pytest.fixture(scope='function')
+def mock_session_dao():
+    """
+    创建模拟的SessionDAO
+    """
+    with patch('services.SessionSweeper.SessionDAO') as mock_dao_class:
+        mock_dao = mock_dao_class.return_value
+        yield mock_dao
+
+
+def test_sweep_deletes_in_batches(mock_session_dao):
+    """
+    测试一批删满时继续删除，直到不足一批
+    """
+    mock_session_dao.delete_expired_sessions.side_effect = [2, 2, 1]
+    sweeper = SessionSweeper(interval=60, batch_size=2)
+
+    with patch.object(SessionSweeper, 'BATCH_PAUSE', 0):
+        assert sweeper.sweep() == 5
+
+    assert mock_session_dao.delete_expired_sessions.call_count == 3
+    mock_session_dao.delete_expired_sessions.assert_called_with(2)
+
+
+def test_start_and_stop(mock_session_dao):
+    """
+    测试后台线程启动后可以及时停止
+    """
+    mock_session_dao.delete_expired_sessions.return_value = 0
+    sweeper = SessionSweeper(interval=0.01, batch_size=100)
+
+    sweeper.start()
+    sweeper.stop()
+
+    assert sweeper._thread is None
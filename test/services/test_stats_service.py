@@ -0,0 +1,155 @@
+import pytest
+import decimal
+from datetime import date, datetime
+from services.StatsService import StatsService
+from dao.StatsDAO import StatsDAO
+from unittest.mock import patch, MagicMock
+import sys
+import os
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+
+@pytest.fixture(scope='function')
+def mock_stats_db():
+    """
+    创建模拟的数据库连接，StatsDAO执行真实的SQL拼接
+    """
+    with patch('dao.StatsDAO.Database') as mock_db_class:
+        mock_db = MagicMock()
+        mock_db.connect.return_value = True
+        mock_db.execute.return_value = True
+        mock_db_class.return_value = mock_db
+        yield mock_db
+
+
+def test_get_grouped_stats_by_month(mock_stats_db):
+    """
+    测试按整月范围分组统计支出时读取日汇总表
+    """
+    # 配置模拟 - 数据库返回分组结果
+    mock_stats_db.cur.fetchall.return_value = [
+        ('2023-01', 3, decimal.Decimal('300')),
+        ('2023-02', 1, decimal.Decimal('50.5'))
+    ]
+
+    # 创建Service实例
+    stats_service = StatsService()
+
+    # 执行测试
+    success, message, data = stats_service.get_grouped_stats(
+        'expend', 1, 'month', datetime(2023, 1, 1), datetime(2023, 2, 28, 23, 59, 59)
+    )
+
+    # 验证结果
+    assert success is True
+    assert data['items'] == [
+        {"key": '2023-01', "count": 3, "total": 300},
+        {"key": '2023-02', "count": 1, "total": 50.5}
+    ]
+    assert data['count'] == 4
+    assert data['total'] == 350.5
+
+    # 验证SQL
+    query, params = mock_stats_db.execute.call_args[0]
+    assert "DATE_FORMAT(day, '%%Y-%%m') AS group_key, COALESCE(SUM(record_count), 0)" in query
+    assert "FROM expend_daily WHERE user_id = %s AND day >= %s AND day <= %s" in query
+    assert query.endswith("GROUP BY group_key HAVING COALESCE(SUM(record_count), 0) > 0 ORDER BY group_key")
+    assert params == (1, date(2023, 1, 1), date(2023, 2, 28))
+
+
+def test_get_grouped_stats_partial_day_reads_raw_records(mock_stats_db):
+    """
+    测试时间范围不是整天时直接在原始记录表上分组统计
+    """
+    mock_stats_db.cur.fetchall.return_value = [('2023-01-01', 1, decimal.Decimal('20'))]
+
+    stats_service = StatsService()
+
+    success, message, data = stats_service.get_grouped_stats(
+        'expend', 1, 'day', datetime(2023, 1, 1, 8, 0, 0), datetime(2023, 1, 1, 18, 0, 0)
+    )
+
+    assert success is True
+    query, params = mock_stats_db.execute.call_args[0]
+    assert "DATE_FORMAT(expend_time, '%%Y-%%m-%%d') AS group_key, COUNT(*)" in query
+    assert "FROM expend WHERE user_id = %s AND enable = TRUE AND expend_time >= %s AND expend_time <= %s" in query
+    assert params == (1, datetime(2023, 1, 1, 8, 0, 0), datetime(2023, 1, 1, 18, 0, 0))
+
+
+def test_get_grouped_stats_by_type_uses_kind_column(mock_stats_db):
+    """
+    测试按类型分组统计收入时使用收入类型字段
+    """
+    mock_stats_db.cur.fetchall.return_value = [(1, 2, decimal.Decimal('8000'))]
+
+    stats_service = StatsService()
+
+    success, message, data = stats_service.get_grouped_stats('income', 1, 'type')
+
+    assert success is True
+    assert data['items'] == [{"key": 1, "count": 2, "total": 8000}]
+    query, params = mock_stats_db.execute.call_args[0]
+    assert query.startswith("SELECT COALESCE(income_type_id, 0) AS group_key")
+    assert "FROM income_daily" in query
+    assert params == (1,)
+
+
+def test_get_grouped_stats_invalid_params(mock_stats_db):
+    """
+    测试统计对象、分组维度或时间范围无效时不查询数据库
+    """
+    stats_service = StatsService()
+
+    success, message, data = stats_service.get_grouped_stats('account', 1, 'month')
+    assert success is False
+    assert message == "不支持的统计对象: account"
+
+    success, message, data = stats_service.get_grouped_stats('expend', 1, 'year')
+    assert success is False
+    assert "group_by" in message
+
+    success, message, data = stats_service.get_grouped_stats('expend', 1, 'day', datetime(2023, 2, 1), datetime(2023, 1, 1))
+    assert success is False
+    assert message == "开始时间不能晚于结束时间"
+
+    mock_stats_db.execute.assert_not_called()
+
+
+def test_get_grouped_stats_query_failure(mock_stats_db):
+    """
+    测试查询失败时返回统计失败，而不是空的统计结果
+    """
+    mock_stats_db.execute.return_value = False
+    stats_service = StatsService()
+
+    success, message, data = stats_service.get_grouped_stats('expend', 1, 'month')
+
+    assert success is False
+    assert message == "统计失败"
+    assert data is None
+
+
+def test_get_summary(mock_stats_db):
+    """
+    测试汇总统计支出、收入及结余
+    """
+    # 配置模拟 - 依次返回支出和收入的合计
+    mock_stats_db.cur.fetchone.side_effect = [
+        (3, decimal.Decimal('300')),
+        (1, decimal.Decimal('5000'))
+    ]
+
+    stats_service = StatsService()
+
+    success, message, data = stats_service.get_summary(1)
+
+    assert success is True
+    assert data == {
+        "expend": {"count": 3, "total": 300},
+        "income": {"count": 1, "total": 5000},
+        "net": 4700
+    }
+    queries = [call.args[0] for call in mock_stats_db.execute.call_args_list]
+    assert [query.split(" FROM ")[1].split(" ")[0] for query in queries] == ['expend_daily', 'income_daily']
@@ -0,0 +1,349 @@
+import logging
+import pytest
+from unittest.mock import patch
+from utils.LogUtils import (LogUtils, AsyncLogQueue, AsyncQueueHandler, BufferedStreamHandler, BufferedRotatingFileHandler,
+                            StructuredMessage, KeywordMatcher, ContentFilter, ModuleFilter)
+import sys
+import os
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+
+class CollectingHandler(logging.Handler):
+    """收集日志消息并记录flush次数的处理器"""
+
+    def __init__(self, level=logging.NOTSET):
+        super().__init__(level)
+        self.messages = []
+        self.flush_count = 0
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+
+    def flush(self):
+        self.flush_count += 1
+
+
+def make_record(name, msg, args=None, level=logging.INFO):
+    return logging.LogRecord(name, level, __file__, 0, msg, args, None)
+
+
+def test_async_queue_writes_batch_to_handlers():
+    """
+    测试监听线程把一批日志写入处理器后只flush一次，停止时写完剩余日志
+    """
+    handler = CollectingHandler()
+    warning_handler = CollectingHandler(logging.WARNING)
+    log_queue = AsyncLogQueue([handler, warning_handler], queue_size=100, batch_size=50)
+
+    # 监听线程启动前放入的日志在第一批中写出
+    for i in range(10):
+        log_queue.put(make_record('Database', "执行SQL %s", (i,)))
+    log_queue.put(make_record('API', "收到请求"))
+    log_queue.start()
+    log_queue.stop()
+
+    assert handler.messages == [f"执行SQL {i}" for i in range(10)] + ["收到请求"]
+    assert handler.flush_count == 1
+    assert warning_handler.messages == []
+    stats = log_queue.stats()
+    assert stats['queue_depth'] == 0
+    assert stats['max_depth'] == 11
+    assert stats['written'] == 11
+    assert stats['dropped'] == 0
+
+    # 停止后在当前线程直接写入
+    log_queue.put(make_record('Database', "停止后的日志"))
+    assert handler.messages[-1] == "停止后的日志"
+
+
+@pytest.mark.parametrize("policy, expected", [
+    ('drop_new', ["0", "1"]),
+    ('drop_old', ["3", "4"]),
+    ('block', ["0", "1"])
+])
+def test_async_queue_overflow_policy(policy, expected):
+    """
+    测试队列满时按溢出策略丢弃日志并计数
+    """
+    handler = CollectingHandler()
+    log_queue = AsyncLogQueue([handler], queue_size=2, overflow_policy=policy, block_timeout=0.01)
+
+    for i in range(5):
+        log_queue.put(make_record('API', str(i)))
+
+    assert log_queue.stats()['queue_depth'] == 2
+    assert log_queue.stats()['dropped'] == 3
+
+    log_queue.start()
+    log_queue.stop()
+    assert handler.messages == expected
+
+
+@pytest.mark.parametrize("policy, written_first", [
+    ('drop_new', "执行SQL失败"),
+    ('drop_old', "连接失败"),
+    ('block', "执行SQL失败"),
+])
+def test_async_queue_full_keeps_error_records(policy, written_first):
+    """
+    测试队列满时ERROR日志不被丢弃：要丢弃的ERROR日志（新日志，或drop_old挤出的旧日志）在当前线程同步写入
+    """
+    handler = CollectingHandler()
+    log_queue = AsyncLogQueue([handler], queue_size=2, overflow_policy=policy, block_timeout=0.01)
+    log_queue.put(make_record('Database', "连接失败", level=logging.ERROR))
+    log_queue.put(make_record('API', "0"))
+
+    log_queue.put(make_record('Database', "执行SQL失败", level=logging.ERROR))
+    log_queue.put(make_record('API', "1"))
+
+    # 监听线程尚未启动，同步写入的日志已经到达处理器
+    assert handler.messages == [written_first]
+    assert log_queue.stats()['dropped'] == 1
+
+    log_queue.start()
+    log_queue.stop()
+    assert "连接失败" in handler.messages
+    assert "执行SQL失败" in handler.messages
+
+
+def test_async_queue_invalid_policy():
+    """
+    测试不支持的溢出策略
+    """
+    with pytest.raises(ValueError):
+        AsyncLogQueue([], overflow_policy='discard')
+
+
+def test_async_queue_handler_defers_flush():
+    """
+    测试入队处理器固定日志消息，批量模式下的处理器只在批次结束时flush
+    """
+    stream_handler = BufferedStreamHandler(sys.stdout)
+    log_queue = AsyncLogQueue([stream_handler], queue_size=10)
+    assert stream_handler.batching is True
+
+    logger = logging.getLogger('test_async_queue_handler')
+    logger.propagate = False
+    logger.addHandler(AsyncQueueHandler(log_queue))
+    try:
+        logger.warning("用户%s的token已过期", 1)
+        record = log_queue.queue.get_nowait()
+        assert record.msg == "用户1的token已过期"
+        assert record.args is None
+    finally:
+        logger.handlers.clear()
+
+    log_queue.stop()
+    assert stream_handler.batching is False
+
+
+def test_loggers_share_handlers_per_config(tmp_path):
+    """
+    测试同一配置文件的日志器共享一套处理器，配置文件只解析一次
+    """
+    config_file = tmp_path / 'LogConfig.ini'
+    config_file.write_text(
+        "[logging]\n"
+        "level = INFO\n"
+        "console_enabled = false\n"
+        "file_enabled = true\n"
+        f"file_dir = {tmp_path}\n"
+        "file_name = app.log\n"
+        "async_enabled = false\n",
+        encoding='utf-8'
+    )
+    config_path = str(config_file)
+
+    try:
+        database_logger = LogUtils.get_instance('SharedDatabase', config_path)
+        api_logger = LogUtils.get_instance('SharedAPI', config_path)
+
+        assert database_logger.config is api_logger.config
+        assert database_logger.get_logger().handlers == api_logger.get_logger().handlers
+        handlers = database_logger.get_logger().handlers
+        assert len(handlers) == 1
+        assert isinstance(handlers[0], BufferedRotatingFileHandler)
+
+        # 过滤器只作用于添加它的日志器
+        database_logger.add_content_filter(exclude_keywords=['忽略'])
+        database_logger.info("需要忽略的日志")
+        api_logger.info("需要忽略的日志")
+        database_logger.info("连接数据库")
+        handlers[0].flush()
+
+        lines = (tmp_path / 'app.log').read_text(encoding='utf-8').splitlines()
+        assert [line.split(' - ')[1] for line in lines] == ['SharedAPI', 'SharedDatabase']
+    finally:
+        for handler in LogUtils._handler_sets.pop(config_path, []):
+            handler.close()
+        LogUtils._configs.pop(config_path, None)
+        for name in ('SharedDatabase', 'SharedAPI'):
+            LogUtils._instances.pop(f"{name}_{config_path}", None)
+            logging.getLogger(name).handlers.clear()
+
+
+def make_log_utils(tmp_path, name, sample_rates='', level='INFO'):
+    """创建只输出到临时日志文件的LogUtils实例"""
+    config_file = tmp_path / f'{name}.ini'
+    config_file.write_text(
+        "[logging]\n"
+        f"level = {level}\n"
+        "console_enabled = false\n"
+        "file_enabled = true\n"
+        f"file_dir = {tmp_path}\n"
+        f"file_name = {name}.log\n"
+        f"file_level = {level}\n"
+        "file_format = simple\n"
+        "async_enabled = false\n"
+        f"sample_rates = {sample_rates}\n",
+        encoding='utf-8'
+    )
+    return LogUtils(name, str(config_file))
+
+
+def release_log_utils(log_utils):
+    """关闭测试创建的共享处理器"""
+    for handler in LogUtils._handler_sets.pop(log_utils.config_file, []):
+        handler.close()
+    LogUtils._configs.pop(log_utils.config_file, None)
+    log_utils.get_logger().handlers.clear()
+
+
+def test_structured_message_defers_formatting(tmp_path):
+    """
+    测试结构化日志在级别未启用时不计算字段，输出时按"事件 - 字段: 值"格式拼接
+    """
+    log_utils = make_log_utils(tmp_path, 'StructuredEvent')
+    try:
+        calls = []
+
+        def expensive():
+            calls.append(1)
+            return 'abcd'
+
+        log_utils.debug_event("token比较", token_hex=expensive)
+        assert calls == []
+
+        log_utils.info_event("收到新增支出请求", user_id=1, money=12.5, token_hex=expensive)
+        log_utils.get_logger().handlers[0].flush()
+        assert calls == [1]
+
+        content = (tmp_path / 'StructuredEvent.log').read_text(encoding='utf-8')
+        assert content.splitlines() == ["INFO - 收到新增支出请求 - user_id: 1, money: 12.5, token_hex: abcd"]
+    finally:
+        release_log_utils(log_utils)
+
+
+def test_async_queue_handler_keeps_structured_message_lazy():
+    """
+    测试异步模式下结构化日志由监听线程输出时才格式化
+    """
+    handler = CollectingHandler()
+    log_queue = AsyncLogQueue([handler], queue_size=10)
+    queue_handler = AsyncQueueHandler(log_queue)
+    calls = []
+    message = StructuredMessage("SQL 执行成功", {"affected_rows": lambda: calls.append(1) or 3})
+
+    queue_handler.handle(make_record('Database', message))
+    assert calls == []
+
+    log_queue.start()
+    log_queue.stop()
+    assert handler.messages == ["SQL 执行成功 - affected_rows: 3"]
+    assert calls == [1]
+
+
+def test_sample_rates_per_module_and_level(tmp_path):
+    """
+    测试按模块和级别采样，模块配置优先于*配置，ERROR及以上级别的日志不采样
+    """
+    log_utils = make_log_utils(
+        tmp_path, 'SampledDatabase',
+        sample_rates='SampledDatabase.INFO:0.01, *.INFO:0.5, *.WARNING:0.2, SampledAPI.DEBUG:0.1, *.ERROR:0.1, Bad.Entry'
+    )
+    try:
+        assert log_utils.sample_rates == {logging.INFO: 0.01, logging.WARNING: 0.2}
+
+        with patch('utils.LogUtils.random.random', return_value=0.05):
+            log_utils.info("连接数据库")
+            log_utils.info_event("SQL 执行成功", affected_rows=1)
+            log_utils.warning("连接池繁忙")
+            log_utils.error("数据库连接错误")
+        with patch('utils.LogUtils.random.random', return_value=0.001):
+            log_utils.info("成功获取数据库连接")
+
+        log_utils.get_logger().handlers[0].flush()
+        content = (tmp_path / 'SampledDatabase.log').read_text(encoding='utf-8')
+        assert content.splitlines() == [
+            "WARNING - ERROR及以上级别的日志不采样，忽略配置: *.ERROR:0.1",
+            "WARNING - 忽略无效的日志采样配置: Bad.Entry",
+            "WARNING - 连接池繁忙",
+            "ERROR - 数据库连接错误",
+            "INFO - 成功获取数据库连接"
+        ]
+    finally:
+        release_log_utils(log_utils)
+
+
+@pytest.mark.parametrize("keywords, text, expected", [
+    (['token', 'tok'], "验证TOKEN成功", True),
+    (['abc', 'abd', 'a.b'], "xxabdxx", True),
+    (['abc', 'abd', 'a.b'], "axb", False),
+    (['a.b', '(z'], "call (z)", True),
+    (['密码', '手机号'], "收到登录请求 - 手机号: 138", True),
+    ([], "任何日志", False)
+])
+def test_keyword_matcher(keywords, text, expected):
+    """
+    测试关键词匹配器与逐个关键词做子串匹配的结果一致
+    """
+    matcher = KeywordMatcher(keywords)
+    assert matcher.search(text) is expected
+    assert expected == any(keyword.lower() in text.lower() for keyword in keywords)
+
+
+def test_keyword_matcher_case_sensitive():
+    """
+    测试区分大小写的关键词匹配
+    """
+    matcher = KeywordMatcher(['Database', 'DAO'], ignore_case=False)
+    assert matcher.search("ExpendDAO") is True
+    assert matcher.search("database") is False
+
+
+def test_content_and_module_filters():
+    """
+    测试编译后的内容过滤器和模块过滤器
+    """
+    content_filter = ContentFilter(include_keywords=['SQL', '连接'], exclude_keywords=['调试'])
+    assert content_filter.filter(make_record('Database', "sql 执行成功")) is True
+    assert content_filter.filter(make_record('Database', "SQL 调试信息")) is False
+    assert content_filter.filter(make_record('Database', "事务提交成功")) is False
+
+    module_filter = ModuleFilter(exclude_modules=['test_log'])
+    record = make_record('Database', "SQL 执行成功")
+    assert record.module == 'test_log_utils'
+    assert module_filter.filter(record) is False
+    assert module_filter._results == {'test_log_utils': False}
+    assert ModuleFilter(include_modules=['Database']).filter(record) is False
+
+
+def test_async_queue_restarts_after_fork():
+    """
+    测试fork后在子进程中重新创建队列和锁并启动新的监听线程，已停止的队列保持停止
+    """
+    handler = CollectingHandler()
+    log_queue = AsyncLogQueue([handler], queue_size=100)
+    log_queue.start()
+    inherited_queue = log_queue.queue
+
+    log_queue.after_fork_in_child()
+    assert log_queue.queue is not inherited_queue
+    log_queue.put(make_record('API', "fork后的日志"))
+    log_queue.stop()
+    assert handler.messages == ["fork后的日志"]
+
+    log_queue.after_fork_in_child()
+    assert log_queue._thread is None
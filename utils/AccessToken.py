@@ -0,0 +1,245 @@
+import base64
+import hashlib
+import hmac
+import json
+import threading
+import time
+from utils.ConfigManager import ConfigManager
+from utils.LogUtils import LogUtils
+
+
+class AccessToken:
+    """
+    签名访问token工具类（可选的鉴权模式）
+
+    访问token格式为 v1.<载荷>.<签名>，载荷是 [用户ID, 签发时间, 过期时间, 会话标识] 的JSON（时间均为毫秒时间戳），
+    签名是以配置的密钥对 "v1.<载荷>" 计算的HMAC-SHA256，二者均为去掉填充的URL安全base64。
+    校验只需要密钥，不查询数据库；数据库中的refresh_token只用于登录和续签访问token。
+
+    会话标识由签发访问token的会话决定（见SessionDAO.session_id）。退出登录或同一设备重新登录时调用revoke_session，
+    只撤销该会话签发的访问token；修改密码或注销账号时调用revoke_user，撤销该用户此前签发的全部访问token。
+    撤销记录在访问token有效期过后自动清理。撤销时间同时写入数据库的token_revocation和session_revocation表，
+    其他进程由TokenRevocationDAO.sync定期读取后通过merge_revocations合并。
+    """
+
+    logger = LogUtils.get_instance('AccessToken')
+
+    PREFIX = 'v1'
+
+    # 默认的访问token有效期（秒）
+    DEFAULT_TTL = 900
+
+    _enabled = None
+    _secret = b''
+    _ttl = DEFAULT_TTL
+    _config_lock = threading.Lock()
+
+    # 用户ID -> 撤销时间（毫秒），签发时间不晚于撤销时间的访问token无效（同一毫秒内签发的也视为已撤销）
+    _revoked = {}
+    # 会话标识 -> 撤销时间（毫秒），该会话签发的访问token无效
+    _revoked_sessions = {}
+    _revoked_lock = threading.Lock()
+
+    @classmethod
+    def configure(cls, enabled, secret='', ttl=DEFAULT_TTL):
+        """
+        设置签名token模式
+
+        Args:
+            enabled: 是否启用签名token
+            secret: HMAC密钥
+            ttl: 访问token有效期（秒）
+        """
+        with cls._config_lock:
+            if enabled and not secret:
+                cls.logger.error("未配置签名token密钥，签名token模式未启用")
+                enabled = False
+            cls._secret = str(secret).encode('utf-8')
+            cls._ttl = int(ttl)
+            cls._enabled = bool(enabled)
+        cls.logger.info(f"签名token模式: {'启用' if cls._enabled else '未启用'}, 有效期: {cls._ttl}秒")
+
+    @classmethod
+    def _load_config(cls, config_file='config/DateBaseConfig.ini'):
+        """
+        从配置文件的[auth]节加载签名token配置，密钥可以通过环境变量AUTH_SECRET覆盖
+        """
+        try:
+            config = ConfigManager(config_file, env_override=True)
+            cls.configure(config.get('auth', 'token_mode', default='opaque') == 'signed',
+                          config.get('auth', 'secret', default=''),
+                          config.getint('auth', 'access_token_ttl', cls.DEFAULT_TTL))
+        except Exception as e:
+            cls.logger.error(f"加载签名token配置失败: {e}")
+            cls.configure(False)
+
+    @classmethod
+    def enabled(cls):
+        """
+        是否启用了签名token模式
+
+        Returns:
+            bool: 启用返回True
+        """
+        if cls._enabled is None:
+            cls._load_config()
+        return cls._enabled
+
+    @staticmethod
+    def _b64encode(data):
+        return base64.urlsafe_b64encode(data).decode('ascii').rstrip('=')
+
+    @staticmethod
+    def _b64decode(text):
+        return base64.urlsafe_b64decode(text + '=' * (-len(text) % 4))
+
+    @classmethod
+    def _sign(cls, signing_input):
+        return cls._b64encode(hmac.new(cls._secret, signing_input.encode('ascii'), hashlib.sha256).digest())
+
+    @classmethod
+    def is_access_token(cls, token):
+        """
+        判断请求中的token是否是签名访问token（未启用签名token模式时总是返回False）
+
+        Args:
+            token: 请求中的token
+
+        Returns:
+            bool: 是签名访问token返回True
+        """
+        return cls.enabled() and token.startswith(cls.PREFIX + '.')
+
+    @classmethod
+    def issue(cls, user_id, session_id=None):
+        """
+        签发访问token
+
+        Args:
+            user_id: 用户ID
+            session_id: 签发访问token的会话标识，退出登录时按会话撤销
+
+        Returns:
+            tuple: (访问token, 过期时间戳)，未启用签名token模式时返回(None, None)
+        """
+        if not cls.enabled():
+            return None, None
+        issued_at = int(time.time() * 1000)
+        expiration_time = issued_at + cls._ttl * 1000
+        payload = cls._b64encode(json.dumps([int(user_id), issued_at, expiration_time, session_id], separators=(',', ':')).encode('utf-8'))
+        signing_input = f"{cls.PREFIX}.{payload}"
+        cls.logger.info(f"签发访问token: user_id={user_id}, 过期时间={expiration_time}")
+        return f"{signing_input}.{cls._sign(signing_input)}", expiration_time
+
+    @classmethod
+    def verify(cls, token, user_id):
+        """
+        在内存中校验访问token
+
+        Args:
+            token: 访问token
+            user_id: 请求头中的用户ID
+
+        Returns:
+            bool: 签名正确、属于该用户、未过期且未被撤销返回True
+        """
+        if not cls.enabled():
+            return False
+        try:
+            prefix, payload, signature = token.split('.')
+            if prefix != cls.PREFIX or not hmac.compare_digest(signature, cls._sign(f"{prefix}.{payload}")):
+                cls.logger.warning("访问token签名无效")
+                return False
+            # 升级前签发的访问token没有会话标识
+            token_user_id, issued_at, expiration_time, *session_id = json.loads(cls._b64decode(payload))
+            session_id = session_id[0] if session_id else None
+        except (ValueError, TypeError) as e:
+            cls.logger.warning(f"访问token格式错误: {e}")
+            return False
+
+        if token_user_id != user_id:
+            cls.logger.warning(f"访问token不属于当前用户: token用户={token_user_id}, 请求用户={user_id}")
+            return False
+        if int(time.time() * 1000) > expiration_time:
+            cls.logger.warning("访问token已过期")
+            return False
+        with cls._revoked_lock:
+            revoked_at = cls._revoked.get(user_id)
+            session_revoked = session_id is not None and session_id in cls._revoked_sessions
+        if revoked_at is not None and issued_at <= revoked_at:
+            cls.logger.warning(f"访问token已被撤销: user_id={user_id}")
+            return False
+        if session_revoked:
+            cls.logger.warning(f"访问token所属的会话已退出登录: user_id={user_id}")
+            return False
+        return True
+
+    @classmethod
+    def _prune_revocations(cls, now):
+        """
+        清理撤销时间早于一个有效期的记录，对应的访问token都已过期，不再需要保留（调用方持有_revoked_lock）
+        """
+        expired_before = now - cls._ttl * 1000
+        for revocations in (cls._revoked, cls._revoked_sessions):
+            for key in [key for key, revoked_time in revocations.items() if revoked_time < expired_before]:
+                del revocations[key]
+
+    @classmethod
+    def revoke_user(cls, user_id, revoked_at=None):
+        """
+        撤销用户此前签发的全部访问token
+
+        Args:
+            user_id: 用户ID
+            revoked_at: 撤销时间（毫秒），为None时使用当前时间
+        """
+        user_id = int(user_id)
+        now = int(time.time() * 1000)
+        with cls._revoked_lock:
+            cls._prune_revocations(now)
+            cls._revoked[user_id] = max(cls._revoked.get(user_id, 0), revoked_at or now)
+        cls.logger.info(f"撤销用户的访问token: user_id={user_id}")
+
+    @classmethod
+    def revoke_session(cls, session_id, revoked_at=None):
+        """
+        撤销一个会话签发的全部访问token，用户在其他会话中的访问token不受影响
+
+        Args:
+            session_id: 会话标识
+            revoked_at: 撤销时间（毫秒），为None时使用当前时间
+        """
+        now = int(time.time() * 1000)
+        with cls._revoked_lock:
+            cls._prune_revocations(now)
+            cls._revoked_sessions[str(session_id)] = max(cls._revoked_sessions.get(str(session_id), 0), revoked_at or now)
+        cls.logger.info("撤销会话的访问token")
+
+    @classmethod
+    def oldest_valid_issue_time(cls):
+        """
+        仍在有效期内的访问token的最早签发时间，早于该时间的撤销记录不再需要同步
+
+        Returns:
+            int: 毫秒时间戳
+        """
+        return int(time.time() * 1000) - cls._ttl * 1000
+
+    @classmethod
+    def merge_revocations(cls, revocations, session_revocations=()):
+        """
+        合并从数据库读取的撤销记录，同一用户或会话保留较晚的撤销时间
+
+        Args:
+            revocations: (用户ID, 撤销时间) 的列表
+            session_revocations: (会话标识, 撤销时间) 的列表
+        """
+        with cls._revoked_lock:
+            for user_id, revoked_at in revocations:
+                user_id, revoked_at = int(user_id), int(revoked_at)
+                if revoked_at > cls._revoked.get(user_id, 0):
+                    cls._revoked[user_id] = revoked_at
+            for session_id, revoked_at in session_revocations:
+                session_id, revoked_at = str(session_id), int(revoked_at)
+                if revoked_at > cls._revoked_sessions.get(session_id, 0):
+                    cls._revoked_sessions[session_id] = revoked_at
@@ -0,0 +1,71 @@
+import hmac
+import threading
+from utils.ConfigManager import ConfigManager
+from utils.LogUtils import LogUtils
+
+
+class AdminToken:
+    """
+    运维接口的访问令牌
+
+    令牌在配置文件[admin]节的token中设置（可以通过环境变量ADMIN_TOKEN覆盖），未设置时运维接口不启用。
+    请求在X-Admin-Token请求头中携带令牌，与配置的令牌按常量时间比较。
+    """
+
+    logger = LogUtils.get_instance('AdminToken')
+
+    HEADER = 'X-Admin-Token'
+
+    _token = None
+    _config_lock = threading.Lock()
+
+    @classmethod
+    def configure(cls, token):
+        """
+        设置运维接口的访问令牌
+
+        Args:
+            token: 访问令牌，为空时不启用运维接口
+        """
+        with cls._config_lock:
+            cls._token = str(token or '')
+        cls.logger.info(f"运维接口: {'启用' if cls._token else '未启用'}")
+
+    @classmethod
+    def _load_config(cls, config_file='config/DateBaseConfig.ini'):
+        """
+        从配置文件的[admin]节加载访问令牌
+        """
+        try:
+            config = ConfigManager(config_file, env_override=True)
+            cls.configure(config.get('admin', 'token', default=''))
+        except Exception as e:
+            cls.logger.error(f"加载运维接口配置失败: {e}")
+            cls.configure('')
+
+    @classmethod
+    def enabled(cls):
+        """
+        是否启用了运维接口
+
+        Returns:
+            bool: 配置了访问令牌返回True
+        """
+        if cls._token is None:
+            cls._load_config()
+        return bool(cls._token)
+
+    @classmethod
+    def verify(cls, token):
+        """
+        校验请求中的访问令牌
+
+        Args:
+            token: 请求头中的令牌
+
+        Returns:
+            bool: 运维接口已启用且令牌一致返回True
+        """
+        if not cls.enabled() or not token:
+            return False
+        return hmac.compare_digest(str(token).encode('utf-8'), cls._token.encode('utf-8'))
@@ -1,7 +1,11 @@
 from flask import request, jsonify
 from functools import wraps
+from dao.TokenRevocationDAO import TokenRevocationDAO
 from services.UserService import UserService
 from utils.LogUtils import LogUtils
+from utils.AccessToken import AccessToken
+from utils.AdminToken import AdminToken
+from utils.TokenCache import TokenCache
 from utils.TokenUtils import TokenUtils
 
 # 初始化API日志记录器
@@ -10,6 +14,9 @@ api_logger = LogUtils.get_instance('API')
 # 创建UserService实例
 user_service = UserService()
 
+# 同步其他进程写入的访问token撤销记录
+token_revocation_dao = TokenRevocationDAO()
+
 # 鉴权装饰器
 def token_required(f):
     """
@@ -24,7 +31,7 @@ def token_required(f):
         # 确保token是字符串类型
         token = str(token)
         
-        api_logger.info(f"开始token验证 - token: {token[:10]}..., user_id_header: {user_id_header}")
+        api_logger.debug_event("开始token验证", user_id_header=user_id_header)
         
         # 验证token和user_id是否存在
         if not token:
@@ -41,19 +48,40 @@ def token_required(f):
             api_logger.warning("token验证失败: userid不是有效的整数")
             return jsonify({"errorcode": 401, "message": "无效的userid", "data": None}), 401
         
-        # 根据user_id查询用户信息
-        user = user_service.get_user_by_id(user_id)
-        if not user:
-            api_logger.warning(f"token验证失败: 用户不存在 - user_id: {user_id}")
-            return jsonify({"errorcode": 401, "message": "用户不存在", "data": None}), 401
+        # 签名访问token在内存中校验，不查询用户表
+        if AccessToken.is_access_token(token):
+            token_revocation_dao.sync()
+            if AccessToken.verify(token, user_id):
+                api_logger.info("token验证成功（签名token）")
+                return f(*args, **kwargs)
+            api_logger.warning("token验证失败: 签名token无效、已过期或已撤销")
+            return jsonify({"errorcode": 401, "message": "无效或已过期的token", "data": None}), 401
         
-        # 从user元组中获取token和过期时间
-        stored_token = user[4]  # refresh_token
-        token_expiration_time = user[5]  # token_expiration_time
+        # 缓存中的token一致且未过期时不再查询用户表
+        if TokenCache.is_valid(user_id, token):
+            api_logger.info("token验证成功（缓存）")
+            return f(*args, **kwargs)
+        
+        # 按token摘要查询当前设备的会话，旧版本登录的token回退到用户表中的refresh_token
+        generation = TokenCache.generation()
+        session = user_service.get_session(user_id, token)
+        if session:
+            stored_token = token
+            token_expiration_time = session[2]  # expiration_time
+        else:
+            user = user_service.get_user_by_id(user_id)
+            if not user:
+                api_logger.warning(f"token验证失败: 用户不存在 - user_id: {user_id}")
+                return jsonify({"errorcode": 401, "message": "用户不存在", "data": None}), 401
+            
+            # 从user元组中获取token和过期时间
+            stored_token = user[4]  # refresh_token
+            token_expiration_time = user[5]  # token_expiration_time
         
         # 确保stored_token是字符串类型
         if stored_token is not None:
             stored_token = str(stored_token)
+        TokenCache.put(user_id, stored_token, token_expiration_time, generation)
         
         # 验证token
         if TokenUtils.validate_token(token, stored_token, token_expiration_time):
@@ -64,3 +92,20 @@ def token_required(f):
             return jsonify({"errorcode": 401, "message": "无效或已过期的token", "data": None}), 401
     
     return decorated
+
+
+def admin_token_required(f):
+    """
+    运维接口鉴权装饰器，未配置运维令牌时接口不启用
+    """
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        if not AdminToken.enabled():
+            api_logger.warning(f"运维接口未启用: {request.path}")
+            return jsonify({"errorcode": 404, "message": "运维接口未启用", "data": None}), 404
+        if not AdminToken.verify(request.headers.get(AdminToken.HEADER, '').strip()):
+            api_logger.warning(f"运维接口鉴权失败: {request.path}")
+            return jsonify({"errorcode": 401, "message": "无效的运维令牌", "data": None}), 401
+        return f(*args, **kwargs)
+    
+    return decorated
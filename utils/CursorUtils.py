@@ -0,0 +1,54 @@
+import base64
+import json
+from datetime import datetime
+from typing import Optional, Tuple
+
+
+class CursorUtils:
+    """
+    分页游标工具类，将 (记录时间, 记录ID) 编码为对客户端不透明的字符串
+
+    记录时间可以为空（支出/收入时间是可空字段），编码为JSON的null，解析后为None
+    """
+
+    @staticmethod
+    def encode(record_time, record_id: int) -> str:
+        """
+        将分页位置编码为游标
+
+        Args:
+            record_time: 当前页最后一条记录的时间（datetime、时间字符串或None）
+            record_id: 当前页最后一条记录的ID
+
+        Returns:
+            str: URL安全的游标字符串
+        """
+        if isinstance(record_time, datetime):
+            record_time = record_time.isoformat(sep=' ')
+        elif record_time is not None:
+            record_time = str(record_time)
+        payload = json.dumps([record_time, int(record_id)], separators=(',', ':'))
+        return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+    @staticmethod
+    def decode(cursor: str) -> Tuple[Optional[datetime], int]:
+        """
+        解析游标
+
+        Args:
+            cursor: encode生成的游标字符串
+
+        Returns:
+            tuple: (记录时间, 记录ID)，记录时间为空时为None
+
+        Raises:
+            ValueError: 游标格式无效
+        """
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            record_time, record_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+            if record_time is None:
+                return None, int(record_id)
+            return datetime.fromisoformat(record_time), int(record_id)
+        except Exception:
+            raise ValueError("无效的分页游标")
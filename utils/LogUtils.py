@@ -1,11 +1,84 @@
+import atexit
 import logging
 import os
+import queue
+import random
+import re
 import sys
-from logging.handlers import RotatingFileHandler, TimedRotatingFileHandler, SMTPHandler, SocketHandler, DatagramHandler
+import threading
+from logging.handlers import RotatingFileHandler, TimedRotatingFileHandler, SMTPHandler, SocketHandler, DatagramHandler, QueueHandler
 from typing import Dict, Any, Optional, List, Callable
 from utils.ConfigManager import ConfigManager
 
 
+class KeywordMatcher:
+    """
+    关键词匹配器
+
+    把关键词列表编译成一个前缀树形式的正则表达式，一次扫描判断文本是否包含任一关键词。
+    共享前缀的关键词合并为同一分支，匹配开销基本不随关键词数量增长
+    """
+
+    def __init__(self, keywords: Optional[List[str]] = None, ignore_case: bool = True):
+        """
+        初始化关键词匹配器
+
+        :param keywords: 关键词列表
+        :param ignore_case: 是否忽略大小写
+        """
+        self.keywords = [keyword for keyword in (keywords or []) if keyword]
+        self.ignore_case = ignore_case
+        self._pattern = None
+        if self.keywords:
+            trie = {}
+            for keyword in self.keywords:
+                self._insert(trie, keyword.lower() if ignore_case else keyword)
+            # 忽略大小写时关键词和文本都转换为小写后匹配，比re.IGNORECASE快
+            self._pattern = re.compile(self._build(trie))
+
+    @staticmethod
+    def _insert(trie: Dict[str, Any], keyword: str):
+        node = trie
+        for char in keyword:
+            if '' in node:
+                # 已有更短的关键词是当前关键词的前缀，包含当前关键词的文本一定包含该前缀
+                return
+            node = node.setdefault(char, {})
+        # 当前关键词结束，更长的关键词都可以省略
+        node.clear()
+        node[''] = True
+
+    @staticmethod
+    def _build(node: Dict[str, Any]) -> str:
+        if '' in node:
+            return ''
+        leaves = [char for char, child in node.items() if '' in child]
+        branches = [re.escape(char) + KeywordMatcher._build(child) for char, child in sorted(node.items()) if '' not in child]
+        if len(leaves) == 1:
+            branches.insert(0, re.escape(leaves[0]))
+        elif leaves:
+            branches.insert(0, '[' + ''.join(re.escape(char) for char in sorted(leaves)) + ']')
+        if len(branches) == 1:
+            return branches[0]
+        return '(?:' + '|'.join(branches) + ')'
+
+    def __bool__(self):
+        return self._pattern is not None
+
+    def search(self, text: str) -> bool:
+        """
+        判断文本是否包含任一关键词
+
+        :param text: 要匹配的文本
+        :return: 包含任一关键词返回True，关键词列表为空时返回False
+        """
+        if self._pattern is None:
+            return False
+        if self.ignore_case:
+            text = text.lower()
+        return self._pattern.search(text) is not None
+
+
 class ContentFilter(logging.Filter):
     """自定义内容过滤器"""
     
@@ -19,6 +92,9 @@ class ContentFilter(logging.Filter):
         super().__init__()
         self.include_keywords = include_keywords or []
         self.exclude_keywords = exclude_keywords or []
+        # 关键词匹配忽略大小写
+        self._include = KeywordMatcher(self.include_keywords)
+        self._exclude = KeywordMatcher(self.exclude_keywords)
     
     def filter(self, record):
         """
@@ -30,20 +106,15 @@ class ContentFilter(logging.Filter):
         message = str(record.getMessage())
         
         # 先检查是否需要排除
-        for keyword in self.exclude_keywords:
-            if keyword.lower() in message.lower():
-                return False
+        if self._exclude.search(message):
+            return False
         
         # 如果没有包含关键词要求，则保留所有不被排除的日志
-        if not self.include_keywords:
+        if not self._include:
             return True
         
         # 检查是否包含要求的关键词
-        for keyword in self.include_keywords:
-            if keyword.lower() in message.lower():
-                return True
-        
-        return False
+        return self._include.search(message)
 
 
 class ModuleFilter(logging.Filter):
@@ -59,6 +130,11 @@ class ModuleFilter(logging.Filter):
         super().__init__()
         self.include_modules = include_modules or []
         self.exclude_modules = exclude_modules or []
+        # 模块名匹配区分大小写
+        self._include = KeywordMatcher(self.include_modules, ignore_case=False)
+        self._exclude = KeywordMatcher(self.exclude_modules, ignore_case=False)
+        # 模块名数量有限，缓存每个模块的过滤结果
+        self._results: Dict[str, bool] = {}
     
     def filter(self, record):
         """
@@ -68,22 +144,323 @@ class ModuleFilter(logging.Filter):
         :return: 是否保留该日志记录
         """
         module_name = record.module
-        
+        result = self._results.get(module_name)
+        if result is None:
+            result = self._match(module_name)
+            self._results[module_name] = result
+        return result
+    
+    def _match(self, module_name: str) -> bool:
         # 先检查是否需要排除
-        for module in self.exclude_modules:
-            if module in module_name:
-                return False
+        if self._exclude.search(module_name):
+            return False
         
         # 如果没有包含模块要求，则保留所有不被排除的日志
-        if not self.include_modules:
+        if not self._include:
             return True
         
         # 检查是否包含要求的模块
-        for module in self.include_modules:
-            if module in module_name:
-                return True
-        
-        return False
+        return self._include.search(module_name)
+
+
+class StructuredMessage:
+    """
+    结构化日志消息
+
+    保存事件名称和字段，只有处理器真正输出日志时才拼接成"事件 - 字段: 值, ..."格式的文本。
+    字段值可以是无参可调用对象，输出时才调用，用于推迟开销较大的计算。
+    拼接结果会被缓存，多个处理器输出同一条日志时只计算一次
+    """
+
+    __slots__ = ('event', 'fields', '_text')
+
+    def __init__(self, event: str, fields: Dict[str, Any]):
+        """
+        初始化结构化日志消息
+
+        :param event: 事件名称
+        :param fields: 日志字段
+        """
+        self.event = event
+        self.fields = fields
+        self._text = None
+
+    def __str__(self):
+        if self._text is not None:
+            return self._text
+        if not self.fields:
+            self._text = self.event
+            return self._text
+        parts = []
+        for key, value in self.fields.items():
+            if callable(value):
+                try:
+                    value = value()
+                except Exception as e:
+                    value = f"<计算失败: {e}>"
+            parts.append(f"{key}: {value}")
+        self._text = f"{self.event} - {', '.join(parts)}"
+        return self._text
+
+
+class BatchFlushMixin:
+    """
+    批量刷新混入类
+
+    异步模式下由队列监听线程写入，每条日志不再单独flush，
+    而是在一批日志写完后调用flush_batch统一刷新到文件或控制台
+    """
+
+    batching = False
+
+    def flush(self):
+        if not self.batching:
+            super().flush()
+
+    def flush_batch(self):
+        """刷新本批写入的日志"""
+        super().flush()
+
+
+class BufferedStreamHandler(BatchFlushMixin, logging.StreamHandler):
+    """支持批量刷新的控制台处理器"""
+
+
+class BufferedRotatingFileHandler(BatchFlushMixin, RotatingFileHandler):
+    """支持批量刷新的按大小轮转文件处理器"""
+
+
+class BufferedTimedRotatingFileHandler(BatchFlushMixin, TimedRotatingFileHandler):
+    """支持批量刷新的按时间轮转文件处理器"""
+
+
+class AsyncLogQueue:
+    """
+    异步日志队列
+
+    请求线程只把日志记录放入有界队列，由一个后台监听线程批量取出，
+    写入配置文件对应的共享处理器，写完一批后统一flush。
+    队列满时按溢出策略处理：
+    - drop_new: 丢弃新日志（默认）
+    - drop_old: 丢弃队列中最旧的日志，再放入新日志
+    - block: 阻塞等待队列空位，超过block_timeout秒仍然没有空位则丢弃新日志
+    溢出策略只丢弃WARNING以下级别的日志：要丢弃的日志是WARNING及以上级别时，改为在当前线程同步写入，
+    数据库、鉴权等故障的日志在高负载下也不会丢失（同步写入的日志可能排在队列中更早的日志之前）。
+    """
+
+    OVERFLOW_POLICIES = ('drop_new', 'drop_old', 'block')
+
+    # 不丢弃的最低日志级别，队列满时同步写入
+    MIN_KEPT_LEVEL = logging.WARNING
+
+    # 停止监听线程的哨兵
+    _SENTINEL = None
+
+    def __init__(self, handlers: List[logging.Handler], queue_size: int = 10000, overflow_policy: str = 'drop_new',
+                 batch_size: int = 200, block_timeout: float = 1.0):
+        """
+        初始化异步日志队列
+
+        :param handlers: 由监听线程写入的处理器列表
+        :param queue_size: 队列容量
+        :param overflow_policy: 队列满时的处理策略
+        :param batch_size: 监听线程每批最多写入的日志条数
+        :param block_timeout: block策略下等待队列空位的最长时间（秒）
+        """
+        if overflow_policy not in self.OVERFLOW_POLICIES:
+            raise ValueError(f"不支持的日志队列溢出策略: {overflow_policy}")
+        self.queue = queue.Queue(maxsize=max(1, queue_size))
+        self.queue_size = max(1, queue_size)
+        self.overflow_policy = overflow_policy
+        self.batch_size = max(1, batch_size)
+        self.block_timeout = block_timeout
+        self.handlers = list(handlers)
+        for handler in self.handlers:
+            if isinstance(handler, BatchFlushMixin):
+                handler.batching = True
+        self.dropped = 0
+        self.written = 0
+        self.max_depth = 0
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stopped = False
+
+    def start(self):
+        """启动监听线程"""
+        with self._lock:
+            if self._thread is not None or self._stopped:
+                return
+            self._thread = threading.Thread(target=self._run, name='AsyncLogQueue', daemon=True)
+            self._thread.start()
+
+    def put(self, record: logging.LogRecord):
+        """
+        把日志记录放入队列，队列满时按溢出策略处理
+
+        :param record: 日志记录对象
+        """
+        if self._stopped:
+            # 监听线程已停止，直接在当前线程写入
+            self._write([record])
+            return
+        try:
+            if self.overflow_policy == 'block':
+                self.queue.put(record, timeout=self.block_timeout)
+            elif self.overflow_policy == 'drop_old':
+                while True:
+                    try:
+                        self.queue.put_nowait(record)
+                        break
+                    except queue.Full:
+                        try:
+                            self._discard(self.queue.get_nowait())
+                        except queue.Empty:
+                            pass
+            else:
+                self.queue.put_nowait(record)
+        except queue.Full:
+            self._discard(record)
+            return
+        depth = self.queue.qsize()
+        if depth > self.max_depth:
+            self.max_depth = depth
+
+    def _discard(self, record: logging.LogRecord):
+        """
+        处理因队列已满不能放入队列的日志：WARNING及以上级别在当前线程同步写入，其余计入丢弃数
+
+        :param record: 日志记录对象
+        """
+        if record is not self._SENTINEL and record.levelno >= self.MIN_KEPT_LEVEL:
+            self._write([record])
+        else:
+            self._count_dropped()
+
+    def _count_dropped(self):
+        with self._lock:
+            self.dropped += 1
+
+    def _run(self):
+        """监听线程主循环：取出一批日志写入处理器"""
+        while True:
+            record = self.queue.get()
+            batch = [record]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            stopping = any(item is self._SENTINEL for item in batch)
+            self._write([item for item in batch if item is not self._SENTINEL])
+            if stopping:
+                return
+
+    def _write(self, records: List[logging.LogRecord]):
+        """
+        把一批日志写入对应的处理器，写完后统一刷新
+
+        :param records: 日志记录列表
+        """
+        touched = []
+        for record in records:
+            for handler in self.handlers:
+                if record.levelno >= handler.level:
+                    handler.handle(record)
+                    if handler not in touched:
+                        touched.append(handler)
+        for handler in touched:
+            try:
+                if isinstance(handler, BatchFlushMixin):
+                    handler.flush_batch()
+                else:
+                    handler.flush()
+            except Exception:
+                pass
+        # 监听线程和队列满时同步写入的请求线程都会调用
+        with self._lock:
+            self.written += len(records)
+
+    def stop(self, timeout: float = 5.0):
+        """
+        停止监听线程，写完队列中剩余的日志
+
+        :param timeout: 等待监听线程退出的最长时间（秒）
+        """
+        with self._lock:
+            if self._stopped:
+                return
+            self._stopped = True
+            thread = self._thread
+        if thread is not None:
+            try:
+                self.queue.put(self._SENTINEL, timeout=timeout)
+            except queue.Full:
+                pass
+            thread.join(timeout)
+        for handler in self.handlers:
+            if isinstance(handler, BatchFlushMixin):
+                handler.batching = False
+                try:
+                    handler.flush()
+                except (OSError, ValueError):
+                    # 进程退出时流可能已经关闭
+                    pass
+
+    def after_fork_in_child(self):
+        """
+        fork后在子进程中调用：监听线程不会被复制到子进程，fork时其他线程还可能正持有队列的锁，
+        因此重新创建队列和锁并启动新的监听线程。父进程队列中尚未写入的日志由父进程写入
+        """
+        self.queue = queue.Queue(maxsize=self.queue_size)
+        self._lock = threading.Lock()
+        self._thread = None
+        if not self._stopped:
+            self.start()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        获取队列统计信息
+
+        :return: 当前深度、容量、历史最大深度、已丢弃和已写入的日志条数
+        """
+        return {
+            "queue_depth": self.queue.qsize(),
+            "queue_size": self.queue_size,
+            "max_depth": self.max_depth,
+            "overflow_policy": self.overflow_policy,
+            "dropped": self.dropped,
+            "written": self.written
+        }
+
+
+class AsyncQueueHandler(QueueHandler):
+    """把日志记录放入异步日志队列的处理器"""
+
+    def __init__(self, log_queue: AsyncLogQueue):
+        """
+        初始化队列处理器
+
+        :param log_queue: 异步日志队列
+        """
+        super().__init__(log_queue.queue)
+        self.log_queue = log_queue
+
+    def prepare(self, record):
+        """
+        在请求线程中固定日志消息，异常信息留给监听线程的处理器格式化；
+        结构化日志消息不在请求线程中拼接，由监听线程输出时再格式化
+
+        :param record: 日志记录对象
+        :return: 放入队列的日志记录
+        """
+        if isinstance(record.msg, StructuredMessage) and not record.args:
+            return record
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record):
+        self.log_queue.put(record)
 
 
 class LogUtils:
@@ -105,6 +482,13 @@ class LogUtils:
         'detailed': '%(asctime)s - %(name)s - %(levelname)s - %(filename)s:%(lineno)d - %(funcName)s - %(message)s'
     }
     
+    # 按配置文件共享的配置、处理器和异步日志队列，所有日志器复用同一套处理器，
+    # 配置文件只解析一次，日志文件也只打开一次
+    _configs: Dict[str, Optional[ConfigManager]] = {}
+    _handler_sets: Dict[str, List[logging.Handler]] = {}
+    _queues: Dict[str, AsyncLogQueue] = {}
+    _registry_lock = threading.Lock()
+    
     def __init__(self, name: str = __name__, config_file: str = 'config/LogConfig.ini'):
         """
         初始化日志工具
@@ -116,24 +500,36 @@ class LogUtils:
         self.config_file = config_file
         self.logger = logging.getLogger(name)
         self.config = None
+        # 日志级别 -> 采样比例，只对当前日志器生效
+        self.sample_rates: Dict[int, float] = {}
+        # 配置文件中的内容和模块过滤器，创建处理器时编译一次
+        self._filters: Optional[List[logging.Filter]] = None
         
         # 加载配置
         self._load_config()
         
         # 初始化日志器
         self._init_logger()
+        
+        # 加载采样配置
+        self._load_sample_rates()
     
     def _load_config(self):
-        """加载日志配置"""
-        try:
-            self.config = ConfigManager(self.config_file)
-        except Exception as e:
-            # 如果加载配置文件失败，使用默认配置
-            # 使用basicConfig临时配置日志，因为self.logger可能还未初始化
-            import logging
-            logging.basicConfig(level=logging.ERROR)
-            logging.error(f"加载配置文件失败: {e}")
-            self.config = None
+        """加载日志配置，同一配置文件只解析一次"""
+        with LogUtils._registry_lock:
+            if self.config_file in LogUtils._configs:
+                self.config = LogUtils._configs[self.config_file]
+                return
+            try:
+                self.config = ConfigManager(self.config_file)
+            except Exception as e:
+                # 如果加载配置文件失败，使用默认配置
+                # 使用basicConfig临时配置日志，因为self.logger可能还未初始化
+                import logging
+                logging.basicConfig(level=logging.ERROR)
+                logging.error(f"加载配置文件失败: {e}")
+                self.config = None
+            LogUtils._configs[self.config_file] = self.config
     
     def _init_logger(self):
         """初始化日志器"""
@@ -148,25 +544,119 @@ class LogUtils:
         if self.logger.handlers:
             self.logger.handlers.clear()
         
+        # 挂载配置文件对应的共享处理器
+        for handler in self._get_shared_handlers():
+            self.logger.addHandler(handler)
+    
+    def _load_sample_rates(self):
+        """
+        加载当前日志器的采样配置
+        
+        配置项sample_rates格式为"模块.级别:比例"，多个配置用逗号分隔，模块为*时对所有日志器生效，
+        例如"Database.INFO:0.01, *.DEBUG:0.1"。ERROR及以上级别的日志不采样
+        """
+        sample_rates = self._get_config_value('logging', 'sample_rates', '')
+        if not sample_rates.strip():
+            return
+        
+        default_rates = {}
+        module_rates = {}
+        for item in sample_rates.split(','):
+            item = item.strip()
+            if not item:
+                continue
+            try:
+                target, rate = item.rsplit(':', 1)
+                module, level = target.strip().rsplit('.', 1)
+                level = self.LOG_LEVELS[level.strip().upper()]
+                rate = min(max(float(rate), 0.0), 1.0)
+            except (ValueError, KeyError):
+                self.logger.warning(f"忽略无效的日志采样配置: {item}")
+                continue
+            if level >= logging.ERROR:
+                self.logger.warning(f"ERROR及以上级别的日志不采样，忽略配置: {item}")
+                continue
+            module = module.strip()
+            if module == '*':
+                default_rates[level] = rate
+            elif module == self.name:
+                module_rates[level] = rate
+        
+        # 模块自身的配置优先于*的配置，比例为1时不需要采样
+        rates = {**default_rates, **module_rates}
+        self.sample_rates = {level: rate for level, rate in rates.items() if rate < 1.0}
+    
+    def _sampled(self, level: int) -> bool:
+        """
+        判断本条日志是否被采样保留
+        
+        :param level: 日志级别
+        :return: 未配置采样或命中采样时返回True
+        """
+        rate = self.sample_rates.get(level)
+        return rate is None or random.random() < rate
+    
+    def _get_shared_handlers(self) -> List[logging.Handler]:
+        """
+        获取当前配置文件对应的共享处理器，不存在时按配置创建
+        
+        :return: 处理器列表
+        """
+        with LogUtils._registry_lock:
+            handlers = LogUtils._handler_sets.get(self.config_file)
+            if handlers is None:
+                handlers = self._create_handlers()
+                LogUtils._handler_sets[self.config_file] = handlers
+            return handlers
+    
+    def _create_handlers(self) -> List[logging.Handler]:
+        """
+        按配置创建处理器，启用异步写入时返回唯一的入队处理器
+        
+        :return: 处理器列表
+        """
+        handlers = []
+        
         # 配置控制台输出
         if self._get_config_value('logging', 'console_enabled', 'true').lower() == 'true':
-            self._add_console_handler()
+            handlers.append(self._create_console_handler())
         
         # 配置文件输出
         if self._get_config_value('logging', 'file_enabled', 'true').lower() == 'true':
-            self._add_file_handler()
+            handlers.append(self._create_file_handler())
         
         # 配置邮件通知
         if self._get_config_value('logging', 'email_enabled', 'false').lower() == 'true':
-            self._add_email_handler()
+            handlers.append(self._create_email_handler())
         
         # 配置网络输出
         if self._get_config_value('logging', 'network_enabled', 'false').lower() == 'true':
-            self._add_network_handler()
+            handlers.append(self._create_network_handler())
+        
+        handlers = [handler for handler in handlers if handler is not None]
+        
+        # 配置异步写入
+        if self._get_config_value('logging', 'async_enabled', 'false').lower() == 'true':
+            try:
+                log_queue = AsyncLogQueue(
+                    handlers,
+                    queue_size=int(self._get_config_value('logging', 'queue_size', '10000')),
+                    overflow_policy=self._get_config_value('logging', 'queue_overflow_policy', 'drop_new').lower(),
+                    batch_size=int(self._get_config_value('logging', 'queue_batch_size', '200')),
+                    block_timeout=float(self._get_config_value('logging', 'queue_block_timeout', '1'))
+                )
+            except Exception as e:
+                self.logger.error(f"配置异步日志队列失败，使用同步写入: {e}")
+                return handlers
+            log_queue.start()
+            LogUtils._queues[self.config_file] = log_queue
+            return [AsyncQueueHandler(log_queue)]
+        
+        return handlers
     
-    def _add_console_handler(self):
-        """添加控制台处理器"""
-        handler = logging.StreamHandler(sys.stdout)
+    def _create_console_handler(self) -> logging.Handler:
+        """创建控制台处理器"""
+        handler = BufferedStreamHandler(sys.stdout)
         
         # 设置日志格式
         log_format = self._get_config_value('logging', 'console_format', 'standard')
@@ -181,10 +671,10 @@ class LogUtils:
         # 添加过滤器
         self._add_filters(handler)
         
-        self.logger.addHandler(handler)
+        return handler
     
-    def _add_file_handler(self):
-        """添加文件处理器"""
+    def _create_file_handler(self) -> logging.Handler:
+        """创建文件处理器"""
         # 获取日志文件路径
         log_dir = self._get_config_value('logging', 'file_dir', 'logs')
         log_filename = self._get_config_value('logging', 'file_name', 'app.log')
@@ -200,13 +690,13 @@ class LogUtils:
             # 按大小轮转
             max_bytes = int(self._get_config_value('logging', 'max_bytes', '10485760'))  # 默认10MB
             backup_count = int(self._get_config_value('logging', 'backup_count', '5'))  # 默认保留5个文件
-            handler = RotatingFileHandler(log_path, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8')
+            handler = BufferedRotatingFileHandler(log_path, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8')
         else:
             # 按时间轮转
             when = self._get_config_value('logging', 'rotate_when', 'D')  # D=天, H=小时, M=分钟, S=秒
             interval = int(self._get_config_value('logging', 'rotate_interval', '1'))  # 默认每天轮转
             backup_count = int(self._get_config_value('logging', 'backup_count', '7'))  # 默认保留7天
-            handler = TimedRotatingFileHandler(log_path, when=when, interval=interval, backupCount=backup_count, encoding='utf-8')
+            handler = BufferedTimedRotatingFileHandler(log_path, when=when, interval=interval, backupCount=backup_count, encoding='utf-8')
         
         # 设置日志格式
         log_format = self._get_config_value('logging', 'file_format', 'detailed')
@@ -221,10 +711,10 @@ class LogUtils:
         # 添加过滤器
         self._add_filters(handler)
         
-        self.logger.addHandler(handler)
+        return handler
     
-    def _add_email_handler(self):
-        """添加邮件处理器"""
+    def _create_email_handler(self) -> Optional[logging.Handler]:
+        """创建邮件处理器"""
         try:
             # 获取邮件配置
             mail_host = self._get_config_value('logging', 'email_host')
@@ -237,7 +727,7 @@ class LogUtils:
             
             if not all([mail_host, mail_username, mail_password, mail_from, mail_to]):
                 self.logger.warning("邮件配置不完整，跳过邮件处理器配置")
-                return
+                return None
             
             # 创建邮件处理器
             handler = SMTPHandler(
@@ -262,12 +752,13 @@ class LogUtils:
             # 添加过滤器
             self._add_filters(handler)
             
-            self.logger.addHandler(handler)
+            return handler
         except Exception as e:
             self.logger.error(f"配置邮件处理器失败: {e}")
+            return None
     
-    def _add_network_handler(self):
-        """添加网络处理器"""
+    def _create_network_handler(self) -> Optional[logging.Handler]:
+        """创建网络处理器"""
         try:
             # 获取网络配置
             network_protocol = self._get_config_value('logging', 'network_protocol', 'tcp').lower()
@@ -293,31 +784,45 @@ class LogUtils:
             # 添加过滤器
             self._add_filters(handler)
             
-            self.logger.addHandler(handler)
+            return handler
         except Exception as e:
             self.logger.error(f"配置网络处理器失败: {e}")
+            return None
     
     def _add_filters(self, handler):
-        """为处理器添加过滤器"""
-        # 添加内容过滤器
+        """为处理器添加过滤器，过滤器只在第一次调用时编译，各处理器共用"""
+        if self._filters is None:
+            self._filters = self._build_filters()
+        for filter_obj in self._filters:
+            handler.addFilter(filter_obj)
+    
+    def _build_filters(self) -> List[logging.Filter]:
+        """
+        按配置编译内容过滤器和模块过滤器
+        
+        :return: 过滤器列表
+        """
+        filters = []
+        
+        # 内容过滤器
         include_keywords = self._get_config_value('logging', 'include_keywords', '')
         exclude_keywords = self._get_config_value('logging', 'exclude_keywords', '')
         
         if include_keywords or exclude_keywords:
             include_list = [kw.strip() for kw in include_keywords.split(',') if kw.strip()]
             exclude_list = [kw.strip() for kw in exclude_keywords.split(',') if kw.strip()]
-            content_filter = ContentFilter(include_list, exclude_list)
-            handler.addFilter(content_filter)
+            filters.append(ContentFilter(include_list, exclude_list))
         
-        # 添加模块过滤器
+        # 模块过滤器
         include_modules = self._get_config_value('logging', 'include_modules', '')
         exclude_modules = self._get_config_value('logging', 'exclude_modules', '')
         
         if include_modules or exclude_modules:
             include_list = [mod.strip() for mod in include_modules.split(',') if mod.strip()]
             exclude_list = [mod.strip() for mod in exclude_modules.split(',') if mod.strip()]
-            module_filter = ModuleFilter(include_list, exclude_list)
-            handler.addFilter(module_filter)
+            filters.append(ModuleFilter(include_list, exclude_list))
+        
+        return filters
     
     def _get_config_value(self, section: str, key: str, default: str = '') -> str:
         """
@@ -334,15 +839,18 @@ class LogUtils:
     
     def debug(self, msg: str, *args, **kwargs):
         """记录DEBUG级别的日志"""
-        self.logger.debug(msg, *args, **kwargs)
+        if self._sampled(logging.DEBUG):
+            self.logger.debug(msg, *args, **kwargs)
     
     def info(self, msg: str, *args, **kwargs):
         """记录INFO级别的日志"""
-        self.logger.info(msg, *args, **kwargs)
+        if self._sampled(logging.INFO):
+            self.logger.info(msg, *args, **kwargs)
     
     def warning(self, msg: str, *args, **kwargs):
         """记录WARNING级别的日志"""
-        self.logger.warning(msg, *args, **kwargs)
+        if self._sampled(logging.WARNING):
+            self.logger.warning(msg, *args, **kwargs)
     
     def error(self, msg: str, *args, **kwargs):
         """记录ERROR级别的日志"""
@@ -356,6 +864,38 @@ class LogUtils:
         """记录异常信息"""
         self.logger.exception(msg, *args, **kwargs)
     
+    def log_event(self, level: int, event: str, **fields):
+        """
+        记录结构化日志，级别未启用或未被采样时不创建日志记录
+        
+        :param level: 日志级别
+        :param event: 事件名称
+        :param fields: 日志字段，值可以是无参可调用对象，输出时才调用
+        """
+        self._log_event(level, event, fields)
+    
+    def debug_event(self, event: str, **fields):
+        """记录DEBUG级别的结构化日志"""
+        self._log_event(logging.DEBUG, event, fields)
+    
+    def info_event(self, event: str, **fields):
+        """记录INFO级别的结构化日志"""
+        self._log_event(logging.INFO, event, fields)
+    
+    def warning_event(self, event: str, **fields):
+        """记录WARNING级别的结构化日志"""
+        self._log_event(logging.WARNING, event, fields)
+    
+    def error_event(self, event: str, **fields):
+        """记录ERROR级别的结构化日志"""
+        self._log_event(logging.ERROR, event, fields)
+    
+    def _log_event(self, level: int, event: str, fields: Dict[str, Any]):
+        if not self.logger.isEnabledFor(level) or not self._sampled(level):
+            return
+        # stacklevel=3跳过LogUtils自身的两层调用，记录调用方的文件和行号
+        self.logger.log(level, StructuredMessage(event, fields), stacklevel=3)
+    
     def set_level(self, level: str):
         """
         设置日志级别
@@ -375,16 +915,13 @@ class LogUtils:
     
     def add_filter(self, filter_obj: logging.Filter):
         """
-        添加自定义过滤器到所有处理器
+        添加自定义过滤器到当前日志器
+        
+        处理器由同一配置文件的所有日志器共享，过滤器只加在日志器上，不影响其他日志器
         
         :param filter_obj: logging.Filter实例
         """
-        # 添加到logger本身
         self.logger.addFilter(filter_obj)
-        
-        # 添加到所有处理器
-        for handler in self.logger.handlers:
-            handler.addFilter(filter_obj)
     
     def add_content_filter(self, include_keywords: Optional[List[str]] = None, exclude_keywords: Optional[List[str]] = None):
         """
@@ -423,3 +960,34 @@ class LogUtils:
             LogUtils._instances[key] = LogUtils(name, config_file)
         
         return LogUtils._instances[key]
+    
+    @staticmethod
+    def get_queue_stats(config_file: str = 'config/LogConfig.ini') -> Optional[Dict[str, Any]]:
+        """
+        获取异步日志队列的统计信息
+        
+        :param config_file: 配置文件路径
+        :return: 队列统计快照，未启用异步写入时返回None
+        """
+        log_queue = LogUtils._queues.get(config_file)
+        if log_queue is None:
+            return None
+        return log_queue.stats()
+    
+    @staticmethod
+    def shutdown():
+        """停止所有异步日志队列的监听线程，写完队列中剩余的日志"""
+        for log_queue in list(LogUtils._queues.values()):
+            log_queue.stop()
+    
+    @staticmethod
+    def _after_fork_in_child():
+        """fork后在子进程中重新启动异步日志队列的监听线程"""
+        for log_queue in list(LogUtils._queues.values()):
+            log_queue.after_fork_in_child()
+
+
+# 进程退出前写完异步队列中的日志
+atexit.register(LogUtils.shutdown)
+# fork出的子进程使用自己的日志监听线程
+os.register_at_fork(after_in_child=LogUtils._after_fork_in_child)
@@ -0,0 +1,300 @@
+import bisect
+import threading
+from typing import Dict, List, Optional, Tuple
+from utils.ConfigManager import ConfigManager
+from utils.LogUtils import LogUtils
+
+
+class MetricsWriter:
+    """
+    Prometheus文本格式（text exposition format 0.0.4）输出工具
+
+    每个指标先输出HELP和TYPE注释，再输出各标签组合的取值。
+    """
+
+    CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+    def __init__(self):
+        self._lines: List[str] = []
+
+    @staticmethod
+    def _escape(value) -> str:
+        return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+    @staticmethod
+    def _format_labels(labels: Optional[Dict[str, object]]) -> str:
+        if not labels:
+            return ''
+        return '{' + ','.join(f'{key}="{MetricsWriter._escape(value)}"' for key, value in labels.items()) + '}'
+
+    @staticmethod
+    def _format_value(value) -> str:
+        if isinstance(value, float):
+            return repr(round(value, 6))
+        return str(value)
+
+    def _header(self, name: str, help_text: str, metric_type: str):
+        self._lines.append(f"# HELP {name} {help_text}")
+        self._lines.append(f"# TYPE {name} {metric_type}")
+
+    def counter(self, name: str, help_text: str, samples: List[Tuple[Optional[Dict[str, object]], float]]):
+        """
+        输出计数器
+
+        :param name: 指标名称
+        :param help_text: 指标说明
+        :param samples: (标签, 取值)列表
+        """
+        self._header(name, help_text, 'counter')
+        for labels, value in samples:
+            self._lines.append(f"{name}{self._format_labels(labels)} {self._format_value(value)}")
+
+    def gauge(self, name: str, help_text: str, samples: List[Tuple[Optional[Dict[str, object]], float]]):
+        """
+        输出仪表盘指标
+
+        :param name: 指标名称
+        :param help_text: 指标说明
+        :param samples: (标签, 取值)列表
+        """
+        self._header(name, help_text, 'gauge')
+        for labels, value in samples:
+            self._lines.append(f"{name}{self._format_labels(labels)} {self._format_value(value)}")
+
+    def histogram(self, name: str, help_text: str, series: List[Tuple[Optional[Dict[str, object]], List[Tuple[str, int]], float, int]]):
+        """
+        输出直方图
+
+        :param name: 指标名称
+        :param help_text: 指标说明
+        :param series: (标签, [(桶上限, 累计计数), ...], 总和, 总数)列表，最后一个桶的上限为+Inf
+        """
+        self._header(name, help_text, 'histogram')
+        for labels, buckets, total, count in series:
+            labels = labels or {}
+            for bound, cumulative in buckets:
+                self._lines.append(f"{name}_bucket{self._format_labels({**labels, 'le': bound})} {cumulative}")
+            self._lines.append(f"{name}_sum{self._format_labels(labels)} {self._format_value(float(total))}")
+            self._lines.append(f"{name}_count{self._format_labels(labels)} {count}")
+
+    def render(self) -> str:
+        """
+        获取输出文本
+
+        :return: Prometheus文本格式的指标
+        """
+        return '\n'.join(self._lines) + '\n'
+
+
+class RequestMetrics:
+    """
+    按路由统计的请求指标：请求数（按状态码）、5xx错误数、请求耗时直方图和请求内数据库耗时直方图
+
+    路由使用Flask的URL规则（如/api/stats/<kind>），标签数量与注册的路由数一致，不随请求参数增长。
+    每个请求只在结束时加一次锁更新计数，开销与请求处理相比可以忽略。
+    """
+
+    # 耗时直方图的桶上限（单位：秒）
+    LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+    _lock = threading.Lock()
+    # (方法, 路由) -> [请求数, 错误数, 耗时桶计数, 耗时总和, 数据库耗时桶计数, 数据库耗时总和, 语句总数]
+    _routes: Dict[Tuple[str, str], list] = {}
+    # (方法, 路由, 状态码) -> 请求数
+    _statuses: Dict[Tuple[str, str, int], int] = {}
+    # (方法, 路由) -> SQL语句数超出预算的请求数
+    _over_budget: Dict[Tuple[str, str], int] = {}
+
+    @classmethod
+    def observe(cls, method: str, route: str, status: int, seconds: float, db_seconds: float = 0.0, query_count: int = 0):
+        """
+        记录一个已完成的请求
+
+        :param method: 请求方法
+        :param route: 路由规则
+        :param status: 响应状态码
+        :param seconds: 请求耗时（秒）
+        :param db_seconds: 请求内执行SQL语句的累计耗时（秒）
+        :param query_count: 请求内执行的SQL语句数
+        """
+        latency_index = bisect.bisect_left(cls.LATENCY_BUCKETS, seconds)
+        db_index = bisect.bisect_left(cls.LATENCY_BUCKETS, db_seconds)
+        key = (method, route)
+        with cls._lock:
+            stats = cls._routes.get(key)
+            if stats is None:
+                bucket_count = len(cls.LATENCY_BUCKETS) + 1
+                stats = [0, 0, [0] * bucket_count, 0.0, [0] * bucket_count, 0.0, 0]
+                cls._routes[key] = stats
+            stats[0] += 1
+            if status >= 500:
+                stats[1] += 1
+            stats[2][latency_index] += 1
+            stats[3] += seconds
+            stats[4][db_index] += 1
+            stats[5] += db_seconds
+            stats[6] += query_count
+            status_key = (method, route, status)
+            cls._statuses[status_key] = cls._statuses.get(status_key, 0) + 1
+
+    @classmethod
+    def record_over_budget(cls, method: str, route: str):
+        """
+        记录一个SQL语句数超出预算的请求
+
+        :param method: 请求方法
+        :param route: 路由规则
+        """
+        key = (method, route)
+        with cls._lock:
+            cls._over_budget[key] = cls._over_budget.get(key, 0) + 1
+
+    @classmethod
+    def _cumulative(cls, counts: List[int]) -> List[Tuple[str, int]]:
+        buckets = []
+        cumulative = 0
+        for bound, count in zip(cls.LATENCY_BUCKETS, counts):
+            cumulative += count
+            buckets.append((str(bound), cumulative))
+        cumulative += counts[-1]
+        buckets.append(('+Inf', cumulative))
+        return buckets
+
+    @classmethod
+    def write(cls, writer: MetricsWriter):
+        """
+        把请求指标写入输出工具
+
+        :param writer: MetricsWriter实例
+        """
+        with cls._lock:
+            routes = sorted((key, [stats[0], stats[1], list(stats[2]), stats[3], list(stats[4]), stats[5], stats[6]])
+                            for key, stats in cls._routes.items())
+            statuses = sorted(cls._statuses.items())
+            over_budget = sorted(cls._over_budget.items())
+
+        writer.counter('app_http_requests_total', '按路由和状态码统计的请求数',
+                       [({'method': method, 'route': route, 'status': status}, count)
+                        for (method, route, status), count in statuses])
+        writer.counter('app_http_request_errors_total', '按路由统计的5xx响应数',
+                       [({'method': method, 'route': route}, stats[1]) for (method, route), stats in routes])
+        writer.histogram('app_http_request_duration_seconds', '按路由统计的请求耗时',
+                         [({'method': method, 'route': route}, cls._cumulative(stats[2]), stats[3], stats[0])
+                          for (method, route), stats in routes])
+        writer.histogram('app_http_request_db_seconds', '按路由统计的单个请求内SQL语句累计耗时',
+                         [({'method': method, 'route': route}, cls._cumulative(stats[4]), stats[5], stats[0])
+                          for (method, route), stats in routes])
+        writer.counter('app_http_request_queries_total', '按路由统计的SQL语句数',
+                       [({'method': method, 'route': route}, stats[6]) for (method, route), stats in routes])
+        writer.counter('app_http_query_budget_exceeded_total', '按路由统计的SQL语句数超出预算的请求数',
+                       [({'method': method, 'route': route}, count) for (method, route), count in over_budget])
+
+    @classmethod
+    def reset(cls):
+        """
+        清除全部请求指标
+        """
+        with cls._lock:
+            cls._routes.clear()
+            cls._statuses.clear()
+            cls._over_budget.clear()
+
+
+class RequestTiming:
+    """
+    请求耗时分解的配置：是否返回Server-Timing响应头，以及每个请求允许执行的SQL语句数（查询预算）
+
+    配置来自DateBaseConfig.ini：[instrumentation]节的server_timing和query_budget（默认预算），
+    [query_budget]节按"请求方法 路由规则 = 语句数"覆盖单个路由的预算，0表示不限制。
+    Server-Timing会向客户端暴露服务端耗时和SQL语句数，默认不返回；当前环境的配置节（如[dev]、[test]）
+    中的server_timing优先于[instrumentation]节。
+    """
+
+    logger = LogUtils.get_instance('RequestTiming')
+
+    _config_lock = threading.Lock()
+    _server_timing = None
+    _default_budget = 0
+    # (大写的请求方法, 路由规则) -> 语句数
+    _route_budgets: Dict[Tuple[str, str], int] = {}
+
+    @classmethod
+    def configure(cls, server_timing: bool, default_budget: int = 0, route_budgets: Optional[Dict[Tuple[str, str], int]] = None):
+        """
+        设置请求耗时分解配置
+
+        :param server_timing: 是否返回Server-Timing响应头
+        :param default_budget: 默认的SQL语句数预算，0表示不限制
+        :param route_budgets: 按(请求方法, 路由规则)设置的预算
+        """
+        with cls._config_lock:
+            cls._server_timing = bool(server_timing)
+            cls._default_budget = int(default_budget)
+            cls._route_budgets = {(method.upper(), route): int(budget) for (method, route), budget in (route_budgets or {}).items()}
+        cls.logger.info(f"Server-Timing: {'启用' if cls._server_timing else '未启用'}, 默认SQL语句数预算: {cls._default_budget}, "
+                        f"按路由设置的预算: {len(cls._route_budgets)}个")
+
+    @classmethod
+    def _load_config(cls, config_file: str = 'config/DateBaseConfig.ini'):
+        """从配置文件加载Server-Timing开关和查询预算"""
+        try:
+            config = ConfigManager(config_file, env_override=True)
+            route_budgets = {}
+            for key, value in (config.get('query_budget') or {}).items():
+                parts = key.split(None, 1)
+                if len(parts) != 2:
+                    cls.logger.warning(f"忽略无效的查询预算配置: {key} = {value}")
+                    continue
+                try:
+                    route_budgets[(parts[0], parts[1].strip())] = int(value)
+                except ValueError:
+                    cls.logger.warning(f"忽略无效的查询预算配置: {key} = {value}")
+            current_env = config.get('app', 'env', default='dev')
+            server_timing = config.getboolean(current_env, 'server_timing',
+                                              config.getboolean('instrumentation', 'server_timing', False))
+            cls.configure(server_timing,
+                          config.getint('instrumentation', 'query_budget', 0),
+                          route_budgets)
+        except Exception as e:
+            cls.logger.error(f"加载请求耗时分解配置失败: {e}")
+            cls.configure(False)
+
+    @classmethod
+    def server_timing_enabled(cls) -> bool:
+        """
+        是否返回Server-Timing响应头
+
+        :return: 启用返回True
+        """
+        if cls._server_timing is None:
+            cls._load_config()
+        return cls._server_timing
+
+    @classmethod
+    def budget_for(cls, method: str, route: str) -> int:
+        """
+        获取路由的SQL语句数预算
+
+        :param method: 请求方法
+        :param route: 路由规则
+        :return: 语句数预算，0表示不限制
+        """
+        if cls._server_timing is None:
+            cls._load_config()
+        return cls._route_budgets.get((method.upper(), route), cls._default_budget)
+
+    @staticmethod
+    def format_header(entries: List[Tuple[str, float, Optional[str]]]) -> str:
+        """
+        生成Server-Timing响应头
+
+        :param entries: (名称, 耗时秒数, 描述)列表
+        :return: 形如 db;dur=1.2;desc="3 queries", total;dur=4.5 的响应头取值，耗时单位为毫秒
+        """
+        parts = []
+        for name, seconds, description in entries:
+            part = f"{name};dur={seconds * 1000:.2f}"
+            if description:
+                part += f';desc="{description}"'
+            parts.append(part)
+        return ', '.join(parts)
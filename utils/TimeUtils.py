@@ -119,3 +119,29 @@ class TimeUtils:
             datetime: datetime对象
         """
         return TimeUtils.milliseconds_to_datetime(milliseconds)
+    
+    @staticmethod
+    def parse_time(value: str) -> datetime:
+        """
+        解析请求参数中的时间，支持毫秒级时间戳或时间字符串
+        
+        Args:
+            value: 毫秒级时间戳，或"%Y-%m-%d %H:%M:%S"、"%Y-%m-%d %H:%M"、"%Y-%m-%d"格式的时间字符串
+            
+        Returns:
+            datetime: datetime对象
+            
+        Raises:
+            ValueError: 时间格式无效
+        """
+        value = value.strip()
+        try:
+            return TimeUtils.milliseconds_to_datetime(int(value))
+        except ValueError:
+            pass
+        for fmt in ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M", "%Y-%m-%d"):
+            try:
+                return datetime.strptime(value, fmt)
+            except ValueError:
+                continue
+        raise ValueError("时间格式错误，请使用毫秒级时间戳或有效的时间字符串")
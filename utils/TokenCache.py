@@ -0,0 +1,154 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from utils.LogUtils import LogUtils
+
+
+class TokenCache:
+    """
+    token校验缓存，在进程内保存 用户ID -> {token摘要: (token过期时间, 缓存时间)}
+
+    同一用户可以在多个设备上登录，每个用户最多缓存MAX_TOKENS_PER_USER个token。
+    鉴权装饰器命中缓存时不再查询会话表和用户表；token更新、密码修改、用户删除时由UserDAO，
+    退出登录、同一设备重新登录时由SessionDAO调用invalidate清除。
+    缓存条目超过TTL秒后失效，用于限制其他进程修改token后本进程继续使用旧数据的时间；
+    缓存的用户数超过MAX_SIZE时淘汰最久未使用的用户。
+    """
+
+    logger = LogUtils.get_instance('TokenCache')
+
+    # 缓存条目的有效期（秒）
+    TTL = 30
+
+    # 最多缓存的用户数
+    MAX_SIZE = 10000
+
+    # 每个用户最多缓存的token数
+    MAX_TOKENS_PER_USER = 8
+
+    _entries = OrderedDict()
+    _lock = threading.Lock()
+    # 每次清除缓存时递增，查询数据库期间发生过清除的结果不再写入缓存
+    _generation = 0
+    # 命中/未命中次数，供/metrics接口统计命中率
+    _hits = 0
+    _misses = 0
+
+    @staticmethod
+    def _digest(token):
+        """
+        计算token摘要，缓存中不保存token原文
+
+        Args:
+            token: token字符串
+
+        Returns:
+            str: SHA-256摘要
+        """
+        return hashlib.sha256(str(token).encode('utf-8')).hexdigest()
+
+    @classmethod
+    def generation(cls):
+        """
+        获取当前的缓存代数，在查询数据库之前读取并传给put
+
+        Returns:
+            int: 缓存代数
+        """
+        with cls._lock:
+            return cls._generation
+
+    @classmethod
+    def put(cls, user_id, token, expiration_time, generation):
+        """
+        缓存从数据库中读到的token
+
+        Args:
+            user_id: 用户ID
+            token: 数据库中保存的token
+            expiration_time: token过期时间戳（毫秒）
+            generation: 查询数据库之前读取的缓存代数
+        """
+        if not token or expiration_time is None:
+            return
+        token_digest = cls._digest(token)
+        with cls._lock:
+            if generation != cls._generation:
+                # 查询期间token已被更新或用户已被删除，读到的可能是旧数据
+                return
+            tokens = cls._entries.setdefault(user_id, {})
+            tokens.pop(token_digest, None)
+            tokens[token_digest] = (expiration_time, time.monotonic())
+            while len(tokens) > cls.MAX_TOKENS_PER_USER:
+                tokens.pop(next(iter(tokens)))
+            cls._entries.move_to_end(user_id)
+            while len(cls._entries) > cls.MAX_SIZE:
+                cls._entries.popitem(last=False)
+
+    @classmethod
+    def is_valid(cls, user_id, token):
+        """
+        使用缓存校验token
+
+        Args:
+            user_id: 用户ID
+            token: 请求中的token
+
+        Returns:
+            bool: 请求中的token已缓存且未过期返回True；
+                  未缓存或缓存已失效返回False，调用方需要查询数据库确认
+        """
+        token_digest = cls._digest(token)
+        with cls._lock:
+            tokens = cls._entries.get(user_id)
+            entry = tokens.get(token_digest) if tokens else None
+            if entry is None:
+                cls._misses += 1
+                return False
+            expiration_time, cached_at = entry
+            if time.monotonic() - cached_at >= cls.TTL:
+                del tokens[token_digest]
+                cls._misses += 1
+                return False
+            cls._entries.move_to_end(user_id)
+            cls._hits += 1
+
+        try:
+            return int(time.time() * 1000) <= int(expiration_time)
+        except (TypeError, ValueError):
+            return False
+
+    @classmethod
+    def invalidate(cls, user_id):
+        """
+        清除用户的缓存
+
+        Args:
+            user_id: 用户ID
+        """
+        with cls._lock:
+            cls._generation += 1
+            removed = cls._entries.pop(user_id, None) is not None
+        if removed:
+            cls.logger.info(f"清除用户token缓存: user_id={user_id}")
+
+    @classmethod
+    def stats(cls):
+        """
+        获取缓存统计信息
+
+        Returns:
+            dict: 命中次数、未命中次数和当前缓存的用户数
+        """
+        with cls._lock:
+            return {"hits": cls._hits, "misses": cls._misses, "size": len(cls._entries)}
+
+    @classmethod
+    def clear(cls):
+        """
+        清除全部缓存
+        """
+        with cls._lock:
+            cls._generation += 1
+            cls._entries.clear()
@@ -72,15 +72,12 @@ class TokenUtils:
                 TokenUtils.logger.warning("token或存储的token为空")
                 return False
             
-            # 检查token是否匹配
-            TokenUtils.logger.debug(f"token比较前调试信息：")
-            TokenUtils.logger.debug(f"  token: {repr(token)}")
-            TokenUtils.logger.debug(f"  stored_token: {repr(stored_token)}")
-            TokenUtils.logger.debug(f"  token hex: {token.encode('utf-8').hex()}")
-            TokenUtils.logger.debug(f"  stored_token hex: {stored_token.encode('utf-8').hex()}")
-            TokenUtils.logger.debug(f"  token length: {len(token)}")
-            TokenUtils.logger.debug(f"  stored_token length: {len(stored_token)}")
-            TokenUtils.logger.debug(f"  token == stored_token: {token == stored_token}")
+            # 检查token是否匹配，调试信息只记录长度，不记录token内容
+            TokenUtils.logger.debug_event(
+                "token比较前调试信息",
+                token_length=lambda: len(token),
+                stored_token_length=lambda: len(stored_token)
+            )
             
             if token != stored_token:
                 TokenUtils.logger.warning("token不匹配")
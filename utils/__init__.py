@@ -1,10 +1,12 @@
 # 注意：为了避免循环导入问题，这里不直接导入模块
 # 而是通过__all__定义可以导出的模块
 __all__ = [
+    'AccessToken',
     'AuthUtils',
     'ConfigManager',
     'LogUtils',
     'MD5Utils',
+    'TokenCache',
     'TokenUtils',
     'TimeUtils'
 ]